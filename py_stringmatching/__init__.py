@@ -7,6 +7,18 @@ from py_stringmatching.tokenizer.delimiter_tokenizer import DelimiterTokenizer
 from py_stringmatching.tokenizer.qgram_tokenizer import QgramTokenizer
 from py_stringmatching.tokenizer.whitespace_tokenizer import WhitespaceTokenizer
 
+# Import normalizer
+from py_stringmatching.normalizer import Normalizer
+
+# Import token vocabulary
+from py_stringmatching.vocabulary import Vocabulary
+
+# Import MinHash sketcher
+from py_stringmatching.minhash import MinHash
+
+# Import SimHash fingerprinter
+from py_stringmatching.simhash import SimHash
+
 # Import similarity measures
 from py_stringmatching.similarity_measure.affine import Affine
 from py_stringmatching.similarity_measure.bag_distance import BagDistance
@@ -28,3 +40,17 @@ from py_stringmatching.similarity_measure.soundex import Soundex
 from py_stringmatching.similarity_measure.tfidf import TfIdf
 from py_stringmatching.similarity_measure.tversky_index import TverskyIndex
 from py_stringmatching.similarity_measure.partial_ratio import PartialRatio
+
+# Import substitution matrix for the alignment measures
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix import SubstitutionMatrix
+
+# Import indexes
+from py_stringmatching.index.soundex_index import SoundexIndex
+from py_stringmatching.index.set_similarity_index import SetSimilarityIndex
+from py_stringmatching.index.lsh_index import LSHIndex
+from py_stringmatching.index.hamming_index import HammingIndex
+
+# Import joins
+from py_stringmatching.join.all_pairs_set_similarity import AllPairsSetSimilarity
+from py_stringmatching.join.set_sim_join import SetSimJoin
+from py_stringmatching.join.tfidf_join import TfIdfJoin
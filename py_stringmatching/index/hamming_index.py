@@ -0,0 +1,245 @@
+"""Multi-index hashing index of 64-bit codes for Hamming distance search"""
+
+import itertools
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_simhash import hamming_search
+
+# Largest number of chunk values within the radius of a query chunk that are looked up.
+_MAX_MASKS = 1 << 16
+
+
+class HammingIndex(object):
+    """Index of packed 64-bit codes, such as SimHash fingerprints, that finds all codes within a Hamming distance.
+
+    The index uses multi-index hashing: the 64 bits of the codes are cut into num_chunks chunks, and the values of
+    every chunk are kept sorted. Two codes that differ in at most max_distance bits differ in at most
+    max_distance // num_chunks bits in one of their chunks, so only the codes that are that close to a query in one
+    of its chunks are compared with it, with a popcount. The results are exact: exactly the codes within
+    max_distance bits are returned. The search runs in Cython.
+
+    With the default num_chunks = max_distance + 1, a match has a chunk equal to that of the query, so each chunk
+    costs a single lookup. Fewer, wider chunks make the lookups more selective but need to enumerate the chunk
+    values within a radius.
+
+    Every record is identified by a hashable record id. The chunk values are sorted on the first search after
+    records were added or removed, so changes are best made in batches.
+
+    Parameters:
+        max_distance (int): Largest Hamming distance of the codes found, in the range [0, 63], default=3
+        num_chunks (int): Number of chunks, in the range [1, 64], default=max_distance + 1. There can be at most
+            65536 chunk values within max_distance // num_chunks bits of a chunk.
+
+    Examples:
+        >>> index = HammingIndex(max_distance=2)
+        >>> index.add_many(['a', 'b', 'c'], np.array([0b1111, 0b1100, 0b0111], dtype=np.uint64))
+        >>> index.query(0b1110)
+        [('a', 1), ('b', 1), ('c', 2)]
+        >>> list(index.pairs())
+        [('a', 'b', 2), ('a', 'c', 1)]
+    """
+    def __init__(self, max_distance=3, num_chunks=None):
+        if num_chunks is None:
+            num_chunks = max_distance + 1
+        if max_distance < 0 or max_distance > 63:
+            raise ValueError('max_distance should be in the range [0, 63]')
+        if num_chunks < 1 or num_chunks > 64:
+            raise ValueError('num_chunks should be in the range [1, 64]')
+        self.max_distance = max_distance
+        self.num_chunks = num_chunks
+        # chunk t covers the bits starts[t] to starts[t] + widths[t] - 1
+        self._widths = np.full(num_chunks, 64 // num_chunks, dtype=np.int32)
+        self._widths[:64 % num_chunks] += 1
+        self._starts = (np.cumsum(self._widths) - self._widths).astype(np.int32)
+        self._radius = max_distance // num_chunks
+        width = int(self._widths.max())
+        if sum(_binomial(width, num_bits) for num_bits in range(self._radius + 1)) > _MAX_MASKS:
+            raise ValueError('num_chunks is too small for max_distance')
+        self._masks = _masks(width, self._radius)
+        # record id -> row of its code, in the order the records were added
+        self._row_of = {}
+        # codes not yet merged into _codes
+        self._pending = []
+        self._codes = np.empty(0, dtype=np.uint64)
+        # per chunk, the chunk values sorted and the rows in that order, built on the first search after a change
+        self._built = False
+        self._record_ids = []
+        self._sorted_keys = None
+        self._sorted_rows = None
+
+    def add(self, record_id, code):
+        """
+        Adds a record to the index. If the record id is already in the index, its code is replaced.
+
+        Args:
+            record_id (hashable): Record id
+            code (int or numpy uint64): Code of the record, in the range [0, 2**64)
+
+        Raises:
+            TypeError : If the code is None or not an integer
+            ValueError : If the code is not in the range [0, 2**64)
+        """
+        self.add_many([record_id], _code_array([code]))
+
+    def add_many(self, record_ids, codes):
+        """
+        Adds many records to the index.
+
+        Args:
+            record_ids (list of hashable): Record ids
+            codes (numpy uint64 array): Codes of the records, as returned by SimHash.fingerprints
+
+        Raises:
+            TypeError : If codes is None or not a numpy integer array
+            ValueError : If record_ids and codes are not of the same length, or if a code is negative
+        """
+        codes = _code_array(codes)
+        utils.sim_check_for_same_len(record_ids, codes)
+        num_rows = len(self._codes) + sum(len(pending) for pending in self._pending)
+        self._pending.append(codes)
+        for row, record_id in enumerate(record_ids, num_rows):
+            # re-inserting a record id moves it to the end of the dictionary, next to its new row
+            self._row_of.pop(record_id, None)
+            self._row_of[record_id] = row
+        self._built = False
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index.
+
+        Args:
+            record_id (hashable): Record id
+
+        Raises:
+            KeyError : If the record id is not in the index
+        """
+        del self._row_of[record_id]
+        self._built = False
+
+    def query(self, code):
+        """
+        Finds the records whose code is within max_distance bits of a code.
+
+        Args:
+            code (int or numpy uint64): Query code, in the range [0, 2**64)
+
+        Returns:
+            List of (record id, Hamming distance) tuples, by increasing distance and then in the order the records
+            were added
+
+        Raises:
+            TypeError : If the code is None or not an integer
+            ValueError : If the code is not in the range [0, 2**64)
+        """
+        queries = _code_array([code])
+        rows, distances = self._search(queries, False, 1)[1:]
+        order = np.lexsort((rows, distances))
+        record_ids = self._record_ids
+        return [(record_ids[row], distance)
+                for row, distance in zip(rows[order].tolist(), distances[order].tolist())]
+
+    def pairs(self, n_jobs=1):
+        """
+        Generates the pairs of records whose codes are within max_distance bits of each other, for a self-join.
+
+        Each pair is generated once, with the record added first on the left, sorted by the order in which the
+        records were added.
+
+        Args:
+            n_jobs (int): Number of threads searching the codes, -1 for all CPUs, default=1. Threads are only used
+                if the package was built with OpenMP.
+
+        Returns:
+            Generator of (record_id1, record_id2, Hamming distance) tuples
+        """
+        rows1, rows2, distances = self._search(None, True, utils.get_num_threads(n_jobs))
+        order = np.lexsort((rows2, rows1))
+        record_ids = self._record_ids
+        for row1, row2, distance in zip(rows1[order].tolist(), rows2[order].tolist(), distances[order].tolist()):
+            yield record_ids[row1], record_ids[row2], distance
+
+    def get_max_distance(self):
+        """
+        Get largest Hamming distance of the codes found
+
+        Returns:
+            max_distance (int)
+        """
+        return self.max_distance
+
+    def get_num_chunks(self):
+        """
+        Get number of chunks
+
+        Returns:
+            num_chunks (int)
+        """
+        return self.num_chunks
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, record_id):
+        return record_id in self._row_of
+
+    def _search(self, queries, self_join, num_threads):
+        if not self._built:
+            self._build()
+        if self_join:
+            queries = self._codes
+        rows1, rows2, distances = hamming_search(
+            queries, self._codes, self._sorted_keys, self._sorted_rows, self._starts, self._widths,
+            self._masks, self.max_distance, self._radius, self_join, num_threads)
+        return rows1, rows2, distances.astype(np.int64)
+
+    def _build(self):
+        """Drops the rows of removed records and sorts the chunk values of the codes."""
+        codes = np.concatenate([self._codes] + self._pending)
+        self._pending = []
+        alive = np.fromiter(self._row_of.values(), dtype=np.intp, count=len(self._row_of))
+        if len(alive) < len(codes):
+            codes = codes[alive]
+            self._row_of = dict(zip(self._row_of, range(len(alive))))
+        self._codes = codes
+        self._record_ids = list(self._row_of)
+        keys = np.empty((self.num_chunks, len(codes)), dtype=np.uint64)
+        for t in range(self.num_chunks):
+            keys[t] = (codes >> np.uint64(self._starts[t])) & np.uint64((1 << int(self._widths[t])) - 1)
+        # a stable sort keeps the rows of equal chunk values in increasing order
+        self._sorted_rows = np.argsort(keys, axis=1, kind='stable').astype(np.intp)
+        self._sorted_keys = np.ascontiguousarray(np.take_along_axis(keys, self._sorted_rows, axis=1))
+        self._built = True
+
+
+def _binomial(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def _masks(width, radius):
+    """All the values of width bits with at most radius bits set."""
+    masks = [sum(1 << bit for bit in bits)
+             for num_bits in range(min(radius, width) + 1)
+             for bits in itertools.combinations(range(width), num_bits)]
+    return np.array(masks, dtype=np.uint64)
+
+
+def _code_array(codes):
+    if codes is None:
+        raise TypeError('Codes cannot be None')
+    if not isinstance(codes, np.ndarray):
+        for code in codes:
+            if code is None or isinstance(code, bool) or not isinstance(code, (int, np.integer)):
+                raise TypeError('Codes are expected to be integers')
+            if code < 0 or code >= 1 << 64:
+                raise ValueError('Codes are expected to be in the range [0, 2**64)')
+        return np.array([int(code) for code in codes], dtype=np.uint64)
+    if codes.ndim != 1 or codes.dtype.kind not in 'ui':
+        raise TypeError('Codes are expected to be a one-dimensional numpy integer array')
+    if codes.dtype.kind == 'i' and len(codes) > 0 and codes.min() < 0:
+        raise ValueError('Codes are expected to be in the range [0, 2**64)')
+    return np.ascontiguousarray(codes, dtype=np.uint64)
@@ -0,0 +1,283 @@
+"""Locality sensitive hashing index of MinHash signatures"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_minhash import band_keys
+
+# Largest number of pairs held in memory at a time by LSHIndex.candidate_pairs.
+_PAIR_CHUNK_SIZE = 1 << 20
+
+
+class LSHIndex(object):
+    """Banding index of MinHash signatures that finds the pairs of records likely to be similar.
+
+    The first bands * rows values of every signature are cut into bands of rows values, and two records are
+    candidates if all the values of at least one of their bands are equal. Two sets with a Jaccard score of s are
+    candidates with a probability of 1 - (1 - s ** rows) ** bands, an S-shaped curve that rises steeply around
+    (1 / bands) ** (1 / rows), see LSHIndex.get_threshold and lsh_parameters. Candidates are then verified with an
+    exact measure such as Jaccard.
+
+    Every record is identified by a hashable record id. The index only keeps one 64-bit key per band and record,
+    and candidate_pairs works band by band on sorted keys, holding a bounded number of pairs at a time. The keys
+    are sorted on the first query after records were added or removed, so changes are best made in batches.
+
+    Parameters:
+        bands (int): Number of bands, default=16
+        rows (int): Number of signature values in each band, default=8
+
+    Examples:
+        >>> from py_stringmatching import Jaccard, MinHash, WhitespaceTokenizer
+        >>> ws = WhitespaceTokenizer(return_set=True)
+        >>> titles = ['apple iphone 12 pro max 128gb', 'apple iphone 12 pro max 256gb', 'samsung galaxy s21 128gb',
+        ...           'apple iphone 12 pro max 128gb black']
+        >>> token_sets = [ws.tokenize(title) for title in titles]
+        >>> index = LSHIndex(bands=32, rows=4)
+        >>> index.add_many(list(range(len(titles))), MinHash().signatures(token_sets))
+        >>> [(i, j) for i, j in index.candidate_pairs()
+        ...  if Jaccard().get_sim_score(token_sets[i], token_sets[j]) >= 0.7]
+        [(0, 1), (0, 3)]
+    """
+    def __init__(self, bands=16, rows=8):
+        if bands < 1 or rows < 1:
+            raise ValueError('bands and rows should be positive integers')
+        self.bands = bands
+        self.rows = rows
+        # record id -> row of its keys, in the order the records were added
+        self._row_of = {}
+        # band keys of the rows (one row per band) not yet merged into _keys
+        self._pending = []
+        self._keys = np.empty((0, bands), dtype=np.uint64)
+        # per band, the keys sorted and the rows in that order, built on the first query after a change
+        self._built = False
+        self._record_ids = []
+        self._sorted_keys = None
+        self._sorted_rows = None
+
+    def add(self, record_id, signature):
+        """
+        Adds a record to the index. If the record id is already in the index, its signature is replaced.
+
+        Args:
+            record_id (hashable): Record id
+            signature (numpy array): MinHash signature of the record, with at least bands * rows values
+
+        Raises:
+            TypeError : If the signature is None or not a numpy array
+            ValueError : If the signature has less than bands * rows values
+        """
+        utils.sim_check_for_none(signature)
+        self.add_many([record_id], self._check_signatures(signature, 1))
+
+    def add_many(self, record_ids, signatures):
+        """
+        Adds many records to the index.
+
+        Args:
+            record_ids (list of hashable): Record ids
+            signatures (numpy array): MinHash signatures of the records, one per row, as returned by
+                MinHash.signatures
+
+        Raises:
+            TypeError : If signatures is None or not a numpy array
+            ValueError : If record_ids and signatures are not of the same length, or if the signatures have less
+                than bands * rows values
+        """
+        utils.sim_check_for_none(signatures)
+        signatures = self._check_signatures(signatures, 2)
+        utils.sim_check_for_same_len(record_ids, signatures)
+        num_rows = len(self._keys) + sum(len(keys) for keys in self._pending)
+        self._pending.append(band_keys(signatures, self.bands, self.rows))
+        for row, record_id in enumerate(record_ids, num_rows):
+            # re-inserting a record id moves it to the end of the dictionary, next to its new row
+            self._row_of.pop(record_id, None)
+            self._row_of[record_id] = row
+        self._built = False
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index.
+
+        Args:
+            record_id (hashable): Record id
+
+        Raises:
+            KeyError : If the record id is not in the index
+        """
+        del self._row_of[record_id]
+        self._built = False
+
+    def query(self, signature):
+        """
+        Finds the records that share a band with a signature.
+
+        Args:
+            signature (numpy array): MinHash signature, with at least bands * rows values
+
+        Returns:
+            List of the ids of the records that share at least one band with the signature, in the order they were
+            added
+
+        Raises:
+            TypeError : If the signature is None or not a numpy array
+            ValueError : If the signature has less than bands * rows values
+        """
+        utils.sim_check_for_none(signature)
+        keys = band_keys(self._check_signatures(signature, 1), self.bands, self.rows)[0]
+        if not self._built:
+            self._build()
+        rows = []
+        for band in range(self.bands):
+            sorted_keys = self._sorted_keys[band]
+            start = np.searchsorted(sorted_keys, keys[band], side='left')
+            end = np.searchsorted(sorted_keys, keys[band], side='right')
+            rows.append(self._sorted_rows[band][start:end])
+        record_ids = self._record_ids
+        return [record_ids[row] for row in np.unique(np.concatenate(rows)).tolist()]
+
+    def candidate_pairs(self):
+        """
+        Generates the pairs of records that share at least one band, for a self-join.
+
+        Each pair is generated once, with the record added first on the left.
+
+        Returns:
+            Generator of (record_id1, record_id2) tuples
+        """
+        if not self._built:
+            self._build()
+        record_ids = self._record_ids
+        for band in range(self.bands):
+            for rows1, rows2 in self._band_pairs(band):
+                for row1, row2 in zip(rows1.tolist(), rows2.tolist()):
+                    yield record_ids[row1], record_ids[row2]
+
+    def get_threshold(self):
+        """
+        Get the Jaccard score around which records start to be candidates, (1 / bands) ** (1 / rows)
+
+        Returns:
+            threshold (float)
+        """
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def get_bands(self):
+        """
+        Get number of bands
+
+        Returns:
+            bands (int)
+        """
+        return self.bands
+
+    def get_rows(self):
+        """
+        Get number of signature values in each band
+
+        Returns:
+            rows (int)
+        """
+        return self.rows
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, record_id):
+        return record_id in self._row_of
+
+    def _check_signatures(self, signatures, ndim):
+        if not isinstance(signatures, np.ndarray):
+            raise TypeError('Signatures are expected to be numpy arrays')
+        if signatures.ndim != ndim or signatures.shape[-1] < self.bands * self.rows:
+            raise ValueError('Signatures are expected to have at least bands * rows = %d values'
+                             % (self.bands * self.rows))
+        return np.ascontiguousarray(signatures.reshape(-1, signatures.shape[-1]), dtype=np.uint64)
+
+    def _build(self):
+        """Drops the rows of removed records and sorts the keys of every band."""
+        keys = np.concatenate([self._keys] + self._pending)
+        self._pending = []
+        alive = np.fromiter(self._row_of.values(), dtype=np.intp, count=len(self._row_of))
+        if len(alive) < len(keys):
+            keys = keys[alive]
+            self._row_of = dict(zip(self._row_of, range(len(alive))))
+        self._keys = keys
+        self._record_ids = list(self._row_of)
+        # a stable sort keeps the rows of a bucket in increasing order
+        self._sorted_rows = np.argsort(keys.T, axis=1, kind='stable')
+        self._sorted_keys = np.take_along_axis(keys.T, self._sorted_rows, axis=1)
+        self._built = True
+
+    def _band_pairs(self, band):
+        """Generates the pairs of rows (as arrays, first row smaller) that share the keys of a band but of none of
+        the earlier bands, in chunks of about _PAIR_CHUNK_SIZE pairs."""
+        sorted_keys = self._sorted_keys[band]
+        sorted_rows = self._sorted_rows[band]
+        n = len(sorted_keys)
+        if n < 2:
+            return
+        # end of the bucket of each position, and number of later positions in the same bucket
+        run_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        run_ends = np.r_[run_starts[1:], n]
+        ends = np.repeat(run_ends, np.diff(np.r_[run_starts, n]))
+        partners = ends - np.arange(n) - 1
+        cumulative = np.cumsum(partners)
+        if cumulative[-1] == 0:
+            return
+
+        start = 0
+        while start < n:
+            offset = cumulative[start - 1] if start > 0 else 0
+            end = max(int(np.searchsorted(cumulative, offset + _PAIR_CHUNK_SIZE, side='right')), start + 1)
+            counts = partners[start:end]
+            total = int(counts.sum())
+            if total > 0:
+                first = np.repeat(np.arange(start, end), counts)
+                skip = np.repeat(np.cumsum(counts) - counts, counts)
+                second = first + 1 + np.arange(total) - skip
+                rows1 = sorted_rows[first]
+                rows2 = sorted_rows[second]
+                if band > 0:
+                    # the pairs that share an earlier band were already generated
+                    new = ~(self._keys[rows1, :band] == self._keys[rows2, :band]).any(axis=1)
+                    rows1 = rows1[new]
+                    rows2 = rows2[new]
+                yield rows1, rows2
+            start = end
+
+
+def lsh_parameters(threshold, num_perm):
+    """
+    Chooses the number of bands and rows of an LSHIndex for a Jaccard threshold.
+
+    Among the pairs (bands, rows) with bands * rows <= num_perm, returns the one whose probability of making a pair
+    a candidate, 1 - (1 - s ** rows) ** bands, is closest to a step at the threshold: the area under the curve below
+    the threshold (false positives) plus the area above the curve beyond it (false negatives) is the smallest.
+
+    Args:
+        threshold (float): Jaccard threshold, in the range [0, 1]
+        num_perm (int): Length of the MinHash signatures
+
+    Returns:
+        bands, rows (int)
+
+    Raises:
+        ValueError : If threshold is not in the range [0, 1] or num_perm is not a positive integer
+
+    Examples:
+        >>> lsh_parameters(0.8, 128)
+        (9, 14)
+    """
+    utils.sim_check_threshold(threshold)
+    if num_perm < 1:
+        raise ValueError('num_perm should be a positive integer')
+    scores = np.linspace(0.0, 1.0, 201)
+    below = scores <= threshold
+    best, best_error = None, None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        probability = 1.0 - (1.0 - scores ** rows) ** bands
+        error = np.where(below, probability, 1.0 - probability).mean()
+        if best_error is None or error < best_error:
+            best, best_error = (bands, rows), error
+    return best
@@ -0,0 +1,167 @@
+"""Top-k set similarity search index"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.join.all_pairs_set_similarity import measure_name, pack_token_ids
+from py_stringmatching.similarity_measure.cython.cython_token_sets import MEASURES
+from py_stringmatching.similarity_measure.cython.cython_topk import topk_search
+from py_stringmatching.vocabulary import Vocabulary
+
+# Measures supported by the search.
+_SEARCH_MEASURES = ('jaccard', 'cosine', 'dice')
+
+
+class SetSimilarityIndex(object):
+    """Inverted index of token sets that finds the sets most similar to a query.
+
+    Every record is identified by a hashable record id and holds a set of tokens, for example the output of
+    QgramTokenizer(return_set=True). The index maps every token to the records that contain it (its posting list),
+    with the records of each posting list sorted by the size of their set.
+
+    SetSimilarityIndex.topk probes the posting lists of the query tokens from the shortest to the longest. A record
+    first met in a posting list cannot share the tokens already probed, which bounds its score given its size, so
+    the records whose bound cannot beat the k-th best score so far are skipped, and the search stops as soon as no
+    unseen record can beat it. The other records are scored exactly. The search runs in Cython.
+
+    The posting lists are rebuilt on the first search after records were added or removed, so changes are best
+    made in batches.
+
+    Examples:
+        >>> from py_stringmatching import QgramTokenizer
+        >>> qg = QgramTokenizer(qval=3, return_set=True)
+        >>> index = SetSimilarityIndex()
+        >>> names = ['Apple Inc', 'Applied Materials', 'Alphabet Inc', 'Apple Computer']
+        >>> index.add_many(names, [qg.tokenize(name) for name in names])
+        >>> index.topk(qg.tokenize('Apple Inc.'), 2, 'jaccard')
+        [('Apple Inc', 0.6428571428571429), ('Apple Computer', 0.2727272727272727)]
+    """
+    def __init__(self):
+        self.vocabulary = Vocabulary()
+        # record id -> sorted token ids of the record, in the order the records were added
+        self._sets = {}
+        # posting lists, built on the first search after a change
+        self._built = False
+        self._record_ids = None
+        self._indptr = None
+        self._indices = None
+        self._post_ptr = None
+        self._post_rows = None
+        self._stamps = None
+        self._stamp = 0
+
+    def add(self, record_id, tokens):
+        """
+        Adds a record to the index. If the record id is already in the index, its tokens are replaced.
+
+        Args:
+            record_id (hashable): Record id
+            tokens (set or list): Tokens of the record, repeated tokens are counted once
+
+        Raises:
+            TypeError : If tokens is None or not a set or a list
+        """
+        utils.tok_check_for_none(tokens)
+        _check_token_set(tokens)
+        self._sets.pop(record_id, None)
+        self._sets[record_id] = self.vocabulary.encode(tokens)
+        self._built = False
+
+    def add_many(self, record_ids, token_sets):
+        """
+        Adds many records to the index.
+
+        Args:
+            record_ids (list of hashable): Record ids
+            token_sets (list of set or list): Tokens of the records, the i-th set belongs to the i-th record
+
+        Raises:
+            TypeError : If one of the token sets is None or not a set or a list
+            ValueError : If record_ids and token_sets are not of the same length
+        """
+        utils.sim_check_for_same_len(record_ids, token_sets)
+        for record_id, tokens in zip(record_ids, token_sets):
+            self.add(record_id, tokens)
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index.
+
+        Args:
+            record_id (hashable): Record id
+
+        Raises:
+            KeyError : If the record id is not in the index
+        """
+        del self._sets[record_id]
+        self._built = False
+
+    def topk(self, query_tokens, k, measure='jaccard'):
+        """
+        Finds the k records whose tokens are most similar to a set of query tokens.
+
+        Args:
+            query_tokens (set or list): Query tokens, repeated tokens are counted once
+            k (int): Number of records to return
+            measure (str or measure object): 'jaccard', 'cosine' or 'dice', or a Jaccard, Cosine or Dice object,
+                default='jaccard'
+
+        Returns:
+            List of at most k (record id, score) tuples, by decreasing score. Records with the same score are in
+            the order they were added. The scores are those of get_raw_score of Jaccard, Cosine or Dice on the two
+            token sets, and records that share no token with the query are never returned.
+
+        Raises:
+            TypeError : If query_tokens is None or not a set or a list
+            ValueError : If measure is not 'jaccard', 'cosine', 'dice' or a Jaccard, Cosine or Dice object, or if k is
+                not a positive integer
+        """
+        utils.tok_check_for_none(query_tokens)
+        _check_token_set(query_tokens)
+        measure = measure_name(measure, _SEARCH_MEASURES)
+        if k < 1:
+            raise ValueError('k should be a positive integer')
+        if not self._built:
+            self._build()
+
+        query_tokens = set(query_tokens)
+        get_id = self.vocabulary._ids.get
+        query = [get_id(token) for token in query_tokens]
+        query = np.array(sorted(token_id for token_id in query if token_id is not None), dtype=np.int32)
+        # shortest posting lists first
+        probe_order = query[np.argsort(self._post_ptr[query + 1] - self._post_ptr[query], kind='stable')]
+
+        self._stamp += 1
+        if self._stamp == np.iinfo(np.int32).max:
+            self._stamps.fill(0)
+            self._stamp = 1
+        rows, scores = topk_search(self._indptr, self._indices, self._post_ptr, self._post_rows,
+                                   query, probe_order, len(query_tokens), k, MEASURES[measure],
+                                   self._stamps, self._stamp)
+        record_ids = self._record_ids
+        return [(record_ids[row], score) for row, score in zip(rows.tolist(), scores.tolist())]
+
+    def _build(self):
+        """Builds the posting lists of the records, sorted by set size and then by row."""
+        self._record_ids = list(self._sets)
+        self._indptr, self._indices = pack_token_ids(list(self._sets.values()))
+        sizes = np.diff(self._indptr)
+        rows = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+        order = np.lexsort((rows, sizes[rows], self._indices))
+        self._post_rows = rows[order]
+        self._post_ptr = np.zeros(len(self.vocabulary) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self._indices, minlength=len(self.vocabulary)), out=self._post_ptr[1:])
+        self._stamps = np.zeros(len(sizes), dtype=np.int32)
+        self._stamp = 0
+        self._built = True
+
+    def __len__(self):
+        return len(self._sets)
+
+    def __contains__(self, record_id):
+        return record_id in self._sets
+
+
+def _check_token_set(tokens):
+    if not isinstance(tokens, (list, set)):
+        raise TypeError('Tokens are expected to be a python list or set')
@@ -0,0 +1,133 @@
+"""Phonetic blocking index keyed on Soundex codes"""
+
+import itertools
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.soundex import Soundex
+
+
+class SoundexIndex(object):
+    """Blocking index that groups records by the Soundex code of a string.
+
+    Every record is identified by a hashable record id and is encoded once when it is added. The records of a
+    Soundex block are exactly the records for which Soundex.get_raw_score returns 1, so the index replaces a scan
+    over all pairs of records by a lookup.
+
+    Examples:
+        >>> index = SoundexIndex()
+        >>> index.add_many([1, 2, 3], ['Robert', 'Rupert', 'Rubin'])
+        >>> list(index.query('Rubert'))
+        [1, 2]
+        >>> list(index.candidate_pairs())
+        [(1, 2)]
+    """
+    def __init__(self):
+        self.soundex = Soundex()
+        # code -> dict of the record ids in the block, used as an ordered set
+        self._blocks = {}
+        # record id -> code
+        self._codes = {}
+
+    def add(self, record_id, string):
+        """
+        Adds a record to the index. If the record id is already in the index, its string is replaced.
+
+        Args:
+            record_id (hashable): Record id
+            string (str): String to index the record by
+
+        Raises:
+            TypeError : If the string is None or not a string
+            ValueError : If the string has no letters or digits
+        """
+        code = self.soundex.encode(string)
+        if record_id in self._codes:
+            self.remove(record_id)
+        self._blocks.setdefault(code, {})[record_id] = None
+        self._codes[record_id] = code
+
+    def add_many(self, record_ids, strings):
+        """
+        Adds many records to the index. The strings are encoded with Soundex.encode_many.
+
+        Args:
+            record_ids (list of hashable): Record ids
+            strings (list of str): Strings to index the records by, the i-th string belongs to the i-th record
+
+        Raises:
+            TypeError : If one of the strings is None or not a string
+            ValueError : If record_ids and strings are not of the same length, or if one of the strings has no
+                letters or digits
+        """
+        utils.sim_check_for_same_len(record_ids, strings)
+        codes = self.soundex.encode_many(strings)
+        for record_id, code in zip(record_ids, codes.tolist()):
+            if record_id in self._codes:
+                self.remove(record_id)
+            self._blocks.setdefault(code, {})[record_id] = None
+            self._codes[record_id] = code
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index.
+
+        Args:
+            record_id (hashable): Record id
+
+        Raises:
+            KeyError : If the record id is not in the index
+        """
+        code = self._codes.pop(record_id)
+        block = self._blocks[code]
+        del block[record_id]
+        if len(block) == 0:
+            del self._blocks[code]
+
+    def query(self, string):
+        """
+        Finds the records whose Soundex code is the same as that of a string.
+
+        Args:
+            string (str): Query string
+
+        Returns:
+            Ids of the matching records in the order they were added (a read-only view into the index, copy it
+            with list() before changing the index)
+
+        Raises:
+            TypeError : If the string is None or not a string
+            ValueError : If the string has no letters or digits
+        """
+        return self._blocks.get(self.soundex.encode(string), _EMPTY_BLOCK).keys()
+
+    def candidate_pairs(self):
+        """
+        Generates the pairs of records that share a Soundex code, for a self-join.
+
+        Each pair is generated once, with the record added first on the left.
+
+        Returns:
+            Generator of (record_id1, record_id2) tuples
+        """
+        for block in self._blocks.values():
+            if len(block) > 1:
+                for pair in itertools.combinations(block, 2):
+                    yield pair
+
+    def get_block_sizes(self):
+        """
+        Get the number of records with each Soundex code
+
+        Returns:
+            Dictionary from Soundex code (int) to number of records
+        """
+        return {code: len(block) for code, block in self._blocks.items()}
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, record_id):
+        return record_id in self._codes
+
+
+_EMPTY_BLOCK = {}
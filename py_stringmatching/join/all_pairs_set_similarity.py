@@ -0,0 +1,211 @@
+"""All-pairs token set similarity of two tables"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_all_pairs import all_pairs_chunk
+from py_stringmatching.similarity_measure.cosine import Cosine
+from py_stringmatching.similarity_measure.cython.cython_token_sets import MEASURES
+from py_stringmatching.similarity_measure.dice import Dice
+from py_stringmatching.similarity_measure.jaccard import Jaccard
+from py_stringmatching.similarity_measure.overlap_coefficient import OverlapCoefficient
+from py_stringmatching.similarity_measure.tversky_index import TverskyIndex
+from py_stringmatching.vocabulary import Vocabulary
+
+# Token set measure objects, with their name in MEASURES.
+_MEASURE_CLASSES = ((Jaccard, 'jaccard'), (Cosine, 'cosine'), (Dice, 'dice'),
+                    (OverlapCoefficient, 'overlap_coefficient'), (TverskyIndex, 'tversky_index'))
+
+
+class AllPairsSetSimilarity(object):
+    """Computes a token set similarity measure between every set of one table and every set of another.
+
+    Both tables are encoded as sparse incidence matrices A and B, with one row per set and one column per token.
+    The intersection sizes of all pairs are the entries of the sparse product A @ B.T, which is computed in Cython
+    row by row, so that only the pairs sharing at least one token are ever looked at. The scores are derived from
+    the intersection and set sizes exactly like Jaccard, Cosine, Dice, OverlapCoefficient and TverskyIndex do. B is
+    processed in chunks of rows, which bounds the memory used besides the output.
+
+    Pairs that share no token have a score of 0 and are not reported, even for two empty sets (which the measures
+    score 1).
+
+    Parameters:
+        measure (str or measure object): 'jaccard', 'cosine', 'dice', 'overlap_coefficient' or 'tversky_index',
+            or a Jaccard, Cosine, Dice, OverlapCoefficient or TverskyIndex object, default='jaccard'
+        alpha, beta (float): Tversky index parameters, only used by 'tversky_index' (defaults to 0.5). The
+            parameters of a TverskyIndex object are used instead.
+        chunk_size (int): Number of sets of the second table processed at a time, default=65536
+        n_jobs (int): Number of threads scoring the sets of the first table, -1 for all CPUs, default=1.
+            Threads are only used if the package was built with OpenMP.
+
+    Examples:
+        >>> all_pairs = AllPairsSetSimilarity()
+        >>> rows1, rows2, scores = all_pairs.get_pairs([['data', 'science'], ['data']],
+        ...                                            [['data'], ['science', 'data'], ['python']])
+        >>> list(zip(rows1.tolist(), rows2.tolist(), scores.tolist()))
+        [(0, 0, 0.5), (0, 1, 1.0), (1, 0, 1.0), (1, 1, 0.5)]
+    """
+    def __init__(self, measure='jaccard', alpha=0.5, beta=0.5, chunk_size=65536, n_jobs=1):
+        measure_name(measure)
+        utils.sim_check_tversky_parameters(alpha, beta)
+        if chunk_size < 1:
+            raise ValueError('chunk_size should be a positive integer')
+        self.measure = measure
+        self.alpha = alpha
+        self.beta = beta
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+
+    def get_pairs(self, sets1, sets2, threshold=0.0):
+        """
+        Computes the scores of all pairs of sets of two tables that share a token.
+
+        Args:
+            sets1,sets2 (list): Input tables, as lists of token sets (or lists), or as lists of sorted arrays of
+                unique token ids encoded by the same Vocabulary
+            threshold (float): Smallest score of the pairs returned, in the range [0, 1] (defaults to 0.0)
+
+        Returns:
+            Row in the first table, row in the second table (numpy intp arrays) and score (numpy float64 array) of
+            the pairs that share a token and score at least threshold, sorted by row in the first table and then
+            by row in the second table
+
+        Raises:
+            TypeError : If one of the sets is None or not a set, a list or an array, or if arrays of token ids
+                are mixed with token sets
+            ValueError : If threshold is not in the range [0, 1], or if an array of token ids is not sorted and
+                unique
+        """
+        utils.sim_check_threshold(threshold)
+        indptr1, indices1, indptr2, indices2 = encode_tables(sets1, sets2)
+        num_tokens = max(_num_tokens(indices1), _num_tokens(indices2))
+        num_threads = utils.get_num_threads(self.n_jobs)
+        alpha, beta = ((self.measure.get_alpha(), self.measure.get_beta())
+                       if isinstance(self.measure, TverskyIndex) else (self.alpha, self.beta))
+
+        rows, cols, scores = [], [], []
+        for start in range(0, len(indptr2) - 1, self.chunk_size):
+            end = min(start + self.chunk_size, len(indptr2) - 1)
+            chunk_rows, chunk_cols, chunk_scores = all_pairs_chunk(
+                indptr1, indices1, indptr2, indices2, start, end, num_tokens,
+                MEASURES[measure_name(self.measure)], alpha, beta, threshold, num_threads)
+            rows.append(chunk_rows)
+            cols.append(chunk_cols)
+            scores.append(chunk_scores)
+        if len(rows) == 0:
+            return (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp),
+                    np.empty(0, dtype=np.float64))
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        scores = np.concatenate(scores)
+        order = np.lexsort((cols, rows))
+        return rows[order], cols[order], scores[order]
+
+    def get_sim_matrix(self, sets1, sets2, threshold=0.0):
+        """
+        Computes the scores of all pairs of sets of two tables as a sparse matrix. Requires SciPy.
+
+        Args:
+            sets1,sets2 (list): Input tables, see get_pairs
+            threshold (float): Smallest score stored in the matrix, in the range [0, 1] (defaults to 0.0)
+
+        Returns:
+            Matrix of the scores (scipy.sparse.csr_matrix of shape (len(sets1), len(sets2))), in which pairs that
+            share no token or score below threshold are not stored
+
+        Raises:
+            ImportError : If SciPy is not installed
+            TypeError : If one of the sets is None or not a set, a list or an array, or if arrays of token ids
+                are mixed with token sets
+            ValueError : If threshold is not in the range [0, 1], or if an array of token ids is not sorted and
+                unique
+        """
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError('get_sim_matrix requires SciPy, use get_pairs instead')
+
+        rows, cols, scores = self.get_pairs(sets1, sets2, threshold)
+        return csr_matrix((scores, (rows, cols)), shape=(len(sets1), len(sets2)))
+
+    def get_measure(self):
+        """
+        Get measure
+
+        Returns:
+            measure (str or measure object)
+        """
+        return self.measure
+
+    def set_measure(self, measure):
+        """
+        Set measure
+
+        Args:
+            measure (str or measure object): 'jaccard', 'cosine', 'dice', 'overlap_coefficient' or
+                'tversky_index', or a Jaccard, Cosine, Dice, OverlapCoefficient or TverskyIndex object
+        """
+        measure_name(measure)
+        self.measure = measure
+        return True
+
+
+def measure_name(measure, measures=utils.SET_MEASURES):
+    """Name in MEASURES of a token set measure given by its name or as a
+    measure object, checked against the names of the supported measures."""
+    for measure_class, name in _MEASURE_CLASSES:
+        if isinstance(measure, measure_class):
+            measure = name
+            break
+    utils.sim_check_set_measure(measure, measures)
+    return measure
+
+
+def encode_tables(sets1, sets2):
+    """Encodes two tables of token sets as CSR incidence matrices (indptr,
+    indices) with token ids shared by both tables. Tables of token id arrays
+    are used as they are, and cannot be mixed with token sets."""
+    num_arrays = 0
+    for sets in (sets1, sets2):
+        for token_set in sets:
+            utils.sim_check_for_none(token_set)
+            if not isinstance(token_set, (list, set, np.ndarray)):
+                raise TypeError('Sets are expected to be python lists or sets, or arrays of token ids')
+            num_arrays += isinstance(token_set, np.ndarray)
+
+    if num_arrays == 0:
+        vocabulary = Vocabulary()
+        return pack_token_ids(vocabulary.encode_many(sets1)) + pack_token_ids(vocabulary.encode_many(sets2))
+    if num_arrays < len(sets1) + len(sets2):
+        raise TypeError('Sets are expected to be either all token sets or all arrays of token ids')
+    tables = pack_token_ids(sets1) + pack_token_ids(sets2)
+    _check_token_ids(*tables[:2])
+    _check_token_ids(*tables[2:])
+    return tables
+
+
+def pack_token_ids(id_arrays):
+    """Packs token id arrays into the indptr and indices arrays of a CSR
+    matrix."""
+    indptr = np.zeros(len(id_arrays) + 1, dtype=np.intp)
+    if len(id_arrays) == 0:
+        return indptr, np.empty(0, dtype=np.int32)
+    np.cumsum([len(ids) for ids in id_arrays], out=indptr[1:])
+    indices = np.concatenate(id_arrays).astype(np.int32, copy=False)
+    return indptr, indices
+
+
+def _check_token_ids(indptr, indices):
+    """Checks that every set of a CSR matrix is a sorted array of unique
+    token ids."""
+    increasing = np.diff(indices) > 0
+    # the first id of a set is not compared with the last id of the set before
+    starts = indptr[1:-1]
+    increasing[starts[(starts > 0) & (starts < len(indices))] - 1] = True
+    if not increasing.all():
+        raise ValueError('Token ids are expected to be sorted and unique')
+
+
+def _num_tokens(indices):
+    return int(indices.max()) + 1 if len(indices) > 0 else 0
@@ -0,0 +1,185 @@
+"""Prefix filtering set similarity join"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.join.all_pairs_set_similarity import encode_tables, measure_name
+from py_stringmatching.similarity_measure.cython.cython_set_join import BOUND_EPS, set_join
+from py_stringmatching.similarity_measure.cython.cython_token_sets import MEASURES
+
+# Measures supported by the join.
+_JOIN_MEASURES = ('jaccard', 'cosine', 'dice', 'overlap_coefficient')
+
+
+class SetSimJoin(object):
+    """Finds all pairs of token sets whose similarity is at least a threshold.
+
+    The join uses prefix filtering (AllPairs, PPJoin): the tokens are ordered by their frequency in both tables,
+    rarest first, and two sets can only reach the threshold if the first few tokens of each (their prefix) share a
+    token. Only the prefixes of the second table are indexed, and only the sets whose size is compatible with the
+    threshold are looked up. A candidate pair is dropped as soon as the positions of its matching tokens show that
+    it cannot share enough tokens (positional filtering), and the remaining candidates are verified by merging the
+    two sets. The whole join runs in Cython.
+
+    The pairs returned and their scores are exactly those for which get_raw_score of Jaccard, Cosine, Dice or
+    OverlapCoefficient on the two token sets is at least the threshold, except that pairs that share no token are never returned (this only matters
+    for empty sets, or for a threshold of 0).
+
+    Parameters:
+        measure (str or measure object): 'jaccard', 'cosine', 'dice' or 'overlap_coefficient', or a Jaccard, Cosine,
+            Dice or OverlapCoefficient object
+        threshold (float): Smallest score of the pairs returned, in the range [0, 1]
+        n_jobs (int): Number of threads probing the sets of the first table, -1 for all CPUs, default=1.
+            Threads are only used if the package was built with OpenMP.
+
+    Examples:
+        >>> join = SetSimJoin('jaccard', 0.5)
+        >>> rows1, rows2, scores = join.get_pairs([['data', 'science'], ['data', 'mining']],
+        ...                                       [['data'], ['science', 'data', 'python'], ['mining']])
+        >>> list(zip(rows1.tolist(), rows2.tolist(), scores.tolist()))
+        [(0, 0, 0.5), (0, 1, 0.6666666666666666), (1, 0, 0.5), (1, 2, 0.5)]
+    """
+    def __init__(self, measure, threshold, n_jobs=1):
+        measure_name(measure, _JOIN_MEASURES)
+        utils.sim_check_threshold(threshold)
+        self.measure = measure
+        self.threshold = threshold
+        self.n_jobs = n_jobs
+
+    def get_pairs(self, sets1, sets2=None):
+        """
+        Finds the pairs of sets of two tables, or of one table, whose score is at least the threshold.
+
+        Args:
+            sets1 (list): First table, as a list of token sets (or lists), or as a list of sorted arrays of unique
+                token ids encoded by the same Vocabulary as sets2
+            sets2 (list): Second table, in the same form as sets1. If None, sets1 is joined with itself and each
+                pair of distinct sets is returned once (defaults to None)
+
+        Returns:
+            Row in the first table, row in the second table (numpy intp arrays) and score (numpy float64 array) of
+            the pairs, sorted by row in the first table and then by row in the second table. For a self-join, the
+            first row of each pair is smaller than the second.
+
+        Raises:
+            TypeError : If one of the sets is None or not a set, a list or an array, or if arrays of token ids
+                are mixed with token sets
+            ValueError : If an array of token ids is not sorted and unique
+        """
+        self_join = sets2 is None
+        if self_join:
+            indptr1, indices1 = encode_tables(sets1, [])[:2]
+            indptr2, indices2 = indptr1, indices1
+        else:
+            indptr1, indices1, indptr2, indices2 = encode_tables(sets1, sets2)
+
+        # global token order, rarest first
+        num_tokens = max(_num_tokens(indices1), _num_tokens(indices2))
+        frequencies = np.bincount(indices1, minlength=num_tokens)
+        if not self_join:
+            frequencies = frequencies + np.bincount(indices2, minlength=num_tokens)
+        ranks = np.empty(num_tokens, dtype=np.int32)
+        ranks[np.argsort(frequencies, kind='stable')] = np.arange(num_tokens, dtype=np.int32)
+        indices1 = _sort_tokens(indptr1, ranks[indices1], num_tokens)
+        indices2 = indices1 if self_join else _sort_tokens(indptr2, ranks[indices2], num_tokens)
+
+        measure = measure_name(self.measure, _JOIN_MEASURES)
+        sizes1 = np.diff(indptr1)
+        sizes2 = np.diff(indptr2)
+        num_threads = utils.get_num_threads(self.n_jobs)
+        join_args = (num_tokens, MEASURES[measure], self.threshold, self_join, num_threads)
+
+        if measure == 'overlap_coefficient':
+            # The overlap only has a lower bound in terms of the smaller set, so the pairs in which the set of the
+            # first table is the smaller one probe its prefix in an index of the full sets, and the other pairs
+            # probe the full set in an index of the prefixes.
+            no_limit = np.full(len(sizes1), np.iinfo(np.intp).max, dtype=np.intp)
+            pairs = [set_join(indptr1, indices1, _prefix_lengths(sizes1, self.threshold), sizes1, no_limit,
+                              indptr2, indices2, sizes2, *join_args),
+                     set_join(indptr1, indices1, sizes1, np.zeros(len(sizes1), dtype=np.intp), sizes1 - 1,
+                              indptr2, indices2, _prefix_lengths(sizes2, self.threshold), *join_args)]
+        else:
+            # smallest overlap with any set, as a fraction of the size of the set
+            fraction = {'jaccard': self.threshold,
+                        'cosine': self.threshold ** 2,
+                        'dice': self.threshold / (2.0 - self.threshold)}[measure]
+            min_size, max_size = _size_bounds(sizes1, fraction)
+            pairs = [set_join(indptr1, indices1, _prefix_lengths(sizes1, fraction), min_size, max_size,
+                              indptr2, indices2, _prefix_lengths(sizes2, fraction), *join_args)]
+
+        rows1 = np.concatenate([pair[0] for pair in pairs])
+        rows2 = np.concatenate([pair[1] for pair in pairs])
+        scores = np.concatenate([pair[2] for pair in pairs])
+        order = np.lexsort((rows2, rows1))
+        return rows1[order], rows2[order], scores[order]
+
+    def get_measure(self):
+        """
+        Get measure
+
+        Returns:
+            measure (str or measure object)
+        """
+        return self.measure
+
+    def get_threshold(self):
+        """
+        Get threshold
+
+        Returns:
+            threshold (float)
+        """
+        return self.threshold
+
+    def set_measure(self, measure):
+        """
+        Set measure
+
+        Args:
+            measure (str or measure object): 'jaccard', 'cosine', 'dice' or 'overlap_coefficient', or a Jaccard,
+                Cosine, Dice or OverlapCoefficient object
+        """
+        measure_name(measure, _JOIN_MEASURES)
+        self.measure = measure
+        return True
+
+    def set_threshold(self, threshold):
+        """
+        Set threshold
+
+        Args:
+            threshold (float): Smallest score of the pairs returned, in the range [0, 1]
+        """
+        utils.sim_check_threshold(threshold)
+        self.threshold = threshold
+        return True
+
+
+def _num_tokens(indices):
+    return int(indices.max()) + 1 if len(indices) > 0 else 0
+
+
+def _sort_tokens(indptr, indices, num_tokens):
+    """Sorts the tokens of each set of a CSR matrix."""
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    keys = rows * num_tokens + indices
+    keys.sort()
+    return (keys % max(num_tokens, 1)).astype(np.int32)
+
+
+def _prefix_lengths(sizes, fraction):
+    """Prefix lengths of sets that share at least fraction * size tokens
+    with any set they match."""
+    min_overlap = np.ceil(fraction * sizes - BOUND_EPS).astype(np.intp)
+    return (sizes - np.maximum(min_overlap, 1) + 1).astype(np.intp)
+
+
+def _size_bounds(sizes, fraction):
+    """Sizes of the sets that can match sets of the given sizes, if matching
+    sets share at least fraction times the size of each of them."""
+    min_size = np.ceil(fraction * sizes - BOUND_EPS).astype(np.intp)
+    if fraction == 0:
+        max_size = np.full(len(sizes), np.iinfo(np.intp).max, dtype=np.intp)
+    else:
+        max_size = np.floor(sizes / fraction + BOUND_EPS).astype(np.intp)
+    return min_size, max_size
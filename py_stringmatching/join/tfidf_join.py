@@ -0,0 +1,173 @@
+"""TF/IDF similarity join and top-k search over an inverted index"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_tfidf import tfidf_join
+from py_stringmatching.similarity_measure.tfidf import TfIdf
+
+
+class TfIdfJoin(object):
+    """Finds the pairs of bags of tokens whose TF/IDF score is at least a threshold, or the best matches of every bag.
+
+    The bags are turned into normalized TF/IDF vectors with TfIdf.vectorize, using the document frequencies of the
+    corpus of the TfIdf measure, and the vectors of the second table are indexed by token, each posting list sorted
+    by decreasing weight. Every vector of the first table accumulates partial dot products from the posting lists of
+    its tokens, from the token that can contribute the most to a score to the one that can contribute the least
+    (MaxScore pruning). The scan of a posting list stops at the first weight that cannot lift a vector not met yet to
+    the threshold, and once the tokens left cannot either, the remaining posting lists only tighten the partial
+    scores of the vectors met. These are then scored exactly, unless their partial score plus the bound of the parts
+    skipped cannot reach the threshold. For a top-k search, the threshold rises to the k-th best score found so far.
+    The search runs in Cython.
+
+    The scores are those of TfIdf.get_raw_score on the vectors of the two bags, that is the TF/IDF score of the bags
+    up to float32 rounding, and pairs that share no token of the corpus with a non-zero weight are never returned.
+    The TfIdf measure should have a corpus, for example the two tables added with TfIdf.add_documents.
+
+    Parameters:
+        tfidf (TfIdf): TF/IDF measure with a corpus
+        threshold (float): Smallest score of the pairs returned, in the range [0, 1], default=0
+        n_jobs (int): Number of threads probing the vectors of the first table, -1 for all CPUs, default=1.
+            Threads are only used if the package was built with OpenMP.
+
+    Examples:
+        >>> from py_stringmatching import TfIdf
+        >>> names1 = [['apple', 'inc'], ['alphabet', 'inc']]
+        >>> names2 = [['apple', 'computer', 'inc'], ['alphabet'], ['microsoft', 'corp']]
+        >>> tfidf = TfIdf()
+        >>> tfidf.add_documents(names1 + names2)
+        True
+        >>> join = TfIdfJoin(tfidf, 0.5)
+        >>> rows1, rows2, scores = join.get_pairs(names1, names2)
+        >>> list(zip(rows1.tolist(), rows2.tolist(), scores.tolist()))
+        [(0, 0, 0.5460591697868225), (1, 1, 0.8734379410743713)]
+        >>> rows1, rows2, scores = join.get_topk(names1, names2, 1)
+        >>> list(zip(rows1.tolist(), rows2.tolist()))
+        [(0, 0), (1, 1)]
+    """
+    def __init__(self, tfidf, threshold=0.0, n_jobs=1):
+        _check_tfidf(tfidf)
+        utils.sim_check_threshold(threshold)
+        self.tfidf = tfidf
+        self.threshold = threshold
+        self.n_jobs = n_jobs
+
+    def get_pairs(self, bags1, bags2=None):
+        """
+        Finds the pairs of bags of two tables, or of one table, whose TF/IDF score is at least the threshold.
+
+        Args:
+            bags1 (list of lists): First table, as bags of tokens
+            bags2 (list of lists): Second table, as bags of tokens. If None, bags1 is joined with itself and each
+                pair of distinct bags is returned once (defaults to None)
+
+        Returns:
+            Row in the first table, row in the second table (numpy intp arrays) and score (numpy float64 array) of
+            the pairs, sorted by row in the first table and then by row in the second table. For a self-join, the
+            first row of each pair is smaller than the second.
+
+        Raises:
+            TypeError : If one of the bags is None or not a list or a set
+            ValueError : If the TfIdf measure has no corpus
+        """
+        rows1, rows2, scores = self._search(bags1, bags2, 0)
+        order = np.lexsort((rows2, rows1))
+        return rows1[order], rows2[order], scores[order]
+
+    def get_topk(self, bags1, bags2, k):
+        """
+        Finds, for every bag of the first table, the k bags of the second table with the highest TF/IDF score.
+
+        Args:
+            bags1 (list of lists): First table, as bags of tokens
+            bags2 (list of lists): Second table, as bags of tokens. If None, the best matches of every bag of bags1
+                are searched among the other bags of bags1
+            k (int): Number of bags of the second table kept for every bag of the first table
+
+        Returns:
+            Row in the first table, row in the second table (numpy intp arrays) and score (numpy float64 array) of
+            the pairs, sorted by row in the first table, then by decreasing score and then by row in the second
+            table. Only the pairs whose score is at least the threshold are returned, so some rows of the first
+            table can have less than k matches.
+
+        Raises:
+            TypeError : If one of the bags is None or not a list or a set
+            ValueError : If k is not a positive integer, or if the TfIdf measure has no corpus
+        """
+        if k < 1:
+            raise ValueError('k should be a positive integer')
+        rows1, rows2, scores = self._search(bags1, bags2, k)
+        order = np.lexsort((rows2, -scores, rows1))
+        return rows1[order], rows2[order], scores[order]
+
+    def get_tfidf(self):
+        """
+        Get TF/IDF measure
+
+        Returns:
+            tfidf (TfIdf)
+        """
+        return self.tfidf
+
+    def get_threshold(self):
+        """
+        Get threshold
+
+        Returns:
+            threshold (float)
+        """
+        return self.threshold
+
+    def set_tfidf(self, tfidf):
+        """
+        Set TF/IDF measure
+
+        Args:
+            tfidf (TfIdf): TF/IDF measure with a corpus
+        """
+        _check_tfidf(tfidf)
+        self.tfidf = tfidf
+        return True
+
+    def set_threshold(self, threshold):
+        """
+        Set threshold
+
+        Args:
+            threshold (float): Smallest score of the pairs returned, in the range [0, 1]
+        """
+        utils.sim_check_threshold(threshold)
+        self.threshold = threshold
+        return True
+
+    def _search(self, bags1, bags2, k):
+        self_join = bags2 is None
+        indptr1, ids1, weights1 = self.tfidf._vectorize_csr(bags1)
+        if self_join:
+            indptr2, ids2, weights2 = indptr1, ids1, weights1
+        else:
+            indptr2, ids2, weights2 = self.tfidf._vectorize_csr(bags2)
+
+        # posting lists of the second table, sorted by decreasing weight
+        num_tokens = max(_num_tokens(ids1), _num_tokens(ids2))
+        rows = np.repeat(np.arange(len(indptr2) - 1, dtype=np.int32), np.diff(indptr2))
+        order = np.lexsort((rows, -weights2, ids2))
+        post_rows = rows[order]
+        post_weights = weights2[order]
+        post_ptr = np.zeros(num_tokens + 1, dtype=np.intp)
+        np.cumsum(np.bincount(ids2, minlength=num_tokens), out=post_ptr[1:])
+
+        rows1, rows2, scores = tfidf_join(indptr1, ids1, weights1, indptr2, ids2, weights2,
+                                          post_ptr, post_rows, post_weights,
+                                          self.threshold, k, self_join, utils.get_num_threads(self.n_jobs))
+        # like TfIdf.get_raw_score on vectors, scores are capped at 1.0
+        return rows1, rows2, np.minimum(scores, 1.0)
+
+
+def _check_tfidf(tfidf):
+    if not isinstance(tfidf, TfIdf):
+        raise TypeError('tfidf is expected to be a TfIdf object')
+
+
+def _num_tokens(ids):
+    return int(ids.max()) + 1 if len(ids) > 0 else 0
@@ -0,0 +1,118 @@
+"""MinHash signatures of token sets, for approximate Jaccard similarity"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_minhash import hash_token_lists, minhash_signatures
+
+
+class MinHash(object):
+    """Turns sets of tokens into fixed-width MinHash signatures.
+
+    The signature of a set is an array of num_perm 64-bit values, the i-th of which is the smallest value of the
+    i-th of num_perm random hash functions over the tokens of the set. Two sets get the same i-th value with a
+    probability equal to their Jaccard score, so the fraction of equal values estimates the Jaccard score with a
+    standard error of at most 0.5 / sqrt(num_perm). Signatures can be indexed by LSHIndex to find the pairs of sets
+    that are likely to be similar without comparing all pairs.
+
+    Tokens are hashed from their UTF-8 bytes, so signatures computed with the same num_perm and seed in different
+    processes or runs can be compared. Repeated tokens are counted once.
+
+    Parameters:
+        num_perm (int): Number of hash functions, that is the length of the signatures, default=128
+        seed (int): Seed of the hash functions, default=1
+
+    Examples:
+        >>> from py_stringmatching import QgramTokenizer
+        >>> qg = QgramTokenizer(qval=3, return_set=True)
+        >>> minhash = MinHash(num_perm=256)
+        >>> signature1 = minhash.signature(qg.tokenize('apple iphone 12 pro'))
+        >>> signature2 = minhash.signature(qg.tokenize('apple iphone 12'))
+        >>> signature1.shape, signature1.dtype
+        ((256,), dtype('uint64'))
+        >>> minhash.estimate_jaccard(signature1, signature2)
+        0.6484375
+    """
+    def __init__(self, num_perm=128, seed=1):
+        if num_perm < 1:
+            raise ValueError('num_perm should be a positive integer')
+        self.num_perm = num_perm
+        self.seed = seed
+        # parameters of the hash functions a * h + b (mod 2**64), with odd multipliers
+        parameters = np.random.RandomState(seed).randint(
+            np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=(2, num_perm), dtype=np.int64).view(np.uint64)
+        self._multipliers = parameters[0] | np.uint64(1)
+        self._increments = parameters[1]
+
+    def signature(self, tokens):
+        """
+        Computes the MinHash signature of a set of tokens.
+
+        Args:
+            tokens (set or list): Input tokens, as strings
+
+        Returns:
+            Signature (numpy uint64 array of length num_perm). All the values of the signature of an empty set are
+            2**64 - 1.
+
+        Raises:
+            TypeError : If tokens is None or not a set or a list, or if a token is not a string
+        """
+        return self.signatures([tokens])[0]
+
+    def signatures(self, token_lists, n_jobs=1):
+        """
+        Computes the MinHash signatures of many sets of tokens.
+
+        Args:
+            token_lists (list of set or list): Input token sets, as sets or lists of strings
+            n_jobs (int): Number of threads computing the signatures once the tokens are hashed, -1 for all CPUs,
+                default=1. Threads are only used if the package was built with OpenMP.
+
+        Returns:
+            Signatures (numpy uint64 array of shape (len(token_lists), num_perm)), one per row
+
+        Raises:
+            TypeError : If one of the token sets is None or not a set or a list, or if a token is not a string
+        """
+        for tokens in token_lists:
+            utils.tok_check_for_none(tokens)
+            if not isinstance(tokens, (list, set)):
+                raise TypeError('Tokens are expected to be a python list or set')
+        indptr, hashes = hash_token_lists(list(token_lists))
+        return minhash_signatures(indptr, hashes, self._multipliers, self._increments, utils.get_num_threads(n_jobs))
+
+    def estimate_jaccard(self, signature1, signature2):
+        """
+        Estimates the Jaccard score of two sets from their signatures.
+
+        Args:
+            signature1,signature2 (numpy array): Signatures of the two sets, computed with the same num_perm and seed
+
+        Returns:
+            Fraction of the values of the signatures that are equal (float)
+
+        Raises:
+            ValueError : If the signatures are not of the same length
+        """
+        if len(signature1) != len(signature2):
+            raise ValueError('Signatures are expected to be of the same length')
+        return np.count_nonzero(signature1 == signature2) / float(len(signature1))
+
+    def get_num_perm(self):
+        """
+        Get number of hash functions
+
+        Returns:
+            num_perm (int)
+        """
+        return self.num_perm
+
+    def get_seed(self):
+        """
+        Get seed of the hash functions
+
+        Returns:
+            seed (int)
+        """
+        return self.seed
@@ -0,0 +1,189 @@
+"""Text normalization for the similarity measures"""
+
+import unicodedata
+
+import six
+
+from py_stringmatching import utils
+
+
+class _CharTable(dict):
+    """Translation table for str.translate that maps each character on first
+    use and remembers the result, so every character is mapped only once."""
+
+    def __init__(self, map_char):
+        super(_CharTable, self).__init__()
+        self.map_char = map_char
+
+    def __missing__(self, code_point):
+        mapped = self.map_char(six.unichr(code_point))
+        self[code_point] = mapped
+        return mapped
+
+
+class Normalizer(object):
+    """Normalizes strings before they are compared.
+
+    The translation table is built once per normalizer: the ASCII characters are mapped when the normalizer is
+    created and every other character the first time it is seen. A string is then normalized with a single
+    str.translate call, followed by the whitespace collapsing. The options cannot be changed once the normalizer is
+    created, so that the table always matches them; a normalizer with other options is a new Normalizer.
+
+    Parameters:
+        force_ascii (boolean): Remove all non-ASCII characters (after accent folding), default=False
+        fold_accents (boolean): Replace characters by their compatibility decomposition without combining marks,
+            so that 'é' becomes 'e' and 'ﬁ' becomes 'fi', default=False
+        remove_punctuation (boolean): Replace all characters except letters, digits and '_' by spaces,
+            default=True
+        lowercase (boolean): Convert the string to lower case, default=True
+        collapse_whitespace (boolean): Replace runs of whitespace by a single space and remove leading and
+            trailing whitespace, default=True. If False, only leading and trailing whitespace is removed.
+    """
+    def __init__(self, force_ascii=False, fold_accents=False, remove_punctuation=True,
+                 lowercase=True, collapse_whitespace=True):
+        self.__force_ascii = force_ascii
+        self.__fold_accents = fold_accents
+        self.__remove_punctuation = remove_punctuation
+        self.__lowercase = lowercase
+        self.__collapse_whitespace = collapse_whitespace
+        self._table = _CharTable(self._map_char)
+        for code_point in range(128):
+            self._table[code_point]
+
+    def _map_char(self, char):
+        """Normalized form of a single character."""
+        if self.__lowercase:
+            char = char.lower()
+        if self.__fold_accents:
+            char = u''.join(c for c in unicodedata.normalize('NFKD', char)
+                            if not unicodedata.combining(c))
+        if self.__force_ascii:
+            char = u''.join(c for c in char if ord(c) < 128)
+        if self.__remove_punctuation:
+            char = u''.join(c if c.isalnum() or c == u'_' else u' ' for c in char)
+        return char
+
+    def _options(self):
+        return (self.__force_ascii, self.__fold_accents, self.__remove_punctuation,
+                self.__lowercase, self.__collapse_whitespace)
+
+    # Normalizers are immutable and equal when their options are, so equal normalizers share the entries of caches
+    # keyed by normalizer, such as the one of TokenSort and PartialTokenSort.
+    def __eq__(self, other):
+        return isinstance(other, Normalizer) and self._options() == other._options()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._options())
+
+    def normalize(self, string):
+        """
+        Normalizes a string.
+
+        Args:
+            string (str): Input string
+
+        Returns:
+            Normalized string (str)
+
+        Raises:
+            TypeError : If the input is None or not a string
+
+        Examples:
+            >>> normalizer = Normalizer(fold_accents=True)
+            >>> normalizer.normalize('  Crème Brûlée,   vanilla! ')
+            'creme brulee vanilla'
+            >>> Normalizer(force_ascii=True).normalize('Crème Brûlée')
+            'crme brle'
+        """
+        # input validations
+        utils.tok_check_for_none(string)
+        utils.tok_check_for_string_input(string)
+
+        return self._normalize(string)
+
+    def _normalize(self, string):
+        string = string.translate(self._table)
+        if self.__collapse_whitespace:
+            return u' '.join(string.split())
+        return string.strip()
+
+    def normalize_many(self, strings):
+        """
+        Normalizes many strings.
+
+        Args:
+            strings (list of str or pandas Series): Input strings
+
+        Returns:
+            Normalized strings, as a list, or as a pandas Series with the same index if the input is a Series.
+            Missing values of a Series are kept as they are.
+
+        Raises:
+            TypeError : If one of the inputs is None or not a string (missing values of a Series excepted)
+
+        Examples:
+            >>> Normalizer().normalize_many(['New  York!', 'new-york'])
+            ['new york', 'new york']
+        """
+        if _is_pandas_series(strings):
+            return strings.map(self.normalize, na_action='ignore')
+
+        normalize = self._normalize
+        normalized = []
+        for string in strings:
+            utils.tok_check_for_none(string)
+            utils.tok_check_for_string_input(string)
+            normalized.append(normalize(string))
+        return normalized
+
+    def __call__(self, string):
+        return self.normalize(string)
+
+    def get_force_ascii(self):
+        """Gets the value of the force_ascii flag.
+
+        Returns:
+            The boolean value of the force_ascii flag.
+        """
+        return self.__force_ascii
+
+    def get_fold_accents(self):
+        """Gets the value of the fold_accents flag.
+
+        Returns:
+            The boolean value of the fold_accents flag.
+        """
+        return self.__fold_accents
+
+    def get_remove_punctuation(self):
+        """Gets the value of the remove_punctuation flag.
+
+        Returns:
+            The boolean value of the remove_punctuation flag.
+        """
+        return self.__remove_punctuation
+
+    def get_lowercase(self):
+        """Gets the value of the lowercase flag.
+
+        Returns:
+            The boolean value of the lowercase flag.
+        """
+        return self.__lowercase
+
+    def get_collapse_whitespace(self):
+        """Gets the value of the collapse_whitespace flag.
+
+        Returns:
+            The boolean value of the collapse_whitespace flag.
+        """
+        return self.__collapse_whitespace
+
+
+def _is_pandas_series(strings):
+    # pandas is optional, so the type is checked without importing it
+    return (type(strings).__name__ == 'Series' and
+            type(strings).__module__.split('.')[0] == 'pandas')
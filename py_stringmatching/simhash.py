@@ -0,0 +1,115 @@
+"""SimHash fingerprints of weighted token bags, for near-duplicate detection"""
+
+import numpy as np
+
+from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_minhash import hash_token_lists
+from py_stringmatching.similarity_measure.cython.cython_simhash import simhash_fingerprints
+from py_stringmatching.similarity_measure.tfidf import TfIdf
+
+
+class SimHash(object):
+    """Turns bags of tokens into 64-bit SimHash fingerprints.
+
+    Every token is hashed to 64 bits, and bit b of the fingerprint of a bag is set if the tokens whose hash has bit
+    b set weigh more than those whose hash has it clear. The number of bits in which the fingerprints of two bags
+    differ grows with the angle between their weighted token vectors, so near-duplicate bags have fingerprints
+    within a few bits of each other. Fingerprints are compared with HammingDistance, which uses a popcount for
+    packed codes, and searched with HammingIndex.
+
+    Tokens are weighted by their number of occurrences in the bag or, if a TfIdf measure with a corpus is given,
+    by their TF/IDF weight (see TfIdf.get_weights), in which case tokens that are not in the corpus are ignored.
+    Tokens are hashed from their UTF-8 bytes, so fingerprints computed in different processes or runs can be
+    compared.
+
+    Parameters:
+        tfidf (TfIdf): TF/IDF measure whose corpus weights the tokens, or None to weight them by their number of
+            occurrences (defaults to None)
+
+    Examples:
+        >>> from py_stringmatching import HammingDistance, WhitespaceTokenizer
+        >>> ws = WhitespaceTokenizer()
+        >>> simhash = SimHash()
+        >>> fingerprint1 = simhash.fingerprint(ws.tokenize('stainless steel 12 cup coffee maker with glass carafe'))
+        >>> fingerprint2 = simhash.fingerprint(ws.tokenize('stainless steel 12 cup coffee maker glass carafe'))
+        >>> HammingDistance().get_raw_score(fingerprint1, fingerprint2)
+        7
+    """
+    def __init__(self, tfidf=None):
+        _check_tfidf(tfidf)
+        self.tfidf = tfidf
+
+    def fingerprint(self, bag):
+        """
+        Computes the SimHash fingerprint of a bag of tokens.
+
+        Args:
+            bag (list or set): Input tokens, as strings
+
+        Returns:
+            Fingerprint (numpy uint64). The fingerprint of an empty bag is 0.
+
+        Raises:
+            TypeError : If bag is None or not a list or a set, or if a token is not a string
+        """
+        return self.fingerprints([bag])[0]
+
+    def fingerprints(self, bags, n_jobs=1):
+        """
+        Computes the SimHash fingerprints of many bags of tokens.
+
+        Args:
+            bags (list of list or set): Input bags, as lists or sets of strings
+            n_jobs (int): Number of threads computing the fingerprints once the tokens are hashed, -1 for all CPUs,
+                default=1. Threads are only used if the package was built with OpenMP.
+
+        Returns:
+            Fingerprints (numpy uint64 array of length len(bags))
+
+        Raises:
+            TypeError : If one of the bags is None or not a list or a set, or if a token is not a string
+        """
+        for bag in bags:
+            utils.tok_check_for_none(bag)
+            if not isinstance(bag, (list, set)):
+                raise TypeError('Bags are expected to be python lists or sets')
+        if self.tfidf is None:
+            token_lists = list(bags)
+            indptr, hashes = hash_token_lists(token_lists)
+            weights = np.ones(len(hashes), dtype=np.float64)
+        else:
+            token_weights = [self.tfidf.get_weights(bag) for bag in bags]
+            indptr, hashes = hash_token_lists([list(bag_weights) for bag_weights in token_weights])
+            weights = np.fromiter((weight for bag_weights in token_weights for weight in bag_weights.values()),
+                                  dtype=np.float64, count=len(hashes))
+        return simhash_fingerprints(indptr, hashes, weights, utils.get_num_threads(n_jobs))
+
+    def get_tfidf(self):
+        """
+        Get TF/IDF measure
+
+        Returns:
+            tfidf (TfIdf or None)
+        """
+        return self.tfidf
+
+    def set_tfidf(self, tfidf):
+        """
+        Set TF/IDF measure
+
+        Args:
+            tfidf (TfIdf): TF/IDF measure whose corpus weights the tokens, or None to weight them by their number
+                of occurrences
+        """
+        _check_tfidf(tfidf)
+        self.tfidf = tfidf
+        return True
+
+
+def _check_tfidf(tfidf):
+    if tfidf is None:
+        return
+    if not isinstance(tfidf, TfIdf):
+        raise TypeError('tfidf is expected to be a TfIdf object')
+    if not tfidf.has_corpus():
+        raise ValueError('tfidf is expected to have a corpus')
@@ -15,8 +15,10 @@ class Affine(SequenceSimilarityMeasure):
     Args:
         gap_start (float): Cost for the gap at the start (defaults to 1).
         gap_continuation (float): Cost for the gap continuation (defaults to 0.5).
-        sim_func (function): Function computing similarity score between two characters, which are represented as strings (defaults
-                             to an identity function, which returns 1 if the two characters are the same and returns 0 otherwise). 
+        sim_func (function or SubstitutionMatrix): Function computing similarity score between two characters, which are represented as strings (defaults
+                             to an identity function, which returns 1 if the two characters are the same and returns 0 otherwise).
+                             A SubstitutionMatrix can be given instead of a function, in which case the scores are
+                             computed in C.
 
     Attributes:
         gap_start (float): An attribute to store the gap cost at the start.
@@ -114,7 +116,7 @@ class Affine(SequenceSimilarityMeasure):
         """Set similarity function.
 
         Args:
-            sim_func (function): Function computing similarity score between two characters, represented as strings.
+            sim_func (function or SubstitutionMatrix): Function computing similarity score between two characters, represented as strings.
         """
         self.sim_func = sim_func
         return True
@@ -1,9 +1,55 @@
 
 import numpy as np
-from py_stringmatching.similarity_measure.cython.cython_utils import float_max_two
-from py_stringmatching.similarity_measure.cython.cython_utils import float_max_three
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+from py_stringmatching.similarity_measure.cython.cython_utils import cython_sim_ident
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport float_max_two, \
+    float_max_three, copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix cimport \
+    SubstitutionMatrix, SubstitutionScores, substitution_score
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix import IDENTITY_MATRIX
+from libc.math cimport INFINITY
 
 
+cdef double affine_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                          Py_UCS4* string2, Py_ssize_t len_str2,
+                          float gap_start, float gap_continuation,
+                          SubstitutionScores* sm, double* rows) noexcept nogil:
+    """Affine gap score with a substitution matrix.
+
+    gap_start and gap_continuation are the (negative) gap scores. rows must
+    hold 6 * (len_str2 + 1) doubles.
+    """
+    cdef Py_ssize_t i = 0, j = 0
+    cdef double neg_inf = -INFINITY
+    cdef double* prev_m = rows
+    cdef double* prev_x = prev_m + (len_str2 + 1)
+    cdef double* prev_y = prev_x + (len_str2 + 1)
+    cdef double* cur_m = prev_y + (len_str2 + 1)
+    cdef double* cur_x = cur_m + (len_str2 + 1)
+    cdef double* cur_y = cur_x + (len_str2 + 1)
+    cdef double* tmp
+
+    prev_m[0] = prev_x[0] = prev_y[0] = 0
+    for j from 1 <= j < (len_str2+1):
+        prev_m[j] = neg_inf
+        prev_x[j] = neg_inf
+        prev_y[j] = gap_start + (j-1) * gap_continuation
+
+    for i from 1 <= i < (len_str1 + 1):
+        cur_m[0] = neg_inf
+        cur_x[0] = gap_start + (i-1) * gap_continuation
+        cur_y[0] = neg_inf
+        for j from 1 <= j < (len_str2 + 1):
+            cur_m[j] = (substitution_score(sm, string1[i-1], string2[j-1]) +
+                        float_max_three(prev_m[j-1], prev_x[j-1], prev_y[j-1]))
+            cur_x[j] = float_max_two((gap_start + prev_m[j]), (gap_continuation + prev_x[j]))
+            cur_y[j] = float_max_two((gap_start + cur_m[j-1]), (gap_continuation + cur_y[j-1]))
+        tmp = prev_m; prev_m = cur_m; cur_m = tmp
+        tmp = prev_x; prev_x = cur_x; cur_x = tmp
+        tmp = prev_y; prev_y = cur_y; cur_y = tmp
+
+    return float_max_three(prev_m[len_str2], prev_x[len_str2], prev_y[len_str2])
+
 
 def affine(unicode string1, unicode string2, float main_gap_start, float main_gap_continuation, sim_func ):
 
@@ -12,33 +58,68 @@ def affine(unicode string1, unicode string2, float main_gap_start, float main_ga
     cdef int len_str1 = len(string1)
     cdef int len_str2 = len(string2)
     cdef int i=0, j=0
-    cdef double[:, :] m = np.zeros((len_str1 + 1, len_str2 + 1), dtype=np.double)
-    cdef double[:, :] x = np.zeros((len_str1 + 1, len_str2 + 1), dtype=np.double)
-    cdef double[:, :] y = np.zeros((len_str1 + 1, len_str2 + 1), dtype=np.double)
-
-    # DP initialization
-    for i from 1 <= i < (len_str1+1):
-        m[i, 0] = -float(np.inf)
-        x[i, 0] = gap_start + (i-1) * gap_continuation
-        y[i, 0] = -float(np.inf)
-    #
-    # # DP initialization
-    for j from 1 <= j < (len_str2+1):
-        m[0, j] = -float(np.inf)
-        x[0, j] = -float(np.inf)
-        y[0, j] = gap_start + (j-1) * gap_continuation
+    cdef double neg_inf = -float(np.inf)
+    cdef double score = 0.0
+    cdef SubstitutionMatrix sm
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
 
+    if sim_func is cython_sim_ident:
+        sim_func = IDENTITY_MATRIX
 
-    # affine gap calculation using DP
-    for i from 1 <= i < (len_str1 + 1):
-        for j from 1 <= j < (len_str2 + 1):
-            # best score between x_1....x_i and y_1....y_j
-                # given that x_i is aligned to y_j
-            m[i, j] = (sim_func(string1[i-1], string2[j-1]) + float_max_three(m[i-1][j-1],
-                                                                       x[i-1][j-1], y[i-1][j-1]))
-            # the best score given that x_i is aligned to a gap
-            x[i, j] = float_max_two((gap_start + m[i-1, j]), (gap_continuation+ x[i-1, j]))
-            # the best score given that y_j is aligned to a gap
-            y[i, j] = float_max_two((gap_start+ m[i, j-1]), (gap_continuation + y[i, j-1]))
-
-    return float_max_three(m[len_str1, len_str2], x[len_str1, len_str2], y[len_str1, len_str2])
+    # Only the previous row of each of the three DP matrices is needed, so
+    # two rows of m, x and y are kept in a per-thread scratch buffer.
+    cdef Py_ssize_t row_bytes = 6 * (len_str2 + 1) * sizeof(double)
+    scratch = acquire_scratch(row_bytes + (len_str1 + len_str2) * sizeof(Py_UCS4))
+    cdef unsigned char[::1] mem = scratch
+    cdef double* prev_m = <double*>&mem[0]
+    cdef double* prev_x = prev_m + (len_str2 + 1)
+    cdef double* prev_y = prev_x + (len_str2 + 1)
+    cdef double* cur_m = prev_y + (len_str2 + 1)
+    cdef double* cur_x = cur_m + (len_str2 + 1)
+    cdef double* cur_y = cur_x + (len_str2 + 1)
+    cdef double* tmp
+
+    try:
+        if isinstance(sim_func, SubstitutionMatrix):
+            # the whole DP runs in C
+            sm = sim_func
+            buf1 = <Py_UCS4*>(&mem[0] + row_bytes)
+            buf2 = buf1 + len_str1
+            copy_ucs4(string1, buf1)
+            copy_ucs4(string2, buf2)
+            with nogil:
+                score = affine_kernel(buf1, len_str1, buf2, len_str2, gap_start,
+                                      gap_continuation, &sm.table, prev_m)
+            return score
+
+        # DP initialization
+        prev_m[0] = prev_x[0] = prev_y[0] = 0
+        for j from 1 <= j < (len_str2+1):
+            prev_m[j] = neg_inf
+            prev_x[j] = neg_inf
+            prev_y[j] = gap_start + (j-1) * gap_continuation
+
+        # affine gap calculation using DP
+        for i from 1 <= i < (len_str1 + 1):
+            # DP initialization
+            cur_m[0] = neg_inf
+            cur_x[0] = gap_start + (i-1) * gap_continuation
+            cur_y[0] = neg_inf
+            for j from 1 <= j < (len_str2 + 1):
+                # best score between x_1....x_i and y_1....y_j
+                    # given that x_i is aligned to y_j
+                cur_m[j] = (sim_func(string1[i-1], string2[j-1]) + float_max_three(prev_m[j-1],
+                                                                           prev_x[j-1], prev_y[j-1]))
+                # the best score given that x_i is aligned to a gap
+                cur_x[j] = float_max_two((gap_start + prev_m[j]), (gap_continuation + prev_x[j]))
+                # the best score given that y_j is aligned to a gap
+                cur_y[j] = float_max_two((gap_start + cur_m[j-1]), (gap_continuation + cur_y[j-1]))
+            tmp = prev_m; prev_m = cur_m; cur_m = tmp
+            tmp = prev_x; prev_x = cur_x; cur_x = tmp
+            tmp = prev_y; prev_y = cur_y; cur_y = tmp
+
+        score = float_max_three(prev_m[len_str2], prev_x[len_str2], prev_y[len_str2])
+    finally:
+        release_scratch(scratch)
+    return score
@@ -0,0 +1,18 @@
+# Growable per-thread buffers of (row, row, score) triples, shared by the
+# join kernels.
+
+cdef struct PairBuffer:
+    Py_ssize_t* rows
+    Py_ssize_t* cols
+    double* scores
+    Py_ssize_t size
+    Py_ssize_t capacity
+
+cdef PairBuffer* new_pair_buffers(int num_buffers) except NULL
+
+cdef int buffer_append(PairBuffer* buf, Py_ssize_t row, Py_ssize_t col,
+                       double score) noexcept nogil
+
+cdef tuple pair_buffers_to_arrays(PairBuffer* buffers, int num_buffers)
+
+cdef void free_pair_buffers(PairBuffer* buffers, int num_buffers) noexcept
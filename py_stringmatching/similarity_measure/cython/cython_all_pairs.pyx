@@ -0,0 +1,198 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from cython.parallel cimport prange, threadid
+from libc.stdint cimport int32_t
+from libc.stdlib cimport malloc, realloc, free
+from py_stringmatching.similarity_measure.cython.cython_token_sets cimport set_score
+
+
+# All-pairs set similarity of two tables of token sets, stored as CSR
+# incidence matrices A and B (one row per set, one column per token id).
+#
+# The intersection sizes are the entries of the sparse product A @ B.T,
+# computed row by row (Gustavson's algorithm): the rows of a chunk of B are
+# first inverted into token -> rows postings, then every row of A adds 1 to
+# an accumulator for each B row found in the postings of its tokens. Only
+# the B rows that were touched are scored and reset, so the cost is the
+# number of (row of A, row of B, shared token) triples, and the memory is
+# bounded by the chunk of B and the pairs that reach the threshold.
+
+cdef PairBuffer* new_pair_buffers(int num_buffers) except NULL:
+    """Allocates empty pair buffers, to be freed with free_pair_buffers."""
+    cdef int b = 0
+    cdef PairBuffer* buffers = <PairBuffer*>malloc(num_buffers * sizeof(PairBuffer))
+    if buffers == NULL:
+        raise MemoryError()
+    for b in range(num_buffers):
+        buffers[b].rows = NULL
+        buffers[b].cols = NULL
+        buffers[b].scores = NULL
+        buffers[b].size = 0
+        buffers[b].capacity = 0
+    return buffers
+
+
+cdef int buffer_append(PairBuffer* buf, Py_ssize_t row, Py_ssize_t col,
+                       double score) noexcept nogil:
+    """Appends a pair to a growable buffer. Returns -1 if out of memory."""
+    cdef Py_ssize_t capacity
+    cdef void* rows
+    cdef void* cols
+    cdef void* scores
+    if buf.size == buf.capacity:
+        capacity = 1024 if buf.capacity == 0 else 2 * buf.capacity
+        rows = realloc(buf.rows, capacity * sizeof(Py_ssize_t))
+        if rows == NULL:
+            return -1
+        buf.rows = <Py_ssize_t*>rows
+        cols = realloc(buf.cols, capacity * sizeof(Py_ssize_t))
+        if cols == NULL:
+            return -1
+        buf.cols = <Py_ssize_t*>cols
+        scores = realloc(buf.scores, capacity * sizeof(double))
+        if scores == NULL:
+            return -1
+        buf.scores = <double*>scores
+        buf.capacity = capacity
+    buf.rows[buf.size] = row
+    buf.cols[buf.size] = col
+    buf.scores[buf.size] = score
+    buf.size += 1
+    return 0
+
+
+
+cdef tuple pair_buffers_to_arrays(PairBuffer* buffers, int num_buffers):
+    """Concatenates the pairs of all buffers into numpy arrays."""
+    cdef Py_ssize_t total = 0, k = 0, q = 0
+    cdef int b = 0
+    cdef Py_ssize_t[::1] row_view
+    cdef Py_ssize_t[::1] col_view
+    cdef double[::1] score_view
+
+    for b in range(num_buffers):
+        total += buffers[b].size
+    rows = np.empty(total, dtype=np.intp)
+    cols = np.empty(total, dtype=np.intp)
+    scores = np.empty(total, dtype=np.float64)
+    row_view = rows
+    col_view = cols
+    score_view = scores
+    for b in range(num_buffers):
+        for q in range(buffers[b].size):
+            row_view[k] = buffers[b].rows[q]
+            col_view[k] = buffers[b].cols[q]
+            score_view[k] = buffers[b].scores[q]
+            k += 1
+    return rows, cols, scores
+
+
+cdef void free_pair_buffers(PairBuffer* buffers, int num_buffers) noexcept:
+    cdef int b = 0
+    if buffers == NULL:
+        return
+    for b in range(num_buffers):
+        free(buffers[b].rows)
+        free(buffers[b].cols)
+        free(buffers[b].scores)
+    free(buffers)
+
+def all_pairs_chunk(const Py_ssize_t[::1] indptr1, const int32_t[::1] indices1,
+                    const Py_ssize_t[::1] indptr2, const int32_t[::1] indices2,
+                    Py_ssize_t start2, Py_ssize_t end2, Py_ssize_t num_tokens,
+                    int measure, double alpha, double beta, double threshold,
+                    int num_threads):
+    """Scores every set of the first table against the sets start2 to end2
+    of the second table, and keeps the pairs that share at least one token
+    and whose score is at least threshold.
+
+    Args:
+        indptr1,indices1,indptr2,indices2: CSR incidence matrices of the two
+            tables, with token ids in [0, num_tokens).
+        start2,end2 (int): Rows of the second table to score.
+        num_tokens (int): Number of token ids.
+        measure (int): Code of the measure, see cython_token_sets.MEASURES.
+        alpha,beta (float): Tversky index parameters.
+        threshold (float): Smallest score kept.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Rows of the first table, rows of the second table (numpy intp
+        arrays) and scores (numpy float64 array) of the kept pairs, in no
+        particular order.
+    """
+    cdef Py_ssize_t n1 = indptr1.shape[0] - 1, chunk = end2 - start2
+    cdef Py_ssize_t i = 0, j = 0, k = 0, p = 0, t = 0, q = 0
+    cdef Py_ssize_t len1 = 0, len2 = 0, num_touched = 0, overlap = 0
+    cdef double score = 0
+    cdef int tid = 0, failed = 0
+    cdef Py_ssize_t* post_ptr = NULL
+    cdef Py_ssize_t* post_rows = NULL
+    cdef Py_ssize_t* counts = NULL
+    cdef Py_ssize_t* touched = NULL
+    cdef PairBuffer* buffers = NULL
+    cdef Py_ssize_t* acc
+    cdef Py_ssize_t* seen
+
+    try:
+        # token -> rows of the chunk of the second table
+        post_ptr = <Py_ssize_t*>malloc((num_tokens + 1) * sizeof(Py_ssize_t))
+        post_rows = <Py_ssize_t*>malloc((indptr2[end2] - indptr2[start2] + 1) * sizeof(Py_ssize_t))
+        # per thread: an accumulator and a list of touched rows of the chunk
+        counts = <Py_ssize_t*>malloc(num_threads * (chunk + 1) * sizeof(Py_ssize_t))
+        touched = <Py_ssize_t*>malloc(num_threads * (chunk + 1) * sizeof(Py_ssize_t))
+        if post_ptr == NULL or post_rows == NULL or counts == NULL or touched == NULL:
+            raise MemoryError()
+        buffers = new_pair_buffers(num_threads)
+        for k in range(num_threads * (chunk + 1)):
+            counts[k] = 0
+
+        for t in range(num_tokens + 1):
+            post_ptr[t] = 0
+        for p in range(indptr2[start2], indptr2[end2]):
+            post_ptr[indices2[p] + 1] += 1
+        for t in range(num_tokens):
+            post_ptr[t + 1] += post_ptr[t]
+        for j in range(start2, end2):
+            for p in range(indptr2[j], indptr2[j + 1]):
+                post_rows[post_ptr[indices2[p]]] = j - start2
+                post_ptr[indices2[p]] += 1
+        for t in range(num_tokens, 0, -1):
+            post_ptr[t] = post_ptr[t - 1]
+        post_ptr[0] = 0
+
+        for i in prange(n1, nogil=True, num_threads=num_threads, schedule='guided'):
+            tid = threadid()
+            acc = counts + tid * (chunk + 1)
+            seen = touched + tid * (chunk + 1)
+            len1 = indptr1[i + 1] - indptr1[i]
+            num_touched = 0
+            for p in range(indptr1[i], indptr1[i + 1]):
+                t = indices1[p]
+                if t >= num_tokens:
+                    continue
+                for q in range(post_ptr[t], post_ptr[t + 1]):
+                    k = post_rows[q]
+                    if acc[k] == 0:
+                        seen[num_touched] = k
+                        num_touched = num_touched + 1
+                    acc[k] = acc[k] + 1
+            for q in range(num_touched):
+                k = seen[q]
+                overlap = acc[k]
+                acc[k] = 0
+                len2 = indptr2[start2 + k + 1] - indptr2[start2 + k]
+                score = set_score(measure, overlap, len1, len2, alpha, beta)
+                if score >= threshold:
+                    if buffer_append(&buffers[tid], i, start2 + k, score) != 0:
+                        failed += 1
+        if failed:
+            raise MemoryError()
+        return pair_buffers_to_arrays(buffers, num_threads)
+    finally:
+        free_pair_buffers(buffers, num_threads)
+        free(touched)
+        free(counts)
+        free(post_rows)
+        free(post_ptr)
@@ -0,0 +1,191 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from cython.parallel cimport prange, threadid
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+
+
+# Editex letter group of every code point below 256, -1 for characters that
+# are in no group (H and W are handled separately by d_cost). These are the
+# effective groups of EditexHelper.letter_groups, where P, C, S and J are
+# assigned twice and keep the last group.
+cdef signed char LETTER_GROUPS[256]
+
+_GROUPS = {'AEIOUY': 0, 'B': 1, 'KQ': 2, 'DT': 3, 'LR': 4, 'MN': 5, 'G': 6,
+           'FPV': 7, 'XZ': 8, 'CSJ': 9}
+
+
+def _init_letter_groups():
+    cdef int c
+    for c in range(256):
+        LETTER_GROUPS[c] = -1
+    for letters, group in _GROUPS.items():
+        for letter in letters:
+            LETTER_GROUPS[ord(letter)] = group
+
+_init_letter_groups()
+
+
+cdef inline double r_cost(Py_UCS4 ch1, Py_UCS4 ch2, double match_cost,
+                          double group_cost, double mismatch_cost) noexcept nogil:
+    """r(a, b) of Zobel & Dart."""
+    if ch1 == ch2:
+        return match_cost
+    if (ch1 < 256 and ch2 < 256 and LETTER_GROUPS[ch1] >= 0 and
+            LETTER_GROUPS[ch1] == LETTER_GROUPS[ch2]):
+        return group_cost
+    return mismatch_cost
+
+
+cdef inline double d_cost(Py_UCS4 ch1, Py_UCS4 ch2, double match_cost,
+                          double group_cost, double mismatch_cost) noexcept nogil:
+    """d(a, b) of Zobel & Dart."""
+    if ch1 != ch2 and (ch1 == u'H' or ch1 == u'W'):
+        return group_cost
+    return r_cost(ch1, ch2, match_cost, group_cost, mismatch_cost)
+
+
+cdef double editex_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                          Py_UCS4* string2, Py_ssize_t len_str2,
+                          double match_cost, double group_cost, double mismatch_cost,
+                          bint local, double* work) noexcept nogil:
+    """Editex distance between two normalized, non-empty strings.
+
+    The deletion costs of every position of both strings are computed once,
+    and only two rows of the DP matrix are kept. work must hold
+    len_str1 + 3 * (len_str2 + 1) doubles. Like the original implementation,
+    which stored the matrix in an integer array, every cell is truncated to
+    an integer.
+    """
+    cdef Py_ssize_t i = 0, j = 0
+    cdef double* d_cost1 = work
+    cdef double* d_cost2 = d_cost1 + len_str1
+    cdef double* prev_row = d_cost2 + (len_str2 + 1)
+    cdef double* cur_row = prev_row + (len_str2 + 1)
+    cdef double* tmp
+    cdef double value, cost
+    cdef Py_UCS4 ch1
+
+    # d_cost of each character with the one before it (a space at the start)
+    d_cost1[0] = d_cost(u' ', string1[0], match_cost, group_cost, mismatch_cost)
+    for i from 1 <= i < len_str1:
+        d_cost1[i] = d_cost(string1[i - 1], string1[i], match_cost, group_cost, mismatch_cost)
+    d_cost2[1] = d_cost(u' ', string2[0], match_cost, group_cost, mismatch_cost)
+    for j from 2 <= j < (len_str2 + 1):
+        d_cost2[j] = d_cost(string2[j - 2], string2[j - 1], match_cost, group_cost, mismatch_cost)
+
+    prev_row[0] = 0
+    for j from 1 <= j < (len_str2 + 1):
+        prev_row[j] = <long long>(prev_row[j - 1] + d_cost2[j])
+
+    for i from 1 <= i < (len_str1 + 1):
+        ch1 = string1[i - 1]
+        cost = d_cost1[i - 1]
+        cur_row[0] = 0 if local else <long long>(prev_row[0] + cost)
+        for j from 1 <= j < (len_str2 + 1):
+            value = prev_row[j] + cost
+            if cur_row[j - 1] + d_cost2[j] < value:
+                value = cur_row[j - 1] + d_cost2[j]
+            if prev_row[j - 1] + r_cost(ch1, string2[j - 1], match_cost, group_cost,
+                                        mismatch_cost) < value:
+                value = prev_row[j - 1] + r_cost(ch1, string2[j - 1], match_cost,
+                                                 group_cost, mismatch_cost)
+            cur_row[j] = <long long>value
+        tmp = prev_row; prev_row = cur_row; cur_row = tmp
+
+    return prev_row[len_str2]
+
+
+def editex(unicode string1, unicode string2, double match_cost, double group_cost,
+           double mismatch_cost, bint local):
+    """Computes the Editex distance between two normalized, non-empty strings.
+
+    Args:
+        string1,string2 (unicode): Input strings, upper case and NFKD normalized.
+        match_cost,group_cost,mismatch_cost (float): Editex costs.
+        local (boolean): Local variant on/off.
+
+    Returns:
+        Editex distance (int).
+    """
+    cdef Py_ssize_t len_str1 = len(string1), len_str2 = len(string2)
+    cdef Py_ssize_t work_bytes = (len_str1 + 3 * (len_str2 + 1)) * sizeof(double)
+    cdef double dist = 0
+    cdef unsigned char[::1] mem
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
+
+    scratch = acquire_scratch(work_bytes + (len_str1 + len_str2) * sizeof(Py_UCS4))
+    mem = scratch
+    try:
+        buf1 = <Py_UCS4*>(&mem[0] + work_bytes)
+        buf2 = buf1 + len_str1
+        copy_ucs4(string1, buf1)
+        copy_ucs4(string2, buf2)
+        with nogil:
+            dist = editex_kernel(buf1, len_str1, buf2, len_str2, match_cost, group_cost,
+                                 mismatch_cost, local, <double*>&mem[0])
+    finally:
+        release_scratch(scratch)
+    return <long long>dist
+
+
+def editex_batch(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                 const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                 double match_cost, double group_cost, double mismatch_cost,
+                 bint local, int num_threads):
+    """Computes the Editex distances of many pairs of packed, normalized strings.
+
+    The strings are packed with cython_utils.pack_strings; pair i is made of
+    the i-th string of each side. A pair with an empty string scores its
+    other string's length times mismatch_cost. The loop runs without the GIL
+    and is spread over num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        match_cost,group_cost,mismatch_cost (float): Editex costs.
+        local (boolean): Local variant on/off.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Editex distances (numpy float64 array). The distances of pairs with an
+        empty string are not truncated, like those of Editex.get_raw_score.
+    """
+    cdef Py_ssize_t n = offsets1.shape[0] - 1, i = 0, nbytes = 0
+    cdef Py_ssize_t len_str1, len_str2
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef unsigned char* block
+
+    for i in range(n):
+        len_str1 = offsets1[i + 1] - offsets1[i]
+        len_str2 = offsets2[i + 1] - offsets2[i]
+        if (len_str1 + 3 * (len_str2 + 1)) * sizeof(double) > nbytes:
+            nbytes = (len_str1 + 3 * (len_str2 + 1)) * sizeof(double)
+
+    scores = np.zeros(n, dtype=np.float64)
+    cdef double[::1] score_view = scores
+
+    # one work buffer per thread
+    block = <unsigned char*>malloc(num_threads * nbytes if nbytes > 0 else 1)
+    if block == NULL:
+        raise MemoryError()
+
+    try:
+        for i in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+            len_str1 = offsets1[i + 1] - offsets1[i]
+            len_str2 = offsets2[i + 1] - offsets2[i]
+            if len_str1 == 0:
+                score_view[i] = len_str2 * mismatch_cost
+            elif len_str2 == 0:
+                score_view[i] = len_str1 * mismatch_cost
+            else:
+                score_view[i] = <long long>editex_kernel(
+                    base1 + offsets1[i], len_str1, base2 + offsets2[i], len_str2,
+                    match_cost, group_cost, mismatch_cost, local,
+                    <double*>(block + threadid() * nbytes))
+    finally:
+        free(block)
+    return scores
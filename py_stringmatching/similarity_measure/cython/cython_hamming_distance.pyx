@@ -0,0 +1,89 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from cython.parallel cimport prange
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport popcount64
+
+
+def hamming_distance_batch(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                           const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                           int num_threads, bint normalize):
+    """Computes the Hamming distances of many pairs of packed strings.
+
+    The strings are packed with cython_utils.pack_strings; pair i is made of
+    the i-th string of each side. The loop runs without the GIL and is
+    spread over num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        num_threads (int): Number of threads to use.
+        normalize (boolean): If True, return normalized similarities instead
+            of distances.
+
+    Returns:
+        Hamming distances (numpy int64 array), or similarities (numpy float64
+        array) if normalize is True.
+
+    Raises:
+        ValueError : If the strings of a pair are not of same length.
+    """
+    cdef Py_ssize_t n = offsets1.shape[0] - 1, i = 0, j = 0, length = 0
+    cdef Py_ssize_t dist = 0
+    cdef const unsigned int* string1
+    cdef const unsigned int* string2
+
+    for i in range(n):
+        if offsets1[i + 1] - offsets1[i] != offsets2[i + 1] - offsets2[i]:
+            raise ValueError("Undefined for sequences of unequal length")
+
+    distances = np.zeros(n, dtype=np.int64)
+    scores = np.zeros(n, dtype=np.float64)
+    cdef long long[::1] dist_view = distances
+    cdef double[::1] score_view = scores
+
+    for i in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+        string1 = &codes1[0] + offsets1[i]
+        string2 = &codes2[0] + offsets2[i]
+        length = offsets1[i + 1] - offsets1[i]
+        dist = 0
+        for j in range(length):
+            if string1[j] != string2[j]:
+                dist = dist + 1
+        dist_view[i] = dist
+        score_view[i] = 1.0 if length == 0 else 1.0 - (<double>dist / length)
+    return scores if normalize else distances
+
+
+def hamming_distance_packed(const uint64_t[::1] codes1, const uint64_t[::1] codes2,
+                            int num_threads, bint normalize):
+    """Computes the Hamming distances of many pairs of 64-bit codes.
+
+    The distance of a pair is the popcount of the XOR of its two codes.
+
+    Args:
+        codes1,codes2 (numpy uint64 arrays): Input codes, of the same length.
+        num_threads (int): Number of threads to use.
+        normalize (boolean): If True, return normalized similarities (1 -
+            distance / 64) instead of distances.
+
+    Returns:
+        Hamming distances (numpy int64 array), or similarities (numpy float64
+        array) if normalize is True.
+    """
+    cdef Py_ssize_t n = codes1.shape[0], i = 0
+    distances = np.zeros(n, dtype=np.int64)
+    scores = np.zeros(n, dtype=np.float64)
+    cdef long long[::1] dist_view = distances
+    cdef double[::1] score_view = scores
+
+    for i in prange(n, nogil=True, num_threads=num_threads, schedule='static'):
+        dist_view[i] = popcount64(codes1[i] ^ codes2[i])
+        score_view[i] = 1.0 - dist_view[i] / 64.0
+    return scores if normalize else distances
+
+
+def hamming_distance_code(uint64_t code1, uint64_t code2):
+    """Computes the Hamming distance of two 64-bit codes, the popcount of
+    their XOR."""
+    return popcount64(code1 ^ code2)
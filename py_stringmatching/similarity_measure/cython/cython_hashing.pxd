@@ -0,0 +1,27 @@
+# Deterministic 64-bit hashing of tokens, shared by the sketching kernels.
+# Unlike the built-in hash of a str, which is salted per process, these
+# hashes only depend on the UTF-8 bytes of the token, so sketches computed
+# in different processes or runs can be compared.
+
+from libc.stdint cimport uint64_t
+
+
+cdef inline uint64_t mix64(uint64_t x) noexcept nogil:
+    """Finalizer of MurmurHash3: a bijection of 64-bit words in which every
+    input bit affects every output bit."""
+    x ^= x >> 33
+    x *= 0xff51afd7ed558ccdULL
+    x ^= x >> 33
+    x *= 0xc4ceb9fe1a85ec53ULL
+    x ^= x >> 33
+    return x
+
+
+cdef inline uint64_t hash_bytes(const char* data, Py_ssize_t size) noexcept nogil:
+    """64-bit FNV-1a hash of a byte string, followed by mix64."""
+    cdef uint64_t h = 0xcbf29ce484222325ULL
+    cdef Py_ssize_t i
+    for i in range(size):
+        h ^= <unsigned char>data[i]
+        h *= 0x100000001b3ULL
+    return mix64(h)
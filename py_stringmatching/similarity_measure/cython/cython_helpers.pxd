@@ -0,0 +1,76 @@
+# Small inline helpers shared by the Cython kernels. Being cdef inline and
+# nogil, they compile down to plain C in every module that cimports them,
+# so they can be used inside the DP loops and under prange without any
+# Python call overhead. cython_utils keeps def wrappers of the min/max
+# helpers for Python callers.
+
+
+# Slack on the bounds of the pruning filters of the joins, so that rounding
+# errors never drop a pair. Defined in C so that every module that cimports
+# it, and SetSimJoin through cython_set_join.BOUND_EPS, uses the same value.
+cdef extern from *:
+    """
+    #define PYSM_BOUND_EPS 1e-9
+    """
+    const double EPS "PYSM_BOUND_EPS"
+
+
+cdef inline int int_max_two(int a, int b) noexcept nogil:
+    return a if a > b else b
+
+
+cdef inline int int_max_three(int a, int b, int c) noexcept nogil:
+    cdef int max_int = a
+    if b > max_int:
+        max_int = b
+    if c > max_int:
+        max_int = c
+    return max_int
+
+
+cdef inline int int_min_two(int a, int b) noexcept nogil:
+    return b if a > b else a
+
+
+cdef inline int int_min_three(int a, int b, int c) noexcept nogil:
+    cdef int min_int = a
+    if b < min_int:
+        min_int = b
+    if c < min_int:
+        min_int = c
+    return min_int
+
+
+cdef inline double float_max_two(double a, double b) noexcept nogil:
+    return a if a > b else b
+
+
+cdef inline double float_max_three(double a, double b, double c) noexcept nogil:
+    cdef double max_float = a
+    if b > max_float:
+        max_float = b
+    if c > max_float:
+        max_float = c
+    return max_float
+
+
+cdef inline double sim_ident(Py_UCS4 char1, Py_UCS4 char2) noexcept nogil:
+    """C counterpart of cython_utils.cython_sim_ident."""
+    return 1 if char1 == char2 else 0
+
+
+cdef inline void copy_ucs4(unicode string, Py_UCS4* buf):
+    """Copies the code points of a unicode string into buf."""
+    cdef Py_ssize_t i = 0
+    cdef Py_UCS4 c
+    for c in string:
+        buf[i] = c
+        i += 1
+
+
+cdef inline int popcount64(unsigned long long x) noexcept nogil:
+    """Number of set bits of a 64-bit word (portable SWAR popcount)."""
+    x = x - ((x >> 1) & 0x5555555555555555ULL)
+    x = (x & 0x3333333333333333ULL) + ((x >> 2) & 0x3333333333333333ULL)
+    x = (x + (x >> 4)) & 0x0f0f0f0f0f0f0f0fULL
+    return <int>((x * 0x0101010101010101ULL) >> 56)
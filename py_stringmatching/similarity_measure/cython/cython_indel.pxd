@@ -0,0 +1,25 @@
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_words, pattern_bytes
+
+cdef Py_ssize_t lcs_length(PatternMatchVector* pm, Py_UCS4* text,
+                           Py_ssize_t len_text, uint64_t* work) noexcept nogil
+
+cdef Py_ssize_t lcs_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                         Py_UCS4* string2, Py_ssize_t len_str2,
+                         unsigned char* mem) noexcept nogil
+
+
+cdef inline Py_ssize_t lcs_bytes(Py_ssize_t len_str1, Py_ssize_t len_str2) noexcept nogil:
+    """Work memory lcs_pair needs for two strings of these lengths."""
+    cdef Py_ssize_t length = len_str1 if len_str1 < len_str2 else len_str2
+    return pattern_words(length) * sizeof(uint64_t) + pattern_bytes(length)
+
+
+cdef inline double indel_ratio_from_lcs(Py_ssize_t lcs, Py_ssize_t len_str1,
+                                        Py_ssize_t len_str2) noexcept nogil:
+    """2 * LCS / (len_str1 + len_str2), 1.0 for two empty strings like
+    difflib.SequenceMatcher.ratio."""
+    if len_str1 + len_str2 == 0:
+        return 1.0
+    return 2.0 * lcs / (len_str1 + len_str2)
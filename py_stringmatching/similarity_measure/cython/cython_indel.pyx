@@ -0,0 +1,356 @@
+# cython: boundscheck=False, wraparound=False
+
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_get, pattern_slot, pattern_words, pattern_bytes, pattern_init
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport copy_ucs4, popcount64
+
+
+# Bit-parallel longest common subsequence (Allison & Dix 1986, Hyyrö 2004).
+#
+# The shorter string is the "pattern", whose peq vectors are built by
+# cython_pattern. A single bit-vector S tracks the row of the LCS matrix:
+# a zero bit marks a pattern position where the LCS grows. Each character
+# of the text updates S with one add and a few word operations per 64
+# pattern characters, and the LCS length is the number of zero bits of S.
+# The indel distance (insertions and deletions only) is
+# len1 + len2 - 2 * LCS, and the normalized indel similarity
+# 2 * LCS / (len1 + len2) is the ratio difflib.SequenceMatcher approximates.
+
+# Work memory of small calls lives on the stack; larger calls use the
+# per-thread scratch buffer.
+cdef enum:
+    STACK_WORDS = 512
+
+
+cdef Py_ssize_t lcs_single_word(PatternMatchVector* pm, Py_UCS4* text,
+                                Py_ssize_t len_text) noexcept nogil:
+    """LCS length for patterns of at most 64 characters."""
+    cdef uint64_t s = ~(<uint64_t>0), u
+    cdef uint64_t mask = ~(<uint64_t>0) >> (64 - pm.length)
+    cdef Py_ssize_t j = 0
+
+    for j from 0 <= j < len_text:
+        u = s & pattern_get(pm, text[j])[0]
+        s = (s + u) | (s - u)
+    return popcount64(~s & mask)
+
+
+cdef Py_ssize_t lcs_block(PatternMatchVector* pm, Py_UCS4* text,
+                          Py_ssize_t len_text, uint64_t* s) noexcept nogil:
+    """LCS length for patterns longer than 64 characters.
+
+    The pattern is split into blocks of 64 characters and the carry of the
+    addition is propagated from one block into the next. s must hold
+    pm.words words.
+    """
+    cdef Py_ssize_t words = pm.words, w = 0, j = 0, lcs = 0
+    cdef uint64_t* peq
+    cdef uint64_t u, x, carry
+    cdef int rest = pm.length % 64
+
+    for w from 0 <= w < words:
+        s[w] = ~(<uint64_t>0)
+
+    for j from 0 <= j < len_text:
+        peq = pattern_get(pm, text[j])
+        carry = 0
+        for w from 0 <= w < words:
+            u = s[w] & peq[w]
+            x = s[w] + carry
+            carry = x < carry
+            x = x + u
+            carry |= x < u
+            s[w] = x | (s[w] - u)
+
+    for w from 0 <= w < words - 1:
+        lcs += popcount64(~s[w])
+    if rest == 0:
+        lcs += popcount64(~s[words - 1])
+    else:
+        lcs += popcount64(~s[words - 1] & ((<uint64_t>1 << rest) - 1))
+    return lcs
+
+
+cdef Py_ssize_t lcs_length(PatternMatchVector* pm, Py_UCS4* text,
+                           Py_ssize_t len_text, uint64_t* work) noexcept nogil:
+    """LCS length of a prepared pattern and a text.
+
+    work must hold pm.words words; it is only used for long patterns.
+    """
+    if pm.length == 0 or len_text == 0:
+        return 0
+    if pm.words == 1:
+        return lcs_single_word(pm, text, len_text)
+    return lcs_block(pm, text, len_text, work)
+
+
+cdef Py_ssize_t lcs_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                         Py_UCS4* string2, Py_ssize_t len_str2,
+                         unsigned char* mem) noexcept nogil:
+    """LCS length of two strings, using the shorter one as the pattern. mem
+    must hold lcs_bytes(len_str1, len_str2) bytes."""
+    cdef PatternMatchVector pm
+    if len_str1 > len_str2:
+        string1, string2 = string2, string1
+        len_str1, len_str2 = len_str2, len_str1
+    if len_str1 == 0:
+        return 0
+    pattern_init(&pm, string1, len_str1,
+                 mem + pattern_words(len_str1) * sizeof(uint64_t))
+    return lcs_length(&pm, string2, len_str2, <uint64_t*>mem)
+
+
+def indel_ratio(unicode string1, unicode string2):
+    """Computes the normalized indel similarity 2 * LCS / (len1 + len2) of two
+    strings.
+
+    Args:
+        string1,string2 (unicode): Input strings.
+
+    Returns:
+        Indel similarity (float), 1.0 if both strings are empty.
+    """
+    cdef Py_ssize_t len_str1 = len(string1)
+    cdef Py_ssize_t len_str2 = len(string2)
+    cdef Py_ssize_t lcs = 0, nbytes = 0
+    cdef uint64_t stack_mem[STACK_WORDS]
+    cdef unsigned char[::1] mem
+    cdef unsigned char* work
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
+
+    if len_str1 == 0 or len_str2 == 0:
+        return indel_ratio_from_lcs(0, len_str1, len_str2)
+
+    # the work memory and both strings share one block
+    nbytes = lcs_bytes(len_str1, len_str2)
+    nbytes = (nbytes + 7) // 8 * 8
+    scratch = None
+    if nbytes + (len_str1 + len_str2) * sizeof(Py_UCS4) <= sizeof(stack_mem):
+        work = <unsigned char*>stack_mem
+    else:
+        scratch = acquire_scratch(nbytes + (len_str1 + len_str2) * sizeof(Py_UCS4))
+        mem = scratch
+        work = &mem[0]
+    try:
+        buf1 = <Py_UCS4*>(work + nbytes)
+        buf2 = buf1 + len_str1
+        copy_ucs4(string1, buf1)
+        copy_ucs4(string2, buf2)
+        with nogil:
+            lcs = lcs_pair(buf1, len_str1, buf2, len_str2, work)
+    finally:
+        if scratch is not None:
+            release_scratch(scratch)
+    return indel_ratio_from_lcs(lcs, len_str1, len_str2)
+
+
+cdef inline Py_ssize_t partial_lcs_bytes(Py_ssize_t len_pattern, Py_ssize_t len_text) noexcept nogil:
+    """Work memory of partial_lcs, a multiple of 8."""
+    return (lcs_bytes(len_pattern, len_pattern) +
+            (len_text + 2 * (len_pattern + 1) + (len_pattern + 2) +
+             2 * (len_text - len_pattern + 1)) * sizeof(Py_ssize_t))
+
+
+cdef Py_ssize_t partial_lcs(Py_UCS4* pattern, Py_ssize_t len_pattern,
+                            Py_UCS4* text, Py_ssize_t len_text,
+                            Py_ssize_t min_lcs, unsigned char* mem) noexcept nogil:
+    """Largest LCS of a pattern and a substring of the text of the same
+    length (0 < len_pattern <= len_text).
+
+    The windows of the text are slid over with a character histogram, which
+    gives for every window the bound sum_c min(count in pattern, count in
+    window) on its LCS. Windows are then verified with the LCS kernel in
+    decreasing order of their bound, until the bound can no longer beat the
+    best LCS so far or reach min_lcs. Returns -1 if no window reaches
+    min_lcs. mem must hold partial_lcs_bytes(len_pattern, len_text) bytes.
+    """
+    cdef PatternMatchVector pm
+    cdef Py_ssize_t words = pattern_words(len_pattern)
+    cdef Py_ssize_t num_windows = len_text - len_pattern + 1
+    cdef uint64_t* work = <uint64_t*>mem
+    cdef Py_ssize_t* text_ids
+    cdef Py_ssize_t* pattern_counts
+    cdef Py_ssize_t* window_counts
+    cdef Py_ssize_t* buckets
+    cdef Py_ssize_t* bounds
+    cdef Py_ssize_t* order
+    cdef Py_ssize_t i = 0, j = 0, c = 0, bound = 0, best = -1, lcs = 0
+
+    pattern_init(&pm, pattern, len_pattern, mem + words * sizeof(uint64_t))
+    text_ids = <Py_ssize_t*>(mem + lcs_bytes(len_pattern, len_pattern))
+    pattern_counts = text_ids + len_text
+    window_counts = pattern_counts + (len_pattern + 1)
+    buckets = window_counts + (len_pattern + 1)
+    bounds = buckets + (len_pattern + 2)
+    order = bounds + num_windows
+
+    # characters are numbered by their row in the peq table, 0 for the
+    # characters that are not in the pattern and never add to the bound
+    for i from 0 <= i < len_pattern + 1:
+        pattern_counts[i] = 0
+        window_counts[i] = 0
+    for i from 0 <= i < len_pattern:
+        pattern_counts[pm.ids[pattern_slot(&pm, pattern[i])]] += 1
+    pattern_counts[0] = 0
+    for j from 0 <= j < len_text:
+        text_ids[j] = pm.ids[pattern_slot(&pm, text[j])]
+
+    for j from 0 <= j < len_text:
+        c = text_ids[j]
+        if c != 0:
+            window_counts[c] += 1
+            if window_counts[c] <= pattern_counts[c]:
+                bound += 1
+        if j >= len_pattern:
+            c = text_ids[j - len_pattern]
+            if c != 0:
+                if window_counts[c] <= pattern_counts[c]:
+                    bound -= 1
+                window_counts[c] -= 1
+        if j >= len_pattern - 1:
+            bounds[j - len_pattern + 1] = bound
+
+    # counting sort of the windows by decreasing bound
+    for i from 0 <= i < len_pattern + 2:
+        buckets[i] = 0
+    for i from 0 <= i < num_windows:
+        buckets[len_pattern - bounds[i] + 1] += 1
+    for i from 1 <= i < len_pattern + 2:
+        buckets[i] += buckets[i - 1]
+    for i from 0 <= i < num_windows:
+        order[buckets[len_pattern - bounds[i]]] = i
+        buckets[len_pattern - bounds[i]] += 1
+
+    for i from 0 <= i < num_windows:
+        bound = bounds[order[i]]
+        if bound < min_lcs or bound <= best:
+            break
+        lcs = lcs_length(&pm, text + order[i], len_pattern, work)
+        if lcs > best:
+            best = lcs
+            if best == len_pattern:
+                break
+    return best if best >= min_lcs else -1
+
+
+def partial_indel_lcs(unicode pattern, unicode text, Py_ssize_t min_lcs):
+    """Computes the largest LCS of a pattern and a substring of the text of
+    the same length, skipping the windows whose histogram bound is below
+    min_lcs.
+
+    Args:
+        pattern (unicode): Shorter input string (not empty).
+        text (unicode): Longer input string.
+        min_lcs (int): Smallest LCS of interest.
+
+    Returns:
+        Largest LCS (int), or -1 if no window reaches min_lcs.
+    """
+    cdef Py_ssize_t len_pattern = len(pattern), len_text = len(text)
+    cdef Py_ssize_t nbytes = partial_lcs_bytes(len_pattern, len_text)
+    cdef Py_ssize_t best = -1
+    cdef unsigned char[::1] mem
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
+
+    scratch = acquire_scratch(nbytes + (len_pattern + len_text) * sizeof(Py_UCS4))
+    mem = scratch
+    try:
+        buf1 = <Py_UCS4*>(&mem[0] + nbytes)
+        buf2 = buf1 + len_pattern
+        copy_ucs4(pattern, buf1)
+        copy_ucs4(text, buf2)
+        with nogil:
+            best = partial_lcs(buf1, len_pattern, buf2, len_text, min_lcs, &mem[0])
+    finally:
+        release_scratch(scratch)
+    return best
+
+
+cdef double prefix_indel_ratio(PatternMatchVector* pm, Py_UCS4* text,
+                               Py_ssize_t len_text, uint64_t* s) noexcept nogil:
+    """Largest indel similarity 2 * LCS / (len_pattern + w) of the pattern
+    and the prefixes text[:w], 0 < w <= len_text, in one pass of the LCS
+    kernel over the text. s must hold pm.words words."""
+    cdef Py_ssize_t words = pm.words, w = 0, j = 0, lcs = 0
+    cdef uint64_t* peq
+    cdef uint64_t u, x, carry
+    cdef uint64_t last_mask = ~(<uint64_t>0)
+    cdef double ratio = 0.0, best = 0.0
+
+    if pm.length % 64 != 0:
+        last_mask = (<uint64_t>1 << (pm.length % 64)) - 1
+    for w from 0 <= w < words:
+        s[w] = ~(<uint64_t>0)
+
+    for j from 0 <= j < len_text:
+        peq = pattern_get(pm, text[j])
+        carry = 0
+        for w from 0 <= w < words:
+            u = s[w] & peq[w]
+            x = s[w] + carry
+            carry = x < carry
+            x = x + u
+            carry |= x < u
+            s[w] = x | (s[w] - u)
+        lcs = 0
+        for w from 0 <= w < words - 1:
+            lcs += popcount64(~s[w])
+        lcs += popcount64(~s[words - 1] & last_mask)
+        ratio = 2.0 * lcs / (pm.length + j + 1)
+        if ratio > best:
+            best = ratio
+    return best
+
+
+def edge_indel_ratio(unicode pattern, unicode text):
+    """Computes the largest indel similarity of a pattern and the windows
+    that stick out of either end of the text, that is the prefixes and
+    suffixes of the text shorter than the pattern.
+
+    The suffixes are scored as prefixes of the reversed text against the
+    reversed pattern, which has the same LCS.
+
+    Args:
+        pattern (unicode): Shorter input string (not empty).
+        text (unicode): Longer input string.
+
+    Returns:
+        Largest indel similarity (float), 0.0 if the pattern has a single
+        character.
+    """
+    cdef Py_ssize_t len_pattern = len(pattern), len_text = len(text)
+    cdef Py_ssize_t len_edge = len_pattern - 1
+    cdef Py_ssize_t words = pattern_words(len_pattern)
+    cdef Py_ssize_t nbytes = (lcs_bytes(len_pattern, len_pattern) + 7) // 8 * 8
+    cdef PatternMatchVector pm
+    cdef double best = 0.0, ratio = 0.0
+    cdef unsigned char[::1] mem
+    cdef unsigned char* work
+    cdef Py_UCS4* buf_pattern
+    cdef Py_UCS4* buf_text
+
+    if len_edge == 0:
+        return 0.0
+
+    scratch = acquire_scratch(nbytes + (len_pattern + len_edge) * sizeof(Py_UCS4))
+    mem = scratch
+    try:
+        work = &mem[0]
+        buf_pattern = <Py_UCS4*>(work + nbytes)
+        buf_text = buf_pattern + len_pattern
+        for edge_pattern, edge_text in ((pattern, text[:len_edge]),
+                                        (pattern[::-1], text[len_text - len_edge:][::-1])):
+            copy_ucs4(edge_pattern, buf_pattern)
+            copy_ucs4(edge_text, buf_text)
+            with nogil:
+                pattern_init(&pm, buf_pattern, len_pattern, work + words * sizeof(uint64_t))
+                ratio = prefix_indel_ratio(&pm, buf_text, len_edge, <uint64_t*>work)
+            if ratio > best:
+                best = ratio
+    finally:
+        release_scratch(scratch)
+    return best
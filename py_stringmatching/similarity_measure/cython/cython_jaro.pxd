@@ -0,0 +1,39 @@
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_words, pattern_bytes
+
+cdef double jaro_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                        Py_UCS4* string2, Py_ssize_t len_str2,
+                        unsigned char* flags) noexcept nogil
+
+cdef double jaro_pattern_kernel(PatternMatchVector* pm, Py_UCS4* pattern,
+                                Py_UCS4* text, Py_ssize_t len_text) noexcept nogil
+
+cdef double jaro_block_kernel(PatternMatchVector* pm, Py_UCS4* pattern,
+                              Py_UCS4* text, Py_ssize_t len_text,
+                              uint64_t* flags, Py_UCS4* matched) noexcept nogil
+
+cdef double jaro_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                      Py_UCS4* string2, Py_ssize_t len_str2,
+                      unsigned char* mem) noexcept nogil
+
+
+cdef inline Py_ssize_t jaro_bytes(Py_ssize_t len_str1, Py_ssize_t len_str2) noexcept nogil:
+    """Work memory jaro_pair needs for two strings of these lengths (a
+    multiple of 8, zero when the shorter string has at most 64 characters)."""
+    cdef Py_ssize_t length = len_str1 if len_str1 < len_str2 else len_str2
+    if length <= 64:
+        return 0
+    return (pattern_bytes(length) + pattern_words(length) * sizeof(uint64_t) +
+            length * sizeof(Py_UCS4) + 7) // 8 * 8
+
+
+cdef inline double jaro_upper_bound(Py_ssize_t len_str1, Py_ssize_t len_str2) noexcept nogil:
+    """Largest Jaro score two strings of these lengths can have: every
+    character of the shorter string matched, without transpositions. Uses
+    the same arithmetic as the kernels, so it is never below the score."""
+    cdef Py_ssize_t common_chars = len_str1 if len_str1 < len_str2 else len_str2
+    if common_chars == 0:
+        return 0
+    return (<double>common_chars / len_str1 + <double>common_chars / len_str2 +
+            <double>common_chars / common_chars) / 3
@@ -1,31 +1,92 @@
+# cython: boundscheck=False, wraparound=False
 
-from py_stringmatching.similarity_measure.cython.cython_utils import int_max_two
 import numpy as np
 cimport numpy as np
+from cython.parallel cimport prange, threadid
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport malloc, free
+from libc.string cimport memset
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_get, pattern_bytes, pattern_init
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+
+
+# Work memory of small calls lives on the stack; larger calls use the
+# per-thread scratch buffer.
+cdef enum:
+    STACK_WORDS = 512
 
 
 #Cython functions to compute the Jaro score
-def jaro(unicode string1, unicode string2):
+def jaro(unicode string1, unicode string2, double score_cutoff=0):
     """Computes the Jaro score between two strings.
         Args:
             string1,string2 (str): Input strings.
+            score_cutoff (float): Scores below this value are returned as 0.
         Returns:
             Jaro distance score (float).
     """
+    cdef Py_ssize_t len_str1 = len(string1), len_str2 = len(string2)
+    cdef Py_ssize_t work_bytes = 0, nbytes = 0
+    cdef double score = 0.0
+    cdef uint64_t stack_mem[STACK_WORDS]
+    cdef unsigned char[::1] mem
+    cdef unsigned char* work
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
 
+    if len_str1 == 0 or len_str2 == 0:
+        return 0.0
 
-    cdef int len_str1 = len(string1), len_str2 = len(string2)
-    cdef int max_len = int_max_two(len_str1, len_str2)
-    cdef int search_range = (max_len // 2) - 1
+    # pairs whose lengths are too far apart are rejected without a scan
+    if score_cutoff > 0 and jaro_upper_bound(len_str1, len_str2) < score_cutoff:
+        return 0.0
 
-    if search_range < 0:
-        search_range = 0
+    # the kernel work memory (none for short strings) is followed by both
+    # strings
+    work_bytes = jaro_bytes(len_str1, len_str2)
+    nbytes = work_bytes + (len_str1 + len_str2) * sizeof(Py_UCS4)
+    scratch = None
+    if nbytes <= sizeof(stack_mem):
+        work = <unsigned char*>stack_mem
+    else:
+        scratch = acquire_scratch(nbytes)
+        mem = scratch
+        work = &mem[0]
+    try:
+        buf1 = <Py_UCS4*>(work + work_bytes)
+        buf2 = buf1 + len_str1
+        copy_ucs4(string1, buf1)
+        copy_ucs4(string2, buf2)
+        with nogil:
+            score = jaro_pair(buf1, len_str1, buf2, len_str2, work)
+    finally:
+        if scratch is not None:
+            release_scratch(scratch)
+    return score if score >= score_cutoff else 0.0
 
-    # populating numpy arrays of length as each string with zeros
-    cdef int[:] flags_s1 = np.zeros(len_str1, dtype=np.int32)
-    cdef int[:] flags_s2 = np.zeros(len_str2, dtype=np.int32)
 
-    cdef int common_chars = 0, low = 0, high = 0, i = 0, j = 0
+cdef double jaro_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                        Py_UCS4* string2, Py_ssize_t len_str2,
+                        unsigned char* flags) noexcept nogil:
+    """Computes the Jaro score between two arrays of code points.
+
+    flags must hold len_str1 + len_str2 bytes. Returns 0 if one of the
+    strings is empty.
+    """
+    cdef Py_ssize_t max_len = len_str1 if len_str1 > len_str2 else len_str2
+    cdef Py_ssize_t search_range = (max_len // 2) - 1
+    cdef Py_ssize_t common_chars = 0, trans_count = 0, low = 0, high = 0
+    cdef Py_ssize_t i = 0, j = 0, k = 0
+    cdef unsigned char* flags_s1 = flags
+    cdef unsigned char* flags_s2 = flags + len_str1
+
+    if len_str1 == 0 or len_str2 == 0:
+        return 0.0
+    if search_range < 0:
+        search_range = 0
+    memset(flags, 0, len_str1 + len_str2)
 
     # Finding the number of common characters in two strings
     for i from 0 <= i < len_str1:
@@ -38,9 +99,7 @@ def jaro(unicode string1, unicode string2):
                 break
 
     if common_chars == 0:
-        return 0
-
-    cdef int trans_count = 0, k = 0
+        return 0.0
 
     # Finding the number of transpositions and Jaro distance
     for i from 0 <= i < len_str1:
@@ -51,11 +110,239 @@ def jaro(unicode string1, unicode string2):
                     break
             if string1[i] != string2[j]:
                 trans_count += 1
-    trans_count /= 2
-    cdef float score = (float(common_chars) / len_str1 + float(common_chars) / len_str2 +
-                         (float(common_chars) - trans_count) / float(common_chars)) / 3
-    return score
+    trans_count = trans_count // 2
+    return (<double>common_chars / len_str1 + <double>common_chars / len_str2 +
+            <double>(common_chars - trans_count) / common_chars) / 3
+
+
+cdef double jaro_pattern_kernel(PatternMatchVector* pm, Py_UCS4* pattern,
+                                Py_UCS4* text, Py_ssize_t len_text) noexcept nogil:
+    """Computes the Jaro score between a prepared pattern and a text.
+
+    Bit-parallel variant for patterns of at most 64 characters: the common
+    characters are found by masking the peq vector of each text character
+    with the matching window and the still unmatched pattern positions, so
+    no flag arrays are needed. Gives the same result as jaro_kernel.
+    """
+    cdef Py_ssize_t len_str1 = pm.length
+    cdef Py_ssize_t max_len = len_str1 if len_str1 > len_text else len_text
+    cdef Py_ssize_t search_range = (max_len // 2) - 1
+    cdef Py_ssize_t common_chars = 0, trans_count = 0, low = 0, high = 0
+    cdef Py_ssize_t i = 0, j = 0
+    cdef uint64_t all_ones = ~(<uint64_t>0)
+    cdef uint64_t flags_s1 = 0, candidates
+    cdef Py_UCS4 matched[64]
+
+    if len_str1 == 0 or len_text == 0:
+        return 0.0
+    if search_range < 0:
+        search_range = 0
+
+    # Finding the common characters, in the order of the text
+    for j in range(len_text):
+        if j - search_range >= len_str1:
+            break
+        low = j - search_range if j > search_range else 0
+        high = j + search_range if j + search_range < len_str1 else len_str1 - 1
+        candidates = (pattern_get(pm, text[j])[0] & ~flags_s1 &
+                      (all_ones >> (63 - high)) & (all_ones << low))
+        if candidates:
+            # keep the first unmatched pattern position in the window
+            flags_s1 |= candidates & (~candidates + 1)
+            matched[common_chars] = text[j]
+            common_chars += 1
+
+    if common_chars == 0:
+        return 0.0
+
+    # Finding the number of transpositions
+    j = 0
+    for i in range(len_str1):
+        if (flags_s1 >> i) & 1:
+            if pattern[i] != matched[j]:
+                trans_count += 1
+            j += 1
+    trans_count = trans_count // 2
+    return (<double>common_chars / len_str1 + <double>common_chars / len_text +
+            <double>(common_chars - trans_count) / common_chars) / 3
+
+
+cdef double jaro_short_kernel(Py_UCS4* pattern, Py_ssize_t len_pattern,
+                              Py_UCS4* text, Py_ssize_t len_text) noexcept nogil:
+    """Computes the Jaro score for patterns of at most 64 characters.
+
+    The match flags of the pattern are kept in a single 64-bit word and the
+    matched text characters in a stack array, so nothing is allocated and
+    no peq masks need to be built.
+    """
+    cdef Py_ssize_t max_len = len_pattern if len_pattern > len_text else len_text
+    cdef Py_ssize_t search_range = (max_len // 2) - 1
+    cdef Py_ssize_t common_chars = 0, trans_count = 0, low = 0, high = 0
+    cdef Py_ssize_t i = 0, j = 0
+    cdef uint64_t flags = 0
+    cdef Py_UCS4 matched[64]
+    cdef Py_UCS4 c
+
+    if len_pattern == 0 or len_text == 0:
+        return 0.0
+    if search_range < 0:
+        search_range = 0
+
+    # Finding the common characters, in the order of the text
+    for j in range(len_text):
+        if j - search_range >= len_pattern:
+            break
+        low = j - search_range if j > search_range else 0
+        high = j + search_range if j + search_range < len_pattern else len_pattern - 1
+        c = text[j]
+        for i from low <= i < (high + 1):
+            if pattern[i] == c and not (flags >> i) & 1:
+                flags |= (<uint64_t>1) << i
+                matched[common_chars] = c
+                common_chars += 1
+                break
+
+    if common_chars == 0:
+        return 0.0
+
+    # Finding the number of transpositions
+    j = 0
+    for i in range(len_pattern):
+        if (flags >> i) & 1:
+            if pattern[i] != matched[j]:
+                trans_count += 1
+            j += 1
+    trans_count = trans_count // 2
+    return (<double>common_chars / len_pattern + <double>common_chars / len_text +
+            <double>(common_chars - trans_count) / common_chars) / 3
+
+
+cdef double jaro_block_kernel(PatternMatchVector* pm, Py_UCS4* pattern,
+                              Py_UCS4* text, Py_ssize_t len_text,
+                              uint64_t* flags, Py_UCS4* matched) noexcept nogil:
+    """Computes the Jaro score between a prepared pattern of any length and
+    a text.
+
+    Blocked variant of jaro_pattern_kernel: only the 64-bit words of the
+    peq vector that overlap the matching window are looked at. flags must
+    hold pm.words words and matched min(pm.length, len_text) code points.
+    """
+    cdef Py_ssize_t len_str1 = pm.length
+    cdef Py_ssize_t max_len = len_str1 if len_str1 > len_text else len_text
+    cdef Py_ssize_t search_range = (max_len // 2) - 1
+    cdef Py_ssize_t common_chars = 0, trans_count = 0, low = 0, high = 0
+    cdef Py_ssize_t i = 0, j = 0, w = 0, low_word = 0, high_word = 0
+    cdef uint64_t all_ones = ~(<uint64_t>0)
+    cdef uint64_t candidates
+    cdef uint64_t* peq
+
+    if len_str1 == 0 or len_text == 0:
+        return 0.0
+    if search_range < 0:
+        search_range = 0
+    memset(flags, 0, pm.words * sizeof(uint64_t))
+
+    # Finding the common characters, in the order of the text
+    for j in range(len_text):
+        if j - search_range >= len_str1:
+            break
+        peq = pattern_get(pm, text[j])
+        if peq == pm.bits:
+            # not in the pattern
+            continue
+        low = j - search_range if j > search_range else 0
+        high = j + search_range if j + search_range < len_str1 else len_str1 - 1
+        low_word = low >> 6
+        high_word = high >> 6
+        for w from low_word <= w < (high_word + 1):
+            candidates = peq[w] & ~flags[w]
+            if w == low_word:
+                candidates &= all_ones << (low & 63)
+            if w == high_word:
+                candidates &= all_ones >> (63 - (high & 63))
+            if candidates:
+                # keep the first unmatched pattern position in the window
+                flags[w] |= candidates & (~candidates + 1)
+                matched[common_chars] = text[j]
+                common_chars += 1
+                break
+
+    if common_chars == 0:
+        return 0.0
+
+    # Finding the number of transpositions
+    j = 0
+    for i in range(len_str1):
+        if (flags[i >> 6] >> (i & 63)) & 1:
+            if pattern[i] != matched[j]:
+                trans_count += 1
+            j += 1
+    trans_count = trans_count // 2
+    return (<double>common_chars / len_str1 + <double>common_chars / len_text +
+            <double>(common_chars - trans_count) / common_chars) / 3
+
+
+cdef double jaro_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                      Py_UCS4* string2, Py_ssize_t len_str2,
+                      unsigned char* mem) noexcept nogil:
+    """Computes the Jaro score between two arrays of code points.
+
+    The shorter string is used as the pattern. If it has at most 64
+    characters the bitset kernel is used and mem is not touched; otherwise
+    the blocked bit-parallel kernel runs in mem, which must hold
+    jaro_bytes(len_str1, len_str2) bytes (8-byte aligned).
+    """
+    cdef PatternMatchVector pm
+    cdef uint64_t* flags
+    if len_str1 > len_str2:
+        string1, string2 = string2, string1
+        len_str1, len_str2 = len_str2, len_str1
+    if len_str1 <= 64:
+        return jaro_short_kernel(string1, len_str1, string2, len_str2)
+    pattern_init(&pm, string1, len_str1, mem)
+    flags = <uint64_t*>(mem + pattern_bytes(len_str1))
+    return jaro_block_kernel(&pm, string1, string2, len_str2, flags,
+                             <Py_UCS4*>(flags + pm.words))
+
+
+def jaro_batch(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+               const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+               int num_threads):
+    """Computes the Jaro scores of many pairs of packed strings.
+
+    The strings are packed with cython_utils.pack_strings; pair i is made of
+    the i-th string of each side. The loop runs without the GIL and is
+    spread over num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Jaro scores (numpy float64 array).
+    """
+    cdef Py_ssize_t n = offsets1.shape[0] - 1, i = 0, nbytes = 8
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef unsigned char* block
 
+    for i in range(n):
+        if jaro_bytes(offsets1[i + 1] - offsets1[i], offsets2[i + 1] - offsets2[i]) > nbytes:
+            nbytes = jaro_bytes(offsets1[i + 1] - offsets1[i], offsets2[i + 1] - offsets2[i])
 
+    scores = np.zeros(n, dtype=np.float64)
+    cdef double[::1] score_view = scores
 
+    # one work buffer per thread, only used by strings longer than 64
+    block = <unsigned char*>malloc(num_threads * nbytes)
+    if block == NULL:
+        raise MemoryError()
 
+    try:
+        for i in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+            score_view[i] = jaro_pair(base1 + offsets1[i], offsets1[i + 1] - offsets1[i],
+                                      base2 + offsets2[i], offsets2[i + 1] - offsets2[i],
+                                      block + threadid() * nbytes)
+    finally:
+        free(block)
+    return scores
@@ -0,0 +1,11 @@
+cdef double jaro_winkler_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                                Py_UCS4* string2, Py_ssize_t len_str2,
+                                double prefix_weight, unsigned char* flags) noexcept nogil
+
+cdef double jaro_winkler_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                              Py_UCS4* string2, Py_ssize_t len_str2,
+                              double prefix_weight, unsigned char* mem) noexcept nogil
+
+cdef double jaro_winkler_upper_bound(Py_UCS4* string1, Py_ssize_t len_str1,
+                                     Py_UCS4* string2, Py_ssize_t len_str2,
+                                     double prefix_weight) noexcept nogil
@@ -1,25 +1,250 @@
+# cython: boundscheck=False, wraparound=False
 
-from py_stringmatching.similarity_measure.cython.cython_utils import int_min_two
-from py_stringmatching.similarity_measure.cython.cython_jaro import jaro
+from py_stringmatching.similarity_measure.cython.cython_jaro cimport jaro_kernel, \
+    jaro_pattern_kernel, jaro_block_kernel, jaro_pair, jaro_bytes, jaro_upper_bound
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_words, pattern_bytes, pattern_init
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+import numpy as np
+from cython.parallel cimport prange, threadid
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport malloc, free
 
 
-def jaro_winkler(unicode string1, unicode string2, float prefix_weight):
+# Work memory of small calls lives on the stack; larger calls use the
+# per-thread scratch buffer.
+cdef enum:
+    STACK_WORDS = 512
+
+
+def jaro_winkler(unicode string1, unicode string2, double prefix_weight,
+                 double score_cutoff=0):
     """Function to find the Jaro Winkler distance between two strings.
     Args:
         string1,string2 (unicode), prefix_weight (float): Input strings and prefix weight.
+        score_cutoff (float): Scores below this value are returned as 0.
     Returns:
         Jaro Winkler distance score (float)
     """
-    cdef int i = 0
-    cdef float jw_score = jaro(string1, string2)
-    cdef int min_len = int_min_two(len(string1), len(string2))
-    cdef int j = int_min_two(min_len, 4)
+    cdef Py_ssize_t len_str1 = len(string1), len_str2 = len(string2)
+    cdef Py_ssize_t work_bytes = 0, nbytes = 0
+    cdef double jw_score = 0.0
+    cdef uint64_t stack_mem[STACK_WORDS]
+    cdef unsigned char[::1] mem
+    cdef unsigned char* work
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
+    cdef Py_UCS4 head1[4]
+    cdef Py_UCS4 head2[4]
+    cdef Py_ssize_t i = 0
+
+    if len_str1 == 0 or len_str2 == 0:
+        return 0.0
+
+    # pairs whose lengths are too far apart are rejected without a scan; the
+    # bound only looks at the first 4 characters
+    if score_cutoff > 0:
+        for i in range(len_str1 if len_str1 < 4 else 4):
+            head1[i] = string1[i]
+        for i in range(len_str2 if len_str2 < 4 else 4):
+            head2[i] = string2[i]
+        if jaro_winkler_upper_bound(head1, len_str1, head2, len_str2,
+                                    prefix_weight) < score_cutoff:
+            return 0.0
+
+    # the Jaro work memory (none for short strings) is followed by both
+    # strings
+    work_bytes = jaro_bytes(len_str1, len_str2)
+    nbytes = work_bytes + (len_str1 + len_str2) * sizeof(Py_UCS4)
+    scratch = None
+    if nbytes <= sizeof(stack_mem):
+        work = <unsigned char*>stack_mem
+    else:
+        scratch = acquire_scratch(nbytes)
+        mem = scratch
+        work = &mem[0]
+    try:
+        buf1 = <Py_UCS4*>(work + work_bytes)
+        buf2 = buf1 + len_str1
+        copy_ucs4(string1, buf1)
+        copy_ucs4(string2, buf2)
+        with nogil:
+            jw_score = jaro_winkler_pair(buf1, len_str1, buf2, len_str2,
+                                         prefix_weight, work)
+    finally:
+        if scratch is not None:
+            release_scratch(scratch)
+    return jw_score if jw_score >= score_cutoff else 0.0
+
+
+cdef double jaro_winkler_pair(Py_UCS4* string1, Py_ssize_t len_str1,
+                              Py_UCS4* string2, Py_ssize_t len_str2,
+                              double prefix_weight, unsigned char* mem) noexcept nogil:
+    """Computes the Jaro-Winkler score between two arrays of code points.
+
+    mem must hold jaro_bytes(len_str1, len_str2) bytes, see jaro_pair.
+    """
+    cdef double jw_score = jaro_pair(string1, len_str1, string2, len_str2, mem)
+    return winkler_boost(jw_score, string1, len_str1, string2, len_str2, prefix_weight)
+
+
+cdef double jaro_winkler_kernel(Py_UCS4* string1, Py_ssize_t len_str1,
+                                Py_UCS4* string2, Py_ssize_t len_str2,
+                                double prefix_weight, unsigned char* flags) noexcept nogil:
+    """Computes the Jaro-Winkler score between two arrays of code points.
+
+    flags must hold len_str1 + len_str2 bytes.
+    """
+    cdef double jw_score = jaro_kernel(string1, len_str1, string2, len_str2, flags)
+    return winkler_boost(jw_score, string1, len_str1, string2, len_str2, prefix_weight)
+
+
+cdef double jaro_winkler_upper_bound(Py_UCS4* string1, Py_ssize_t len_str1,
+                                     Py_UCS4* string2, Py_ssize_t len_str2,
+                                     double prefix_weight) noexcept nogil:
+    """Largest Jaro-Winkler score two strings can have given their lengths
+    and their actual common prefix. Only the first 4 characters of the
+    strings are read."""
+    cdef double low = winkler_boost(0, string1, len_str1, string2, len_str2, prefix_weight)
+    cdef double high = winkler_boost(jaro_upper_bound(len_str1, len_str2), string1, len_str1,
+                                     string2, len_str2, prefix_weight)
+    # the boost is linear in the Jaro score
+    return high if high > low else low
+
+
+cdef inline double winkler_boost(double jw_score, Py_UCS4* string1, Py_ssize_t len_str1,
+                                 Py_UCS4* string2, Py_ssize_t len_str2,
+                                 double prefix_weight) noexcept nogil:
+    """Adds the common prefix (at most 4 characters) boost to a Jaro score."""
+    cdef Py_ssize_t min_len = len_str1 if len_str1 < len_str2 else len_str2
+    cdef Py_ssize_t j = min_len if min_len < 4 else 4
+    cdef Py_ssize_t i = 0
 
-    #Finding the Jaro Winkler distance between two strings
     while i < j and string1[i] == string2[i]:
         i += 1
     if i != 0:
         jw_score += i * prefix_weight * (1 - jw_score)
-
     return jw_score
 
+
+def jaro_winkler_batch(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                       const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                       double prefix_weight, int num_threads):
+    """Computes the Jaro-Winkler scores of many pairs of packed strings.
+
+    The strings are packed with cython_utils.pack_strings; pair i is made of
+    the i-th string of each side. The loop runs without the GIL and is
+    spread over num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        prefix_weight (float): Weight to give to the prefix.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Jaro-Winkler scores (numpy float64 array).
+    """
+    cdef Py_ssize_t n = offsets1.shape[0] - 1, i = 0, nbytes = 8
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef unsigned char* block
+
+    for i in range(n):
+        if jaro_bytes(offsets1[i + 1] - offsets1[i], offsets2[i + 1] - offsets2[i]) > nbytes:
+            nbytes = jaro_bytes(offsets1[i + 1] - offsets1[i], offsets2[i + 1] - offsets2[i])
+
+    scores = np.zeros(n, dtype=np.float64)
+    cdef double[::1] score_view = scores
+
+    # one work buffer per thread, only used by strings longer than 64
+    block = <unsigned char*>malloc(num_threads * nbytes)
+    if block == NULL:
+        raise MemoryError()
+
+    try:
+        for i in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+            score_view[i] = jaro_winkler_pair(base1 + offsets1[i], offsets1[i + 1] - offsets1[i],
+                                              base2 + offsets2[i], offsets2[i + 1] - offsets2[i],
+                                              prefix_weight, block + threadid() * nbytes)
+    finally:
+        free(block)
+    return scores
+
+
+def jaro_winkler_matrix(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                        const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                        double prefix_weight, int num_threads):
+    """Computes the Jaro-Winkler scores between every string of one packed
+    sequence and every string of another.
+
+    Each string of the first sequence is turned once into peq masks and
+    scored against every string of the second sequence with the
+    bit-parallel Jaro kernel (the blocked one for strings longer than 64
+    characters). Rows are spread over num_threads threads when built with
+    OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        prefix_weight (float): Weight to give to the prefix.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        len1 x len2 matrix of Jaro-Winkler scores (numpy float64 array).
+    """
+    cdef Py_ssize_t n1 = offsets1.shape[0] - 1, n2 = offsets2.shape[0] - 1
+    cdef Py_ssize_t i = 0, j = 0, len_str1, len_str2, max_len1 = 0, max_len2 = 0
+    cdef Py_ssize_t header = (sizeof(PatternMatchVector) + 7) // 8 * 8
+    cdef Py_ssize_t nbytes, pm_bytes, words
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef Py_UCS4* string1
+    cdef Py_UCS4* string2
+    cdef PatternMatchVector* pm
+    cdef unsigned char* block
+    cdef unsigned char* mem
+    cdef uint64_t* flags
+    cdef double jw_score
+
+    for i in range(n1):
+        if offsets1[i + 1] - offsets1[i] > max_len1:
+            max_len1 = offsets1[i + 1] - offsets1[i]
+    for j in range(n2):
+        if offsets2[j + 1] - offsets2[j] > max_len2:
+            max_len2 = offsets2[j + 1] - offsets2[j]
+
+    # per thread: the pattern header and peq masks, followed by the flags
+    # and matched characters of the blocked kernel
+    pm_bytes = pattern_bytes(max_len1)
+    words = pattern_words(max_len1)
+    nbytes = (header + pm_bytes + words * sizeof(uint64_t) +
+              max_len1 * sizeof(Py_UCS4) + 7) // 8 * 8
+
+    scores = np.zeros((n1, n2), dtype=np.float64)
+    cdef double[:, ::1] score_view = scores
+
+    block = <unsigned char*>malloc(num_threads * nbytes)
+    if block == NULL:
+        raise MemoryError()
+
+    try:
+        for i in prange(n1, nogil=True, num_threads=num_threads, schedule='guided'):
+            mem = block + threadid() * nbytes
+            pm = <PatternMatchVector*>mem
+            flags = <uint64_t*>(mem + header + pm_bytes)
+            string1 = base1 + offsets1[i]
+            len_str1 = offsets1[i + 1] - offsets1[i]
+            pattern_init(pm, string1, len_str1, mem + header)
+            for j in range(n2):
+                string2 = base2 + offsets2[j]
+                len_str2 = offsets2[j + 1] - offsets2[j]
+                if len_str1 <= 64:
+                    jw_score = jaro_pattern_kernel(pm, string1, string2, len_str2)
+                else:
+                    jw_score = jaro_block_kernel(pm, string1, string2, len_str2,
+                                                 flags, <Py_UCS4*>(flags + words))
+                score_view[i, j] = winkler_boost(jw_score, string1, len_str1,
+                                                 string2, len_str2, prefix_weight)
+    finally:
+        free(block)
+    return scores
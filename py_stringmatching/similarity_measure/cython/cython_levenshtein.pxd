@@ -0,0 +1,20 @@
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_words, pattern_bytes
+
+cdef Py_ssize_t myers_distance(PatternMatchVector* pm, Py_UCS4* text,
+                               Py_ssize_t len_text, uint64_t* work) noexcept nogil
+
+cdef Py_ssize_t pair_distance(Py_UCS4* string1, Py_ssize_t len_str1,
+                              Py_UCS4* string2, Py_ssize_t len_str2,
+                              unsigned char* mem) noexcept nogil
+
+cdef Py_ssize_t banded_distance(Py_UCS4* string1, Py_ssize_t len_str1,
+                                Py_UCS4* string2, Py_ssize_t len_str2,
+                                Py_ssize_t max_distance, Py_ssize_t* row) noexcept nogil
+
+
+cdef inline Py_ssize_t pair_bytes(Py_ssize_t len_str1, Py_ssize_t len_str2) noexcept nogil:
+    """Work memory pair_distance needs for two strings of these lengths."""
+    cdef Py_ssize_t length = len_str1 if len_str1 < len_str2 else len_str2
+    return 2 * pattern_words(length) * sizeof(uint64_t) + pattern_bytes(length)
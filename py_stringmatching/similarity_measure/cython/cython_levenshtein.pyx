@@ -2,55 +2,435 @@
 
 from __future__ import division
 import cython
+from cython.parallel cimport prange, threadid
 import numpy as np
-cimport numpy as np
-from py_stringmatching.similarity_measure.cython.cython_utils import int_min_three
-from numpy import int32
-from numpy cimport int32_t
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+from py_stringmatching.similarity_measure.cython.cython_pattern cimport PatternMatchVector, \
+    pattern_get, pattern_words, pattern_bytes, pattern_init
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport copy_ucs4
 
-DTYPE = np.int
-ctypedef np.int_t DTYPE_t
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
+# Bit-parallel Levenshtein distance (Myers 1999, Hyyrö 2003).
+#
+# The shorter string is the "pattern", whose peq vectors are built by
+# cython_pattern. The DP matrix is then never stored: each column of the
+# matrix is encoded as two bit-vectors of vertical deltas (VP/VN) and a
+# whole column is advanced with a handful of word operations per 64
+# pattern characters.
 
+# Work memory of small calls lives on the stack; larger calls use the
+# per-thread scratch buffer.
+cdef enum:
+    STACK_WORDS = 512
+
+
+cdef Py_ssize_t myers_single_word(PatternMatchVector* pm, Py_UCS4* text,
+                                  Py_ssize_t len_text) noexcept nogil:
+    """Levenshtein distance for patterns of at most 64 characters."""
+    cdef uint64_t vp = ~(<uint64_t>0), vn = 0
+    cdef uint64_t peq, d0, hp, hn
+    cdef uint64_t last = (<uint64_t>1) << (pm.length - 1)
+    cdef Py_ssize_t dist = pm.length, j = 0
+
+    for j from 0 <= j < len_text:
+        peq = pattern_get(pm, text[j])[0]
+        d0 = (((peq & vp) + vp) ^ vp) | peq | vn
+        hp = vn | ~(d0 | vp)
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+        hp = (hp << 1) | 1
+        hn = hn << 1
+        vp = hn | ~(d0 | hp)
+        vn = hp & d0
+    return dist
+
+
+cdef Py_ssize_t myers_block(PatternMatchVector* pm, Py_UCS4* text,
+                            Py_ssize_t len_text, uint64_t* work) noexcept nogil:
+    """Levenshtein distance for patterns longer than 64 characters.
+
+    The pattern is split into blocks of 64 characters and the horizontal
+    deltas are carried from one block into the next. work must hold
+    2 * pm.words words.
+    """
+    cdef Py_ssize_t words = pm.words, w = 0, j = 0
+    cdef Py_ssize_t dist = pm.length
+    cdef uint64_t last = (<uint64_t>1) << ((pm.length - 1) % 64)
+    cdef uint64_t* vp = work
+    cdef uint64_t* vn = work + words
+    cdef uint64_t* peq
+    cdef uint64_t x, d0, hp, hn, hp_carry, hn_carry, hp_out, hn_out
+
+    for w from 0 <= w < words:
+        vp[w] = ~(<uint64_t>0)
+        vn[w] = 0
+
+    for j from 0 <= j < len_text:
+        peq = pattern_get(pm, text[j])
+        hp_carry = 1
+        hn_carry = 0
+        for w from 0 <= w < words:
+            x = peq[w] | hn_carry
+            d0 = (((x & vp[w]) + vp[w]) ^ vp[w]) | x | vn[w]
+            hp = vn[w] | ~(d0 | vp[w])
+            hn = d0 & vp[w]
+            if w < words - 1:
+                hp_out = hp >> 63
+                hn_out = hn >> 63
+            else:
+                hp_out = 1 if hp & last else 0
+                hn_out = 1 if hn & last else 0
+            hp = (hp << 1) | hp_carry
+            hn = (hn << 1) | hn_carry
+            hp_carry = hp_out
+            hn_carry = hn_out
+            vp[w] = hn | ~(d0 | hp)
+            vn[w] = hp & d0
+        dist += <Py_ssize_t>hp_carry - <Py_ssize_t>hn_carry
+
+    return dist
+
+
+cdef Py_ssize_t myers_distance(PatternMatchVector* pm, Py_UCS4* text,
+                               Py_ssize_t len_text, uint64_t* work) noexcept nogil:
+    """Levenshtein distance between a prepared pattern and a text.
+
+    work must hold 2 * pm.words words; it is only used for long patterns.
+    """
+    if pm.length == 0:
+        return len_text
+    if len_text == 0:
+        return pm.length
+    if pm.words == 1:
+        return myers_single_word(pm, text, len_text)
+    return myers_block(pm, text, len_text, work)
+
+
+cdef Py_ssize_t pair_distance(Py_UCS4* string1, Py_ssize_t len_str1,
+                              Py_UCS4* string2, Py_ssize_t len_str2,
+                              unsigned char* mem) noexcept nogil:
+    """Levenshtein distance between two strings, using the shorter one as the
+    pattern. mem must hold pair_bytes(len_str1, len_str2) bytes."""
+    cdef PatternMatchVector pm
+    cdef Py_ssize_t words
+    if len_str1 > len_str2:
+        string1, string2 = string2, string1
+        len_str1, len_str2 = len_str2, len_str1
+    if len_str1 == 0:
+        return len_str2
+    words = pattern_words(len_str1)
+    pattern_init(&pm, string1, len_str1, mem + 2 * words * sizeof(uint64_t))
+    return myers_distance(&pm, string2, len_str2, <uint64_t*>mem)
+
+
+cdef Py_ssize_t banded_distance(Py_UCS4* string1, Py_ssize_t len_str1,
+                                Py_UCS4* string2, Py_ssize_t len_str2,
+                                Py_ssize_t max_distance, Py_ssize_t* row) noexcept nogil:
+    """Levenshtein distance restricted to a diagonal band (Ukkonen).
+
+    string1 must not be longer than string2. Only the cells within
+    max_distance of the main diagonal are computed, using the single rolling
+    row passed in (len_str2 + 1 entries). Returns max_distance + 1 as soon
+    as no cell of the current row can lead to a distance within the bound.
+    """
+    cdef Py_ssize_t k = max_distance, over = max_distance + 1
+    cdef Py_ssize_t i = 0, j = 0, lo = 0, hi = 0
+    cdef Py_ssize_t diag, up, left, value, bound, row_bound
+
+    # skip the common prefix and suffix, they never change the distance
+    while len_str1 > 0 and string1[0] == string2[0]:
+        string1 += 1
+        string2 += 1
+        len_str1 -= 1
+        len_str2 -= 1
+    while len_str1 > 0 and string1[len_str1 - 1] == string2[len_str2 - 1]:
+        len_str1 -= 1
+        len_str2 -= 1
+
+    if len_str2 - len_str1 > k:
+        return over
+    if len_str1 == 0:
+        return len_str2
+
+    for j from 0 <= j < (len_str2 + 1):
+        row[j] = j if j <= k else over
+
+    for i from 1 <= i < (len_str1 + 1):
+        lo = i - k if i > k else 1
+        hi = i + k if i + k < len_str2 else len_str2
+        diag = row[lo - 1]
+        if lo == 1:
+            row[0] = i if i <= k else over
+            left = row[0]
+        else:
+            left = over
+        row_bound = over
+        for j from lo <= j < (hi + 1):
+            up = row[j]
+            value = diag + (0 if string1[i - 1] == string2[j - 1] else 1)
+            if up + 1 < value:
+                value = up + 1
+            if left + 1 < value:
+                value = left + 1
+            if value > over:
+                value = over
+            diag = up
+            row[j] = value
+            left = value
+            # the remaining suffixes differ in length by at least this much
+            bound = (len_str2 - j) - (len_str1 - i)
+            if bound < 0:
+                bound = -bound
+            if value + bound < row_bound:
+                row_bound = value + bound
+        if row_bound > k:
+            return over
+
+    value = row[len_str2]
+    return value if value <= k else over
 
 
 def levenshtein(unicode string1, unicode string2):
+    """Computes the Levenshtein distance between two strings.
 
-    cdef int len_str1 = len(string1)
-    cdef int len_str2 = len(string2)
+    Uses the bit-parallel algorithm of Myers, with the shorter string as the
+    pattern, so that no DP matrix is allocated.
 
-    cdef int ins_cost = 1
-    cdef int del_cost = 1
-    cdef int sub_cost = 1
-    cdef int trans_cost = 1
+    Args:
+        string1,string2 (unicode): Input strings.
 
-    cdef int i = 0
-    cdef int j = 0
+    Returns:
+        Levenshtein distance (int).
+    """
+    cdef Py_ssize_t len_str1 = len(string1)
+    cdef Py_ssize_t len_str2 = len(string2)
+    cdef Py_ssize_t dist = 0, words = 0, pm_bytes = 0, nbytes = 0
+    cdef PatternMatchVector pm
+    cdef uint64_t stack_mem[STACK_WORDS]
+    cdef unsigned char[::1] mem
+    cdef uint64_t* work
+    cdef Py_UCS4* pattern
+    cdef Py_UCS4* text
 
     if len_str1 == 0:
-        return len_str2 * ins_cost
+        return len_str2
 
     if len_str2 == 0:
-        return len_str1 * del_cost
+        return len_str1
 
-    cdef int[:,:] d_mat = np.zeros((len_str1 + 1, len_str2 + 1), dtype=np.int32)
+    # use the shorter string as the pattern
+    if len_str1 > len_str2:
+        string1, string2 = string2, string1
+        len_str1, len_str2 = len_str2, len_str1
 
-    for i from 0 <= i < (len_str1 + 1):
-        d_mat[i, 0] = i * del_cost
+    # the block vectors, the peq masks and both strings share one block of
+    # work memory
+    words = pattern_words(len_str1)
+    pm_bytes = pattern_bytes(len_str1)
+    nbytes = (2 * words * sizeof(uint64_t) + pm_bytes +
+              (len_str1 + len_str2) * sizeof(Py_UCS4))
+    scratch = None
+    if nbytes <= sizeof(stack_mem):
+        work = stack_mem
+    else:
+        scratch = acquire_scratch(nbytes)
+        mem = scratch
+        work = <uint64_t*>&mem[0]
+    try:
+        pattern = <Py_UCS4*>(<unsigned char*>work + 2 * words * sizeof(uint64_t) + pm_bytes)
+        text = pattern + len_str1
+        copy_ucs4(string1, pattern)
+        copy_ucs4(string2, text)
 
-    for j from 0 <= j < (len_str2 + 1):
-        d_mat[0, j] = j * ins_cost
+        with nogil:
+            pattern_init(&pm, pattern, len_str1, <unsigned char*>(work + 2 * words))
+            dist = myers_distance(&pm, text, len_str2, work)
+    finally:
+        if scratch is not None:
+            release_scratch(scratch)
+    return dist
+
+
+def levenshtein_bounded(unicode string1, unicode string2, int max_distance):
+    """Computes the Levenshtein distance between two strings if it is at most
+    max_distance.
+
+    Args:
+        string1,string2 (unicode): Input strings.
+        max_distance (int): Largest distance of interest (non-negative).
+
+    Returns:
+        Levenshtein distance (int), or max_distance + 1 if the distance
+        exceeds max_distance.
+    """
+    cdef Py_ssize_t len_str1 = len(string1)
+    cdef Py_ssize_t len_str2 = len(string2)
+    cdef Py_ssize_t dist = 0, nbytes = 0
+    cdef uint64_t stack_mem[STACK_WORDS]
+    cdef unsigned char[::1] mem
+    cdef Py_ssize_t* row
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
+
+    if len_str1 > len_str2:
+        string1, string2 = string2, string1
+        len_str1, len_str2 = len_str2, len_str1
+
+    if len_str2 - len_str1 > max_distance:
+        return max_distance + 1
+
+    # the bound cannot prune any cell, the bit-parallel kernel is faster
+    if max_distance >= len_str2:
+        return levenshtein(string1, string2)
+
+    nbytes = ((len_str2 + 1) * sizeof(Py_ssize_t) +
+              (len_str1 + len_str2) * sizeof(Py_UCS4))
+    scratch = None
+    if nbytes <= sizeof(stack_mem):
+        row = <Py_ssize_t*>stack_mem
+    else:
+        scratch = acquire_scratch(nbytes)
+        mem = scratch
+        row = <Py_ssize_t*>&mem[0]
+    try:
+        buf1 = <Py_UCS4*>(row + len_str2 + 1)
+        buf2 = buf1 + len_str1
+        copy_ucs4(string1, buf1)
+        copy_ucs4(string2, buf2)
+
+        with nogil:
+            dist = banded_distance(buf1, len_str1, buf2, len_str2, max_distance, row)
+    finally:
+        if scratch is not None:
+            release_scratch(scratch)
+    return dist
+
+
+def levenshtein_batch(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                      const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                      int num_threads, bint normalize):
+    """Computes the Levenshtein distances of many pairs of packed strings.
+
+    The strings are packed with cython_utils.pack_strings; pair i is made of
+    the i-th string of each side. The loop runs without the GIL and is
+    spread over num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        num_threads (int): Number of threads to use.
+        normalize (boolean): If True, return normalized similarities instead
+            of distances.
+
+    Returns:
+        Levenshtein distances (numpy int64 array), or similarities (numpy
+        float64 array) if normalize is True.
+    """
+    cdef Py_ssize_t n = offsets1.shape[0] - 1, i = 0
+    cdef Py_ssize_t len_str1, len_str2, max_len, dist, nbytes = 8
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef unsigned char* block
+    cdef unsigned char* mem
+
+    for i in range(n):
+        len_str1 = offsets1[i + 1] - offsets1[i]
+        len_str2 = offsets2[i + 1] - offsets2[i]
+        if pair_bytes(len_str1, len_str2) > nbytes:
+            nbytes = pair_bytes(len_str1, len_str2)
+    nbytes = (nbytes + 7) // 8 * 8
+
+    distances = np.zeros(n, dtype=np.int64)
+    scores = np.zeros(n, dtype=np.float64)
+    cdef long long[::1] dist_view = distances
+    cdef double[::1] score_view = scores
+
+    # one block of work memory per thread
+    block = <unsigned char*>malloc(num_threads * nbytes)
+    if block == NULL:
+        raise MemoryError()
+
+    try:
+        for i in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+            mem = block + threadid() * nbytes
+            len_str1 = offsets1[i + 1] - offsets1[i]
+            len_str2 = offsets2[i + 1] - offsets2[i]
+            dist = pair_distance(base1 + offsets1[i], len_str1,
+                                 base2 + offsets2[i], len_str2, mem)
+            dist_view[i] = dist
+            max_len = len_str1 if len_str1 > len_str2 else len_str2
+            score_view[i] = 1.0 if max_len == 0 else 1.0 - (<double>dist / max_len)
+    finally:
+        free(block)
+    return scores if normalize else distances
+
+
+def levenshtein_matrix(const unsigned int[::1] codes1, const Py_ssize_t[::1] offsets1,
+                       const unsigned int[::1] codes2, const Py_ssize_t[::1] offsets2,
+                       int num_threads, bint normalize):
+    """Computes the Levenshtein distances between every string of one packed
+    sequence and every string of another.
+
+    The peq masks of each string of the first sequence are built once and run
+    against every string of the second sequence. Rows are spread over
+    num_threads threads when built with OpenMP.
+
+    Args:
+        codes1,offsets1,codes2,offsets2: Packed input strings.
+        num_threads (int): Number of threads to use.
+        normalize (boolean): If True, return normalized similarities instead
+            of distances.
+
+    Returns:
+        len1 x len2 matrix of Levenshtein distances (numpy int64 array), or of
+        similarities (numpy float64 array) if normalize is True.
+    """
+    cdef Py_ssize_t n1 = offsets1.shape[0] - 1, n2 = offsets2.shape[0] - 1
+    cdef Py_ssize_t i = 0, j = 0, len_str1, len_str2, max_len, dist, words
+    cdef Py_ssize_t nbytes = 8
+    cdef Py_UCS4* base1 = <Py_UCS4*>&codes1[0]
+    cdef Py_UCS4* base2 = <Py_UCS4*>&codes2[0]
+    cdef PatternMatchVector* pm
+    cdef uint64_t* work
+    cdef unsigned char* block
+    cdef unsigned char* mem
+
+    # per thread: the pattern header, the block vectors and the peq masks
+    for i in range(n1):
+        len_str1 = offsets1[i + 1] - offsets1[i]
+        if 2 * pattern_words(len_str1) * sizeof(uint64_t) + pattern_bytes(len_str1) > nbytes:
+            nbytes = 2 * pattern_words(len_str1) * sizeof(uint64_t) + pattern_bytes(len_str1)
+    nbytes = (nbytes + sizeof(PatternMatchVector) + 15) // 8 * 8
 
-    cdef unsigned char lchar = 0
-    cdef unsigned char rchar = 0
+    distances = np.zeros((n1, n2), dtype=np.int64)
+    scores = np.zeros((n1, n2), dtype=np.float64)
+    cdef long long[:, ::1] dist_view = distances
+    cdef double[:, ::1] score_view = scores
 
-    for i from 0 <= i < (len_str1):
-        lchar = string1[i]
-        for j from 0 <= j < (len_str2):
-            rchar = string2[j]
+    # one block of work memory per thread
+    block = <unsigned char*>malloc(num_threads * nbytes)
+    if block == NULL:
+        raise MemoryError()
 
-            d_mat[i+1,j+1] = int_min_three(d_mat[i + 1, j] + ins_cost, d_mat[i, j + 1] + del_cost, d_mat[i, j]
-                                        + (sub_cost if lchar != rchar else 0))
-    return d_mat[len_str1, len_str2]
+    try:
+        for i in prange(n1, nogil=True, num_threads=num_threads, schedule='guided'):
+            mem = block + threadid() * nbytes
+            pm = <PatternMatchVector*>mem
+            work = <uint64_t*>(mem + (sizeof(PatternMatchVector) + 7) // 8 * 8)
+            len_str1 = offsets1[i + 1] - offsets1[i]
+            words = pattern_words(len_str1)
+            pattern_init(pm, base1 + offsets1[i], len_str1,
+                         <unsigned char*>(work + 2 * words))
+            for j in range(n2):
+                len_str2 = offsets2[j + 1] - offsets2[j]
+                dist = myers_distance(pm, base2 + offsets2[j], len_str2, work)
+                dist_view[i, j] = dist
+                max_len = len_str1 if len_str1 > len_str2 else len_str2
+                score_view[i, j] = 1.0 if max_len == 0 else 1.0 - (<double>dist / max_len)
+    finally:
+        free(block)
+    return scores if normalize else distances
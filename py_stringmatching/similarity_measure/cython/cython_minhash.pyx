@@ -0,0 +1,112 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from cpython.unicode cimport PyUnicode_AsUTF8AndSize
+from cython.parallel cimport prange
+from libc.stdint cimport uint64_t
+from py_stringmatching.similarity_measure.cython.cython_hashing cimport mix64, hash_bytes
+
+
+# MinHash signatures and LSH band keys.
+#
+# Every token is hashed once to a well mixed 64-bit word h. The i-th of the
+# num_perm hash functions of the signature is a_i * h + b_i modulo 2**64,
+# with a random odd a_i, which permutes the 64-bit words at the cost of one
+# multiply-add. The i-th value of the signature of a set is the minimum of
+# that function over its tokens, and two sets have the same i-th value with
+# a probability close to their Jaccard score.
+
+
+def hash_token_lists(list token_lists):
+    """Hashes the tokens of many token lists.
+
+    Args:
+        token_lists (list): Lists (or sets) of string tokens.
+
+    Returns:
+        CSR arrays indptr (numpy intp array) and hashes (numpy uint64 array),
+        the hashes of the i-th list being hashes[indptr[i]:indptr[i + 1]].
+
+    Raises:
+        TypeError: If a token is not a string.
+    """
+    cdef Py_ssize_t n = len(token_lists), i = 0, p = 0, size = 0
+    cdef const char* data
+    indptr_array = np.zeros(n + 1, dtype=np.intp)
+    cdef Py_ssize_t[::1] indptr = indptr_array
+    for i in range(n):
+        indptr[i + 1] = indptr[i] + len(token_lists[i])
+    hashes_array = np.empty(indptr[n], dtype=np.uint64)
+    cdef uint64_t[::1] hashes = hashes_array
+    for tokens in token_lists:
+        for token in tokens:
+            if not isinstance(token, str):
+                raise TypeError('Tokens are expected to be strings')
+            data = PyUnicode_AsUTF8AndSize(token, &size)
+            hashes[p] = hash_bytes(data, size)
+            p += 1
+    return indptr_array, hashes_array
+
+
+def minhash_signatures(const Py_ssize_t[::1] indptr, const uint64_t[::1] hashes,
+                       const uint64_t[::1] multipliers, const uint64_t[::1] increments,
+                       int num_threads):
+    """Computes the MinHash signatures of sets of token hashes.
+
+    Args:
+        indptr,hashes: Token hashes of the sets, see hash_token_lists.
+        multipliers,increments (numpy uint64 arrays): Parameters of the hash
+            functions, the multipliers must be odd.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Signatures (numpy uint64 array of shape (number of sets, number of
+        hash functions)). The signature of an empty set is all 2**64 - 1.
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1, num_perm = multipliers.shape[0]
+    cdef Py_ssize_t x = 0, i = 0, p = 0
+    cdef uint64_t h = 0, value = 0
+    cdef uint64_t* signature
+    signatures_array = np.full((n, num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    cdef uint64_t[:, ::1] signatures = signatures_array
+    if n == 0 or num_perm == 0:
+        return signatures_array
+
+    for x in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+        signature = &signatures[x, 0]
+        for p in range(indptr[x], indptr[x + 1]):
+            h = hashes[p]
+            for i in range(num_perm):
+                value = multipliers[i] * h + increments[i]
+                if value < signature[i]:
+                    signature[i] = value
+    return signatures_array
+
+
+def band_keys(const uint64_t[:, ::1] signatures, Py_ssize_t bands, Py_ssize_t rows):
+    """Hashes the bands of MinHash signatures.
+
+    Args:
+        signatures (numpy uint64 array): Signatures, one per row, with at
+            least bands * rows values.
+        bands (int): Number of bands.
+        rows (int): Number of values in each band.
+
+    Returns:
+        Keys (numpy uint64 array of shape (number of signatures, bands)): the
+        t-th key of a signature hashes its values t * rows to
+        (t + 1) * rows - 1.
+    """
+    cdef Py_ssize_t n = signatures.shape[0], x = 0, t = 0, j = 0
+    cdef uint64_t h = 0
+    keys_array = np.empty((n, bands), dtype=np.uint64)
+    cdef uint64_t[:, ::1] keys = keys_array
+
+    with nogil:
+        for x in range(n):
+            for t in range(bands):
+                h = 0x9e3779b97f4a7c15ULL
+                for j in range(t * rows, (t + 1) * rows):
+                    h = mix64(h ^ signatures[x, j])
+                keys[x, t] = h
+    return keys_array
@@ -1,6 +1,40 @@
 import cython
-import numpy as np
-cimport numpy as np
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+from py_stringmatching.similarity_measure.cython.cython_utils import cython_sim_ident
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport float_max_three, copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix cimport \
+    SubstitutionMatrix, SubstitutionScores, substitution_score
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix import IDENTITY_MATRIX
+
+
+cdef double needleman_wunsch_kernel(Py_UCS4* string1, Py_ssize_t len_s1,
+                                    Py_UCS4* string2, Py_ssize_t len_s2,
+                                    float gap_cost, SubstitutionScores* sm,
+                                    double* rows) noexcept nogil:
+    """Needleman-Wunsch score with a substitution matrix.
+
+    rows must hold 2 * (len_s2 + 1) doubles.
+    """
+    cdef Py_ssize_t i = 0, j = 0
+    cdef double match = 0.0, delete = 0.0, insert = 0.0
+    cdef double* prev_row = rows
+    cdef double* cur_row = rows + (len_s2 + 1)
+    cdef double* tmp
+
+    for j from 0 <= j < (len_s2 + 1):
+        prev_row[j] = -(j * gap_cost)
+
+    for i from 1 <= i < (len_s1 + 1):
+        cur_row[0] = -(i * gap_cost)
+        for j from 1 <= j < (len_s2 + 1):
+            match = prev_row[j - 1] + substitution_score(sm, string1[i - 1], string2[j - 1])
+            delete = prev_row[j] - gap_cost
+            insert = cur_row[j - 1] - gap_cost
+            cur_row[j] = float_max_three(match, delete, insert)
+        tmp = prev_row; prev_row = cur_row; cur_row = tmp
+
+    return prev_row[len_s2]
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -18,26 +52,54 @@ def needleman_wunsch(unicode string1, unicode string2, float gap_cost,
 
     cdef int i = 0, j = 0
     cdef double match = 0.0, delete = 0.0, insert = 0.0
-    cdef double sim_func_score = 0.0
+    cdef double sim_func_score = 0.0, score = 0.0
     cdef int len_s1 = len(string1), len_s2 = len(string2)
-    cdef double[:,:] dist_mat = np.zeros((len(string1) + 1, len(string2) + 1), dtype=np.float)
+    cdef SubstitutionMatrix sm
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
 
-    # DP initialization
-    for i from 0 <= i < (len_s1 + 1):
-        dist_mat[i, 0] = -(i * gap_cost)
+    if sim_score is cython_sim_ident:
+        sim_score = IDENTITY_MATRIX
 
-    # DP initialization
-    for j from 0 <= j < (len_s2 + 1):
-        dist_mat[0, j] = -(j * gap_cost)
+    # Only the previous row of the DP matrix is needed, so two rows are kept
+    # in a per-thread scratch buffer.
+    cdef Py_ssize_t row_bytes = 2 * (len_s2 + 1) * sizeof(double)
+    scratch = acquire_scratch(row_bytes + (len_s1 + len_s2) * sizeof(Py_UCS4))
+    cdef unsigned char[::1] mem = scratch
+    cdef double* prev_row = <double*>&mem[0]
+    cdef double* cur_row = prev_row + (len_s2 + 1)
+    cdef double* tmp
 
+    try:
+        if isinstance(sim_score, SubstitutionMatrix):
+            # the whole DP runs in C
+            sm = sim_score
+            buf1 = <Py_UCS4*>(&mem[0] + row_bytes)
+            buf2 = buf1 + len_s1
+            copy_ucs4(string1, buf1)
+            copy_ucs4(string2, buf2)
+            with nogil:
+                score = needleman_wunsch_kernel(buf1, len_s1, buf2, len_s2, gap_cost,
+                                                &sm.table, prev_row)
+            return score
 
-    # Needleman-Wunsch DP calculation
-    for i from 1 <= i < (len_s1 + 1):
-        for j from 1 <= j < (len_s2 + 1):
-            sim_func_score = sim_score(string1[i - 1], string2[j - 1])
-            match = dist_mat[i - 1, j - 1] + sim_func_score
-            delete = dist_mat[i - 1, j] - gap_cost
-            insert = dist_mat[i, j - 1] - gap_cost
-            dist_mat[i, j] = max(match, delete, insert)
+        # DP initialization
+        for j from 0 <= j < (len_s2 + 1):
+            prev_row[j] = -(j * gap_cost)
+
+        # Needleman-Wunsch DP calculation
+        for i from 1 <= i < (len_s1 + 1):
+            # DP initialization
+            cur_row[0] = -(i * gap_cost)
+            for j from 1 <= j < (len_s2 + 1):
+                sim_func_score = sim_score(string1[i - 1], string2[j - 1])
+                match = prev_row[j - 1] + sim_func_score
+                delete = prev_row[j] - gap_cost
+                insert = cur_row[j - 1] - gap_cost
+                cur_row[j] = float_max_three(match, delete, insert)
+            tmp = prev_row; prev_row = cur_row; cur_row = tmp
 
-    return dist_mat[len_s1, len_s2]
\ No newline at end of file
+        score = prev_row[len_s2]
+    finally:
+        release_scratch(scratch)
+    return score
@@ -0,0 +1,78 @@
+# Character position bitmasks ("peq" vectors) of a pattern string, shared by
+# the bit-parallel kernels. For every distinct character of the pattern we
+# keep a bitmask of the positions at which it occurs, split into 64-bit
+# words. Characters are looked up by full code point through a small open
+# addressing hash table. A pattern is built once and can then be run
+# against any number of texts.
+
+from libc.stdint cimport uint64_t
+from libc.string cimport memset
+
+
+ctypedef struct PatternMatchVector:
+    Py_ssize_t length     # length of the pattern
+    Py_ssize_t words      # number of 64-bit words per mask
+    Py_ssize_t hash_mask  # capacity of the character hash table - 1
+    Py_UCS4* keys         # code point stored in each hash slot
+    Py_ssize_t* ids       # row of the slot in bits (0 means empty slot)
+    uint64_t* bits        # (distinct characters + 1) x words masks, row 0 is zero
+
+
+cdef inline Py_ssize_t pattern_slot(PatternMatchVector* pm, Py_UCS4 c) noexcept nogil:
+    # open addressing with linear probing; the table is never full
+    cdef Py_ssize_t slot = <Py_ssize_t>c & pm.hash_mask
+    while pm.ids[slot] != 0 and pm.keys[slot] != c:
+        slot = (slot + 1) & pm.hash_mask
+    return slot
+
+
+cdef inline uint64_t* pattern_get(PatternMatchVector* pm, Py_UCS4 c) noexcept nogil:
+    """Returns the peq masks of a character (all zero if it is not in the pattern)."""
+    return pm.bits + pm.ids[pattern_slot(pm, c)] * pm.words
+
+
+cdef inline Py_ssize_t pattern_words(Py_ssize_t length) noexcept nogil:
+    return (length + 63) // 64 if length > 0 else 1
+
+
+cdef inline Py_ssize_t pattern_capacity(Py_ssize_t length) noexcept nogil:
+    cdef Py_ssize_t capacity = 8
+    while capacity < 2 * length:
+        capacity *= 2
+    return capacity
+
+
+cdef inline Py_ssize_t pattern_bytes(Py_ssize_t length) noexcept nogil:
+    """Size of the memory block pattern_init needs for a pattern."""
+    cdef Py_ssize_t capacity = pattern_capacity(length)
+    return ((length + 1) * pattern_words(length) * sizeof(uint64_t) +
+            capacity * (sizeof(Py_ssize_t) + sizeof(Py_UCS4)))
+
+
+cdef inline void pattern_init(PatternMatchVector* pm, Py_UCS4* pattern,
+                              Py_ssize_t length, unsigned char* mem) noexcept nogil:
+    """Builds the peq masks of a pattern.
+
+    mem must hold pattern_bytes(length) bytes (8-byte aligned) and stays
+    owned by the caller.
+    """
+    cdef Py_ssize_t capacity = pattern_capacity(length)
+    cdef Py_ssize_t words = pattern_words(length)
+    cdef Py_ssize_t i = 0, slot = 0, next_id = 1
+
+    pm.length = length
+    pm.words = words
+    pm.hash_mask = capacity - 1
+    pm.bits = <uint64_t*>mem
+    pm.ids = <Py_ssize_t*>(pm.bits + (length + 1) * words)
+    pm.keys = <Py_UCS4*>(pm.ids + capacity)
+    memset(pm.bits, 0, (length + 1) * words * sizeof(uint64_t))
+    memset(pm.ids, 0, capacity * sizeof(Py_ssize_t))
+
+    for i in range(length):
+        slot = pattern_slot(pm, pattern[i])
+        if pm.ids[slot] == 0:
+            pm.keys[slot] = pattern[i]
+            pm.ids[slot] = next_id
+            next_id += 1
+        pm.bits[pm.ids[slot] * words + i // 64] |= (<uint64_t>1) << (i % 64)
@@ -0,0 +1,188 @@
+# cython: boundscheck=False, wraparound=False
+
+from cython.parallel cimport prange, threadid
+from libc.math cimport ceil, sqrt
+from libc.stdint cimport int32_t
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_all_pairs cimport PairBuffer, \
+    new_pair_buffers, buffer_append, pair_buffers_to_arrays, free_pair_buffers
+from py_stringmatching.similarity_measure.cython.cython_token_sets cimport overlap_size, \
+    set_score, JACCARD, COSINE, DICE
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport EPS
+
+
+# Prefix filtering set similarity join (AllPairs, Bayardo et al. 2007, and
+# PPJoin, Xiao et al. 2008).
+#
+# The tokens of every set are sorted by a global order, rarest first. If two
+# sets share at least alpha tokens, then the first len - alpha + 1 tokens of
+# each of them (its prefix) share a token, so only the prefixes of the second
+# table are indexed and only the prefixes of the first table are probed. The
+# caller computes the prefix lengths and the range of set sizes that can
+# reach the threshold from a lower bound on alpha. When a probe matches a
+# posting at position i of x and j of y, the overlap of x and y is at most
+# the matches counted so far plus 1 + min(len_x - i - 1, len_y - j - 1); a
+# pair whose bound falls below alpha is dropped for good (positional
+# filter). The remaining candidates are verified by merging the full sets.
+
+# Slack of the size and prefix filters SetSimJoin computes in Python.
+BOUND_EPS = EPS
+
+
+cdef inline Py_ssize_t required_overlap(int measure, double threshold, Py_ssize_t len1,
+                                        Py_ssize_t len2) noexcept nogil:
+    """Smallest overlap with which two sets can reach the threshold (at
+    least 1)."""
+    cdef double bound
+    cdef Py_ssize_t overlap
+    if measure == JACCARD:
+        bound = threshold / (1.0 + threshold) * (len1 + len2)
+    elif measure == COSINE:
+        bound = threshold * sqrt(<double>len1 * len2)
+    elif measure == DICE:
+        bound = threshold * (len1 + len2) / 2.0
+    else:
+        bound = threshold * (len1 if len1 < len2 else len2)
+    overlap = <Py_ssize_t>ceil(bound - EPS)
+    return overlap if overlap > 1 else 1
+
+
+def set_join(const Py_ssize_t[::1] indptr1, const int32_t[::1] indices1,
+             const Py_ssize_t[::1] probe_prefix, const Py_ssize_t[::1] min_size,
+             const Py_ssize_t[::1] max_size,
+             const Py_ssize_t[::1] indptr2, const int32_t[::1] indices2,
+             const Py_ssize_t[::1] index_prefix, Py_ssize_t num_tokens,
+             int measure, double threshold, bint self_join, int num_threads):
+    """Finds the pairs of sets of two tables whose score is at least the
+    threshold.
+
+    The tokens of each set must be sorted by the global token order. With
+    self_join, both tables must be the same and only the pairs of a set with
+    an earlier set are looked at.
+
+    Args:
+        indptr1,indices1,indptr2,indices2: CSR incidence matrices of the two
+            tables, with token ids in [0, num_tokens).
+        probe_prefix (numpy intp array): Number of tokens of each set of the
+            first table that are probed.
+        min_size,max_size (numpy intp arrays): Sizes of the sets of the second
+            table that each set of the first table is compared with.
+        index_prefix (numpy intp array): Number of tokens of each set of the
+            second table that are indexed.
+        num_tokens (int): Number of token ids.
+        measure (int): Code of the measure, see cython_token_sets.MEASURES.
+        threshold (float): Smallest score kept.
+        self_join (boolean): If True, the tables are the same.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Rows of the first table, rows of the second table (numpy intp
+        arrays) and scores (numpy float64 array) of the pairs, in no
+        particular order. With self_join, the first row of each pair is the
+        smaller one.
+    """
+    cdef Py_ssize_t n1 = indptr1.shape[0] - 1, n2 = indptr2.shape[0] - 1
+    cdef Py_ssize_t x = 0, y = 0, i = 0, j = 0, p = 0, q = 0, t = 0
+    cdef Py_ssize_t len1 = 0, len2 = 0, count = 0, need = 0, rest = 0
+    cdef Py_ssize_t num_seen = 0, overlap = 0, num_postings = 0
+    cdef double score = 0
+    cdef int tid = 0, failed = 0
+    cdef Py_ssize_t* post_ptr = NULL
+    cdef Py_ssize_t* post_rows = NULL
+    cdef Py_ssize_t* post_pos = NULL
+    cdef Py_ssize_t* counts = NULL
+    cdef Py_ssize_t* seen_rows = NULL
+    cdef PairBuffer* buffers = NULL
+    cdef Py_ssize_t* acc
+    cdef Py_ssize_t* seen
+
+    for y in range(n2):
+        num_postings += index_prefix[y]
+
+    try:
+        # token -> (row, position) of the prefixes of the second table, by row
+        post_ptr = <Py_ssize_t*>malloc((num_tokens + 1) * sizeof(Py_ssize_t))
+        post_rows = <Py_ssize_t*>malloc((num_postings + 1) * sizeof(Py_ssize_t))
+        post_pos = <Py_ssize_t*>malloc((num_postings + 1) * sizeof(Py_ssize_t))
+        # per thread: matches counted so far (-1 once pruned) and candidates
+        counts = <Py_ssize_t*>malloc(num_threads * (n2 + 1) * sizeof(Py_ssize_t))
+        seen_rows = <Py_ssize_t*>malloc(num_threads * (n2 + 1) * sizeof(Py_ssize_t))
+        if (post_ptr == NULL or post_rows == NULL or post_pos == NULL or
+                counts == NULL or seen_rows == NULL):
+            raise MemoryError()
+        buffers = new_pair_buffers(num_threads)
+        for p in range(num_threads * (n2 + 1)):
+            counts[p] = 0
+
+        for t in range(num_tokens + 1):
+            post_ptr[t] = 0
+        for y in range(n2):
+            for p in range(indptr2[y], indptr2[y] + index_prefix[y]):
+                post_ptr[indices2[p] + 1] += 1
+        for t in range(num_tokens):
+            post_ptr[t + 1] += post_ptr[t]
+        for y in range(n2):
+            for p in range(indptr2[y], indptr2[y] + index_prefix[y]):
+                t = indices2[p]
+                post_rows[post_ptr[t]] = y
+                post_pos[post_ptr[t]] = p - indptr2[y]
+                post_ptr[t] += 1
+        for t in range(num_tokens, 0, -1):
+            post_ptr[t] = post_ptr[t - 1]
+        post_ptr[0] = 0
+
+        for x in prange(n1, nogil=True, num_threads=num_threads, schedule='guided'):
+            tid = threadid()
+            acc = counts + tid * (n2 + 1)
+            seen = seen_rows + tid * (n2 + 1)
+            len1 = indptr1[x + 1] - indptr1[x]
+            num_seen = 0
+            for i in range(probe_prefix[x]):
+                t = indices1[indptr1[x] + i]
+                if t >= num_tokens:
+                    continue
+                for q in range(post_ptr[t], post_ptr[t + 1]):
+                    y = post_rows[q]
+                    if self_join and y >= x:
+                        break
+                    count = acc[y]
+                    if count < 0:
+                        continue
+                    len2 = indptr2[y + 1] - indptr2[y]
+                    if len2 < min_size[x] or len2 > max_size[x]:
+                        continue
+                    if count == 0:
+                        seen[num_seen] = y
+                        num_seen = num_seen + 1
+                    need = required_overlap(measure, threshold, len1, len2)
+                    j = post_pos[q]
+                    rest = len1 - i - 1 if len1 - i < len2 - j else len2 - j - 1
+                    if count + 1 + rest >= need:
+                        acc[y] = count + 1
+                    else:
+                        acc[y] = -1
+            for q in range(num_seen):
+                y = seen[q]
+                count = acc[y]
+                acc[y] = 0
+                if count <= 0:
+                    continue
+                len2 = indptr2[y + 1] - indptr2[y]
+                overlap = overlap_size(&indices1[indptr1[x]], len1, &indices2[indptr2[y]], len2)
+                score = set_score(measure, overlap, len1, len2, 0.5, 0.5)
+                if score >= threshold:
+                    if self_join:
+                        if buffer_append(&buffers[tid], y, x, score) != 0:
+                            failed += 1
+                    elif buffer_append(&buffers[tid], x, y, score) != 0:
+                        failed += 1
+        if failed:
+            raise MemoryError()
+        return pair_buffers_to_arrays(buffers, num_threads)
+    finally:
+        free_pair_buffers(buffers, num_threads)
+        free(seen_rows)
+        free(counts)
+        free(post_pos)
+        free(post_rows)
+        free(post_ptr)
@@ -0,0 +1,174 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from cython.parallel cimport prange, threadid
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_all_pairs cimport PairBuffer, \
+    new_pair_buffers, buffer_append, pair_buffers_to_arrays, free_pair_buffers
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport popcount64
+
+
+# SimHash fingerprints (Charikar 2002) and multi-index hashing search of
+# 64-bit codes within a Hamming radius (Norouzi et al. 2012).
+#
+# The 64 bits of the codes are cut into m chunks. If two codes differ in at
+# most k bits, one of their chunks differs in at most k // m bits
+# (pigeonhole), so the codes within k bits of a query are found by looking
+# up, in the sorted chunk values of the index, every value within k // m
+# bits of each chunk of the query, and verifying the candidates with a
+# popcount. A candidate found through chunk t is skipped if one of the
+# earlier chunks would already have found it, so that every match is
+# reported once without any per-query bookkeeping.
+
+
+def simhash_fingerprints(const Py_ssize_t[::1] indptr, const uint64_t[::1] hashes,
+                         const double[::1] weights, int num_threads):
+    """Computes the SimHash fingerprints of weighted bags of token hashes.
+
+    Bit b of the fingerprint of a bag is set if the weights of the tokens
+    whose hash has bit b set outweigh those of the tokens whose hash has it
+    clear.
+
+    Args:
+        indptr,hashes: Token hashes of the bags, see
+            cython_minhash.hash_token_lists.
+        weights (numpy float64 array): Weight of each token hash.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Fingerprints (numpy uint64 array). The fingerprint of an empty bag
+        is 0.
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1, x = 0, p = 0
+    cdef int b = 0
+    cdef uint64_t h = 0, fingerprint = 0
+    cdef double weight = 0
+    cdef double* thread_totals = NULL
+    cdef double* totals
+    fingerprints_array = np.zeros(n, dtype=np.uint64)
+    cdef uint64_t[::1] fingerprints = fingerprints_array
+
+    try:
+        # per thread: sum of the signed weights of each bit
+        thread_totals = <double*>malloc(num_threads * 64 * sizeof(double))
+        if thread_totals == NULL:
+            raise MemoryError()
+        for x in prange(n, nogil=True, num_threads=num_threads, schedule='guided'):
+            totals = thread_totals + threadid() * 64
+            for b in range(64):
+                totals[b] = 0
+            for p in range(indptr[x], indptr[x + 1]):
+                h = hashes[p]
+                weight = weights[p]
+                for b in range(64):
+                    if (h >> b) & 1:
+                        totals[b] += weight
+                    else:
+                        totals[b] -= weight
+            fingerprint = 0
+            for b in range(64):
+                if totals[b] > 0:
+                    fingerprint = fingerprint | (<uint64_t>1 << b)
+            fingerprints[x] = fingerprint
+        return fingerprints_array
+    finally:
+        free(thread_totals)
+
+
+cdef inline uint64_t chunk_value(uint64_t code, int start, int width) noexcept nogil:
+    if width == 64:
+        return code
+    return (code >> start) & ((<uint64_t>1 << width) - 1)
+
+
+cdef inline Py_ssize_t lower_bound(const uint64_t* values, Py_ssize_t n,
+                                   uint64_t value) noexcept nogil:
+    """Position of the first of the sorted values that is not less than
+    value."""
+    cdef Py_ssize_t lo = 0, hi = n, mid
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if values[mid] < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def hamming_search(const uint64_t[::1] queries, const uint64_t[::1] codes,
+                   const uint64_t[:, ::1] sorted_keys, const Py_ssize_t[:, ::1] sorted_rows,
+                   const int[::1] starts, const int[::1] widths, const uint64_t[::1] masks,
+                   int max_distance, int radius, bint self_join, int num_threads):
+    """Finds the pairs of a query and an indexed code that differ in at most
+    max_distance bits.
+
+    Args:
+        queries (numpy uint64 array): Query codes.
+        codes (numpy uint64 array): Indexed codes.
+        sorted_keys,sorted_rows: For each chunk (one per row), the chunk
+            values of the indexed codes in increasing order, and the rows
+            of the codes in that order (increasing for equal values).
+        starts,widths (numpy int32 arrays): First bit and number of bits of
+            each chunk.
+        masks (numpy uint64 array): All the values with at most radius bits
+            set, up to the largest chunk width.
+        max_distance (int): Largest Hamming distance of the pairs returned.
+        radius (int): max_distance // number of chunks.
+        self_join (boolean): If True, the queries are the indexed codes and
+            only the pairs of a code with an earlier code are returned.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Query rows, indexed rows (numpy intp arrays) and distances (numpy
+        float64 array) of the pairs, in no particular order. With self_join,
+        the first row of each pair is the smaller one.
+    """
+    cdef Py_ssize_t num_queries = queries.shape[0], n = codes.shape[0]
+    cdef Py_ssize_t num_masks = masks.shape[0], num_chunks = starts.shape[0]
+    cdef Py_ssize_t x = 0, t = 0, t2 = 0, k = 0, pos = 0, row = 0
+    cdef uint64_t query = 0, diff = 0, value = 0, mask = 0
+    cdef int distance = 0, tid = 0, failed = 0, duplicate = 0
+    cdef PairBuffer* buffers = NULL
+
+    if n == 0 or num_queries == 0:
+        return (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp),
+                np.empty(0, dtype=np.float64))
+    try:
+        buffers = new_pair_buffers(num_threads)
+        for x in prange(num_queries, nogil=True, num_threads=num_threads, schedule='guided'):
+            tid = threadid()
+            query = queries[x]
+            for t in range(num_chunks):
+                for k in range(num_masks):
+                    mask = masks[k]
+                    if widths[t] < 64 and (mask >> widths[t]) != 0:
+                        continue
+                    value = chunk_value(query, starts[t], widths[t]) ^ mask
+                    pos = lower_bound(&sorted_keys[t, 0], n, value)
+                    while pos < n and sorted_keys[t, pos] == value:
+                        row = sorted_rows[t, pos]
+                        pos = pos + 1
+                        if self_join and row >= x:
+                            break
+                        diff = codes[row] ^ query
+                        distance = popcount64(diff)
+                        if distance > max_distance:
+                            continue
+                        duplicate = 0
+                        for t2 in range(t):
+                            if popcount64(chunk_value(diff, starts[t2], widths[t2])) <= radius:
+                                duplicate = 1
+                                break
+                        if duplicate:
+                            continue
+                        if self_join:
+                            if buffer_append(&buffers[tid], row, x, distance) != 0:
+                                failed += 1
+                        elif buffer_append(&buffers[tid], x, row, distance) != 0:
+                            failed += 1
+        if failed:
+            raise MemoryError()
+        return pair_buffers_to_arrays(buffers, num_threads)
+    finally:
+        free_pair_buffers(buffers, num_threads)
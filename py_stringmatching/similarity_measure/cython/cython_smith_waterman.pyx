@@ -1,6 +1,42 @@
 import cython
-import numpy as np
-cimport numpy as np
+from py_stringmatching.similarity_measure.cython.cython_utils import acquire_scratch, release_scratch
+from py_stringmatching.similarity_measure.cython.cython_utils import cython_sim_ident
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport float_max_two, \
+    float_max_three, copy_ucs4
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix cimport \
+    SubstitutionMatrix, SubstitutionScores, substitution_score
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix import IDENTITY_MATRIX
+
+
+cdef double smith_waterman_kernel(Py_UCS4* string1, Py_ssize_t len_s1,
+                                  Py_UCS4* string2, Py_ssize_t len_s2,
+                                  float gap_cost, SubstitutionScores* sm,
+                                  double* rows) noexcept nogil:
+    """Smith-Waterman score with a substitution matrix.
+
+    rows must hold 2 * (len_s2 + 1) doubles.
+    """
+    cdef Py_ssize_t i = 0, j = 0
+    cdef double match = 0.0, delete = 0.0, insert = 0.0, max_value = 0.0
+    cdef double* prev_row = rows
+    cdef double* cur_row = rows + (len_s2 + 1)
+    cdef double* tmp
+
+    for j from 0 <= j < (len_s2 + 1):
+        prev_row[j] = 0
+    cur_row[0] = 0
+
+    for i from 1 <= i < (len_s1 + 1):
+        for j from 1 <= j < (len_s2 + 1):
+            match = prev_row[j - 1] + substitution_score(sm, string1[i - 1], string2[j - 1])
+            delete = prev_row[j] - gap_cost
+            insert = cur_row[j - 1] - gap_cost
+            cur_row[j] = float_max_two(0, float_max_three(match, delete, insert))
+            max_value = float_max_two(max_value, cur_row[j])
+        tmp = prev_row; prev_row = cur_row; cur_row = tmp
+
+    return max_value
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -12,19 +48,52 @@ def smith_waterman(unicode string1, unicode string2, float gap_cost, \
     cdef int i = 0, j = 0
     cdef double match = 0.0, delete = 0.0, insert = 0.0
     cdef double sim_score = 0.0, max_value = 0.0
+    cdef double sim_func_score = 0.0
     cdef int len_s1 = len(string1), len_s2 = len(string2)
-    cdef double[:,:] dist_mat = np.zeros((len(string1) + 1, len(string2) + 1), dtype=np.float)
+    cdef SubstitutionMatrix sm
+    cdef Py_UCS4* buf1
+    cdef Py_UCS4* buf2
 
+    if sim_func is cython_sim_ident:
+        sim_func = IDENTITY_MATRIX
 
-    # Smith Waterman DP calculations
-    for i from 1 <= i < (len_s1 + 1):
-        for j from 1 <= j < (len_s2 + 1):
+    # Only the previous row of the DP matrix is needed, so two rows are kept
+    # in a per-thread scratch buffer.
+    cdef Py_ssize_t row_bytes = 2 * (len_s2 + 1) * sizeof(double)
+    scratch = acquire_scratch(row_bytes + (len_s1 + len_s2) * sizeof(Py_UCS4))
+    cdef unsigned char[::1] mem = scratch
+    cdef double* prev_row = <double*>&mem[0]
+    cdef double* cur_row = prev_row + (len_s2 + 1)
+    cdef double* tmp
+
+    try:
+        if isinstance(sim_func, SubstitutionMatrix):
+            # the whole DP runs in C
+            sm = sim_func
+            buf1 = <Py_UCS4*>(&mem[0] + row_bytes)
+            buf2 = buf1 + len_s1
+            copy_ucs4(string1, buf1)
+            copy_ucs4(string2, buf2)
+            with nogil:
+                max_value = smith_waterman_kernel(buf1, len_s1, buf2, len_s2, gap_cost,
+                                                  &sm.table, prev_row)
+            return max_value
+
+        for j from 0 <= j < (len_s2 + 1):
+            prev_row[j] = 0
+        cur_row[0] = 0
 
-            sim_func_score = sim_func(string1[i - 1], string2[j - 1])
-            match = dist_mat[i - 1, j - 1] + sim_func_score
-            delete = dist_mat[i - 1, j] - gap_cost
-            insert = dist_mat[i, j - 1] - gap_cost
-            dist_mat[i, j] = max(0, match, delete, insert)
-            max_value = max(max_value, dist_mat[i, j])
+        # Smith Waterman DP calculations
+        for i from 1 <= i < (len_s1 + 1):
+            for j from 1 <= j < (len_s2 + 1):
 
-    return max_value
\ No newline at end of file
+                sim_func_score = sim_func(string1[i - 1], string2[j - 1])
+                match = prev_row[j - 1] + sim_func_score
+                delete = prev_row[j] - gap_cost
+                insert = cur_row[j - 1] - gap_cost
+                cur_row[j] = float_max_two(0, float_max_three(match, delete, insert))
+                max_value = float_max_two(max_value, cur_row[j])
+            tmp = prev_row; prev_row = cur_row; cur_row = tmp
+    finally:
+        release_scratch(scratch)
+    return max_value
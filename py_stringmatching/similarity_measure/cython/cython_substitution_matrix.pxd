@@ -0,0 +1,42 @@
+cimport numpy as np
+
+
+# C view of a SubstitutionMatrix, usable without the GIL. A character is
+# mapped to a row of scores (through class_ids, or its code point when
+# class_ids is NULL); pairs with an unmapped character fall back to the
+# match / mismatch constants.
+ctypedef struct SubstitutionScores:
+    double match
+    double mismatch
+    Py_ssize_t size        # scores is a size x size matrix
+    Py_ssize_t table_size  # code points >= table_size are unmapped
+    int* class_ids         # row of each code point, -1 if unmapped
+    double* scores
+
+
+cdef class SubstitutionMatrix:
+    cdef SubstitutionScores table
+    cdef readonly double match
+    cdef readonly double mismatch
+    cdef readonly object scores
+    cdef readonly object classes
+    cdef np.ndarray _scores_array
+    cdef np.ndarray _class_ids_array
+
+
+cdef inline Py_ssize_t substitution_row(SubstitutionScores* sm, Py_UCS4 c) noexcept nogil:
+    if <Py_ssize_t>c >= sm.table_size:
+        return -1
+    if sm.class_ids == NULL:
+        return <Py_ssize_t>c
+    return sm.class_ids[c]
+
+
+cdef inline double substitution_score(SubstitutionScores* sm, Py_UCS4 char1,
+                                      Py_UCS4 char2) noexcept nogil:
+    """Score of aligning char1 with char2."""
+    cdef Py_ssize_t row1 = substitution_row(sm, char1)
+    cdef Py_ssize_t row2 = substitution_row(sm, char2)
+    if row1 >= 0 and row2 >= 0:
+        return sm.scores[row1 * sm.size + row2]
+    return sm.match if char1 == char2 else sm.mismatch
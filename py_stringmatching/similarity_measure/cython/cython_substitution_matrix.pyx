@@ -0,0 +1,129 @@
+
+import numpy as np
+cimport numpy as np
+
+np.import_array()
+
+
+cdef class SubstitutionMatrix:
+    """Character similarity scores for the alignment measures.
+
+    A SubstitutionMatrix can be passed as sim_func to Affine, NeedlemanWunsch
+    and SmithWaterman. Unlike an arbitrary Python function, it is evaluated
+    in C, so the whole DP runs without calling back into Python (and without
+    the GIL). It is also callable like any other sim_func.
+
+    Three kinds of scoring are supported:
+
+    * match / mismatch constants only (scores is None).
+    * a dense matrix indexed by code point (classes is None): the score of
+      characters c1 and c2 is scores[ord(c1), ord(c2)].
+    * a per-character-class table: classes[i] is a string holding the
+      characters of class i, and the score of two characters is the entry of
+      scores for their classes.
+
+    Characters not covered by the matrix or by any class are scored with the
+    match / mismatch constants.
+
+    Args:
+        match (float): Score of two equal unmapped characters (defaults to 1).
+        mismatch (float): Score of two different characters one of which is unmapped (defaults to 0).
+        scores (2-D array-like): Square matrix of scores (defaults to None).
+        classes (sequence of str): Characters of each row of scores (defaults to None).
+
+    Attributes:
+        match (float): An attribute to store the match score.
+        mismatch (float): An attribute to store the mismatch score.
+        scores (numpy array): An attribute to store the score matrix (None if not given).
+        classes (tuple of str): An attribute to store the character classes (None if not given).
+
+    Raises:
+        TypeError : If a class is not a string.
+        ValueError : If scores is not a square matrix, if classes is given without scores or does not match
+                     the size of scores, or if a character belongs to several classes.
+
+    Examples:
+        >>> sm = SubstitutionMatrix(match=2, mismatch=-1)
+        >>> sm('a', 'b')
+        -1.0
+        >>> sm = SubstitutionMatrix(scores=[[1, 0.5], [0.5, 1]], classes=['aeiou', 'bcdfg'])
+        >>> sm('a', 'e')
+        1.0
+        >>> sm('a', 'b')
+        0.5
+        >>> sm('a', 'z')
+        0.0
+    """
+
+    def __init__(self, match=1, mismatch=0, scores=None, classes=None):
+        cdef Py_ssize_t i = 0
+        cdef Py_UCS4 c
+        cdef int[::1] class_ids
+
+        self.match = match
+        self.mismatch = mismatch
+        self.scores = None
+        self.classes = None
+        self.table.match = self.match
+        self.table.mismatch = self.mismatch
+        self.table.size = 0
+        self.table.table_size = 0
+        self.table.class_ids = NULL
+        self.table.scores = NULL
+
+        if scores is None:
+            if classes is not None:
+                raise ValueError('Character classes need a score matrix')
+            return
+
+        scores = np.ascontiguousarray(scores, dtype=np.float64)
+        if scores.ndim != 2 or scores.shape[0] != scores.shape[1]:
+            raise ValueError('The score matrix must be a square matrix')
+        scores.setflags(write=False)
+        self.scores = scores
+        self._scores_array = scores
+        self.table.size = scores.shape[0]
+        self.table.scores = <double*>np.PyArray_DATA(self._scores_array)
+
+        if classes is None:
+            # dense matrix indexed by code point
+            self.table.table_size = self.table.size
+            return
+
+        classes = tuple(classes)
+        if len(classes) != self.table.size:
+            raise ValueError('The number of classes must match the size of the score matrix')
+        for chars in classes:
+            if not isinstance(chars, str):
+                raise TypeError('Character classes are expected to be strings')
+        self.classes = classes
+
+        table_size = max([ord(c) + 1 for chars in classes for c in chars] or [0])
+        self._class_ids_array = np.full(table_size, -1, dtype=np.intc)
+        class_ids = self._class_ids_array
+        for i in range(len(classes)):
+            for c in <unicode>classes[i]:
+                if class_ids[c] != -1 and class_ids[c] != i:
+                    raise ValueError('Character %r belongs to several classes' % c)
+                class_ids[c] = i
+        self.table.table_size = table_size
+        if table_size > 0:
+            self.table.class_ids = &class_ids[0]
+
+    def __call__(self, char1, char2):
+        """Returns the score of aligning char1 with char2.
+
+        Args:
+            char1,char2 (str): Input characters.
+
+        Returns:
+            Score of the two characters (float).
+        """
+        return substitution_score(&self.table, ord(char1), ord(char2))
+
+    def __reduce__(self):
+        return (SubstitutionMatrix, (self.match, self.mismatch, self.scores, self.classes))
+
+
+# used by the alignment kernels in place of cython_sim_ident
+IDENTITY_MATRIX = SubstitutionMatrix(match=1, mismatch=0)
@@ -0,0 +1,5 @@
+from libc.stdint cimport int32_t
+
+
+cdef double sparse_dot(const int32_t* ids1, const float* weights1, Py_ssize_t len1,
+                       const int32_t* ids2, const float* weights2, Py_ssize_t len2) noexcept nogil
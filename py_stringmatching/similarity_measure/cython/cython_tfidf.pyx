@@ -0,0 +1,339 @@
+# cython: boundscheck=False, wraparound=False
+
+cimport numpy as np
+from cython.parallel cimport prange, threadid
+from libc.math cimport sqrt
+from libc.stdint cimport int32_t
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_all_pairs cimport PairBuffer, \
+    new_pair_buffers, buffer_append, pair_buffers_to_arrays, free_pair_buffers
+from py_stringmatching.similarity_measure.cython.cython_helpers cimport EPS
+
+np.import_array()
+
+
+# TF/IDF vectors prepared by TfIdf.vectorize are sparse: sorted int32 token
+# ids and the float32 weights of the tokens, normalized to unit length. The
+# TF/IDF score of two prepared vectors is their dot product, found by
+# merging the two id arrays.
+#
+# tfidf_join scores the vectors of a first table against an inverted index
+# (token -> rows, weights) of the vectors of a second table, term at a time
+# with MaxScore pruning. The posting lists are sorted by decreasing weight.
+# The contribution of a query token to any score is at most its weight
+# times the largest weight of its posting list, and the tokens not processed
+# yet contribute at most the sum of these bounds, or the norm of their query
+# weights (Cauchy-Schwarz, the indexed vectors have unit length), whichever
+# is smaller.
+#
+# The query tokens are processed by decreasing bound, accumulating partial
+# dot products. The scan of a posting list stops at the first weight that
+# cannot lift a row not met yet to the threshold, and the bound of the rest
+# of the list is kept, as it may still add to the rows met. When no row not
+# met yet can reach the threshold, the remaining posting lists are only
+# used to tighten the partial dot products of the rows met, reading at most
+# as many postings of each list as there are rows met (a posting costs much
+# less to read than a row to score). The rows met are finally scored
+# exactly with sparse_dot, unless their partial dot product plus the bounds
+# of the parts skipped is below the threshold.
+#
+# For a top-k search, the threshold is raised to the k-th best score found
+# so far. To find good scores early, the rows met with the highest partial
+# dot products are scored until there are k results, and so are the rows
+# whose partial dot product alone reaches the threshold.
+
+
+cdef double sparse_dot(const int32_t* ids1, const float* weights1, Py_ssize_t len1,
+                       const int32_t* ids2, const float* weights2, Py_ssize_t len2) noexcept nogil:
+    """Dot product of two sparse vectors with sorted unique ids."""
+    cdef Py_ssize_t i = 0, j = 0
+    cdef double dot = 0
+
+    while i < len1 and j < len2:
+        if ids1[i] < ids2[j]:
+            i += 1
+        elif ids1[i] > ids2[j]:
+            j += 1
+        else:
+            dot += <double>weights1[i] * weights2[j]
+            i += 1
+            j += 1
+    return dot
+
+
+cdef inline void check_vector(np.ndarray ids, np.ndarray weights) except *:
+    if (np.PyArray_NDIM(ids) != 1 or np.PyArray_TYPE(ids) != np.NPY_INT32 or
+            not np.PyArray_IS_C_CONTIGUOUS(ids)):
+        raise ValueError('Token ids are expected to be a contiguous 1-d int32 array')
+    if (np.PyArray_NDIM(weights) != 1 or np.PyArray_TYPE(weights) != np.NPY_FLOAT32 or
+            not np.PyArray_IS_C_CONTIGUOUS(weights)):
+        raise ValueError('Weights are expected to be a contiguous 1-d float32 array')
+    if np.PyArray_DIM(ids, 0) != np.PyArray_DIM(weights, 0):
+        raise ValueError('Token ids and weights are expected to be of the same length')
+
+
+def tfidf_vector_dot(np.ndarray ids1 not None, np.ndarray weights1 not None,
+                     np.ndarray ids2 not None, np.ndarray weights2 not None):
+    """Computes the dot product of two sparse TF/IDF vectors (see
+    TfIdf.vectorize).
+
+    The arrays are read through the NumPy C API, like
+    cython_token_sets.token_ids_overlap, since typed memoryviews would cost
+    more than the merge for short vectors.
+
+    Args:
+        ids1,ids2 (numpy int32 array): Sorted unique token ids.
+        weights1,weights2 (numpy float32 array): Weights of the tokens.
+
+    Returns:
+        Dot product (float), accumulated in double precision.
+
+    Raises:
+        ValueError : If the arrays are not contiguous 1-d arrays of the
+            expected types, or if ids and weights differ in length.
+    """
+    check_vector(ids1, weights1)
+    check_vector(ids2, weights2)
+    return sparse_dot(<const int32_t*>np.PyArray_DATA(ids1), <const float*>np.PyArray_DATA(weights1),
+                      np.PyArray_DIM(ids1, 0),
+                      <const int32_t*>np.PyArray_DATA(ids2), <const float*>np.PyArray_DATA(weights2),
+                      np.PyArray_DIM(ids2, 0))
+
+
+cdef inline void sort_by_bound(Py_ssize_t* order, const double* bounds, Py_ssize_t n) noexcept nogil:
+    """Sorts the positions 0 to n - 1 by decreasing bound (insertion sort,
+    query vectors are short)."""
+    cdef Py_ssize_t i = 0, j = 0, p = 0
+    for i in range(n):
+        p = i
+        j = i
+        while j > 0 and bounds[order[j - 1]] < bounds[p]:
+            order[j] = order[j - 1]
+            j -= 1
+        order[j] = p
+
+
+cdef inline bint better(double score1, Py_ssize_t row1, double score2, Py_ssize_t row2) noexcept nogil:
+    """Order of the top-k results: by decreasing score, then by increasing
+    row."""
+    return score1 > score2 or (score1 == score2 and row1 < row2)
+
+
+cdef inline Py_ssize_t insert_best(Py_ssize_t* best_rows, double* best_scores, Py_ssize_t count,
+                                   Py_ssize_t k, Py_ssize_t row, double score) noexcept nogil:
+    """Inserts a row into the sorted list of the (at most k) best rows, if
+    it belongs there. Returns the new length of the list."""
+    cdef Py_ssize_t pos = count if count < k else k - 1
+    if count == k and not better(score, row, best_scores[k - 1], best_rows[k - 1]):
+        return count
+    while pos > 0 and better(score, row, best_scores[pos - 1], best_rows[pos - 1]):
+        best_scores[pos] = best_scores[pos - 1]
+        best_rows[pos] = best_rows[pos - 1]
+        pos -= 1
+    best_scores[pos] = score
+    best_rows[pos] = row
+    return count + 1 if count < k else count
+
+
+def tfidf_join(const Py_ssize_t[::1] indptr1, const int32_t[::1] ids1, const float[::1] weights1,
+               const Py_ssize_t[::1] indptr2, const int32_t[::1] ids2, const float[::1] weights2,
+               const Py_ssize_t[::1] post_ptr, const int32_t[::1] post_rows, const float[::1] post_weights,
+               double threshold, Py_ssize_t k, bint self_join, int num_threads):
+    """Finds the pairs of TF/IDF vectors of two tables whose dot product is
+    at least threshold, or the k best such pairs of every vector of the
+    first table.
+
+    Args:
+        indptr1,ids1,weights1,indptr2,ids2,weights2: CSR matrices of the
+            normalized vectors of the two tables, with the token ids of each
+            row sorted.
+        post_ptr,post_rows,post_weights: Posting lists of the second table
+            (token -> rows and weights), each sorted by decreasing weight,
+            for the token ids of both tables.
+        threshold (float): Smallest score kept.
+        k (int): Number of pairs kept per row of the first table, 0 to keep
+            all the pairs that reach the threshold.
+        self_join (bool): Whether the two tables are the same. A row is then
+            never paired with itself, and if k is 0, each pair is found once
+            with the smaller row first.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        Rows of the first table, rows of the second table (numpy intp
+        arrays) and scores (numpy float64 array) of the pairs that share a
+        token, in no particular order.
+    """
+    cdef Py_ssize_t n1 = indptr1.shape[0] - 1, n2 = indptr2.shape[0] - 1
+    cdef Py_ssize_t max_len = 1, i = 0, p = 0, q = 0, j = 0, x = 0, t = 0, hi = 0, top = 0
+    cdef Py_ssize_t len1 = 0, num_touched = 0, count = 0, start1 = 0
+    cdef double total = 0, squares = 0, rest = 0, rest_after = 0, skipped = 0
+    cdef double weight = 0, score = 0, cutoff = 0
+    cdef bint admitting = True
+    cdef int tid = 0, failed = 0
+    cdef double* accumulators = NULL
+    cdef Py_ssize_t* touched_rows = NULL
+    cdef Py_ssize_t* orders = NULL
+    cdef double* bounds_buffer = NULL
+    cdef Py_ssize_t* topk_rows = NULL
+    cdef double* topk_scores = NULL
+    cdef PairBuffer* buffers = NULL
+    cdef double* acc
+    cdef Py_ssize_t* touched
+    cdef Py_ssize_t* order
+    cdef double* bounds
+    cdef Py_ssize_t* best_rows
+    cdef double* best_scores
+
+    for i in range(n1):
+        if indptr1[i + 1] - indptr1[i] > max_len:
+            max_len = indptr1[i + 1] - indptr1[i]
+
+    try:
+        # per thread: an accumulator and a list of touched rows of the second
+        # table, the query tokens by decreasing bound, and the k best pairs
+        accumulators = <double*>malloc(num_threads * (n2 + 1) * sizeof(double))
+        touched_rows = <Py_ssize_t*>malloc(num_threads * (n2 + 1) * sizeof(Py_ssize_t))
+        orders = <Py_ssize_t*>malloc(num_threads * max_len * sizeof(Py_ssize_t))
+        bounds_buffer = <double*>malloc(num_threads * max_len * sizeof(double))
+        topk_rows = <Py_ssize_t*>malloc(num_threads * (k + 1) * sizeof(Py_ssize_t))
+        topk_scores = <double*>malloc(num_threads * (k + 1) * sizeof(double))
+        if (accumulators == NULL or touched_rows == NULL or orders == NULL or bounds_buffer == NULL or
+                topk_rows == NULL or topk_scores == NULL):
+            raise MemoryError()
+        buffers = new_pair_buffers(num_threads)
+        for j in range(num_threads * (n2 + 1)):
+            accumulators[j] = 0
+
+        for i in prange(n1, nogil=True, num_threads=num_threads, schedule='guided'):
+            tid = threadid()
+            acc = accumulators + tid * (n2 + 1)
+            touched = touched_rows + tid * (n2 + 1)
+            order = orders + tid * max_len
+            bounds = bounds_buffer + tid * max_len
+            best_rows = topk_rows + tid * (k + 1)
+            best_scores = topk_scores + tid * (k + 1)
+            start1 = indptr1[i]
+            len1 = indptr1[i + 1] - start1
+
+            total = 0
+            squares = 0
+            for p in range(len1):
+                t = ids1[start1 + p]
+                bounds[p] = 0
+                if post_ptr[t + 1] > post_ptr[t]:
+                    bounds[p] = <double>weights1[start1 + p] * post_weights[post_ptr[t]]
+                total = total + bounds[p]
+                squares = squares + <double>weights1[start1 + p] * weights1[start1 + p]
+            sort_by_bound(order, bounds, len1)
+
+            # the rows met have a positive partial dot product in acc, or -1
+            # once they are scored (top-k search only)
+            num_touched = 0
+            count = 0
+            cutoff = threshold
+            skipped = 0
+            admitting = True
+            rest = total if total < sqrt(squares) else sqrt(squares)
+            for p in range(len1):
+                # bound of the tokens after this one
+                total = total - bounds[order[p]]
+                weight = weights1[start1 + order[p]]
+                squares = squares - weight * weight
+                if p == len1 - 1 or squares <= 0:
+                    rest_after = 0
+                else:
+                    rest_after = total if total < sqrt(squares) else sqrt(squares)
+                t = ids1[start1 + order[p]]
+                if admitting and skipped + rest < cutoff - EPS:
+                    # no row not met yet can reach the threshold
+                    if num_touched == 0:
+                        break
+                    admitting = False
+
+                if admitting:
+                    for q in range(post_ptr[t], post_ptr[t + 1]):
+                        if weight * post_weights[q] + rest_after + skipped < cutoff - EPS:
+                            # the rest of the list can only add to the rows met
+                            skipped = skipped + weight * post_weights[q]
+                            break
+                        x = post_rows[q]
+                        if acc[x] < 0 or (self_join and (x == i or (k == 0 and x < i))):
+                            continue
+                        if acc[x] == 0:
+                            touched[num_touched] = x
+                            num_touched = num_touched + 1
+                        acc[x] = acc[x] + weight * post_weights[q]
+                else:
+                    # tighten the partial dot products of the rows met with
+                    # the head of the list
+                    hi = post_ptr[t + 1]
+                    if hi - post_ptr[t] > num_touched:
+                        hi = post_ptr[t] + num_touched
+                        skipped = skipped + weight * post_weights[hi]
+                    for q in range(post_ptr[t], hi):
+                        x = post_rows[q]
+                        if acc[x] > 0:
+                            acc[x] = acc[x] + weight * post_weights[q]
+                rest = rest_after
+
+                if k > 0 and admitting:
+                    # score the rows met with the highest partial dot products
+                    # until there are k results
+                    while count < k:
+                        top = -1
+                        for q in range(num_touched):
+                            x = touched[q]
+                            if acc[x] > 0 and (top < 0 or acc[x] > acc[top]):
+                                top = x
+                        if top < 0:
+                            break
+                        score = sparse_dot(&ids1[start1], &weights1[start1], len1,
+                                           &ids2[indptr2[top]], &weights2[indptr2[top]],
+                                           indptr2[top + 1] - indptr2[top])
+                        if score >= threshold:
+                            count = insert_best(best_rows, best_scores, count, k, top, score)
+                        acc[top] = -1
+                    # and the rows whose partial dot product is already above
+                    # the k-th best score
+                    for q in range(num_touched):
+                        x = touched[q]
+                        if count == k and acc[x] >= cutoff:
+                            score = sparse_dot(&ids1[start1], &weights1[start1], len1,
+                                               &ids2[indptr2[x]], &weights2[indptr2[x]],
+                                               indptr2[x + 1] - indptr2[x])
+                            if score >= threshold:
+                                count = insert_best(best_rows, best_scores, count, k, x, score)
+                            acc[x] = -1
+                            if best_scores[k - 1] > cutoff:
+                                cutoff = best_scores[k - 1]
+                    if count == k and best_scores[k - 1] > cutoff:
+                        cutoff = best_scores[k - 1]
+
+            for q in range(num_touched):
+                x = touched[q]
+                if acc[x] > 0 and acc[x] + skipped + rest >= cutoff - EPS:
+                    score = sparse_dot(&ids1[start1], &weights1[start1], len1,
+                                       &ids2[indptr2[x]], &weights2[indptr2[x]], indptr2[x + 1] - indptr2[x])
+                    if score >= threshold:
+                        if k == 0:
+                            if buffer_append(&buffers[tid], i, x, score) != 0:
+                                failed += 1
+                        else:
+                            count = insert_best(best_rows, best_scores, count, k, x, score)
+                            if count == k and best_scores[k - 1] > cutoff:
+                                cutoff = best_scores[k - 1]
+                acc[x] = 0
+            for q in range(count):
+                if buffer_append(&buffers[tid], i, best_rows[q], best_scores[q]) != 0:
+                    failed += 1
+        if failed:
+            raise MemoryError()
+        return pair_buffers_to_arrays(buffers, num_threads)
+    finally:
+        free_pair_buffers(buffers, num_threads)
+        free(topk_scores)
+        free(topk_rows)
+        free(bounds_buffer)
+        free(orders)
+        free(touched_rows)
+        free(accumulators)
@@ -0,0 +1,30 @@
+from libc.math cimport sqrt
+from libc.stdint cimport int32_t
+
+cdef Py_ssize_t overlap_size(const int32_t* ids1, Py_ssize_t len1,
+                             const int32_t* ids2, Py_ssize_t len2) noexcept nogil
+
+
+# Token set measures, see cython_token_sets.MEASURES
+cdef enum:
+    JACCARD = 0
+    COSINE = 1
+    DICE = 2
+    OVERLAP_COEFFICIENT = 3
+    TVERSKY_INDEX = 4
+
+
+cdef inline double set_score(int measure, Py_ssize_t overlap, Py_ssize_t len1,
+                             Py_ssize_t len2, double alpha, double beta) noexcept nogil:
+    """Score of two non-empty sets, computed like the token measures."""
+    if overlap == len1 and overlap == len2:
+        return 1.0
+    if measure == JACCARD:
+        return <double>overlap / <double>(len1 + len2 - overlap)
+    if measure == COSINE:
+        return <double>overlap / (sqrt(<double>len1) * sqrt(<double>len2))
+    if measure == DICE:
+        return 2.0 * overlap / <double>(len1 + len2)
+    if measure == OVERLAP_COEFFICIENT:
+        return <double>overlap / (len1 if len1 < len2 else len2)
+    return overlap / (overlap + alpha * (len1 - overlap) + beta * (len2 - overlap))
@@ -0,0 +1,146 @@
+# cython: boundscheck=False, wraparound=False
+
+cimport numpy as np
+from libc.stdint cimport int32_t
+
+np.import_array()
+
+
+# Token sets encoded by Vocabulary are sorted arrays of unique int32 ids, so
+# the size of their intersection is found by merging the two arrays, without
+# hashing any token. When one set is much larger than the other, each id of
+# the smaller set is looked up in the larger one with an exponential search
+# instead, which costs O(len1 * log(len2 / len1)).
+
+MEASURES = {'jaccard': JACCARD, 'cosine': COSINE, 'dice': DICE,
+            'overlap_coefficient': OVERLAP_COEFFICIENT, 'tversky_index': TVERSKY_INDEX}
+
+# Size ratio from which the exponential search replaces the merge.
+cdef enum:
+    GALLOP_RATIO = 16
+
+
+cdef Py_ssize_t gallop(const int32_t* ids, Py_ssize_t start, Py_ssize_t length,
+                       int32_t target) noexcept nogil:
+    """Smallest position >= start of an id >= target, or length."""
+    cdef Py_ssize_t step = 1, low = start, high = start, mid = 0
+
+    while high < length and ids[high] < target:
+        low = high + 1
+        high += step
+        step *= 2
+    if high > length:
+        high = length
+    while low < high:
+        mid = (low + high) // 2
+        if ids[mid] < target:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+cdef Py_ssize_t overlap_size(const int32_t* ids1, Py_ssize_t len1,
+                             const int32_t* ids2, Py_ssize_t len2) noexcept nogil:
+    """Number of ids shared by two sorted arrays of unique ids."""
+    cdef Py_ssize_t i = 0, j = 0, overlap = 0
+
+    if len1 > len2:
+        ids1, ids2 = ids2, ids1
+        len1, len2 = len2, len1
+    if len1 == 0:
+        return 0
+
+    if len2 >= GALLOP_RATIO * len1:
+        for i from 0 <= i < len1:
+            j = gallop(ids2, j, len2, ids1[i])
+            if j == len2:
+                break
+            if ids2[j] == ids1[i]:
+                overlap += 1
+                j += 1
+        return overlap
+
+    while i < len1 and j < len2:
+        if ids1[i] < ids2[j]:
+            i += 1
+        elif ids1[i] > ids2[j]:
+            j += 1
+        else:
+            overlap += 1
+            i += 1
+            j += 1
+    return overlap
+
+
+cdef inline void check_token_ids(np.ndarray ids) except *:
+    cdef const int32_t* data
+    cdef Py_ssize_t i = 0
+
+    if (np.PyArray_NDIM(ids) != 1 or np.PyArray_TYPE(ids) != np.NPY_INT32 or
+            not np.PyArray_IS_C_CONTIGUOUS(ids)):
+        raise TypeError('Token ids are expected to be a contiguous 1-d int32 array')
+    data = <const int32_t*>np.PyArray_DATA(ids)
+    for i from 1 <= i < np.PyArray_DIM(ids, 0):
+        if data[i] <= data[i - 1]:
+            raise ValueError('Token ids are expected to be sorted and unique')
+
+
+def token_ids_overlap(np.ndarray ids1 not None, np.ndarray ids2 not None):
+    """Computes the size of the intersection of two token sets encoded as
+    sorted arrays of unique ids (see Vocabulary.encode).
+
+    The arrays are read through the NumPy C API rather than as typed
+    memoryviews, which would cost more than the merge itself for the small
+    token sets of typical strings.
+
+    Args:
+        ids1,ids2 (numpy int32 array): Input token id arrays.
+
+    Returns:
+        Number of shared ids (int).
+
+    Raises:
+        TypeError : If an input is not a contiguous 1-d int32 array.
+        ValueError : If the ids of an input are not sorted and unique.
+    """
+    check_token_ids(ids1)
+    check_token_ids(ids2)
+    return overlap_size(<const int32_t*>np.PyArray_DATA(ids1), np.PyArray_DIM(ids1, 0),
+                        <const int32_t*>np.PyArray_DATA(ids2), np.PyArray_DIM(ids2, 0))
+
+
+def token_ids_score(np.ndarray ids1 not None, np.ndarray ids2 not None, measure,
+                    double alpha=0.5, double beta=0.5):
+    """Computes a token set measure between two token sets encoded as sorted
+    arrays of unique ids (see Vocabulary.encode).
+
+    Two empty sets score 1.0, and an empty set and a non-empty one score 0.0,
+    like the token measures do.
+
+    Args:
+        ids1,ids2 (numpy int32 array): Input token id arrays.
+        measure (str): Name of the measure in MEASURES.
+        alpha,beta (float): Tversky index parameters, only used by
+            'tversky_index'.
+
+    Returns:
+        Score of the two sets (float).
+
+    Raises:
+        TypeError : If an input is not a contiguous 1-d int32 array.
+        ValueError : If the ids of an input are not sorted and unique.
+    """
+    cdef Py_ssize_t len1 = 0, len2 = 0, overlap = 0
+
+    check_token_ids(ids1)
+    check_token_ids(ids2)
+    len1 = np.PyArray_DIM(ids1, 0)
+    len2 = np.PyArray_DIM(ids2, 0)
+    if len1 == 0 and len2 == 0:
+        return 1.0
+    if len1 == 0 or len2 == 0:
+        return 0.0
+    overlap = overlap_size(<const int32_t*>np.PyArray_DATA(ids1), len1,
+                           <const int32_t*>np.PyArray_DATA(ids2), len2)
+    return set_score(MEASURES[measure], overlap, len1, len2, alpha, beta)
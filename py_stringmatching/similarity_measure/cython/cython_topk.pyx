@@ -0,0 +1,141 @@
+# cython: boundscheck=False, wraparound=False
+
+import numpy as np
+from libc.math cimport sqrt
+from libc.stdint cimport int32_t
+from libc.stdlib cimport malloc, free
+from py_stringmatching.similarity_measure.cython.cython_token_sets cimport overlap_size, \
+    set_score, JACCARD, COSINE
+
+
+# Top-k set similarity search over an inverted index whose posting lists
+# are sorted by set size.
+#
+# The query tokens are probed rarest first. A set first met in the posting
+# list of the i-th probed token shares none of the earlier tokens, so its
+# overlap with the query is at most the number r of tokens not probed yet.
+# Given r and the size of the set, the score has an upper bound that grows
+# with the size up to r and decreases after it. Once k sets have been
+# scored, the sets of a posting list whose bound is below the k-th best
+# score are skipped: the smaller sizes are jumped over with a binary
+# search, and the scan of the list stops at the first larger size whose
+# bound is too low. The search stops when even a set of size r could not
+# beat the k-th best score. Sets met for the first time are scored exactly
+# by merging them with the query.
+
+
+cdef inline double score_bound(int measure, Py_ssize_t rest, Py_ssize_t size,
+                               Py_ssize_t query_size) noexcept nogil:
+    """Largest score of a set of the given size that shares at most rest
+    tokens with the query."""
+    cdef Py_ssize_t overlap = rest if rest < size else size
+    if measure == JACCARD:
+        return <double>overlap / <double>(query_size + size - overlap)
+    if measure == COSINE:
+        return <double>overlap / (sqrt(<double>query_size) * sqrt(<double>size))
+    return 2.0 * overlap / <double>(query_size + size)
+
+
+cdef inline bint better(double score1, Py_ssize_t row1, double score2, Py_ssize_t row2) noexcept nogil:
+    """Order of the results: by decreasing score, then by increasing row."""
+    return score1 > score2 or (score1 == score2 and row1 < row2)
+
+
+def topk_search(const Py_ssize_t[::1] indptr, const int32_t[::1] indices,
+                const Py_ssize_t[::1] post_ptr, const int32_t[::1] post_rows,
+                const int32_t[::1] query, const int32_t[::1] probe_order,
+                Py_ssize_t query_size, Py_ssize_t k, int measure,
+                int32_t[::1] stamps, int32_t stamp):
+    """Finds the k sets with the highest score against a query.
+
+    Args:
+        indptr,indices: CSR incidence matrix of the indexed sets, with the
+            token ids of each set sorted.
+        post_ptr,post_rows: Posting lists (token -> rows), each sorted by
+            set size and then by row.
+        query (numpy int32 array): Sorted ids of the query tokens that are in
+            the index.
+        probe_order (numpy int32 array): The same ids, in the order in which
+            they are probed (shortest posting list first).
+        query_size (int): Number of query tokens, including the tokens that
+            are not in the index.
+        k (int): Number of sets to return.
+        measure (int): JACCARD, COSINE or DICE, see
+            cython_token_sets.MEASURES.
+        stamps (numpy int32 array): Per row, the stamp of the last query
+            that scored it. Rows with the current stamp are not scored again.
+        stamp (int): Stamp of this query.
+
+    Returns:
+        Rows (numpy intp array) and scores (numpy float64 array) of the at
+        most k best sets that share a token with the query, by decreasing
+        score and then by increasing row.
+    """
+    cdef Py_ssize_t num_probes = probe_order.shape[0], num_query = query.shape[0]
+    cdef Py_ssize_t count = 0, rest = num_probes, i = 0, q = 0, lo = 0, hi = 0, mid = 0
+    cdef Py_ssize_t row = 0, size = 0, overlap = 0, pos = 0, token = 0
+    cdef double score = 0, threshold = 0
+    cdef Py_ssize_t* best_rows = NULL
+    cdef double* best_scores = NULL
+
+    best_rows = <Py_ssize_t*>malloc((k + 1) * sizeof(Py_ssize_t))
+    best_scores = <double*>malloc((k + 1) * sizeof(double))
+    try:
+        if best_rows == NULL or best_scores == NULL:
+            raise MemoryError()
+
+        for i in range(num_probes):
+            if count == k and score_bound(measure, rest, rest, query_size) < threshold:
+                break
+            token = probe_order[i]
+            lo = post_ptr[token]
+            hi = post_ptr[token + 1]
+            if count == k:
+                # skip the sets smaller than rest whose bound is too low
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    size = indptr[post_rows[mid] + 1] - indptr[post_rows[mid]]
+                    if size < rest and score_bound(measure, rest, size, query_size) < threshold:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                hi = post_ptr[token + 1]
+
+            for q in range(lo, hi):
+                row = post_rows[q]
+                size = indptr[row + 1] - indptr[row]
+                if count == k and score_bound(measure, rest, size, query_size) < threshold:
+                    if size > rest:
+                        break
+                    continue
+                if stamps[row] == stamp:
+                    continue
+                stamps[row] = stamp
+
+                overlap = overlap_size(&query[0], num_query, &indices[indptr[row]], size)
+                score = set_score(measure, overlap, query_size, size, 0.5, 0.5)
+                if count == k and not better(score, row, best_scores[k - 1], best_rows[k - 1]):
+                    continue
+                # insert into the sorted list of the best sets
+                pos = count if count < k else k - 1
+                while pos > 0 and better(score, row, best_scores[pos - 1], best_rows[pos - 1]):
+                    best_scores[pos] = best_scores[pos - 1]
+                    best_rows[pos] = best_rows[pos - 1]
+                    pos -= 1
+                best_scores[pos] = score
+                best_rows[pos] = row
+                if count < k:
+                    count += 1
+                if count == k:
+                    threshold = best_scores[k - 1]
+            rest -= 1
+
+        rows = np.empty(count, dtype=np.intp)
+        scores = np.empty(count, dtype=np.float64)
+        for i in range(count):
+            rows[i] = best_rows[i]
+            scores[i] = best_scores[i]
+        return rows, scores
+    finally:
+        free(best_rows)
+        free(best_scores)
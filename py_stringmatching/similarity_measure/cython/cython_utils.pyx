@@ -1,10 +1,121 @@
+import threading
+
 import cython
+import numpy as np
+from py_stringmatching.similarity_measure.cython cimport cython_helpers
+
+# Scratch buffers larger than this are not kept between calls.
+MAX_RETAINED_SCRATCH_BYTES = 1 << 24
+
+_thread_scratch = threading.local()
+
+
+def acquire_scratch(Py_ssize_t nbytes):
+    """Returns a per-thread scratch buffer of at least nbytes bytes.
+
+    The buffer is reused across calls made from the same thread and grows
+    geometrically. It must be handed back with release_scratch before the
+    kernel returns. A nested request from the same thread (e.g. a sim_func
+    that itself computes a score) gets a fresh buffer instead.
+
+        Args:
+            nbytes (int): Required size in bytes.
+        Returns:
+            Scratch buffer (numpy uint8 array).
+    """
+    buf = getattr(_thread_scratch, 'buf', None)
+    if getattr(_thread_scratch, 'busy', False) or nbytes > MAX_RETAINED_SCRATCH_BYTES:
+        return np.empty(nbytes if nbytes > 0 else 1, dtype=np.uint8)
+    if buf is None or buf.shape[0] < nbytes:
+        size = 4096 if buf is None else 2 * buf.shape[0]
+        while size < nbytes:
+            size *= 2
+        buf = np.empty(size, dtype=np.uint8)
+        _thread_scratch.buf = buf
+    _thread_scratch.busy = True
+    return buf
+
+
+def release_scratch(buf):
+    """Hands back a buffer obtained from acquire_scratch.
+
+        Args:
+            buf (numpy array): Buffer returned by acquire_scratch.
+    """
+    if buf is getattr(_thread_scratch, 'buf', None):
+        _thread_scratch.busy = False
 
 
 def cython_sim_ident(unicode char1, unicode char2):
     return 1 if char1 == char2 else 0
 
 
+def pack_strings(strings):
+    """Packs a sequence of strings into a single array of code points.
+
+    Bytes are decoded as utf-8, like utils.convert_to_unicode does for a
+    single string.
+
+        Args:
+            strings (sequence of str): Input strings.
+        Returns:
+            Code points of all strings (numpy uint32 array) and the offsets of
+            the strings in it (numpy intp array with len(strings) + 1 entries).
+        Raises:
+            TypeError : If one of the inputs is None or not a string.
+    """
+    cdef Py_ssize_t n = len(strings), i = 0, pos = 0
+    cdef Py_UCS4 c
+    cdef unicode ustring
+
+    unicode_strings = []
+    for string in strings:
+        if string is None:
+            raise TypeError('Input strings cannot be None')
+        if isinstance(string, bytes):
+            string = string.decode('utf-8')
+        if not isinstance(string, unicode):
+            raise TypeError('Input is expected to be a string')
+        unicode_strings.append(string)
+        pos += len(<unicode>string)
+
+    # keep at least one element so that the buffer always has a data pointer
+    codes = np.empty(pos if pos > 0 else 1, dtype=np.uint32)
+    offsets = np.empty(n + 1, dtype=np.intp)
+    cdef unsigned int[::1] codes_view = codes
+    cdef Py_ssize_t[::1] offsets_view = offsets
+
+    pos = 0
+    for i in range(n):
+        offsets_view[i] = pos
+        ustring = unicode_strings[i]
+        for c in ustring:
+            codes_view[pos] = c
+            pos += 1
+    offsets_view[n] = pos
+    return codes, offsets
+
+
+def pack_string_pairs(strings1, strings2):
+    """Packs two sequences of strings whose i-th elements form a pair.
+
+        Args:
+            strings1,strings2 (sequence of str): Input strings.
+        Returns:
+            Code points and offsets of strings1, followed by those of strings2.
+        Raises:
+            TypeError : If one of the inputs is None or not a string.
+            ValueError : If the sequences are not of the same length.
+    """
+    if strings1 is None or strings2 is None:
+        raise TypeError('Input sequences cannot be None')
+    if len(strings1) != len(strings2):
+        raise ValueError('Undefined for sequences of unequal length')
+    codes1, offsets1 = pack_strings(strings1)
+    codes2, offsets2 = pack_strings(strings2)
+    return codes1, offsets1, codes2, offsets2
+
+
 def int_max_two(int a, int b):
     """Finds the maximum integer of the given two integers.
         Args:
@@ -12,8 +123,7 @@ def int_max_two(int a, int b):
         Returns:
             Maximum integer (int).
     """
-    if a > b : return a
-    else: return b
+    return cython_helpers.int_max_two(a, b)
 
 
 def int_max_three(int a, int b, int c):
@@ -23,12 +133,7 @@ def int_max_three(int a, int b, int c):
         Returns:
             Maximum integer (int).
     """
-    cdef int max_int = a
-    if b > max_int:
-        max_int = b
-    if c > max_int:
-        max_int = c
-    return max_int
+    return cython_helpers.int_max_three(a, b, c)
 
 
 def float_max_two(float a, float b):
@@ -38,8 +143,7 @@ def float_max_two(float a, float b):
         Returns:
             Maximum float (float).
     """
-    if a > b : return a
-    else: return b
+    return cython_helpers.float_max_two(a, b)
 
 
 def float_max_three(float a, float b, float c):
@@ -49,12 +153,7 @@ def float_max_three(float a, float b, float c):
         Returns:
             Maximum float (float).
     """
-    cdef float max_float = a
-    if b > max_float:
-        max_float = b
-    if c > max_float:
-        max_float = c
-    return max_float
+    return cython_helpers.float_max_three(a, b, c)
 
 
 def int_min_two(int a, int b):
@@ -64,8 +163,7 @@ def int_min_two(int a, int b):
     Returns:
         Minimum integer (int).
     """
-    if a > b : return b
-    else: return a
+    return cython_helpers.int_min_two(a, b)
 
 
 def int_min_three(int a, int b, int c):
@@ -75,9 +173,4 @@ def int_min_three(int a, int b, int c):
     Returns:
         Minimum integer (int).
     """
-    cdef int min_int = a
-    if b < min_int:
-        min_int = b
-    if c < min_int:
-        min_int = c
-    return min_int
+    return cython_helpers.int_min_three(a, b, c)
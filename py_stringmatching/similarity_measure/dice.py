@@ -1,4 +1,5 @@
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_token_sets import token_ids_score
 from py_stringmatching.similarity_measure.token_similarity_measure import \
                                                     TokenSimilarityMeasure
 
@@ -22,13 +23,15 @@ class Dice(TokenSimilarityMeasure):
         """Computes the raw Dice score between two sets. This score is already in [0,1].
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Dice similarity score (float).
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> dice = Dice()
@@ -46,6 +49,10 @@ class Dice(TokenSimilarityMeasure):
         
         # input validations
         utils.sim_check_for_none(set1, set2)
+
+        if utils.sim_check_for_token_ids(set1, set2):
+            return token_ids_score(set1, set2, 'dice')
+
         utils.sim_check_for_list_or_set_inputs(set1, set2)
 
         # if exact match return 1.0
@@ -67,13 +74,15 @@ class Dice(TokenSimilarityMeasure):
         """Computes the normalized dice similarity score between two sets. Simply call get_raw_score.
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Normalized dice similarity (float).
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> dice = Dice()
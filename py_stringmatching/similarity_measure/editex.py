@@ -9,8 +9,10 @@ import six
 import numpy as np
 
 from py_stringmatching import utils
-from six.moves import xrange
 from six import text_type
+from py_stringmatching.similarity_measure.cython.cython_editex import editex, \
+    editex_batch
+from py_stringmatching.similarity_measure.cython.cython_utils import pack_string_pairs
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
 
@@ -75,49 +77,20 @@ class Editex(SequenceSimilarityMeasure):
         # input validations
         utils.sim_check_for_none(string1, string2)
         utils.sim_check_for_string_inputs(string1, string2)
+
         if utils.sim_check_for_exact_match(string1, string2):
             return 0
 
-        # convert both the strings to NFKD normalized unicode
-        string1 = unicodedata.normalize('NFKD', text_type(string1.upper()))
-        string2 = unicodedata.normalize('NFKD', text_type(string2.upper()))
-
-        # convert ß to SS (for Python2)
-        string1 = string1.replace('ß', 'SS')
-        string2 = string2.replace('ß', 'SS')
+        string1 = _normalize(string1)
+        string2 = _normalize(string2)
 
         if len(string1) == 0:
             return len(string2) * self.mismatch_cost
         if len(string2) == 0:
             return len(string1) * self.mismatch_cost
 
-        d_mat = np.zeros((len(string1) + 1, len(string2) + 1), dtype=np.int)
-        len1 = len(string1)
-        len2 = len(string2)
-        string1 = ' ' + string1
-        string2 = ' ' + string2
-        editex_helper = EditexHelper(self.match_cost, self.mismatch_cost,
-                                     self.group_cost)
-
-        if not self.local:
-            for i in xrange(1, len1 + 1):
-                d_mat[i, 0] = d_mat[i - 1, 0] + editex_helper.d_cost(
-                                                    string1[i - 1], string1[i])
-
-        for j in xrange(1, len2 + 1):
-            d_mat[0, j] = d_mat[0, j - 1] + editex_helper.d_cost(string2[j - 1],
-                                                                 string2[j])
-
-        for i in xrange(1, len1 + 1):
-            for j in xrange(1, len2 + 1):
-                d_mat[i, j] = min(d_mat[i - 1, j] + editex_helper.d_cost(
-                                                    string1[i - 1], string1[i]),
-                                  d_mat[i, j - 1] + editex_helper.d_cost(
-                                                    string2[j - 1], string2[j]),
-                                  d_mat[i - 1, j - 1] + editex_helper.r_cost(
-                                                        string1[i], string2[j]))
-
-        return d_mat[len1, len2]
+        return editex(string1, string2, self.match_cost, self.group_cost,
+                      self.mismatch_cost, self.local)
 
     def get_sim_score(self, string1, string2):
         """
@@ -135,9 +108,9 @@ class Editex(SequenceSimilarityMeasure):
         Examples:
             >>> ed = Editex()
             >>> ed.get_sim_score('cat', 'hat')
-            0.66666666666666674
+            0.6666666666666667
             >>> ed.get_sim_score('Niall', 'Neil')
-            0.80000000000000004
+            0.8
             >>> ed.get_sim_score('aluminum', 'Catalan')
             0.25
             >>> ed.get_sim_score('ATCG', 'TAGC')
@@ -154,6 +127,82 @@ class Editex(SequenceSimilarityMeasure):
         return 1 - (raw_score / max(string1_len * self.mismatch_cost,
                                     string2_len * self.mismatch_cost))
 
+    def get_raw_scores(self, strings1, strings2, n_jobs=1):
+        """
+        Computes the editex distances between pairs of strings.
+
+        The i-th string of strings1 is compared with the i-th string of strings2. The strings are normalized once
+        and the loop over the pairs runs in compiled code without the GIL.
+
+        Args:
+            strings1,strings2 (list of str): Input strings
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Editex distances (NumPy float64 array)
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings
+            ValueError : If strings1 and strings2 are not of the same length
+
+        Examples:
+            >>> ed = Editex()
+            >>> ed.get_raw_scores(['cat', 'Niall', 'ATCG'], ['hat', 'Neil', 'TAGC'])
+            array([2., 2., 6.])
+        """
+        # input validations
+        utils.sim_check_for_none(strings1, strings2)
+        utils.sim_check_for_same_len(strings1, strings2)
+
+        normalized1 = []
+        normalized2 = []
+        for string1, string2 in zip(strings1, strings2):
+            utils.sim_check_for_none(string1, string2)
+            utils.sim_check_for_string_inputs(string1, string2)
+            # an exact match scores 0, as does a pair of empty strings
+            if utils.sim_check_for_exact_match(string1, string2):
+                normalized1.append('')
+                normalized2.append('')
+            else:
+                normalized1.append(_normalize(string1))
+                normalized2.append(_normalize(string2))
+
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(normalized1, normalized2)
+        return editex_batch(codes1, offsets1, codes2, offsets2, self.match_cost,
+                            self.group_cost, self.mismatch_cost, self.local,
+                            utils.get_num_threads(n_jobs))
+
+    def get_sim_scores(self, strings1, strings2, n_jobs=1):
+        """
+        Computes the normalized editex similarities between pairs of strings.
+
+        Args:
+            strings1,strings2 (list of str): Input strings
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Normalized editex similarities (NumPy float64 array)
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings
+            ValueError : If strings1 and strings2 are not of the same length
+
+        Examples:
+            >>> ed = Editex()
+            >>> ed.get_sim_scores(['cat', 'Niall', 'ATCG'], ['hat', 'Neil', 'TAGC'])
+            array([0.66666667, 0.8       , 0.25      ])
+        """
+        raw_scores = self.get_raw_scores(strings1, strings2, n_jobs)
+        max_lens = np.array([max(len(string1), len(string2))
+                             for string1, string2 in zip(strings1, strings2)],
+                            dtype=np.float64) * self.mismatch_cost
+        sim_scores = np.ones(len(raw_scores), dtype=np.float64)
+        nonempty = max_lens > 0
+        sim_scores[nonempty] = 1 - raw_scores[nonempty] / max_lens[nonempty]
+        return sim_scores
+
     def get_match_cost(self):
         """
         Get match cost
@@ -231,7 +280,16 @@ class Editex(SequenceSimilarityMeasure):
         return True
 
 
+def _normalize(string):
+    """Upper cases and NFKD normalizes a string the way Editex compares it."""
+    string = unicodedata.normalize('NFKD', text_type(string.upper()))
+    # convert ß to SS (for Python2)
+    return string.replace('ß', 'SS')
+
+
 class EditexHelper:
+    # The compiled kernel uses a lookup table built from the effective groups
+    # below (cython_editex._GROUPS); keep both in sync.
     letter_groups = dict()
     letter_groups['A'] = letter_groups['E'] = letter_groups['I'] = letter_groups['O'] \
         = letter_groups['U'] = letter_groups['Y'] = 0
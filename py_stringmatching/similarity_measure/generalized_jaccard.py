@@ -11,7 +11,8 @@ class GeneralizedJaccard(HybridSimilarityMeasure):
 
     Parameters:
         sim_func (function): similarity function. This should return a similarity score between two strings in set (optional),
-                             default is jaro similarity measure
+                             default is jaro similarity measure. If it takes a score_cutoff keyword argument,
+                             pairs that cannot pass the threshold are skipped.
         threshold (float): Threshold value (defaults to 0.5). If the similarity of a token pair exceeds the threshold,
                            then the token pair is considered a match.
     """
@@ -74,9 +75,16 @@ class GeneralizedJaccard(HybridSimilarityMeasure):
         match_score = 0.0
         match_count = 0
         list_matches = []
+        # a secondary function that takes a score_cutoff (e.g. Jaro) can skip
+        # the pairs that cannot pass the threshold
+        use_cutoff = (utils.sim_func_accepts_score_cutoff(self.sim_func) and
+                      0 <= self.threshold <= 1)
         for element in set1:
             for item in set2:
-                score = self.sim_func(element, item)
+                if use_cutoff:
+                    score = self.sim_func(element, item, score_cutoff=self.threshold)
+                else:
+                    score = self.sim_func(element, item)
                 if score > 1 or score < 0:
                     raise ValueError('Similarity measure should' + \
                                      ' return value in the range [0,1]')
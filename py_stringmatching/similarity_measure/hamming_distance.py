@@ -1,6 +1,11 @@
 from __future__ import division
 
+import numpy as np
+
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_hamming_distance import \
+    hamming_distance_batch, hamming_distance_code, hamming_distance_packed
+from py_stringmatching.similarity_measure.cython.cython_utils import pack_string_pairs
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
 
@@ -11,16 +16,20 @@ class HammingDistance(SequenceSimilarityMeasure):
     The Hamming distance between two strings of equal length is the number of positions at which the corresponding
     symbols are different. Thus, it measures the minimum number of substitutions required to change
     one string into the other, or the minimum number of errors that could have transformed one string into the other.
+
+    The inputs can also be packed 64-bit codes, such as SimHash fingerprints, given as NumPy uint64 values (or
+    NumPy uint64 arrays for the batch methods). Their Hamming distance is the number of bits in which they differ,
+    computed with a popcount of their XOR.
     """
 
     def __init__(self):
         super(HammingDistance, self).__init__()
 
     def get_raw_score(self, string1, string2):
-        """Computes the raw hamming distance between two strings.
+        """Computes the raw hamming distance between two strings, or between two packed 64-bit codes.
 
         Args:
-            string1,string2 (str): Input strings.
+            string1,string2 (str or NumPy uint64): Input strings, or input codes.
 
         Returns:
             Hamming distance (int).
@@ -39,11 +48,17 @@ class HammingDistance(SequenceSimilarityMeasure):
             1
             >>> hd.get_raw_score('JOHN', 'john')
             4
+            >>> hd.get_raw_score(np.uint64(0b1011), np.uint64(0b0110))
+            3
         """
         
         # input validations
         utils.sim_check_for_none(string1, string2)
 
+        # packed codes differ in the set bits of their XOR
+        if isinstance(string1, np.uint64) and isinstance(string2, np.uint64):
+            return hamming_distance_code(string1, string2)
+
         # convert input to unicode.
         string1 = utils.convert_to_unicode(string1)
         string2 = utils.convert_to_unicode(string2)
@@ -58,10 +73,12 @@ class HammingDistance(SequenceSimilarityMeasure):
         return sum(bool(ord(c1) - ord(c2)) for c1, c2 in zip(string1, string2))
 
     def get_sim_score(self, string1, string2):
-        """Computes the normalized Hamming similarity score between two strings.
+        """Computes the normalized Hamming similarity score between two strings, or between two packed 64-bit codes.
+
+        The distance between two codes is normalized by 64.
 
         Args:
-            string1,string2 (str): Input strings.
+            string1,string2 (str or NumPy uint64): Input strings, or input codes.
 
         Returns:
             Normalized Hamming similarity score (float).
@@ -80,8 +97,13 @@ class HammingDistance(SequenceSimilarityMeasure):
             0.0
             >>> hd.get_sim_score('JOHN', 'john')
             0.0
+            >>> hd.get_sim_score(np.uint64(0b1011), np.uint64(0b0110))
+            0.953125
         """
 
+        if isinstance(string1, np.uint64) and isinstance(string2, np.uint64):
+            return 1 - (self.get_raw_score(string1, string2) / 64)
+
         # convert input to unicode.
         string1 = utils.convert_to_unicode(string1)
         string2 = utils.convert_to_unicode(string2)
@@ -92,3 +114,70 @@ class HammingDistance(SequenceSimilarityMeasure):
         if common_len == 0:
             return 1.0
         return 1 - (raw_score / common_len)
+
+    def get_raw_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the raw hamming distances between pairs of strings, or of packed 64-bit codes.
+
+        The i-th string of strings1 is compared with the i-th string of strings2. The loop over the pairs runs in
+        compiled code without the GIL, which is much faster than calling get_raw_score on every pair.
+
+        Args:
+            strings1,strings2 (list of str or NumPy uint64 array): Input strings, or input codes.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Hamming distances (NumPy int64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length, or if the strings of a pair are
+                not of same length.
+
+        Examples:
+            >>> hd = HammingDistance()
+            >>> hd.get_raw_scores(['', 'alex', 'JOHN'], ['', 'john', 'john'])
+            array([0, 4, 4])
+            >>> hd.get_raw_scores(np.array([0b1011, 0], dtype=np.uint64), np.array([0b0110, 2**64 - 1], dtype=np.uint64))
+            array([ 3, 64])
+        """
+        if _is_code_array(strings1) and _is_code_array(strings2):
+            utils.sim_check_for_same_len(strings1, strings2)
+            return hamming_distance_packed(np.ascontiguousarray(strings1), np.ascontiguousarray(strings2),
+                                           utils.get_num_threads(n_jobs), False)
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return hamming_distance_batch(codes1, offsets1, codes2, offsets2,
+                                      utils.get_num_threads(n_jobs), False)
+
+    def get_sim_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Hamming similarity scores between pairs of strings, or of packed 64-bit codes.
+
+        Args:
+            strings1,strings2 (list of str or NumPy uint64 array): Input strings, or input codes.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Normalized Hamming similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length, or if the strings of a pair are
+                not of same length.
+
+        Examples:
+            >>> hd = HammingDistance()
+            >>> hd.get_sim_scores(['', 'alex', 'karolin'], ['', 'john', 'kathrin'])
+            array([1.        , 0.        , 0.57142857])
+        """
+        if _is_code_array(strings1) and _is_code_array(strings2):
+            utils.sim_check_for_same_len(strings1, strings2)
+            return hamming_distance_packed(np.ascontiguousarray(strings1), np.ascontiguousarray(strings2),
+                                           utils.get_num_threads(n_jobs), True)
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return hamming_distance_batch(codes1, offsets1, codes2, offsets2,
+                                      utils.get_num_threads(n_jobs), True)
+
+
+def _is_code_array(values):
+    return isinstance(values, np.ndarray) and values.dtype == np.uint64
@@ -2,7 +2,8 @@ from py_stringmatching import utils
 from six.moves import xrange
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
-from py_stringmatching.similarity_measure.cython.cython_jaro import jaro
+from py_stringmatching.similarity_measure.cython.cython_jaro import jaro, jaro_batch
+from py_stringmatching.similarity_measure.cython.cython_utils import pack_string_pairs
 
 
 class Jaro(SequenceSimilarityMeasure):
@@ -15,17 +16,21 @@ class Jaro(SequenceSimilarityMeasure):
     def __init__(self):
         super(Jaro, self).__init__()
 
-    def get_raw_score(self, string1, string2):
+    def get_raw_score(self, string1, string2, score_cutoff=None):
         """Computes the raw Jaro score between two strings.
 
         Args:
             string1,string2 (str): Input strings.
+            score_cutoff (float): Smallest score of interest (defaults to None). If given, 0.0 is returned for pairs
+                whose score is below score_cutoff, and pairs whose lengths alone rule out reaching it are rejected
+                without comparing their characters.
 
         Returns:
             Jaro similarity score (float).
 
         Raises:
             TypeError : If the inputs are not strings or if one of the inputs is None.
+            ValueError : If score_cutoff is not in the range [0, 1].
 
         Examples:
             >>> jaro = Jaro()
@@ -35,11 +40,14 @@ class Jaro(SequenceSimilarityMeasure):
             0.8222222222222223
             >>> jaro.get_raw_score('DIXON', 'DICKSONX')
             0.7666666666666666
+            >>> jaro.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.8)
+            0.0
 
         """
 
         # input validations
         utils.sim_check_for_none(string1, string2)
+        utils.sim_check_score_cutoff(score_cutoff)
 
         # convert input to unicode.
         string1 = utils.convert_to_unicode(string1)
@@ -51,19 +59,25 @@ class Jaro(SequenceSimilarityMeasure):
         if utils.sim_check_for_empty(string1, string2):
             return 0
 
-        return jaro(string1, string2)
+        if score_cutoff is None:
+            return jaro(string1, string2)
+        return jaro(string1, string2, score_cutoff)
 
-    def get_sim_score(self, string1, string2):
+    def get_sim_score(self, string1, string2, score_cutoff=None):
         """Computes the normalized Jaro similarity score between two strings. Simply call get_raw_score.
 
         Args:
             string1,string2 (str): Input strings.
+            score_cutoff (float): Smallest score of interest (defaults to None). If given, 0.0 is returned for pairs
+                whose score is below score_cutoff, and pairs whose lengths alone rule out reaching it are rejected
+                without comparing their characters.
 
         Returns:
             Normalized Jaro similarity score (float).
 
         Raises:
             TypeError : If the inputs are not strings or if one of the inputs is None.
+            ValueError : If score_cutoff is not in the range [0, 1].
 
         Examples:
             >>> jaro = Jaro()
@@ -73,6 +87,57 @@ class Jaro(SequenceSimilarityMeasure):
             0.8222222222222223
             >>> jaro.get_sim_score('DIXON', 'DICKSONX')
             0.7666666666666666
+            >>> jaro.get_sim_score('DIXON', 'DICKSONX', score_cutoff=0.8)
+            0.0
 
         """
-        return self.get_raw_score(string1, string2)
+        return self.get_raw_score(string1, string2, score_cutoff)
+
+    def get_raw_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the raw Jaro scores between pairs of strings.
+
+        The i-th string of strings1 is compared with the i-th string of strings2. The loop over the pairs runs in
+        compiled code without the GIL, which is much faster than calling get_raw_score on every pair.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Jaro similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> jaro = Jaro()
+            >>> jaro.get_raw_scores(['MARTHA', 'DWAYNE', ''], ['MARHTA', 'DUANE', 'deeva'])
+            array([0.94444444, 0.82222222, 0.        ])
+        """
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return jaro_batch(codes1, offsets1, codes2, offsets2,
+                          utils.get_num_threads(n_jobs))
+
+    def get_sim_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Jaro similarity scores between pairs of strings. Simply call get_raw_scores.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Normalized Jaro similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> jaro = Jaro()
+            >>> jaro.get_sim_scores(['MARTHA', 'DWAYNE', ''], ['MARHTA', 'DUANE', 'deeva'])
+            array([0.94444444, 0.82222222, 0.        ])
+        """
+        return self.get_raw_scores(strings1, strings2, n_jobs)
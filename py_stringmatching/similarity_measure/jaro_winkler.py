@@ -1,7 +1,10 @@
 from py_stringmatching import utils
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
-from py_stringmatching.similarity_measure.cython.cython_jaro_winkler import jaro_winkler
+from py_stringmatching.similarity_measure.cython.cython_jaro_winkler import jaro_winkler, \
+    jaro_winkler_batch, jaro_winkler_matrix
+from py_stringmatching.similarity_measure.cython.cython_utils import pack_string_pairs, \
+    pack_strings
 
 
 class JaroWinkler(SequenceSimilarityMeasure):
@@ -20,31 +23,38 @@ class JaroWinkler(SequenceSimilarityMeasure):
         self.prefix_weight = prefix_weight
         super(JaroWinkler, self).__init__()
 
-    def get_raw_score(self, string1, string2):
+    def get_raw_score(self, string1, string2, score_cutoff=None):
         """Computes the raw Jaro-Winkler score between two strings.
 
         Args:
             string1,string2 (str): Input strings.
+            score_cutoff (float): Smallest score of interest (defaults to None). If given, 0.0 is returned for pairs
+                whose score is below score_cutoff, and pairs whose lengths and common prefix alone rule out reaching it
+                are rejected without comparing the rest of their characters.
 
         Returns:
             Jaro-Winkler similarity score (float).
 
         Raises:
             TypeError : If the inputs are not strings or if one of the inputs is None.
+            ValueError : If score_cutoff is not in the range [0, 1].
 
         Examples:
             >>> jw = JaroWinkler()
             >>> jw.get_raw_score('MARTHA', 'MARHTA')
             0.9611111111111111
             >>> jw.get_raw_score('DWAYNE', 'DUANE')
-            0.84
+            0.8400000000000001
             >>> jw.get_raw_score('DIXON', 'DICKSONX')
             0.8133333333333332
+            >>> jw.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.9)
+            0.0
 
         """
         
         # input validations
         utils.sim_check_for_none(string1, string2)
+        utils.sim_check_score_cutoff(score_cutoff)
 
         # convert input to unicode.
         string1 = utils.convert_to_unicode(string1)
@@ -56,30 +66,140 @@ class JaroWinkler(SequenceSimilarityMeasure):
         if utils.sim_check_for_empty(string1, string2):
             return 0
 
-        return jaro_winkler(string1, string2, self.prefix_weight)
+        if score_cutoff is None:
+            return jaro_winkler(string1, string2, self.prefix_weight)
+        return jaro_winkler(string1, string2, self.prefix_weight, score_cutoff)
 
-    def get_sim_score(self, string1, string2):
+    def get_sim_score(self, string1, string2, score_cutoff=None):
         """Computes the normalized Jaro-Winkler similarity score between two strings. Simply call get_raw_score.
 
         Args:
             string1,string2 (str): Input strings.
+            score_cutoff (float): Smallest score of interest (defaults to None). If given, 0.0 is returned for pairs
+                whose score is below score_cutoff, and pairs whose lengths and common prefix alone rule out reaching it
+                are rejected without comparing the rest of their characters.
 
         Returns:
             Normalized Jaro-Winkler similarity (float).
 
         Raises:
             TypeError : If the inputs are not strings or if one of the inputs is None.
+            ValueError : If score_cutoff is not in the range [0, 1].
 
         Examples:
             >>> jw = JaroWinkler()
             >>> jw.get_sim_score('MARTHA', 'MARHTA')
             0.9611111111111111
             >>> jw.get_sim_score('DWAYNE', 'DUANE')
-            0.84
+            0.8400000000000001
             >>> jw.get_sim_score('DIXON', 'DICKSONX')
             0.8133333333333332
+            >>> jw.get_sim_score('DIXON', 'DICKSONX', score_cutoff=0.9)
+            0.0
         """
-        return self.get_raw_score(string1, string2)
+        return self.get_raw_score(string1, string2, score_cutoff)
+
+    def get_raw_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the raw Jaro-Winkler scores between pairs of strings.
+
+        The i-th string of strings1 is compared with the i-th string of strings2. The loop over the pairs runs in
+        compiled code without the GIL, which is much faster than calling get_raw_score on every pair.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Jaro-Winkler similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> jw = JaroWinkler()
+            >>> jw.get_raw_scores(['MARTHA', 'DWAYNE', 'DIXON'], ['MARHTA', 'DUANE', 'DICKSONX'])
+            array([0.96111111, 0.84      , 0.81333333])
+        """
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return jaro_winkler_batch(codes1, offsets1, codes2, offsets2, self.prefix_weight,
+                                  utils.get_num_threads(n_jobs))
+
+    def get_sim_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Jaro-Winkler similarity scores between pairs of strings. Simply call
+        get_raw_scores.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Normalized Jaro-Winkler similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> jw = JaroWinkler()
+            >>> jw.get_sim_scores(['MARTHA', 'DWAYNE', 'DIXON'], ['MARHTA', 'DUANE', 'DICKSONX'])
+            array([0.96111111, 0.84      , 0.81333333])
+        """
+        return self.get_raw_scores(strings1, strings2, n_jobs)
+
+    def get_raw_score_matrix(self, strings1, strings2, n_jobs=1):
+        """Computes the raw Jaro-Winkler score between every string of strings1 and every string of strings2.
+
+        Each string of strings1 is preprocessed once into character position bitmasks, and then compared with
+        every string of strings2 using a bit-parallel Jaro kernel.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            len(strings1) x len(strings2) matrix of Jaro-Winkler similarity scores (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+
+        Examples:
+            >>> jw = JaroWinkler()
+            >>> jw.get_raw_score_matrix(['MARTHA', 'DIXON'], ['MARHTA', 'DICKSONX'])
+            array([[0.96111111, 0.        ],
+                   [0.        , 0.81333333]])
+        """
+        utils.sim_check_for_none(strings1, strings2)
+        codes1, offsets1 = pack_strings(strings1)
+        codes2, offsets2 = pack_strings(strings2)
+        return jaro_winkler_matrix(codes1, offsets1, codes2, offsets2, self.prefix_weight,
+                                   utils.get_num_threads(n_jobs))
+
+    def get_sim_score_matrix(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Jaro-Winkler similarity between every string of strings1 and every string of
+        strings2. Simply call get_raw_score_matrix.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            len(strings1) x len(strings2) matrix of normalized Jaro-Winkler similarities (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+
+        Examples:
+            >>> jw = JaroWinkler()
+            >>> jw.get_sim_score_matrix(['MARTHA', 'DIXON'], ['MARHTA', 'DICKSONX'])
+            array([[0.96111111, 0.        ],
+                   [0.        , 0.81333333]])
+        """
+        return self.get_raw_score_matrix(strings1, strings2, n_jobs)
 
     def get_prefix_weight(self):
         """Get prefix weight.
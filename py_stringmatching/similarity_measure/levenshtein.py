@@ -1,7 +1,12 @@
 from __future__ import division
 
+import math
+
 from py_stringmatching import utils
-from py_stringmatching.similarity_measure.cython.cython_levenshtein import levenshtein
+from py_stringmatching.similarity_measure.cython.cython_levenshtein import levenshtein, \
+    levenshtein_batch, levenshtein_bounded, levenshtein_matrix
+from py_stringmatching.similarity_measure.cython.cython_utils import pack_string_pairs, \
+    pack_strings
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
     SequenceSimilarityMeasure
 
@@ -17,17 +22,22 @@ class Levenshtein(SequenceSimilarityMeasure):
     def __init__(self):
         super(Levenshtein, self).__init__()
 
-    def get_raw_score(self, string1, string2):
+    def get_raw_score(self, string1, string2, max_distance=None):
         """Computes the raw Levenshtein distance between two strings.
 
         Args:
             string1,string2 (str): Input strings.
+            max_distance (int): Largest distance of interest (defaults to None, meaning no bound). If given, only
+                the diagonal band of the DP that can stay within this bound is computed, and the computation stops
+                as soon as the bound can no longer be met.
 
         Returns:
-            Levenshtein distance (int).
+            Levenshtein distance (int). If max_distance is given and the distance exceeds it, max_distance + 1 is
+            returned instead.
 
         Raises:
             TypeError : If the inputs are not strings.
+            ValueError : If max_distance is negative.
 
         Examples:
             >>> lev = Levenshtein()
@@ -37,10 +47,14 @@ class Levenshtein(SequenceSimilarityMeasure):
             3
             >>> lev.get_raw_score('levenshtein', 'frankenstein')
             6
+            >>> lev.get_raw_score('levenshtein', 'frankenstein', max_distance=3)
+            4
         """
         
         # input validations
         utils.sim_check_for_none(string1, string2)
+        if max_distance is not None and max_distance < 0:
+            raise ValueError('max_distance should be greater than or equal to zero')
 
         # convert input to unicode.
         string1 = utils.convert_to_unicode(string1)
@@ -51,19 +65,26 @@ class Levenshtein(SequenceSimilarityMeasure):
         if utils.sim_check_for_exact_match(string1, string2):
             return 0.0
 
+        if max_distance is not None:
+            return levenshtein_bounded(string1, string2, max_distance)
+
         return levenshtein(string1, string2)
 
-    def get_sim_score(self, string1, string2):
+    def get_sim_score(self, string1, string2, min_sim=None):
         """Computes the normalized Levenshtein similarity score between two strings.
 
         Args:
             string1,string2 (str): Input strings.
+            min_sim (float): Smallest similarity of interest (defaults to None). If given, the distance is computed
+                with the corresponding max_distance bound, and 0.0 is returned for pairs whose similarity is below
+                min_sim.
 
         Returns:
             Normalized Levenshtein similarity (float).
 
         Raises:
             TypeError : If the inputs are not strings.
+            ValueError : If min_sim is not in the range [0, 1].
 
         Examples:
             >>> lev = Levenshtein()
@@ -73,15 +94,141 @@ class Levenshtein(SequenceSimilarityMeasure):
             0.5714285714285714
             >>> lev.get_sim_score('levenshtein', 'frankenstein')
             0.5
+            >>> lev.get_sim_score('levenshtein', 'frankenstein', min_sim=0.8)
+            0.0
 
         """
 
+        if min_sim is not None and (min_sim < 0 or min_sim > 1):
+            raise ValueError('min_sim should be in the range [0, 1]')
+
         # convert input strings to unicode.
         string1 = utils.convert_to_unicode(string1)
         string2 = utils.convert_to_unicode(string2)
 
-        raw_score = self.get_raw_score(string1, string2)
+        if min_sim is None:
+            raw_score = self.get_raw_score(string1, string2)
+        else:
+            utils.sim_check_for_none(string1, string2)
+            utils.tok_check_for_string_input(string1, string2)
+            max_len = max(len(string1), len(string2))
+            # the small epsilon guards against rounding down an exact bound,
+            # the similarity itself is checked against min_sim below
+            max_distance = int(math.floor((1 - min_sim) * max_len + 1e-9))
+            raw_score = self.get_raw_score(string1, string2, max_distance)
         max_len = max(len(string1), len(string2))
         if max_len == 0:
             return 1.0
-        return 1 - (raw_score / max_len)
+        sim_score = 1 - (raw_score / max_len)
+        if min_sim is not None and sim_score < min_sim:
+            return 0.0
+        return sim_score
+
+    def get_raw_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the raw Levenshtein distances between pairs of strings.
+
+        The i-th string of strings1 is compared with the i-th string of strings2. The loop over the pairs runs in
+        compiled code without the GIL, which is much faster than calling get_raw_score on every pair.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Levenshtein distances (NumPy int64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> lev = Levenshtein()
+            >>> lev.get_raw_scores(['a', 'example', 'levenshtein'], ['', 'samples', 'frankenstein'])
+            array([1, 3, 6])
+        """
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return levenshtein_batch(codes1, offsets1, codes2, offsets2,
+                                 utils.get_num_threads(n_jobs), False)
+
+    def get_sim_scores(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Levenshtein similarity scores between pairs of strings.
+
+        The i-th string of strings1 is compared with the i-th string of strings2.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            Normalized Levenshtein similarities (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+            ValueError : If strings1 and strings2 are not of the same length.
+
+        Examples:
+            >>> lev = Levenshtein()
+            >>> lev.get_sim_scores(['a', 'example', 'levenshtein'], ['', 'samples', 'frankenstein'])
+            array([0.        , 0.57142857, 0.5       ])
+        """
+        codes1, offsets1, codes2, offsets2 = pack_string_pairs(strings1, strings2)
+        return levenshtein_batch(codes1, offsets1, codes2, offsets2,
+                                 utils.get_num_threads(n_jobs), True)
+
+    def get_raw_score_matrix(self, strings1, strings2, n_jobs=1):
+        """Computes the raw Levenshtein distance between every string of strings1 and every string of strings2.
+
+        Each string of strings1 is preprocessed once into the character bitmasks of the bit-parallel kernel, and
+        then compared with every string of strings2.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            len(strings1) x len(strings2) matrix of Levenshtein distances (NumPy int64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+
+        Examples:
+            >>> lev = Levenshtein()
+            >>> lev.get_raw_score_matrix(['example', 'levenshtein'], ['samples', 'frankenstein', ''])
+            array([[ 3, 10,  7],
+                   [10,  6, 11]])
+        """
+        utils.sim_check_for_none(strings1, strings2)
+        codes1, offsets1 = pack_strings(strings1)
+        codes2, offsets2 = pack_strings(strings2)
+        return levenshtein_matrix(codes1, offsets1, codes2, offsets2,
+                                  utils.get_num_threads(n_jobs), False)
+
+    def get_sim_score_matrix(self, strings1, strings2, n_jobs=1):
+        """Computes the normalized Levenshtein similarity between every string of strings1 and every string of
+        strings2.
+
+        Args:
+            strings1,strings2 (list of str): Input strings.
+            n_jobs (int): Number of threads to use (defaults to 1). -1 means all CPUs. Threads are only used if
+                the package was built with OpenMP support.
+
+        Returns:
+            len(strings1) x len(strings2) matrix of normalized Levenshtein similarities (NumPy float64 array).
+
+        Raises:
+            TypeError : If the inputs are None or contain items that are not strings.
+
+        Examples:
+            >>> lev = Levenshtein()
+            >>> lev.get_sim_score_matrix(['example', 'levenshtein'], ['samples', 'frankenstein', ''])
+            array([[0.57142857, 0.16666667, 0.        ],
+                   [0.09090909, 0.5       , 0.        ]])
+        """
+        utils.sim_check_for_none(strings1, strings2)
+        codes1, offsets1 = pack_strings(strings1)
+        codes2, offsets2 = pack_strings(strings2)
+        return levenshtein_matrix(codes1, offsets1, codes2, offsets2,
+                                  utils.get_num_threads(n_jobs), True)
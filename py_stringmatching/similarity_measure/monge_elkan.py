@@ -14,7 +14,8 @@ class MongeElkan(HybridSimilarityMeasure):
 
     Args:
         sim_func (function): Secondary similarity function. This is expected to be a sequence-based
-                             similarity measure (defaults to Jaro-Winkler similarity measure).
+                             similarity measure (defaults to Jaro-Winkler similarity measure). If it takes a
+                             score_cutoff keyword argument, pairs that cannot beat the current maximum are skipped.
 
     Attributes:
         sim_func (function): An attribute to store the secondary similarity function.
@@ -69,13 +70,20 @@ class MongeElkan(HybridSimilarityMeasure):
         if utils.sim_check_for_empty(bag1, bag2):
             return 0
 
+        # a secondary function that takes a score_cutoff (e.g. Jaro-Winkler)
+        # can skip the pairs that cannot beat the current maximum
+        use_cutoff = utils.sim_func_accepts_score_cutoff(self.sim_func)
+
         # aggregated sum of all the max sim score of all the elements in bag1
         # with elements in bag2
         sum_of_maxes = 0
         for el1 in bag1:
             max_sim = float('-inf')
             for el2 in bag2:
-                max_sim = max(max_sim, self.sim_func(el1, el2))
+                if use_cutoff and 0 <= max_sim <= 1:
+                    max_sim = max(max_sim, self.sim_func(el1, el2, score_cutoff=max_sim))
+                else:
+                    max_sim = max(max_sim, self.sim_func(el1, el2))
             sum_of_maxes += max_sim
 
         sim = float(sum_of_maxes) / float(len(bag1))
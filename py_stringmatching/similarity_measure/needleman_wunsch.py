@@ -18,8 +18,10 @@ class NeedlemanWunsch(SequenceSimilarityMeasure):
 
     Args:
         gap_cost (float): Cost of gap (defaults to 1.0).
-        sim_func (function): Similarity function to give a score for each correspondence between the characters (defaults
-                             to an identity function, which returns 1 if the two characters are the same and 0 otherwise.  
+        sim_func (function or SubstitutionMatrix): Similarity function to give a score for each correspondence between the characters (defaults
+                             to an identity function, which returns 1 if the two characters are the same and 0 otherwise.
+                             A SubstitutionMatrix can be given instead of a function, in which case the scores are
+                             computed in C.
                              
     Attributes:
         gap_cost (float): An attribute to store the gap cost.
@@ -56,6 +58,10 @@ class NeedlemanWunsch(SequenceSimilarityMeasure):
             >>> nw = NeedlemanWunsch(gap_cost=0.5, sim_func=lambda s1, s2 : (1.0 if s1 == s2 else -1.0))
             >>> nw.get_raw_score('GCATGCUA', 'GATTACA')
             2.5
+            >>> from py_stringmatching import SubstitutionMatrix
+            >>> nw = NeedlemanWunsch(gap_cost=0.5, sim_func=SubstitutionMatrix(match=1.0, mismatch=-1.0))
+            >>> nw.get_raw_score('GCATGCUA', 'GATTACA')
+            2.5
         """
         
         # input validations
@@ -99,7 +105,7 @@ class NeedlemanWunsch(SequenceSimilarityMeasure):
         """Set similarity function.
 
         Args:
-            sim_func (function): Similarity function to give a score for the correspondence between characters.
+            sim_func (function or SubstitutionMatrix): Similarity function to give a score for the correspondence between characters.
         """
         self.sim_func = sim_func
         return True
@@ -1,4 +1,5 @@
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_token_sets import token_ids_score
 from py_stringmatching.similarity_measure.token_similarity_measure import \
                                                     TokenSimilarityMeasure
 
@@ -24,13 +25,15 @@ class OverlapCoefficient(TokenSimilarityMeasure):
         """Computes the raw overlap coefficient score between two sets.
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Overlap coefficient (float).
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> oc = OverlapCoefficient()
@@ -48,6 +51,10 @@ class OverlapCoefficient(TokenSimilarityMeasure):
         
         # input validations
         utils.sim_check_for_none(set1, set2)
+
+        if utils.sim_check_for_token_ids(set1, set2):
+            return token_ids_score(set1, set2, 'overlap_coefficient')
+
         utils.sim_check_for_list_or_set_inputs(set1, set2)
 
         # if exact match return 1.0
@@ -69,13 +76,15 @@ class OverlapCoefficient(TokenSimilarityMeasure):
         """Computes the normalized overlap coefficient between two sets. Simply call get_raw_score. 
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Normalized overlap coefficient (float).
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> oc = OverlapCoefficient()
@@ -4,6 +4,8 @@ from __future__ import division
 
 from difflib import SequenceMatcher
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_indel import edge_indel_ratio, indel_ratio, \
+    partial_indel_lcs
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
 
@@ -21,23 +23,37 @@ class PartialRatio(SequenceSimilarityMeasure):
     Note:
     In the case where either of strings X or Y are empty, we define the Fuzzy Wuzzy ratio similarity 
     score to be 0.
+
+    Parameters:
+        engine (str): How the substrings are found and compared, default='difflib'. 'difflib' and 'indel'
+            only compare the substrings aligned with the matching blocks of difflib.SequenceMatcher, using the
+            ratio of the same engine (see Ratio). 'sliding' slides the shorter string over every substring of
+            length m, and over the shorter prefixes and suffixes where it sticks out of either end of the
+            longer string, and takes the exact maximum of the indel ratios. It keeps a character histogram of
+            the current substring, which bounds its ratio, and only runs the LCS kernel on the substrings of
+            length m whose bound can beat the best score so far and score_cutoff.
     """
-    def __init__(self):
-        pass
+    def __init__(self, engine='difflib'):
+        utils.sim_check_ratio_engine(engine, utils.PARTIAL_RATIO_ENGINES)
+        self.engine = engine
+        super(PartialRatio, self).__init__()
 
-    def get_raw_score(self, string1, string2):
+    def get_raw_score(self, string1, string2, score_cutoff=None):
         """
         Computes the Fuzzy Wuzzy partial ratio measure raw score between two strings.
         This score is in the range [0,100].
 
         Args:
             string1,string2 (str): Input strings
+            score_cutoff (float): Smallest score of interest, in the range [0, 100] (defaults to None). Scores
+                below it are returned as 0.
 
         Returns:
             Partial Ratio measure raw score (int) is returned
 
         Raises:
             TypeError: If the inputs are not strings
+            ValueError: If score_cutoff is not in the range [0, 100]
 
         Examples:
             >>> s = PartialRatio()
@@ -47,6 +63,11 @@ class PartialRatio(SequenceSimilarityMeasure):
             67
             >>> s.get_raw_score('example', 'samples')
             86
+            >>> s = PartialRatio(engine='sliding')
+            >>> s.get_raw_score('Robert Rupert', 'Rupert')
+            100
+            >>> s.get_raw_score('java was neat', 'scala is great', score_cutoff=70)
+            0
 
         References:
             * https://pypi.python.org/pypi/fuzzywuzzy
@@ -54,6 +75,7 @@ class PartialRatio(SequenceSimilarityMeasure):
         # input validations
         utils.sim_check_for_none(string1, string2)
         utils.sim_check_for_string_inputs(string1, string2)
+        utils.sim_check_score_cutoff(score_cutoff, 100)
 
         # if one of the strings is empty return 0
         if utils.sim_check_for_empty(string1, string2):
@@ -69,6 +91,9 @@ class PartialRatio(SequenceSimilarityMeasure):
             string1 = string2
             string2 = temp
 
+        if self.engine == 'sliding':
+            return _sliding_partial_ratio(string1, string2, score_cutoff)
+
         sm = SequenceMatcher(None, string1, string2)
         matching_blocks = sm.get_matching_blocks()
 
@@ -80,28 +105,35 @@ class PartialRatio(SequenceSimilarityMeasure):
             string2_ending_index = string2_starting_index + len(string1)
             string2_substr = string2[string2_starting_index:string2_ending_index]
 
-            sm2 = SequenceMatcher(None, string1, string2_substr)
-            similarity_ratio = sm2.ratio()
+            if self.engine == 'indel':
+                similarity_ratio = indel_ratio(string1, string2_substr)
+            else:
+                sm2 = SequenceMatcher(None, string1, string2_substr)
+                similarity_ratio = sm2.ratio()
             if similarity_ratio > .995:
                 return 100
             else:
                 scores.append(similarity_ratio)
 
-        return int(round(100 * max(scores)))
+        score = int(round(100 * max(scores)))
+        return score if score_cutoff is None or score >= score_cutoff else 0
 
-    def get_sim_score(self, string1, string2):
+    def get_sim_score(self, string1, string2, score_cutoff=None):
         """
         Computes the Fuzzy Wuzzy partial ratio similarity score between two strings.
         This score is in the range [0,1].
 
         Args:
             string1,string2 (str): Input strings
+            score_cutoff (float): Smallest score of interest, in the range [0, 1] (defaults to None). Scores
+                below it are returned as 0.
 
         Returns:
             Partial Ratio measure similarity score (float) is returned
 
         Raises:
             TypeError: If the inputs are not strings
+            ValueError: If score_cutoff is not in the range [0, 1]
 
         Examples:
             >>> s = PartialRatio()
@@ -118,11 +150,68 @@ class PartialRatio(SequenceSimilarityMeasure):
         # input validations
         utils.sim_check_for_none(string1, string2)
         utils.sim_check_for_string_inputs(string1, string2)
+        utils.sim_check_score_cutoff(score_cutoff)
 
         # if one of the strings is empty return 0
         if utils.sim_check_for_empty(string1, string2):
             return 0
 
-        raw_score = 1.0 * self.get_raw_score(string1, string2)
+        raw_score = 1.0 * self.get_raw_score(string1, string2, _raw_score_cutoff(score_cutoff))
         sim_score = raw_score / 100
-        return sim_score
+        return sim_score if score_cutoff is None or sim_score >= score_cutoff else 0
+
+    def get_engine(self):
+        """
+        Get engine
+
+        Returns:
+            engine (str)
+        """
+        return self.engine
+
+    def set_engine(self, engine):
+        """
+        Set engine
+
+        Args:
+            engine (str): 'difflib', 'indel' or 'sliding'
+        """
+        utils.sim_check_ratio_engine(engine, utils.PARTIAL_RATIO_ENGINES)
+        self.engine = engine
+        return True
+
+
+def _raw_score_cutoff(score_cutoff):
+    """Raw score cutoff for a similarity score cutoff, lowered by a tiny
+    margin so that score_cutoff * 100 rounding up never rejects a raw score
+    whose similarity reaches score_cutoff."""
+    if score_cutoff is None:
+        return None
+    return max(0.0, score_cutoff * 100 - 1e-9)
+
+
+def _sliding_partial_ratio(string1, string2, score_cutoff):
+    """Exact partial ratio of a non-empty string1 and a string2 that is not
+    shorter than it, over the windows of string2 of string1's length and the
+    shorter windows at both ends of string2."""
+    if string1 in string2:
+        return 100
+
+    # smallest LCS whose rounded score reaches score_cutoff
+    length = len(string1)
+    min_lcs = 0
+    if score_cutoff is not None:
+        min_lcs = max(0, int((score_cutoff - 1) * length / 100))
+        while min_lcs <= length and int(round(100 * (min_lcs / length))) < score_cutoff:
+            min_lcs += 1
+        if min_lcs > length:
+            return 0
+
+    # the windows that stick out of either end of string2 are shorter, so
+    # they are scored on their own and may beat every full window
+    best = edge_indel_ratio(string1, string2)
+    lcs = partial_indel_lcs(string1, string2, min_lcs)
+    if lcs >= 0:
+        best = max(best, 2 * lcs / (2 * length))
+    score = int(round(100 * best))
+    return score if score_cutoff is None or score >= score_cutoff else 0
@@ -2,12 +2,13 @@
 
 from __future__ import division
 
-from difflib import SequenceMatcher
 from py_stringmatching import utils
 
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
-from py_stringmatching.similarity_measure.partial_ratio import PartialRatio
+from py_stringmatching.similarity_measure.partial_ratio import PartialRatio, \
+    _raw_score_cutoff
+from py_stringmatching.similarity_measure.token_sort import _prepare, _sorted_tokens
 
 
 class PartialTokenSort(SequenceSimilarityMeasure):
@@ -23,23 +24,53 @@ class PartialTokenSort(SequenceSimilarityMeasure):
      Note:
          In the case where either of strings X or Y are empty, we define the
          Fuzzy Wuzzy partial ratio similarity score to be 0. 
+
+    Parameters:
+        engine (str): Engine of the partial ratio computed on the sorted strings, 'difflib', 'indel' or
+            'sliding' (see PartialRatio), default='difflib'
+        normalizer (Normalizer): Normalizer used to process the strings when full_process is enabled, in place
+            of the default processing (the force_ascii flag is then ignored), default=None
     """
-    def __init__(self):
-        pass
+    def __init__(self, engine='difflib', normalizer=None):
+        utils.sim_check_ratio_engine(engine, utils.PARTIAL_RATIO_ENGINES)
+        self.engine = engine
+        self.normalizer = normalizer
+        self._partial_ratio = PartialRatio(engine=engine)
+        super(PartialTokenSort, self).__init__()
 
     def _process_string_and_sort(self, s, force_ascii, full_process=True):
-        """Returns a string with tokens sorted. Processes the string if
-        full_process flag is enabled. If force_ascii flag is enabled then
-        processing removes non ascii characters from the string."""
-        # pull tokens
-        ts = utils.process_string(s, force_ascii=force_ascii) if full_process else s
-        tokens = ts.split()
-
-        # sort tokens and join
-        sorted_string = u" ".join(sorted(tokens))
-        return sorted_string.strip()
-
-    def get_raw_score(self, string1, string2, force_ascii=True, full_process=True):
+        """Returns a string with tokens sorted, from the cache if possible."""
+        return _sorted_tokens(s, force_ascii, full_process, self.normalizer)
+
+    def prepare(self, string, force_ascii=True, full_process=True):
+        """
+        Processes a string and sorts its tokens once, for a string that is compared with many others.
+
+        The result can be passed to get_raw_score or get_sim_score with the same force_ascii and full_process
+        flags, see TokenSort.prepare.
+
+        Args:
+            string (str): Input string
+            force_ascii (boolean) : Flag to remove non-ascii characters or not
+            full_process (boolean) : Flag to process the string or not
+
+        Returns:
+            Processed string with sorted tokens (str)
+
+        Raises:
+            TypeError: If the input is not a string
+
+        Examples:
+            >>> s = PartialTokenSort()
+            >>> query = s.prepare('Great is Scala!')
+            >>> query
+            'great is scala'
+            >>> s.get_raw_score(query, 'java is great')
+            77
+        """
+        return _prepare(string, force_ascii, full_process, self.normalizer)
+
+    def get_raw_score(self, string1, string2, force_ascii=True, full_process=True, score_cutoff=None):
         """
         Computes the Fuzzy Wuzzy partial token sort measure raw score between two strings.
         This score is in the range [0,100].
@@ -50,12 +81,15 @@ class PartialTokenSort(SequenceSimilarityMeasure):
             full_process (boolean) : Flag to process the string or not. Processing includes
             removing non alphanumeric characters, converting string to lower case and 
             removing leading and trailing whitespaces.
+            score_cutoff (float) : Smallest score of interest, in the range [0, 100] (defaults to None).
+            Scores below it are returned as 0.
 
         Returns:
             Partial Token Sort measure raw score (int) is returned
 
         Raises:
             TypeError: If the inputs are not strings
+            ValueError: If score_cutoff is not in the range [0, 100]
 
         Examples:
             >>> s = PartialTokenSort()
@@ -72,6 +106,7 @@ class PartialTokenSort(SequenceSimilarityMeasure):
         # input validations
         utils.sim_check_for_none(string1, string2)
         utils.sim_check_for_string_inputs(string1, string2)
+        utils.sim_check_score_cutoff(score_cutoff, 100)
 
         # if one of the strings is empty return 0
         if utils.sim_check_for_empty(string1, string2):
@@ -79,10 +114,9 @@ class PartialTokenSort(SequenceSimilarityMeasure):
 
         sorted1 = self._process_string_and_sort(string1, force_ascii, full_process=full_process)
         sorted2 = self._process_string_and_sort(string2, force_ascii, full_process=full_process)
-        partialRatio = PartialRatio()
-        return partialRatio.get_raw_score(sorted1, sorted2)
+        return self._partial_ratio.get_raw_score(sorted1, sorted2, score_cutoff)
 
-    def get_sim_score(self, string1, string2, force_ascii=True, full_process=True):
+    def get_sim_score(self, string1, string2, force_ascii=True, full_process=True, score_cutoff=None):
         """
         Computes the Fuzzy Wuzzy partial token sort similarity score between two strings.
         This score is in the range [0,1].
@@ -93,12 +127,15 @@ class PartialTokenSort(SequenceSimilarityMeasure):
             full_process (boolean) : Flag to process the string or not. Processing includes
             removing non alphanumeric characters, converting string to lower case and 
             removing leading and trailing whitespaces.
+            score_cutoff (float) : Smallest score of interest, in the range [0, 1] (defaults to None).
+            Scores below it are returned as 0.
 
         Returns:
             Partial Token Sort measure similarity score (float) is returned
 
         Raises:
             TypeError: If the inputs are not strings
+            ValueError: If score_cutoff is not in the range [0, 1]
 
         Examples:
             >>> s = PartialTokenSort()
@@ -112,6 +149,48 @@ class PartialTokenSort(SequenceSimilarityMeasure):
         References:
             * https://pypi.python.org/pypi/fuzzywuzzy
         """
-        raw_score = 1.0 * self.get_raw_score(string1, string2, force_ascii, full_process)
+        utils.sim_check_score_cutoff(score_cutoff)
+        raw_score = 1.0 * self.get_raw_score(string1, string2, force_ascii, full_process,
+                                             _raw_score_cutoff(score_cutoff))
         sim_score = raw_score / 100
-        return sim_score
\ No newline at end of file
+        return sim_score if score_cutoff is None or sim_score >= score_cutoff else 0
+
+    def get_engine(self):
+        """
+        Get engine
+
+        Returns:
+            engine (str)
+        """
+        return self.engine
+
+    def set_engine(self, engine):
+        """
+        Set engine
+
+        Args:
+            engine (str): 'difflib', 'indel' or 'sliding'
+        """
+        utils.sim_check_ratio_engine(engine, utils.PARTIAL_RATIO_ENGINES)
+        self.engine = engine
+        self._partial_ratio = PartialRatio(engine=engine)
+        return True
+
+    def get_normalizer(self):
+        """
+        Get normalizer
+
+        Returns:
+            normalizer (Normalizer)
+        """
+        return self.normalizer
+
+    def set_normalizer(self, normalizer):
+        """
+        Set normalizer
+
+        Args:
+            normalizer (Normalizer): Normalizer used to process the strings, or None for the default processing
+        """
+        self.normalizer = normalizer
+        return True
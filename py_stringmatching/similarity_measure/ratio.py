@@ -4,6 +4,7 @@ from __future__ import division
 
 from difflib import SequenceMatcher
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_indel import indel_ratio
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
 
@@ -21,9 +22,16 @@ class Ratio(SequenceSimilarityMeasure):
      Note:
          In the case where either of strings X or Y are empty, we define the
          Fuzzy Wuzzy ratio similarity score to be 0. 
+
+    Parameters:
+        engine (str): How M is computed, default='difflib'. 'difflib' uses difflib.SequenceMatcher, whose
+            matching-block heuristic gives the legacy Fuzzy Wuzzy scores. 'indel' uses M = length of the longest
+            common subsequence of X and Y, computed with a bit-parallel Cython kernel, which is exact and much
+            faster. The two engines agree on most strings but may differ slightly.
     """
-    def __init__(self):
-        pass
+    def __init__(self, engine='difflib'):
+        utils.sim_check_ratio_engine(engine)
+        self.engine = engine
 
     def get_raw_score(self, string1, string2):
         """
@@ -47,6 +55,8 @@ class Ratio(SequenceSimilarityMeasure):
             67
             >>> s.get_raw_score('example', 'samples')
             71
+            >>> Ratio(engine='indel').get_raw_score('example', 'samples')
+            71
 
         References:
             * https://pypi.python.org/pypi/fuzzywuzzy
@@ -62,6 +72,9 @@ class Ratio(SequenceSimilarityMeasure):
         string1 = utils.convert_to_unicode(string1)
         string2 = utils.convert_to_unicode(string2)
 
+        if self.engine == 'indel':
+            return int(round(100 * indel_ratio(string1, string2)))
+
         sm = SequenceMatcher(None, string1, string2)
         return int(round(100 * sm.ratio()))
 
@@ -102,3 +115,23 @@ class Ratio(SequenceSimilarityMeasure):
         raw_score = 1.0 * self.get_raw_score(string1, string2)
         sim_score = raw_score / 100
         return sim_score
+
+    def get_engine(self):
+        """
+        Get engine
+
+        Returns:
+            engine (str)
+        """
+        return self.engine
+
+    def set_engine(self, engine):
+        """
+        Set engine
+
+        Args:
+            engine (str): 'difflib' or 'indel'
+        """
+        utils.sim_check_ratio_engine(engine)
+        self.engine = engine
+        return True
@@ -17,8 +17,10 @@ class SmithWaterman(SequenceSimilarityMeasure):
 
     Args:
         gap_cost (float): Cost of gap (defaults to 1.0).
-        sim_func (function): Similarity function to give a score for the correspondence between the characters (defaults
+        sim_func (function or SubstitutionMatrix): Similarity function to give a score for the correspondence between the characters (defaults
                              to an identity function, which returns 1 if the two characters are the same and 0 otherwise).
+                             A SubstitutionMatrix can be given instead of a function, in which case the scores are
+                             computed in C.
 
     Attributes:
         gap_cost (float): An attribute to store the gap cost.
@@ -98,7 +100,7 @@ class SmithWaterman(SequenceSimilarityMeasure):
         """Set similarity function.
 
         Args:
-            sim_func (function): Similarity function to give a score for the correspondence between the characters.
+            sim_func (function or SubstitutionMatrix): Similarity function to give a score for the correspondence between the characters.
         """
         self.sim_func = sim_func
         return True
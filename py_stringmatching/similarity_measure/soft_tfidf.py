@@ -19,7 +19,8 @@ class SoftTfIdf(HybridSimilarityMeasure):
         corpus_list (list of lists): Corpus list (default is set to None) of strings. If set to None,
                                      the input list are considered the only corpus.
         sim_func (function): Secondary similarity function. This should return a similarity score between two strings (optional),
-                             default is the Jaro similarity measure.
+                             default is the Jaro similarity measure. If it takes a score_cutoff keyword argument,
+                             pairs that cannot pass the threshold are skipped.
         threshold (float): Threshold value for the secondary similarity function (defaults to 0.5). If the similarity
                            of a token pair exceeds the threshold, then the token pair is considered a match.
 
@@ -31,6 +32,7 @@ class SoftTfIdf(HybridSimilarityMeasure):
     def __init__(self, corpus_list=None, sim_func=Jaro().get_raw_score,
                  threshold=0.5):
         self.__corpus_list = corpus_list
+        self.__has_corpus = corpus_list is not None
         self.__document_frequency = {}
         self.__compute_document_frequency()
         self.__corpus_size = 0 if self.__corpus_list is None else (
@@ -92,16 +94,23 @@ class SoftTfIdf(HybridSimilarityMeasure):
             local_df[element] = local_df.get(element, 0) + 1
 
         # if corpus is not provided treat input string as corpus
-        curr_df, corpus_size = (local_df, 2) if self.__corpus_list is None else (
+        curr_df, corpus_size = (local_df, 2) if not self.__has_corpus else (
                                    (self.__document_frequency, self.__corpus_size))
 
         # calculating the term sim score against the input string 2,
         # construct similarity map
         similarity_map = {}
+        # a secondary function that takes a score_cutoff (e.g. Jaro) can skip
+        # the pairs that cannot pass the threshold or beat the current maximum
+        use_cutoff = utils.sim_func_accepts_score_cutoff(self.sim_func)
         for term_x in tf_x:
             max_score = 0.0
             for term_y in tf_y:
-                score = self.sim_func(term_x, term_y)
+                score_cutoff = max(self.threshold, max_score)
+                if use_cutoff and 0 <= score_cutoff <= 1:
+                    score = self.sim_func(term_x, term_y, score_cutoff=score_cutoff)
+                else:
+                    score = self.sim_func(term_x, term_y)
                 # adding sim only if it is above threshold and
                 # highest for this element
                 if score > self.threshold and score > max_score:
@@ -139,10 +148,19 @@ class SoftTfIdf(HybridSimilarityMeasure):
         """Get corpus list.
 
         Returns:
-            corpus list (list of lists).
+            corpus list (list of lists), None if no corpus is set or if the corpus was changed with add_documents,
+            remove_documents or update_document.
         """
         return self.__corpus_list
 
+    def has_corpus(self):
+        """Tells whether a corpus is set, with the constructor, set_corpus_list or add_documents.
+
+        Returns:
+            True if a corpus is set, False otherwise (boolean).
+        """
+        return self.__has_corpus
+
     def get_sim_func(self):
         """Get secondary similarity function.
 
@@ -184,12 +202,75 @@ class SoftTfIdf(HybridSimilarityMeasure):
             corpus_list (list of lists): Corpus list.
         """
         self.__corpus_list = corpus_list
+        self.__has_corpus = corpus_list is not None
         self.__document_frequency = {}
         self.__compute_document_frequency()
         self.__corpus_size = 0 if self.__corpus_list is None else (
                                                          len(self.__corpus_list))
         return True
 
+    def add_documents(self, documents):
+        """Adds documents to the corpus, updating the document frequencies in place.
+
+        The documents themselves are not kept: once the corpus has been changed with add_documents,
+        remove_documents or update_document, get_corpus_list returns None. If no corpus was set, the corpus
+        starts empty.
+
+        Args:
+            documents (list of lists): Documents to add, each a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+
+        Examples:
+            >>> soft_tfidf = SoftTfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']])
+            >>> soft_tfidf.add_documents([['a', 'b'], ['c']])
+            True
+            >>> soft_tfidf.get_raw_score(['a', 'b', 'a'], ['a', 'c'])
+            0.3162277660168379
+        """
+        return self.__update_corpus(documents, [])
+
+    def remove_documents(self, documents):
+        """Removes documents from the corpus, updating the document frequencies in place.
+
+        Only the document frequencies are checked, so the documents should be documents of the corpus.
+
+        Args:
+            documents (list of lists): Documents to remove, each a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+            ValueError : If no corpus is set or if the document frequencies show that a document is not in the
+                corpus, in which case the corpus is left unchanged.
+        """
+        if not self.__has_corpus:
+            raise ValueError('remove_documents requires a corpus')
+        return self.__update_corpus([], documents)
+
+    def update_document(self, old_document, new_document):
+        """Replaces a document of the corpus, updating the document frequencies in place.
+
+        Args:
+            old_document (list): Document to remove, a list of tokens.
+            new_document (list): Document to add in its place, a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+            ValueError : If no corpus is set or if the document frequencies show that old_document is not in the
+                corpus, in which case the corpus is left unchanged.
+        """
+        if not self.__has_corpus:
+            raise ValueError('update_document requires a corpus')
+        return self.__update_corpus([new_document], [old_document])
+
+    def __update_corpus(self, added, removed):
+        self.__corpus_size = utils.update_document_frequency(self.__document_frequency, self.__corpus_size,
+                                                             added, removed)
+        self.__corpus_list = None
+        self.__has_corpus = True
+        return True
+
     def __compute_document_frequency(self):
         if self.__corpus_list != None:
             for document in self.__corpus_list:
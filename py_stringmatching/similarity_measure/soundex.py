@@ -2,10 +2,42 @@
 
 import re
 
+import numpy as np
+
 from py_stringmatching import utils
 from py_stringmatching.similarity_measure.phonetic_similarity_measure import \
                                                     PhoneticSimilarityMeasure
 
+# everything but ASCII letters and digits is ignored
+_NON_ALNUM = re.compile('[^a-zA-Z0-9]+')
+
+# Translation of the characters after the first one: vowels, 'y', 'w' and
+# 'h' are dropped, (B,F,P,V)->1 (C,G,J,K,Q,S,X,Z)->2 (D,T)->3 (L)->4
+# (M,N)->5 (R)->6, and digits are kept.
+_SOUNDEX_DIGITS = {'BFPV': '1', 'CGJKQSXZ': '2', 'DT': '3', 'L': '4',
+                   'MN': '5', 'R': '6'}
+_TAIL_TABLE = str.maketrans(
+    {letter: digit for letters, digit in _SOUNDEX_DIGITS.items()
+     for letter in letters + letters.lower()})
+_TAIL_TABLE.update(str.maketrans('', '', 'AEIOUYWHaeiouywh'))
+
+
+def _soundex_code(string):
+    """Encodes a validated string as an int: the upper-cased first character
+    in the high bits, then up to three digits of 4 bits each stored as
+    digit + 1, so that codes of different lengths never collide."""
+    string = _NON_ALNUM.sub('', string)
+    if len(string) == 0:
+        raise ValueError("Undefined for string of zero length")
+
+    code = ord(string[0].upper())
+    tail = string[1:].translate(_TAIL_TABLE)
+    for i in range(3):
+        code <<= 4
+        if i < len(tail):
+            code |= ord(tail[i]) - 47
+    return code
+
 
 class Soundex(PhoneticSimilarityMeasure):
     """Soundex phonetic similarity measure class.
@@ -51,43 +83,7 @@ class Soundex(PhoneticSimilarityMeasure):
         utils.sim_check_for_none(string1, string2)
         utils.sim_check_for_string_inputs(string1, string2)
 
-        # remove all chars but alphanumeric characters
-        string1 = re.sub("[^a-zA-Z0-9]", "", string1)
-        string2 = re.sub("[^a-zA-Z0-9]", "", string2)
-
-        utils.sim_check_for_zero_len(string1, string2)
-
-        if utils.sim_check_for_exact_match(string1, string2):
-            return 1
-
-        string1, string2 = string1.upper(), string2.upper()
-        first_letter1, first_letter2 = string1[0], string2[0]
-        string1, string2 = string1[1:], string2[1:]
-
-        # remove occurrences of vowels, 'y', 'w' and 'h'
-        string1 = re.sub('[AEIOUYWH]', '', string1)
-        string2 = re.sub('[AEIOUYWH]', '', string2)
-
-        # replace (B,F,P,V)->1 (C,G,J,K,Q,S,X,Z)->2 (D,T)->3 (L)->4
-        # (M,N)->5 (R)->6
-        string1 = re.sub('[BFPV]', '1', string1)
-        string1 = re.sub('[CGJKQSXZ]', '2', string1)
-        string1 = re.sub('[DT]', '3', string1)
-        string1 = re.sub('[L]', '4', string1)
-        string1 = re.sub('[MN]', '5', string1)
-        string1 = re.sub('[R]', '6', string1)
-
-        string2 = re.sub('[BFPV]', '1', string2)
-        string2 = re.sub('[CGJKQSXZ]', '2', string2)
-        string2 = re.sub('[DT]', '3', string2)
-        string2 = re.sub('[L]', '4', string2)
-        string2 = re.sub('[MN]', '5', string2)
-        string2 = re.sub('[R]', '6', string2)
-
-        string1 = first_letter1 + string1[:3]
-        string2 = first_letter2 + string2[:3]
-
-        return 1 if string1 == string2 else 0
+        return 1 if _soundex_code(string1) == _soundex_code(string2) else 0
 
     def get_sim_score(self, string1, string2):
         """
@@ -115,3 +111,63 @@ class Soundex(PhoneticSimilarityMeasure):
 
         """
         return self.get_raw_score(string1, string2)
+
+    def encode(self, string):
+        """
+        Computes the Soundex code of a string.
+
+        Comparing two codes is an integer equality check, so a string that is compared with many others only
+        needs to be encoded once. Two strings have the same code exactly when get_raw_score returns 1 for them.
+
+        The code is an int that holds the upper-cased first letter (or digit) of the string and up to three
+        digits.
+
+        Args:
+            string (str): Input string
+
+        Returns:
+            Soundex code (int)
+
+        Raises:
+            TypeError : If the input is None or not a string
+            ValueError : If the input has no letters or digits
+
+        Examples:
+            >>> s = Soundex()
+            >>> s.encode('Robert') == s.encode('Rupert')
+            True
+            >>> s.encode('Gough') == s.encode('Goff')
+            False
+        """
+        # input validations
+        utils.tok_check_for_none(string)
+        utils.tok_check_for_string_input(string)
+
+        return _soundex_code(string)
+
+    def encode_many(self, strings):
+        """
+        Computes the Soundex codes of many strings.
+
+        Args:
+            strings (iterable of str): Input strings
+
+        Returns:
+            Soundex codes (NumPy int32 array), in the order of the input strings
+
+        Raises:
+            TypeError : If one of the inputs is None or not a string
+            ValueError : If one of the inputs has no letters or digits
+
+        Examples:
+            >>> s = Soundex()
+            >>> codes = s.encode_many(['Robert', 'Rupert', 'Rubin'])
+            >>> codes[0] == codes[1], codes[0] == codes[2]
+            (True, False)
+        """
+        codes = []
+        for string in strings:
+            utils.tok_check_for_none(string)
+            utils.tok_check_for_string_input(string)
+            codes.append(_soundex_code(string))
+        return np.array(codes, dtype=np.int32)
@@ -2,7 +2,10 @@ from __future__ import division
 from math import log, sqrt
 import collections
 
+import numpy as np
+
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_tfidf import tfidf_vector_dot
 from py_stringmatching.similarity_measure.token_similarity_measure import \
                                                     TokenSimilarityMeasure
 
@@ -13,6 +16,10 @@ class TfIdf(TokenSimilarityMeasure):
     This measure employs the notion of TF/IDF score commonly used in information retrieval (IR) to
     find documents that are relevant to keyword queries. The intuition underlying the TF/IDF measure
     is that two strings are similar if they share distinguishing terms. See the string matching chapter in the book "Principles of Data Integration"
+
+    When a corpus is given, the IDF weights of its tokens are computed once, on first use. TfIdf.vectorize turns a
+    bag into a normalized sparse TF/IDF vector with these weights, and get_raw_score scores two such vectors with a
+    merge dot product, so that a bag scored against many others is weighted only once.
     
     Args:
         corpus_list (list of lists): The corpus that will be used to compute TF and IDF values. This corpus is a list of strings, where each string has been tokenized into a list of tokens (that is, a bag of tokens). The default is set to None. In this case, when we call this TF/IDF measure on two input strings (using get_raw_score or get_sim_score), the corpus is taken to be the list of those two strings. 
@@ -24,18 +31,24 @@ class TfIdf(TokenSimilarityMeasure):
 
     def __init__(self, corpus_list=None, dampen=True):
         self.__corpus_list = corpus_list
+        self.__has_corpus = corpus_list is not None
         self.__document_frequency = {}
         self.__compute_document_frequency()
         self.__corpus_size = 0 if self.__corpus_list is None else (
                                                          len(self.__corpus_list))
         self.dampen = dampen        
+        # IDF table of the corpus, built on first use
+        self.__idf = None
+        self.__idf_dampen = None
+        self.__token_ids = None
+        self.__idf_array = None
         super(TfIdf, self).__init__()
 
     def get_raw_score(self, bag1, bag2):
         """Computes the raw TF/IDF score between two lists.
 
         Args:
-            bag1,bag2 (list): Input lists.
+            bag1,bag2 (list or tuple): Input lists, or TF/IDF vectors returned by vectorize.
 
         Returns:
             TF/IDF score between the input lists (float).
@@ -64,9 +77,17 @@ class TfIdf(TokenSimilarityMeasure):
             >>> tfidf = TfIdf()
             >>> tfidf.get_raw_score(['a', 'b', 'a'], ['a'])
             0.0
+            >>> tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']])
+            >>> tfidf.get_raw_score(tfidf.vectorize(['a', 'b', 'a']), tfidf.vectorize(['b', 'c']))
+            0.7071067690849304
         """
         # input validations
         utils.sim_check_for_none(bag1, bag2)
+
+        # prepared vectors are scored with a merge dot product
+        if isinstance(bag1, tuple) and isinstance(bag2, tuple):
+            return min(tfidf_vector_dot(bag1[0], bag1[1], bag2[0], bag2[1]), 1.0)
+
         utils.sim_check_for_list_or_set_inputs(bag1, bag2)
 
         # if the strings match exactly return 1.0
@@ -87,22 +108,26 @@ class TfIdf(TokenSimilarityMeasure):
         for element in tf_y:
             local_df[element] = local_df.get(element, 0) + 1
 
-        # if corpus is not provided treat input string as corpus
-        curr_df, corpus_size = (local_df, 2) if self.__corpus_list is None else (
-                                   (self.__document_frequency, self.__corpus_size))
+        # if corpus is not provided treat input string as corpus, else use the
+        # IDF table of the corpus (log of the IDF if dampen is set)
+        if not self.__has_corpus:
+            idf = {element: (log(2.0 / df_element) if self.dampen else 2.0 / df_element)
+                   for element, df_element in local_df.items()}
+        else:
+            self.__check_idf_table()
+            idf = self.__idf
 
         idf_element, v_x, v_y, v_x_y, v_x_2, v_y_2 = (0.0, 0.0, 0.0, 
                                                       0.0, 0.0, 0.0)
 
         # tfidf calculation
         for element in local_df.keys():
-            df_element = curr_df.get(element)
-            if df_element is None:
+            idf_element = idf.get(element)
+            if idf_element is None:
                 continue
-            idf_element = corpus_size * 1.0 / df_element
-            v_x = 0 if element not in tf_x else (log(idf_element) * log(tf_x[element] + 1)) if self.dampen else (
+            v_x = 0 if element not in tf_x else (idf_element * log(tf_x[element] + 1)) if self.dampen else (
                   idf_element * tf_x[element])
-            v_y = 0 if element not in tf_y else (log(idf_element) * log(tf_y[element] + 1)) if self.dampen else (
+            v_y = 0 if element not in tf_y else (idf_element * log(tf_y[element] + 1)) if self.dampen else (
                   idf_element * tf_y[element])
             v_x_y += v_x * v_y
             v_x_2 += v_x * v_x
@@ -146,6 +171,131 @@ class TfIdf(TokenSimilarityMeasure):
         """
         return self.get_raw_score(bag1, bag2)
 
+    def vectorize(self, bag):
+        """Computes the normalized TF/IDF vector of a list, using the IDF weights of the corpus.
+
+        The vector holds the tokens of the list that are in the corpus and have a non-zero weight, as sorted token
+        ids and float32 weights scaled to unit length. get_raw_score and get_sim_score score two vectors of the
+        same TfIdf object with a merge dot product, which gives the score of the two lists up to float32 rounding
+        (except that two identical lists whose tokens all have a zero weight score 0.0 instead of 1.0). The IDF
+        table is frozen until the corpus or the dampen flag is changed, and vectors computed before such a change
+        should not be used afterwards.
+
+        Args:
+            bag (list): Input list.
+
+        Returns:
+            Tuple of the token ids (NumPy int32 array, sorted) and the weights (NumPy float32 array) of the vector.
+
+        Raises:
+            TypeError : If the input is not a list or if it is None.
+            ValueError : If no corpus is set.
+
+        Examples:
+
+            >>> tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']])
+            >>> tfidf.vectorize(['c', 'b', 'b', 'd'])
+            (array([1, 2], dtype=int32), array([0.8457367 , 0.53360045], dtype=float32))
+        """
+        utils.tok_check_for_none(bag)
+        if not isinstance(bag, (list, set)):
+            raise TypeError('Input is expected to be a python list or set')
+        return self._vectorize_csr([bag])[1:]
+
+    def vectorize_many(self, bags):
+        """Computes the normalized TF/IDF vectors of many lists, see vectorize.
+
+        Args:
+            bags (list of lists): Input lists.
+
+        Returns:
+            List of (token ids, weights) tuples.
+
+        Raises:
+            TypeError : If one of the inputs is not a list or if it is None.
+            ValueError : If no corpus is set.
+        """
+        indptr, ids, weights = self._vectorize_csr(bags)
+        return [(ids[start:end], weights[start:end]) for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist())]
+
+    def _vectorize_csr(self, bags):
+        """Computes the normalized TF/IDF vectors of many lists, as a CSR matrix: the vector of the i-th list has
+        the token ids ids[indptr[i]:indptr[i + 1]] (sorted) and the corresponding weights."""
+        if not self.__has_corpus:
+            raise ValueError('vectorize requires a corpus')
+        self.__check_idf_table()
+
+        token_ids = self.__token_ids
+        ids, counts, lengths = [], [], []
+        for bag in bags:
+            utils.tok_check_for_none(bag)
+            if not isinstance(bag, (list, set)):
+                raise TypeError('Input is expected to be a python list or set')
+            tf = collections.Counter(bag)
+            ids.extend([token_ids.get(element, -1) for element in tf])
+            counts.extend(tf.values())
+            lengths.append(len(tf))
+        num_bags = len(lengths)
+        ids = np.array(ids, dtype=np.int32)
+        counts = np.array(counts, dtype=np.float64)
+        rows = np.repeat(np.arange(num_bags, dtype=np.intp), lengths)
+
+        # tokens of the corpus, with a non-zero weight
+        known = ids >= 0
+        ids, counts, rows = ids[known], counts[known], rows[known]
+        weights = self.__idf_array[ids] * (np.log(counts + 1) if self.dampen else counts)
+        nonzero = weights != 0
+        ids, weights, rows = ids[nonzero], weights[nonzero], rows[nonzero]
+        weights /= np.sqrt(np.bincount(rows, weights * weights, minlength=num_bags))[rows]
+
+        order = np.lexsort((ids, rows))
+        indptr = np.zeros(num_bags + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=num_bags), out=indptr[1:])
+        return indptr, ids[order], weights[order].astype(np.float32)
+
+    def get_weights(self, bag):
+        """Computes the TF/IDF weights of the tokens of a list, using the document frequencies of the corpus.
+
+        These are the weights that get_raw_score gives to the tokens of its inputs when a corpus is set. Tokens
+        that are not in the corpus get no weight.
+
+        Args:
+            bag (list): Input list.
+
+        Returns:
+            Dictionary from token to TF/IDF weight (float).
+
+        Raises:
+            TypeError : If the input is not a list or if it is None.
+            ValueError : If no corpus is set.
+
+        Examples:
+
+            >>> tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']])
+            >>> tfidf.get_weights(['a', 'b', 'b', 'd'])
+            {'a': 0.0, 'b': 1.206948960812582}
+            >>> tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']], False)
+            >>> tfidf.get_weights(['a', 'b', 'b', 'd'])
+            {'a': 1.0, 'b': 6.0}
+        """
+        utils.tok_check_for_none(bag)
+        if not isinstance(bag, (list, set)):
+            raise TypeError('Input is expected to be a python list or set')
+        if not self.__has_corpus:
+            raise ValueError('get_weights requires a corpus')
+
+        self.__check_idf_table()
+        idf = self.__idf
+
+        weights = {}
+        for element, tf_element in collections.Counter(bag).items():
+            idf_element = idf.get(element)
+            if idf_element is None:
+                continue
+            weights[element] = (idf_element * log(tf_element + 1)) if self.dampen else (
+                                idf_element * tf_element)
+        return weights
+
     def get_dampen(self):
         """Get dampen flag.
 
@@ -158,10 +308,19 @@ class TfIdf(TokenSimilarityMeasure):
         """Get corpus list.
 
         Returns:
-            corpus list (list of lists).
+            corpus list (list of lists), None if no corpus is set or if the corpus was changed with add_documents,
+            remove_documents or update_document.
         """
         return self.__corpus_list
 
+    def has_corpus(self):
+        """Tells whether a corpus is set, with the constructor, set_corpus_list or add_documents.
+
+        Returns:
+            True if a corpus is set, False otherwise (boolean).
+        """
+        return self.__has_corpus
+
     def set_dampen(self, dampen):
         """Set dampen flag.
 
@@ -169,6 +328,7 @@ class TfIdf(TokenSimilarityMeasure):
             dampen (boolean): Flag to indicate whether 'log' should be applied to TF and IDF formulas.
         """
         self.dampen = dampen
+        self.__idf = None
         return True
 
     def set_corpus_list(self, corpus_list):
@@ -178,15 +338,97 @@ class TfIdf(TokenSimilarityMeasure):
             corpus_list (list of lists): Corpus list.
         """
         self.__corpus_list = corpus_list
+        self.__has_corpus = corpus_list is not None
         self.__document_frequency = {}
         self.__compute_document_frequency()
         self.__corpus_size = 0 if self.__corpus_list is None else (
                                                          len(self.__corpus_list))
+        self.__idf = None
+        return True
+
+    def add_documents(self, documents):
+        """Adds documents to the corpus, updating the document frequencies in place.
+
+        The documents themselves are not kept: once the corpus has been changed with add_documents,
+        remove_documents or update_document, get_corpus_list returns None. If no corpus was set, the corpus
+        starts empty.
+
+        Args:
+            documents (list of lists): Documents to add, each a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+
+        Examples:
+            >>> tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a']])
+            >>> tfidf.add_documents([['a', 'b'], ['c']])
+            True
+            >>> tfidf.get_raw_score(['a', 'b', 'a'], ['a', 'c'])
+            0.0852026794595965
+        """
+        return self.__update_corpus(documents, [])
+
+    def remove_documents(self, documents):
+        """Removes documents from the corpus, updating the document frequencies in place.
+
+        Only the document frequencies are checked, so the documents should be documents of the corpus.
+
+        Args:
+            documents (list of lists): Documents to remove, each a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+            ValueError : If no corpus is set or if the document frequencies show that a document is not in the
+                corpus, in which case the corpus is left unchanged.
+        """
+        if not self.__has_corpus:
+            raise ValueError('remove_documents requires a corpus')
+        return self.__update_corpus([], documents)
+
+    def update_document(self, old_document, new_document):
+        """Replaces a document of the corpus, updating the document frequencies in place.
+
+        Args:
+            old_document (list): Document to remove, a list of tokens.
+            new_document (list): Document to add in its place, a list of tokens.
+
+        Raises:
+            TypeError : If a document is None or not a list.
+            ValueError : If no corpus is set or if the document frequencies show that old_document is not in the
+                corpus, in which case the corpus is left unchanged.
+        """
+        if not self.__has_corpus:
+            raise ValueError('update_document requires a corpus')
+        return self.__update_corpus([new_document], [old_document])
+
+    def __update_corpus(self, added, removed):
+        self.__corpus_size = utils.update_document_frequency(self.__document_frequency, self.__corpus_size,
+                                                             added, removed)
+        self.__corpus_list = None
+        self.__has_corpus = True
+        self.__idf = None
         return True
 
     def __compute_document_frequency(self):
         if self.__corpus_list != None:
+            # tokens are counted in the order they first appear in the corpus
             for document in self.__corpus_list:
-                for element in set(document):
+                for element in dict.fromkeys(document):
                     self.__document_frequency[element] = ( 
                         self.__document_frequency.get(element, 0) + 1)
+
+    def __check_idf_table(self):
+        # dampen is a public attribute, so the table is rebuilt if it was built with another dampen flag.
+        if self.__idf is None or self.__idf_dampen != self.dampen:
+            self.__build_idf_table()
+
+    def __build_idf_table(self):
+        # IDF weight of every token of the corpus (log of the IDF if dampen is set), by token and by token id.
+        # Token ids follow the order in which the tokens first appear in the corpus.
+        self.__idf_dampen = self.dampen
+        self.__idf = {}
+        for element, df_element in self.__document_frequency.items():
+            idf_element = self.__corpus_size * 1.0 / df_element
+            self.__idf[element] = log(idf_element) if self.dampen else idf_element
+        self.__token_ids = {element: token_id for token_id, element in enumerate(self.__idf)}
+        self.__idf_array = np.fromiter(self.__idf.values(), dtype=np.float64, count=len(self.__idf))
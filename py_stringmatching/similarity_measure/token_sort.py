@@ -2,13 +2,46 @@
 
 from __future__ import division
 
-from difflib import SequenceMatcher
+import functools
+
 from py_stringmatching import utils
 
 from py_stringmatching.similarity_measure.sequence_similarity_measure import \
                                                     SequenceSimilarityMeasure
 from py_stringmatching.similarity_measure.ratio import Ratio
 
+# Number of processed and sorted strings kept by the cache shared by
+# TokenSort and PartialTokenSort.
+SORTED_TOKENS_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=SORTED_TOKENS_CACHE_SIZE)
+def _sorted_tokens(s, force_ascii, full_process, normalizer=None):
+    """Returns a string with tokens sorted. Processes the string if
+    full_process flag is enabled, with the normalizer if one is given.
+    Otherwise, if force_ascii flag is enabled then processing removes non
+    ascii characters from the string."""
+    # pull tokens
+    if not full_process:
+        ts = s
+    elif normalizer is not None:
+        ts = normalizer.normalize(s)
+    else:
+        ts = utils.process_string(s, force_ascii=force_ascii)
+    tokens = ts.split()
+
+    # sort tokens and join
+    sorted_string = u" ".join(sorted(tokens))
+    return sorted_string.strip()
+
+
+def _prepare(s, force_ascii, full_process, normalizer=None):
+    # input validations
+    utils.tok_check_for_none(s)
+    utils.tok_check_for_string_input(s)
+
+    return _sorted_tokens(s, force_ascii, full_process, normalizer)
+
 
 class TokenSort(SequenceSimilarityMeasure):
     """Computes Fuzzy Wuzzy token sort similarity measure.
@@ -23,21 +56,53 @@ class TokenSort(SequenceSimilarityMeasure):
      Note:
          In the case where either of strings X or Y are empty, we define the
          Fuzzy Wuzzy ratio similarity score to be 0. 
+
+    Parameters:
+        engine (str): Engine of the ratio computed on the sorted strings, 'difflib' or 'indel' (see Ratio),
+            default='difflib'
+        normalizer (Normalizer): Normalizer used to process the strings when full_process is enabled, in place
+            of the default processing (the force_ascii flag is then ignored), default=None
     """
-    def __init__(self):
-        pass
+    def __init__(self, engine='difflib', normalizer=None):
+        utils.sim_check_ratio_engine(engine)
+        self.engine = engine
+        self.normalizer = normalizer
+        self._ratio = Ratio(engine=engine)
 
     def _process_string_and_sort(self, s, force_ascii, full_process=True):
-        """Returns a string with tokens sorted. Processes the string if
-        full_process flag is enabled. If force_ascii flag is enabled then
-        processing removes non ascii characters from the string."""
-        # pull tokens
-        ts = utils.process_string(s, force_ascii=force_ascii) if full_process else s
-        tokens = ts.split()
+        """Returns a string with tokens sorted, from the cache if possible."""
+        return _sorted_tokens(s, force_ascii, full_process, self.normalizer)
+
+    def prepare(self, string, force_ascii=True, full_process=True):
+        """
+        Processes a string and sorts its tokens once, for a string that is compared with many others.
 
-        # sort tokens and join
-        sorted_string = u" ".join(sorted(tokens))
-        return sorted_string.strip()
+        Processed strings are kept in a bounded LRU cache keyed by (string, force_ascii, full_process,
+        normalizer), which get_raw_score and get_sim_score look up first. Processing a prepared string again gives
+        the same string (except for a handful of characters such as 'Ÿ', whose lower case is removed by the default
+        processing), so the result can be passed in place of the original string with the same force_ascii and
+        full_process flags.
+
+        Args:
+            string (str): Input string
+            force_ascii (boolean) : Flag to remove non-ascii characters or not
+            full_process (boolean) : Flag to process the string or not
+
+        Returns:
+            Processed string with sorted tokens (str)
+
+        Raises:
+            TypeError: If the input is not a string
+
+        Examples:
+            >>> s = TokenSort()
+            >>> query = s.prepare('great is scala')
+            >>> query
+            'great is scala'
+            >>> s.get_raw_score(query, 'java is great')
+            81
+        """
+        return _prepare(string, force_ascii, full_process, self.normalizer)
 
     def get_raw_score(self, string1, string2, force_ascii=True, full_process=True):
         """
@@ -65,6 +130,10 @@ class TokenSort(SequenceSimilarityMeasure):
             100
             >>> s.get_raw_score('C++ and Java', 'Java and Python')
             64
+            >>> from py_stringmatching import Normalizer
+            >>> s = TokenSort(normalizer=Normalizer(fold_accents=True))
+            >>> s.get_raw_score('Crème Brûlée', 'brulee creme')
+            100
 
         References:
             * https://pypi.python.org/pypi/fuzzywuzzy
@@ -79,8 +148,7 @@ class TokenSort(SequenceSimilarityMeasure):
 
         sorted1 = self._process_string_and_sort(string1, force_ascii, full_process=full_process)
         sorted2 = self._process_string_and_sort(string2, force_ascii, full_process=full_process)
-        ratio = Ratio()
-        return ratio.get_raw_score(sorted1, sorted2)
+        return self._ratio.get_raw_score(sorted1, sorted2)
 
     def get_sim_score(self, string1, string2, force_ascii=True, full_process=True):
         """
@@ -115,3 +183,43 @@ class TokenSort(SequenceSimilarityMeasure):
         raw_score = 1.0 * self.get_raw_score(string1, string2, force_ascii, full_process)
         sim_score = raw_score / 100
         return sim_score
+
+    def get_engine(self):
+        """
+        Get engine
+
+        Returns:
+            engine (str)
+        """
+        return self.engine
+
+    def set_engine(self, engine):
+        """
+        Set engine
+
+        Args:
+            engine (str): 'difflib' or 'indel'
+        """
+        utils.sim_check_ratio_engine(engine)
+        self.engine = engine
+        self._ratio = Ratio(engine=engine)
+        return True
+
+    def get_normalizer(self):
+        """
+        Get normalizer
+
+        Returns:
+            normalizer (Normalizer)
+        """
+        return self.normalizer
+
+    def set_normalizer(self, normalizer):
+        """
+        Set normalizer
+
+        Args:
+            normalizer (Normalizer): Normalizer used to process the strings, or None for the default processing
+        """
+        self.normalizer = normalizer
+        return True
@@ -1,6 +1,7 @@
 """Tversky index similarity measure"""
 
 from py_stringmatching import utils
+from py_stringmatching.similarity_measure.cython.cython_token_sets import token_ids_score
 from py_stringmatching.similarity_measure.token_similarity_measure import \
                                                     TokenSimilarityMeasure
 
@@ -31,13 +32,15 @@ class TverskyIndex(TokenSimilarityMeasure):
         where, :math: \alpha, \beta >=0
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Tversly index similarity (float)
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> tvi = TverskyIndex()
@@ -56,6 +59,10 @@ class TverskyIndex(TokenSimilarityMeasure):
         """
         # input validations
         utils.sim_check_for_none(set1, set2)
+
+        if utils.sim_check_for_token_ids(set1, set2):
+            return token_ids_score(set1, set2, 'tversky_index', self.alpha, self.beta)
+
         utils.sim_check_for_list_or_set_inputs(set1, set2)
 
         # if exact match return 1.0
@@ -80,13 +87,15 @@ class TverskyIndex(TokenSimilarityMeasure):
         Computes the normalized tversky index similarity between two sets.
 
         Args:
-            set1,set2 (set or list): Input sets (or lists). Input lists are converted to sets.
+            set1,set2 (set or list or array): Input sets (or lists), or sorted arrays of unique token ids
+                encoded by the same Vocabulary. Input lists are converted to sets.
 
         Returns:
             Normalized tversky index similarity (float)
 
         Raises:
             TypeError : If the inputs are not sets (or lists) or if one of the inputs is None.
+            ValueError : If an input array of token ids is not sorted and unique.
 
         Examples:
             >>> tvi = TverskyIndex()
@@ -0,0 +1,319 @@
+from __future__ import unicode_literals
+
+import itertools
+import unittest
+from nose.tools import *
+
+import numpy as np
+
+from py_stringmatching.index.set_similarity_index import SetSimilarityIndex
+from py_stringmatching.index.hamming_index import HammingIndex
+from py_stringmatching.index.lsh_index import LSHIndex, lsh_parameters
+from py_stringmatching.index.soundex_index import SoundexIndex
+from py_stringmatching.minhash import MinHash
+from py_stringmatching.similarity_measure.cosine import Cosine
+from py_stringmatching.similarity_measure.dice import Dice
+from py_stringmatching.similarity_measure.hamming_distance import HammingDistance
+from py_stringmatching.similarity_measure.jaccard import Jaccard
+from py_stringmatching.similarity_measure.overlap_coefficient import OverlapCoefficient
+from py_stringmatching.similarity_measure.soundex import Soundex
+
+
+class SoundexIndexTestCases(unittest.TestCase):
+    def setUp(self):
+        self.names = ['Robert', 'Rupert', 'Rubin', 'Ashcraft', 'Ashcroft', 'Tymczak', 'Pfister', 'robert']
+        self.index = SoundexIndex()
+        self.index.add_many(list(range(len(self.names))), self.names)
+
+    def test_query(self):
+        self.assertEqual(list(self.index.query('Rubert')), [0, 1, 7])
+        self.assertEqual(list(self.index.query('Ashcroft')), [3, 4])
+        self.assertEqual(list(self.index.query('Lee')), [])
+
+    def test_candidate_pairs(self):
+        soundex = Soundex()
+        expected = set((i, j) for i, j in itertools.combinations(range(len(self.names)), 2)
+                       if soundex.get_raw_score(self.names[i], self.names[j]) == 1)
+        pairs = list(self.index.candidate_pairs())
+        self.assertEqual(len(pairs), len(expected))
+        self.assertEqual(set(pairs), expected)
+
+    def test_add(self):
+        index = SoundexIndex()
+        index.add('a', 'Robert')
+        index.add('b', 'Rupert')
+        self.assertEqual(len(index), 2)
+        self.assertEqual(list(index.query('Robert')), ['a', 'b'])
+        # adding an existing record id replaces its string
+        index.add('a', 'Rubin')
+        self.assertEqual(len(index), 2)
+        self.assertEqual(list(index.query('Robert')), ['b'])
+        self.assertEqual(list(index.query('Rubin')), ['a'])
+
+    def test_remove(self):
+        self.index.remove(1)
+        self.assertNotIn(1, self.index)
+        self.assertEqual(list(self.index.query('Robert')), [0, 7])
+        self.index.remove(5)
+        self.assertEqual(list(self.index.query('Tymczak')), [])
+        self.assertEqual(len(self.index), len(self.names) - 2)
+        self.assertNotIn(Soundex().encode('Tymczak'), self.index.get_block_sizes())
+
+    def test_get_block_sizes(self):
+        sizes = self.index.get_block_sizes()
+        self.assertEqual(sum(sizes.values()), len(self.names))
+        self.assertEqual(sizes[Soundex().encode('Robert')], 3)
+
+    @raises(KeyError)
+    def test_remove_missing(self):
+        self.index.remove(100)
+
+    @raises(TypeError)
+    def test_invalid_input_none_add(self):
+        self.index.add(100, None)
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_add_many(self):
+        self.index.add_many([1, 2], ['Robert'])
+
+    @raises(ValueError)
+    def test_invalid_input_no_alnum_query(self):
+        self.index.query('..')
+
+
+class SetSimilarityIndexTestCases(unittest.TestCase):
+    def setUp(self):
+        self.sets = [{'data', 'science'}, {'data', 'mining', 'python'}, {'data'}, {'spark', 'scala'},
+                     {'python', 'science', 'data'}, set()]
+        self.index = SetSimilarityIndex()
+        self.index.add_many(list('abcdef'), self.sets)
+
+    def brute_force(self, query, k, measure):
+        scores = [(record_id, measure.get_raw_score(query, token_set))
+                  for record_id, token_set in zip('abcdef', self.sets) if query & token_set]
+        return sorted(scores, key=lambda pair: -pair[1])[:k]
+
+    def test_topk(self):
+        queries = [{'data', 'science'}, {'python', 'data'}, {'scala', 'java'}, {'data', 'r', 'python', 'mining'}]
+        for name, measure in (('jaccard', Jaccard()), ('cosine', Cosine()), ('dice', Dice())):
+            for query in queries:
+                for k in (1, 2, 3, 10):
+                    self.assertEqual(self.index.topk(query, k, name), self.brute_force(query, k, measure))
+
+    def test_topk_measure_objects(self):
+        for name, measure in (('jaccard', Jaccard()), ('cosine', Cosine()), ('dice', Dice())):
+            query = {'python', 'data'}
+            self.assertEqual(self.index.topk(query, 3, measure), self.index.topk(query, 3, name))
+
+    def test_topk_ties_in_insertion_order(self):
+        self.assertEqual(self.index.topk({'data'}, 3), [('c', 1.0), ('a', 0.5), ('b', 1.0 / 3)])
+        self.assertEqual(self.index.topk({'mining', 'python'}, 2, 'dice'), [('b', 0.8), ('e', 0.4)])
+
+    def test_topk_no_shared_token(self):
+        self.assertEqual(self.index.topk({'java'}, 3), [])
+        self.assertEqual(self.index.topk([], 3), [])
+
+    def test_topk_list_query(self):
+        self.assertEqual(self.index.topk(['data', 'science', 'data'], 1), [('a', 1.0)])
+
+    def test_add(self):
+        self.index.add('g', ['spark', 'scala', 'spark'])
+        self.assertEqual(self.index.topk({'spark', 'scala'}, 2), [('d', 1.0), ('g', 1.0)])
+        self.index.add('d', {'spark'})
+        self.assertEqual(self.index.topk({'spark', 'scala'}, 2), [('g', 1.0), ('d', 0.5)])
+        self.assertEqual(len(self.index), 7)
+
+    def test_remove(self):
+        self.index.remove('c')
+        self.assertEqual(self.index.topk({'data'}, 1), [('a', 0.5)])
+        self.assertEqual(len(self.index), 5)
+        self.assertFalse('c' in self.index)
+        self.assertTrue('a' in self.index)
+
+    @raises(KeyError)
+    def test_remove_missing(self):
+        self.index.remove('z')
+
+    @raises(TypeError)
+    def test_invalid_input_none_add(self):
+        self.index.add('g', None)
+
+    @raises(TypeError)
+    def test_invalid_input_string_add(self):
+        self.index.add('g', 'data')
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_add_many(self):
+        self.index.add_many(['g', 'h'], [{'data'}])
+
+    @raises(TypeError)
+    def test_invalid_input_none_query(self):
+        self.index.topk(None, 1)
+
+    @raises(ValueError)
+    def test_invalid_measure(self):
+        self.index.topk({'data'}, 1, 'overlap_coefficient')
+
+    @raises(ValueError)
+    def test_invalid_measure_object(self):
+        self.index.topk({'data'}, 1, OverlapCoefficient())
+
+    @raises(ValueError)
+    def test_invalid_k(self):
+        self.index.topk({'data'}, 0)
+
+
+class LSHIndexTestCases(unittest.TestCase):
+    def setUp(self):
+        self.sets = [set('t%d' % i for i in range(start, start + 20)) for start in (0, 1, 50, 100, 0)]
+        self.signatures = MinHash().signatures(self.sets)
+        self.index = LSHIndex(bands=16, rows=8)
+        self.index.add_many(list('abcde'), self.signatures)
+
+    def test_candidate_pairs(self):
+        self.assertEqual(set(self.index.candidate_pairs()), {('a', 'b'), ('a', 'e'), ('b', 'e')})
+
+    def test_candidate_pairs_share_a_band(self):
+        signatures = MinHash(num_perm=16).signatures([{'a', 'b', 'c'}, {'a', 'b', 'd'}, {'a', 'e'}, {'f'},
+                                                      {'a', 'b', 'c', 'd'}, {'c', 'e'}])
+        index = LSHIndex(bands=8, rows=2)
+        index.add_many(list(range(len(signatures))), signatures)
+        expected = [(i, j) for i, j in itertools.combinations(range(len(signatures)), 2)
+                    if any((signatures[i][2 * band:2 * band + 2] == signatures[j][2 * band:2 * band + 2]).all()
+                           for band in range(8))]
+        pairs = list(index.candidate_pairs())
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertEqual(sorted(pairs), expected)
+
+    def test_query(self):
+        self.assertEqual(self.index.query(self.signatures[0]), ['a', 'b', 'e'])
+        self.assertEqual(self.index.query(self.signatures[2]), ['c'])
+        self.assertEqual(self.index.query(MinHash().signature({'x', 'y'})), [])
+
+    def test_add(self):
+        self.index.add('f', self.signatures[2])
+        self.assertEqual(self.index.query(self.signatures[2]), ['c', 'f'])
+        # adding an existing record id replaces its signature
+        self.index.add('a', self.signatures[3])
+        self.assertEqual(self.index.query(self.signatures[3]), ['d', 'a'])
+        self.assertEqual(set(self.index.candidate_pairs()), {('b', 'e'), ('c', 'f'), ('d', 'a')})
+        self.assertEqual(len(self.index), 6)
+
+    def test_remove(self):
+        self.index.remove('b')
+        self.assertFalse('b' in self.index)
+        self.assertTrue('a' in self.index)
+        self.assertEqual(list(self.index.candidate_pairs()), [('a', 'e')])
+        self.assertEqual(len(self.index), 4)
+
+    def test_get_threshold(self):
+        self.assertAlmostEqual(self.index.get_threshold(), (1.0 / 16) ** (1.0 / 8))
+        self.assertEqual(self.index.get_bands(), 16)
+        self.assertEqual(self.index.get_rows(), 8)
+
+    def test_lsh_parameters(self):
+        bands, rows = lsh_parameters(0.8, 128)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertAlmostEqual((1.0 / bands) ** (1.0 / rows), 0.8, delta=0.1)
+        self.assertGreater(lsh_parameters(0.3, 128)[0], bands)
+
+    @raises(KeyError)
+    def test_remove_missing(self):
+        self.index.remove('z')
+
+    @raises(TypeError)
+    def test_invalid_input_none_add(self):
+        self.index.add('f', None)
+
+    @raises(TypeError)
+    def test_invalid_input_list_add(self):
+        self.index.add('f', self.signatures[0].tolist())
+
+    @raises(ValueError)
+    def test_invalid_input_short_signature(self):
+        self.index.query(self.signatures[0][:64])
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_add_many(self):
+        self.index.add_many(['f'], self.signatures)
+
+    @raises(ValueError)
+    def test_invalid_bands(self):
+        LSHIndex(bands=0)
+
+    @raises(ValueError)
+    def test_invalid_threshold_lsh_parameters(self):
+        lsh_parameters(1.5, 128)
+
+
+class HammingIndexTestCases(unittest.TestCase):
+    def setUp(self):
+        self.codes = np.array([0b1111, 0b1100, 0b0111, 2 ** 64 - 1, 2 ** 64 - 2, 0], dtype=np.uint64)
+        self.index = HammingIndex(max_distance=2)
+        self.index.add_many(list('abcdef'), self.codes)
+
+    def brute_force(self, codes, max_distance):
+        hd = HammingDistance()
+        return [(i, j, hd.get_raw_score(codes[i], codes[j])) for i, j in itertools.combinations(range(len(codes)), 2)
+                if hd.get_raw_score(codes[i], codes[j]) <= max_distance]
+
+    def test_query(self):
+        self.assertEqual(self.index.query(0b1110), [('a', 1), ('b', 1), ('c', 2)])
+        self.assertEqual(self.index.query(np.uint64(2 ** 64 - 1)), [('d', 0), ('e', 1)])
+        self.assertEqual(self.index.query(2 ** 40), [('f', 1)])
+
+    def test_pairs(self):
+        self.assertEqual(list(self.index.pairs()), [('a', 'b', 2), ('a', 'c', 1), ('b', 'f', 2), ('d', 'e', 1)])
+
+    def test_pairs_brute_force(self):
+        rng = np.random.RandomState(0)
+        base = rng.randint(0, 2 ** 62, size=3).astype(np.uint64)
+        flips = [sum(1 << int(bit) for bit in rng.choice(64, rng.randint(0, 5), replace=False)) for _ in range(40)]
+        codes = base[rng.randint(0, 3, size=40)] ^ np.array(flips, dtype=np.uint64)
+        for max_distance, num_chunks in [(0, 1), (3, 4), (4, 2), (5, 3), (6, 7)]:
+            index = HammingIndex(max_distance, num_chunks)
+            index.add_many(list(range(len(codes))), codes)
+            self.assertEqual(list(index.pairs()), self.brute_force(codes, max_distance))
+
+    def test_add(self):
+        self.index.add('g', 0b1110)
+        self.assertEqual(self.index.query(0b1110), [('g', 0), ('a', 1), ('b', 1), ('c', 2)])
+        # adding an existing record id replaces its code
+        self.index.add('a', 0)
+        self.assertEqual(self.index.query(0b1111), [('c', 1), ('g', 1), ('b', 2)])
+        self.assertEqual(len(self.index), 7)
+
+    def test_remove(self):
+        self.index.remove('a')
+        self.assertFalse('a' in self.index)
+        self.assertTrue('b' in self.index)
+        self.assertEqual(list(self.index.pairs()), [('b', 'f', 2), ('d', 'e', 1)])
+        self.assertEqual(len(self.index), 5)
+
+    def test_get_max_distance_and_num_chunks(self):
+        self.assertEqual(self.index.get_max_distance(), 2)
+        self.assertEqual(self.index.get_num_chunks(), 3)
+
+    @raises(KeyError)
+    def test_remove_missing(self):
+        self.index.remove('z')
+
+    @raises(TypeError)
+    def test_invalid_input_none_add(self):
+        self.index.add('g', None)
+
+    @raises(ValueError)
+    def test_invalid_input_negative_code(self):
+        self.index.add('g', -1)
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_add_many(self):
+        self.index.add_many(['g'], self.codes)
+
+    @raises(ValueError)
+    def test_invalid_max_distance(self):
+        HammingIndex(max_distance=64)
+
+    @raises(ValueError)
+    def test_invalid_num_chunks(self):
+        HammingIndex(max_distance=12, num_chunks=1)
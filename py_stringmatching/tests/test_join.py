@@ -0,0 +1,286 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+from nose.tools import *
+
+import numpy as np
+
+from py_stringmatching.join.all_pairs_set_similarity import AllPairsSetSimilarity
+from py_stringmatching.join.set_sim_join import SetSimJoin
+from py_stringmatching.join.tfidf_join import TfIdfJoin
+from py_stringmatching.similarity_measure.cosine import Cosine
+from py_stringmatching.similarity_measure.dice import Dice
+from py_stringmatching.similarity_measure.jaccard import Jaccard
+from py_stringmatching.similarity_measure.overlap_coefficient import OverlapCoefficient
+from py_stringmatching.similarity_measure.tfidf import TfIdf
+from py_stringmatching.similarity_measure.tversky_index import TverskyIndex
+from py_stringmatching.vocabulary import Vocabulary
+
+
+def random_sets(rng, num_sets, num_tokens=30, max_size=6):
+    return [set(str(rng.randrange(num_tokens)) for _ in range(rng.randrange(max_size)))
+            for _ in range(num_sets)]
+
+
+class AllPairsSetSimilarityTestCases(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.sets1 = random_sets(rng, 40)
+        self.sets2 = random_sets(rng, 50)
+        self.measures = {'jaccard': Jaccard(), 'cosine': Cosine(), 'dice': Dice(),
+                         'overlap_coefficient': OverlapCoefficient(), 'tversky_index': TverskyIndex(0.2, 0.9)}
+
+    def brute_force(self, measure, threshold):
+        return [(i, j, measure.get_raw_score(set1, set2))
+                for i, set1 in enumerate(self.sets1) for j, set2 in enumerate(self.sets2)
+                if len(set1 & set2) > 0 and measure.get_raw_score(set1, set2) >= threshold]
+
+    def test_get_pairs(self):
+        for name, measure in self.measures.items():
+            for threshold in [0.0, 0.5, 1.0]:
+                for chunk_size in [1, 7, 1000]:
+                    all_pairs = AllPairsSetSimilarity(name, alpha=0.2, beta=0.9, chunk_size=chunk_size)
+                    rows1, rows2, scores = all_pairs.get_pairs(self.sets1, self.sets2, threshold)
+                    self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())),
+                                     self.brute_force(measure, threshold))
+
+    def test_token_id_arrays(self):
+        vocabulary = Vocabulary()
+        ids1 = vocabulary.encode_many(self.sets1)
+        ids2 = vocabulary.encode_many(self.sets2)
+        all_pairs = AllPairsSetSimilarity('dice')
+        for got, expected in zip(all_pairs.get_pairs(ids1, ids2, 0.4),
+                                 all_pairs.get_pairs(self.sets1, self.sets2, 0.4)):
+            self.assertEqual(got.tolist(), expected.tolist())
+
+    @raises(TypeError)
+    def test_token_id_arrays_and_sets(self):
+        AllPairsSetSimilarity().get_pairs([np.array([0, 1], dtype=np.int32)], [['a', 'b']])
+
+    @raises(ValueError)
+    def test_unsorted_token_id_arrays(self):
+        AllPairsSetSimilarity().get_pairs([np.array([0, 1], dtype=np.int32), np.array([2, 1], dtype=np.int32)],
+                                          [np.array([1], dtype=np.int32)])
+
+    def test_empty_tables(self):
+        rows1, rows2, scores = AllPairsSetSimilarity().get_pairs([], [['a']])
+        self.assertEqual(len(rows1), 0)
+        self.assertEqual(scores.dtype, np.float64)
+        rows1, rows2, scores = AllPairsSetSimilarity().get_pairs([[], ['a']], [[], ['b']])
+        self.assertEqual(len(rows1), 0)
+
+    def test_get_set_measure(self):
+        all_pairs = AllPairsSetSimilarity()
+        self.assertEqual(all_pairs.get_measure(), 'jaccard')
+        self.assertEqual(all_pairs.set_measure('cosine'), True)
+        self.assertEqual(all_pairs.get_measure(), 'cosine')
+
+    def test_measure_objects(self):
+        for name, measure in self.measures.items():
+            rows1, rows2, scores = AllPairsSetSimilarity(measure).get_pairs(self.sets1, self.sets2, 0.3)
+            self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())),
+                             self.brute_force(measure, 0.3))
+        all_pairs = AllPairsSetSimilarity()
+        dice = Dice()
+        self.assertEqual(all_pairs.set_measure(dice), True)
+        self.assertIs(all_pairs.get_measure(), dice)
+
+    @raises(ValueError)
+    def test_invalid_measure(self):
+        AllPairsSetSimilarity('levenshtein')
+
+    @raises(ValueError)
+    def test_invalid_measure_object(self):
+        AllPairsSetSimilarity(TfIdf())
+
+    @raises(ValueError)
+    def test_invalid_threshold(self):
+        AllPairsSetSimilarity().get_pairs([['a']], [['a']], 1.5)
+
+    @raises(ValueError)
+    def test_invalid_chunk_size(self):
+        AllPairsSetSimilarity(chunk_size=0)
+
+    @raises(TypeError)
+    def test_invalid_set(self):
+        AllPairsSetSimilarity().get_pairs([['a'], None], [['a']])
+
+    @raises(TypeError)
+    def test_invalid_set_type(self):
+        AllPairsSetSimilarity().get_pairs(['ab'], [['a']])
+
+
+class SetSimJoinTestCases(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.sets1 = random_sets(rng, 60, num_tokens=25, max_size=9)
+        self.sets2 = random_sets(rng, 70, num_tokens=25, max_size=9)
+        self.measures = {'jaccard': Jaccard(), 'cosine': Cosine(), 'dice': Dice(),
+                         'overlap_coefficient': OverlapCoefficient()}
+
+    def test_get_pairs(self):
+        for name, measure in self.measures.items():
+            for threshold in [0.0, 0.3, 0.5, 0.75, 0.8, 1.0]:
+                rows1, rows2, scores = SetSimJoin(name, threshold).get_pairs(self.sets1, self.sets2)
+                expected = [(i, j, measure.get_raw_score(set1, set2))
+                            for i, set1 in enumerate(self.sets1) for j, set2 in enumerate(self.sets2)
+                            if len(set1 & set2) > 0 and measure.get_raw_score(set1, set2) >= threshold]
+                self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())), expected)
+
+    def test_self_join(self):
+        for name, measure in self.measures.items():
+            for threshold in [0.0, 0.5, 0.8]:
+                rows1, rows2, scores = SetSimJoin(name, threshold).get_pairs(self.sets1)
+                expected = [(i, j, measure.get_raw_score(self.sets1[i], self.sets1[j]))
+                            for i in range(len(self.sets1)) for j in range(i + 1, len(self.sets1))
+                            if len(self.sets1[i] & self.sets1[j]) > 0 and
+                            measure.get_raw_score(self.sets1[i], self.sets1[j]) >= threshold]
+                self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())), expected)
+
+    def test_token_id_arrays(self):
+        vocabulary = Vocabulary()
+        ids1 = vocabulary.encode_many(self.sets1)
+        ids2 = vocabulary.encode_many(self.sets2)
+        join = SetSimJoin('cosine', 0.6)
+        for got, expected in zip(join.get_pairs(ids1, ids2), join.get_pairs(self.sets1, self.sets2)):
+            self.assertEqual(got.tolist(), expected.tolist())
+
+    def test_empty_tables(self):
+        rows1, rows2, scores = SetSimJoin('jaccard', 0.5).get_pairs([], [['a']])
+        self.assertEqual(len(rows1), 0)
+        rows1, rows2, scores = SetSimJoin('jaccard', 0.5).get_pairs([[], []])
+        self.assertEqual(len(rows1), 0)
+
+    def test_get_set_parameters(self):
+        join = SetSimJoin('jaccard', 0.5)
+        self.assertEqual(join.get_threshold(), 0.5)
+        self.assertEqual(join.set_threshold(0.7), True)
+        self.assertEqual(join.get_threshold(), 0.7)
+        self.assertEqual(join.get_measure(), 'jaccard')
+        self.assertEqual(join.set_measure('dice'), True)
+        self.assertEqual(join.get_measure(), 'dice')
+
+    @raises(ValueError)
+    def test_invalid_measure(self):
+        SetSimJoin('tversky_index', 0.5)
+
+    def test_measure_objects(self):
+        for name, measure in self.measures.items():
+            for got, expected in zip(SetSimJoin(measure, 0.5).get_pairs(self.sets1, self.sets2),
+                                     SetSimJoin(name, 0.5).get_pairs(self.sets1, self.sets2)):
+                self.assertEqual(got.tolist(), expected.tolist())
+        join = SetSimJoin('jaccard', 0.5)
+        cosine = Cosine()
+        self.assertEqual(join.set_measure(cosine), True)
+        self.assertIs(join.get_measure(), cosine)
+
+    @raises(ValueError)
+    def test_invalid_measure_object(self):
+        SetSimJoin(TverskyIndex(), 0.5)
+
+    @raises(ValueError)
+    def test_invalid_threshold(self):
+        SetSimJoin('jaccard', -0.1)
+
+    @raises(TypeError)
+    def test_invalid_set(self):
+        SetSimJoin('jaccard', 0.5).get_pairs([['a'], None])
+
+
+def random_bags(rng, num_bags, num_tokens=30, max_size=6):
+    return [[str(rng.randrange(num_tokens)) for _ in range(rng.randrange(max_size))] for _ in range(num_bags)]
+
+
+class TfIdfJoinTestCases(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.bags1 = random_bags(rng, 60, num_tokens=25, max_size=9)
+        self.bags2 = random_bags(rng, 70, num_tokens=25, max_size=9)
+        self.tfidfs = [TfIdf(self.bags1 + self.bags2), TfIdf(self.bags1 + self.bags2, dampen=False)]
+
+    def expected_pairs(self, tfidf, bags1, bags2, threshold, self_join=False):
+        vectors1 = tfidf.vectorize_many(bags1)
+        vectors2 = tfidf.vectorize_many(bags2)
+        pairs = []
+        for i, vector1 in enumerate(vectors1):
+            for j, vector2 in enumerate(vectors2):
+                if self_join and j <= i:
+                    continue
+                score = tfidf.get_raw_score(vector1, vector2)
+                if len(np.intersect1d(vector1[0], vector2[0])) > 0 and score >= threshold:
+                    pairs.append((i, j, score))
+        return pairs
+
+    def test_get_pairs(self):
+        for tfidf in self.tfidfs:
+            for threshold in [0.0, 0.3, 0.5, 0.8, 1.0]:
+                rows1, rows2, scores = TfIdfJoin(tfidf, threshold).get_pairs(self.bags1, self.bags2)
+                self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())),
+                                 self.expected_pairs(tfidf, self.bags1, self.bags2, threshold))
+
+    def test_get_pairs_scores(self):
+        rows1, rows2, scores = TfIdfJoin(self.tfidfs[0], 0.4).get_pairs(self.bags1, self.bags2)
+        for i, j, score in zip(rows1.tolist(), rows2.tolist(), scores.tolist()):
+            self.assertAlmostEqual(score, self.tfidfs[0].get_raw_score(self.bags1[i], self.bags2[j]), places=6)
+
+    def test_self_join(self):
+        for threshold in [0.0, 0.5, 0.8]:
+            rows1, rows2, scores = TfIdfJoin(self.tfidfs[0], threshold).get_pairs(self.bags1)
+            self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())),
+                             self.expected_pairs(self.tfidfs[0], self.bags1, self.bags1, threshold, True))
+
+    def test_get_topk(self):
+        for tfidf in self.tfidfs:
+            for threshold, k in [(0.0, 1), (0.0, 3), (0.4, 2), (0.0, 100)]:
+                rows1, rows2, scores = TfIdfJoin(tfidf, threshold).get_topk(self.bags1, self.bags2, k)
+                pairs = self.expected_pairs(tfidf, self.bags1, self.bags2, threshold)
+                expected = []
+                for i in range(len(self.bags1)):
+                    expected.extend(sorted([pair for pair in pairs if pair[0] == i],
+                                           key=lambda pair: (-pair[2], pair[1]))[:k])
+                self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())), expected)
+
+    def test_get_topk_self(self):
+        rows1, rows2, scores = TfIdfJoin(self.tfidfs[0]).get_topk(self.bags1, None, 2)
+        self.assertTrue(all(row1 != row2 for row1, row2 in zip(rows1.tolist(), rows2.tolist())))
+        pairs = self.expected_pairs(self.tfidfs[0], self.bags1, self.bags1, 0.0)
+        expected = []
+        for i in range(len(self.bags1)):
+            expected.extend(sorted([pair for pair in pairs if pair[0] == i and pair[1] != i],
+                                   key=lambda pair: (-pair[2], pair[1]))[:2])
+        self.assertEqual(list(zip(rows1.tolist(), rows2.tolist(), scores.tolist())), expected)
+
+    def test_empty_tables(self):
+        rows1, rows2, scores = TfIdfJoin(self.tfidfs[0], 0.5).get_pairs([], [['1']])
+        self.assertEqual(len(rows1), 0)
+        rows1, rows2, scores = TfIdfJoin(self.tfidfs[0]).get_topk([[], ['unknown']], None, 3)
+        self.assertEqual(len(rows1), 0)
+
+    def test_get_set_parameters(self):
+        join = TfIdfJoin(self.tfidfs[0], 0.5)
+        self.assertEqual(join.get_threshold(), 0.5)
+        self.assertEqual(join.set_threshold(0.7), True)
+        self.assertEqual(join.get_threshold(), 0.7)
+        self.assertEqual(join.set_tfidf(self.tfidfs[1]), True)
+        self.assertIs(join.get_tfidf(), self.tfidfs[1])
+
+    @raises(TypeError)
+    def test_invalid_tfidf(self):
+        TfIdfJoin(Cosine(), 0.5)
+
+    @raises(ValueError)
+    def test_invalid_threshold(self):
+        TfIdfJoin(self.tfidfs[0], 1.5)
+
+    @raises(ValueError)
+    def test_invalid_k(self):
+        TfIdfJoin(self.tfidfs[0]).get_topk(self.bags1, self.bags2, 0)
+
+    @raises(ValueError)
+    def test_no_corpus(self):
+        TfIdfJoin(TfIdf(), 0.5).get_pairs(self.bags1, self.bags2)
+
+    @raises(TypeError)
+    def test_invalid_bag(self):
+        TfIdfJoin(self.tfidfs[0], 0.5).get_pairs([['a'], None])
@@ -0,0 +1,65 @@
+from __future__ import unicode_literals
+
+import unittest
+from nose.tools import *
+
+import numpy as np
+
+from py_stringmatching.minhash import MinHash
+from py_stringmatching.similarity_measure.jaccard import Jaccard
+
+
+class MinHashTestCases(unittest.TestCase):
+    def setUp(self):
+        self.minhash = MinHash(num_perm=256)
+
+    def test_signature(self):
+        signature = self.minhash.signature(['data', 'science', 'data'])
+        self.assertEqual(signature.dtype, np.uint64)
+        self.assertEqual(signature.shape, (256,))
+        self.assertEqual(signature.tolist(), self.minhash.signature({'science', 'data'}).tolist())
+        self.assertEqual(signature.tolist(), MinHash(num_perm=256).signature(['science', 'data']).tolist())
+        self.assertNotEqual(signature.tolist(), MinHash(num_perm=256, seed=2).signature(['science', 'data']).tolist())
+
+    def test_signature_empty(self):
+        self.assertEqual(self.minhash.signature([]).tolist(), [2 ** 64 - 1] * 256)
+
+    def test_signatures(self):
+        token_lists = [['a', 'b'], [], {'c'}, ['a', 'b']]
+        signatures = self.minhash.signatures(token_lists)
+        self.assertEqual(signatures.shape, (4, 256))
+        for tokens, signature in zip(token_lists, signatures):
+            self.assertEqual(signature.tolist(), self.minhash.signature(tokens).tolist())
+        self.assertEqual(self.minhash.signatures([]).shape, (0, 256))
+
+    def test_estimate_jaccard(self):
+        jaccard = Jaccard()
+        for size1, size2, shared in [(50, 50, 25), (100, 40, 40), (30, 30, 0), (20, 20, 20)]:
+            set1 = set('x%d' % i for i in range(size1))
+            set2 = set('x%d' % i for i in range(size1 - shared, size1 - shared + size2))
+            estimate = self.minhash.estimate_jaccard(self.minhash.signature(set1), self.minhash.signature(set2))
+            self.assertAlmostEqual(estimate, jaccard.get_raw_score(set1, set2), delta=0.1)
+
+    def test_get_num_perm_and_seed(self):
+        self.assertEqual(self.minhash.get_num_perm(), 256)
+        self.assertEqual(self.minhash.get_seed(), 1)
+
+    @raises(ValueError)
+    def test_invalid_num_perm(self):
+        MinHash(num_perm=0)
+
+    @raises(TypeError)
+    def test_invalid_input_none(self):
+        self.minhash.signature(None)
+
+    @raises(TypeError)
+    def test_invalid_input_string(self):
+        self.minhash.signature('data')
+
+    @raises(TypeError)
+    def test_invalid_token(self):
+        self.minhash.signature(['data', 1])
+
+    @raises(ValueError)
+    def test_estimate_jaccard_unequal_len(self):
+        self.minhash.estimate_jaccard(self.minhash.signature(['a']), MinHash(num_perm=8).signature(['a']))
@@ -0,0 +1,79 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import unittest
+from nose.tools import *
+
+from py_stringmatching import utils
+from py_stringmatching.normalizer import Normalizer
+
+
+class NormalizerTestCases(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = Normalizer()
+
+    def test_normalize(self):
+        self.assertEqual(self.normalizer.normalize('  New   York,  NY! '), 'new york ny')
+        self.assertEqual(self.normalizer.normalize('snake_case\tand\nlines'), 'snake_case and lines')
+        self.assertEqual(self.normalizer.normalize(''), '')
+        self.assertEqual(self.normalizer.normalize('!?'), '')
+
+    def test_same_tokens_as_process_string(self):
+        for string in ['  Hello, World! ', 'C++ and Java', 'São Paulo', 'Κόσμε ΑΒΓ', 'a--b__c']:
+            self.assertEqual(self.normalizer.normalize(string).split(),
+                             utils.process_string(string).split())
+
+    def test_force_ascii(self):
+        normalizer = Normalizer(force_ascii=True)
+        self.assertEqual(normalizer.normalize('Crème Brûlée'), 'crme brle')
+        # characters above U+00FF are removed too
+        self.assertEqual(normalizer.normalize('Łódź 北京 x'), 'd x')
+
+    def test_fold_accents(self):
+        normalizer = Normalizer(fold_accents=True)
+        self.assertEqual(normalizer.normalize('Crème Brûlée'), 'creme brulee')
+        self.assertEqual(normalizer.normalize('ﬁle İstanbul'), 'file istanbul')
+        self.assertEqual(normalizer.normalize('北京'), '北京')
+        self.assertEqual(Normalizer(force_ascii=True, fold_accents=True).normalize('Łódź 北京'), 'odz')
+
+    def test_options(self):
+        self.assertEqual(Normalizer(lowercase=False).normalize('New York'), 'New York')
+        self.assertEqual(Normalizer(remove_punctuation=False).normalize(' a, b! '), 'a, b!')
+        self.assertEqual(Normalizer(collapse_whitespace=False).normalize(' a,  b '), 'a   b')
+
+    def test_get_options(self):
+        normalizer = Normalizer(True, True, False, False, False)
+        self.assertEqual(normalizer.get_force_ascii(), True)
+        self.assertEqual(normalizer.get_fold_accents(), True)
+        self.assertEqual(normalizer.get_remove_punctuation(), False)
+        self.assertEqual(normalizer.get_lowercase(), False)
+        self.assertEqual(normalizer.get_collapse_whitespace(), False)
+        self.assertEqual(Normalizer().get_lowercase(), True)
+
+    def test_equality(self):
+        self.assertEqual(Normalizer(), Normalizer())
+        self.assertEqual(hash(Normalizer(fold_accents=True)), hash(Normalizer(fold_accents=True)))
+        self.assertNotEqual(Normalizer(), Normalizer(lowercase=False))
+        self.assertNotEqual(Normalizer(), 'normalizer')
+
+    def test_normalize_many(self):
+        strings = ['New  York!', 'new-york', '', 'Crème']
+        self.assertEqual(self.normalizer.normalize_many(strings),
+                         [self.normalizer.normalize(s) for s in strings])
+        self.assertEqual(self.normalizer.normalize_many(s for s in ['A b']), ['a b'])
+        self.assertEqual(self.normalizer.normalize_many([]), [])
+
+    def test_call(self):
+        self.assertEqual(self.normalizer('A, B'), 'a b')
+
+    @raises(TypeError)
+    def test_invalid_input1(self):
+        self.normalizer.normalize(None)
+
+    @raises(TypeError)
+    def test_invalid_input2(self):
+        self.normalizer.normalize(12)
+
+    @raises(TypeError)
+    def test_invalid_input_normalize_many(self):
+        self.normalizer.normalize_many(['a', None])
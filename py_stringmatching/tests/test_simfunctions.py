@@ -4,9 +4,11 @@
 from __future__ import unicode_literals
 
 import math
+import pickle
 import unittest
 
 from nose.tools import *
+import numpy as np
 
 
 
@@ -21,6 +23,7 @@ from py_stringmatching.similarity_measure.jaro_winkler import JaroWinkler
 from py_stringmatching.similarity_measure.levenshtein import Levenshtein
 from py_stringmatching.similarity_measure.needleman_wunsch import NeedlemanWunsch
 from py_stringmatching.similarity_measure.smith_waterman import SmithWaterman
+from py_stringmatching.similarity_measure.cython.cython_substitution_matrix import SubstitutionMatrix
 # token based similarity measures
 from py_stringmatching.similarity_measure.cosine import Cosine
 from py_stringmatching.similarity_measure.dice import Dice
@@ -34,6 +37,8 @@ from py_stringmatching.similarity_measure.generalized_jaccard import Generalized
 from py_stringmatching.similarity_measure.monge_elkan import MongeElkan
 #phonetic similarity measures
 from py_stringmatching.similarity_measure.soundex import Soundex
+from py_stringmatching.normalizer import Normalizer
+from py_stringmatching.vocabulary import Vocabulary
 #fuzzywuzzy similarity measures
 from py_stringmatching.similarity_measure.partial_ratio import PartialRatio
 from py_stringmatching.similarity_measure.ratio import Ratio
@@ -60,6 +65,26 @@ class AffineTestCases(unittest.TestCase):
         self.assertAlmostEqual(self.affine_with_params2.get_raw_score(' ', ' '), 1)
         self.assertEqual(self.affine.get_raw_score('', 'deeva'), 0)
 
+    def test_valid_input_long_strings(self):
+        self.assertAlmostEqual(self.affine.get_raw_score('dva' * 500, 'dva' * 500), 1500)
+        self.assertAlmostEqual(self.affine.get_raw_score('a' * 2000, 'a' * 1000), 499.5)
+
+    def test_valid_input_nested_sim_func(self):
+        # a sim_func that computes another alignment score while the outer
+        # one is still running must not clobber the outer DP rows
+        nw = NeedlemanWunsch()
+        nested = Affine(sim_func=lambda s1, s2: nw.get_raw_score(s1 * 3, s2 * 3) / 3.0)
+        self.assertAlmostEqual(nested.get_raw_score('dva', 'deeva'),
+                               self.affine.get_raw_score('dva', 'deeva'))
+
+    def test_valid_input_default_sim_func_matches_python_sim_func(self):
+        # the default sim_func is evaluated in C, a Python one is called
+        affine_py = Affine(sim_func=self.sim_func)
+        for s1, s2 in [('dva', 'deeva'), ('AAAGAATTCA', 'AAATCA'),
+                       (u'd\U0001F600va', u'de\U0001F600eva')]:
+            self.assertAlmostEqual(self.affine.get_raw_score(s1, s2),
+                                   affine_py.get_raw_score(s1, s2))
+
     def test_valid_input_non_ascii(self):
         self.assertAlmostEqual(self.affine.get_raw_score(u'dva', u'dáóva'), 1.5)
         self.assertAlmostEqual(self.affine.get_raw_score('dva', 'dáóva'), 1.5)
@@ -242,6 +267,59 @@ class EditexTestCases(unittest.TestCase):
         self.ed_with_params5 = Editex(mismatch_cost=3, group_cost=2, local=True)
         self.ed_with_params6 = Editex(local=True)
 
+    def test_valid_input_raw_scores(self):
+        strings1 = ['cat', 'Niall', 'aluminum', 'ATCG', '', 'abc']
+        strings2 = ['hat', 'Neil', 'Catalan', 'TAGC', 'abc', '']
+        self.assertEqual(list(self.ed.get_raw_scores(strings1, strings2)),
+                         [self.ed.get_raw_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+        self.assertEqual(list(self.ed.get_sim_scores(strings1, strings2)),
+                         [self.ed.get_sim_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+        self.assertEqual(len(self.ed.get_raw_scores([], [])), 0)
+
+    def test_valid_input_raw_scores_with_params(self):
+        strings1 = ['ALIE', 'WALIW', 'niall', 'MARTHA', 'Straße', 'a\U0001F600b', 'ALIP']
+        strings2 = ['ALIE', 'HALIH', 'nihal', 'marhta', 'STRASSE', 'A\U0001F601B', '']
+        for ed in [self.ed_with_params1, self.ed_with_params4, self.ed_with_params5,
+                   self.ed_with_params6, Editex(group_cost=1.5, mismatch_cost=2.5)]:
+            self.assertEqual(list(ed.get_raw_scores(strings1, strings2, n_jobs=2)),
+                             [ed.get_raw_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+            self.assertEqual(list(ed.get_sim_scores(strings1, strings2, n_jobs=2)),
+                             [ed.get_sim_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+
+    def test_valid_input_raw_scores_empty_string_non_integer_cost(self):
+        ed = Editex(0, 1.5, 2.5, True)
+        strings1 = ['', 'abcdefghi', 'abc']
+        strings2 = ['abcdefghi', '', 'abd']
+        self.assertEqual(list(ed.get_raw_scores(strings1, strings2)), [22.5, 22.5, 2.0])
+        self.assertEqual(list(ed.get_raw_scores(strings1, strings2)),
+                         [ed.get_raw_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+        self.assertEqual(list(ed.get_sim_scores(strings1, strings2)),
+                         [ed.get_sim_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+
+    def test_letter_groups(self):
+        # P, C, S and J belong to the last group they are listed in
+        self.assertEqual(self.ed.get_raw_score('P', 'F'), 1)
+        self.assertEqual(self.ed.get_raw_score('P', 'B'), 2)
+        self.assertEqual(self.ed.get_raw_score('C', 'S'), 1)
+        self.assertEqual(self.ed.get_raw_score('C', 'K'), 2)
+        self.assertEqual(self.ed.get_raw_score('J', 'S'), 1)
+        self.assertEqual(self.ed.get_raw_score('S', 'Z'), 2)
+        self.assertEqual(self.ed.get_raw_score('H', 'W'), 2)
+
+    def test_long_strings(self):
+        string1 = 'NIALL' * 100
+        string2 = 'NEIL' * 120
+        self.assertEqual(self.ed.get_raw_scores([string1], [string2])[0],
+                         self.ed.get_raw_score(string1, string2))
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_raw_scores(self):
+        self.ed.get_raw_scores(['cat'], ['hat', 'bat'])
+
+    @raises(TypeError)
+    def test_invalid_input_none_raw_scores(self):
+        self.ed.get_raw_scores(['cat', None], ['hat', 'bat'])
+
     def test_get_match_cost(self):
         self.assertEqual(self.ed_with_params1.get_match_cost(), 2)
 
@@ -373,6 +451,38 @@ class JaroTestCases(unittest.TestCase):
     def setUp(self):
         self.jaro = Jaro()
 
+
+    def test_valid_input_score_cutoff(self):
+        self.assertAlmostEqual(self.jaro.get_sim_score('MARTHA', 'MARHTA', score_cutoff=0.9),
+                               0.9444444444444445)
+        self.assertEqual(self.jaro.get_sim_score('MARTHA', 'MARHTA', score_cutoff=0.95), 0.0)
+        self.assertEqual(self.jaro.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.8), 0.0)
+        self.assertIsInstance(self.jaro.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.8), float)
+        # rejected from the lengths alone: at most (1 + 2/20 + 1) / 3 = 0.7
+        self.assertEqual(self.jaro.get_sim_score('ab', 'ab' + 'x' * 18, score_cutoff=0.71), 0.0)
+        self.assertAlmostEqual(self.jaro.get_sim_score('ab', 'ab' + 'x' * 18, score_cutoff=0.7), 0.7)
+        self.assertEqual(self.jaro.get_sim_score('', 'deeva', score_cutoff=0.5), 0)
+
+    @raises(ValueError)
+    def test_invalid_score_cutoff(self):
+        self.jaro.get_sim_score('MARTHA', 'MARHTA', score_cutoff=1.5)
+
+    def test_valid_input_raw_scores(self):
+        strings1 = ['MARTHA', 'DWAYNE', 'DIXON', '', 'ác', 'a' * 100]
+        strings2 = ['MARHTA', 'DUANE', 'DICKSONX', 'deeva', 'áóc', 'ab' * 40]
+        for score, s1, s2 in zip(self.jaro.get_raw_scores(strings1, strings2), strings1, strings2):
+            self.assertAlmostEqual(score, self.jaro.get_raw_score(s1, s2))
+        for score, s1, s2 in zip(self.jaro.get_sim_scores(strings1, strings2, n_jobs=2), strings1, strings2):
+            self.assertAlmostEqual(score, self.jaro.get_sim_score(s1, s2))
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_raw_scores(self):
+        self.jaro.get_raw_scores(['MARTHA'], ['MARHTA', 'DUANE'])
+
+    @raises(TypeError)
+    def test_invalid_input_non_string_raw_scores(self):
+        self.jaro.get_raw_scores(['MARTHA', 12.90], ['MARHTA', 'DUANE'])
+
     def test_valid_input_raw_score(self):
         # https://en.wikipedia.org/wiki/Jaro%E2%80%93Winkler_distance
         self.assertAlmostEqual(self.jaro.get_raw_score('MARTHA', 'MARHTA'),
@@ -383,6 +493,16 @@ class JaroTestCases(unittest.TestCase):
                                0.7666666666666666)
         self.assertEqual(self.jaro.get_raw_score('', 'deeva'), 0)
 
+    def test_valid_input_long_strings_raw_score(self):
+        # longer than 64 characters, scored with the blocked bit-parallel kernel
+        self.assertAlmostEqual(self.jaro.get_raw_score('the quick brown fox jumps over the lazy dog ' * 3,
+                                                       'the quikc brown fox jumped over a lazy dog ' * 3),
+                               0.8804680382956049)
+        self.assertAlmostEqual(self.jaro.get_raw_score('abc' * 30, 'x' * 10 + 'abc' * 30),
+                               0.9666666666666667)
+        self.assertAlmostEqual(self.jaro.get_raw_score('MARTHA' * 20, 'MARHTA' * 20),
+                               0.9444444444444445)
+
     def test_valid_input_sim_score(self):
         self.assertAlmostEqual(self.jaro.get_sim_score('MARTHA', 'MARHTA'),
                                0.9444444444444445)
@@ -467,6 +587,65 @@ class JaroWinklerTestCases(unittest.TestCase):
     def setUp(self):
         self.jw = JaroWinkler()
 
+
+    def test_valid_input_score_cutoff(self):
+        self.assertAlmostEqual(self.jw.get_sim_score('MARTHA', 'MARHTA', score_cutoff=0.95),
+                               0.9611111111111111)
+        self.assertEqual(self.jw.get_sim_score('MARTHA', 'MARHTA', score_cutoff=0.97), 0.0)
+        self.assertEqual(self.jw.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.9), 0.0)
+        self.assertIsInstance(self.jw.get_raw_score('DIXON', 'DICKSONX', score_cutoff=0.9), float)
+        # the common prefix is part of the bound: 0.7 + 2 * 0.1 * 0.3 = 0.76
+        self.assertAlmostEqual(self.jw.get_sim_score('ab', 'ab' + 'x' * 18, score_cutoff=0.76), 0.76)
+        self.assertEqual(self.jw.get_sim_score('ab', 'ab' + 'x' * 18, score_cutoff=0.77), 0.0)
+
+    @raises(ValueError)
+    def test_invalid_score_cutoff(self):
+        self.jw.get_sim_score('MARTHA', 'MARHTA', score_cutoff=-0.1)
+
+    def test_valid_input_raw_scores(self):
+        strings1 = ['MARTHA', 'DWAYNE', 'DIXON', '', 'ác', 'a' * 100]
+        strings2 = ['MARHTA', 'DUANE', 'DICKSONX', 'deeva', 'áóc', 'ab' * 40]
+        for score, s1, s2 in zip(self.jw.get_raw_scores(strings1, strings2), strings1, strings2):
+            self.assertAlmostEqual(score, self.jw.get_raw_score(s1, s2))
+        jw = JaroWinkler(prefix_weight=0.2)
+        for score, s1, s2 in zip(jw.get_sim_scores(strings1, strings2, n_jobs=2), strings1, strings2):
+            self.assertAlmostEqual(score, jw.get_sim_score(s1, s2))
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_raw_scores(self):
+        self.jw.get_raw_scores(['MARTHA'], ['MARHTA', 'DUANE'])
+
+    @raises(TypeError)
+    def test_invalid_input_none_raw_scores(self):
+        self.jw.get_raw_scores(None, ['MARHTA'])
+
+    def test_valid_input_long_strings_raw_score(self):
+        self.assertAlmostEqual(self.jw.get_raw_score('the quick brown fox jumps over the lazy dog ' * 3,
+                                                     'the quikc brown fox jumped over a lazy dog ' * 3),
+                               0.9282808229773629)
+        self.assertAlmostEqual(self.jw.get_raw_score('MARTHA' * 20, 'MARHTA' * 20),
+                               0.9611111111111111)
+
+    def test_valid_input_raw_score_matrix(self):
+        # the first sequence has strings longer than one 64-bit word, which
+        # use the blocked bit-parallel kernel
+        strings1 = ['MARTHA', 'DWAYNE', 'DIXON', '', 'ác', 'a' * 100, 'ab' * 40]
+        strings2 = ['MARHTA', 'DUANE', 'DICKSONX', 'deeva', 'áóc', 'ba' * 50, '']
+        matrix = self.jw.get_raw_score_matrix(strings1, strings2)
+        self.assertEqual(matrix.shape, (7, 7))
+        for i, s1 in enumerate(strings1):
+            for j, s2 in enumerate(strings2):
+                self.assertAlmostEqual(matrix[i, j], self.jw.get_raw_score(s1, s2))
+        jw = JaroWinkler(prefix_weight=0.2)
+        matrix = jw.get_sim_score_matrix(strings1, strings2, n_jobs=2)
+        for i, s1 in enumerate(strings1):
+            for j, s2 in enumerate(strings2):
+                self.assertAlmostEqual(matrix[i, j], jw.get_sim_score(s1, s2))
+
+    @raises(TypeError)
+    def test_invalid_input_raw_score_matrix(self):
+        self.jw.get_raw_score_matrix(['MARTHA'], None)
+
     def test_get_prefix_weight(self):
         self.assertEqual(self.jw.get_prefix_weight(), 0.1)
 
@@ -568,6 +747,45 @@ class LevenshteinTestCases(unittest.TestCase):
     def setUp(self):
         self.lev = Levenshtein()
 
+    def test_valid_input_raw_scores(self):
+        strings1 = ['a', '', 'example', 'levenshtein', 'ác', 'a' * 100, b'\xc3\xa1c']
+        strings2 = ['', '', 'samples', 'frankenstein', 'áóc', 'ab' * 70, 'áóc']
+        self.assertEqual(list(self.lev.get_raw_scores(strings1, strings2)),
+                         [self.lev.get_raw_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+        self.assertEqual(list(self.lev.get_sim_scores(strings1, strings2, n_jobs=2)),
+                         [self.lev.get_sim_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+        self.assertEqual(len(self.lev.get_raw_scores([], [])), 0)
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_raw_scores(self):
+        self.lev.get_raw_scores(['a', 'b'], ['a'])
+
+    @raises(TypeError)
+    def test_invalid_input_none_raw_scores(self):
+        self.lev.get_raw_scores(['a', None], ['a', 'b'])
+
+    @raises(ValueError)
+    def test_invalid_n_jobs_raw_scores(self):
+        self.lev.get_raw_scores(['a'], ['b'], n_jobs=0)
+
+    def test_valid_input_raw_score_matrix(self):
+        strings1 = ['a', '', 'example', 'levenshtein', 'ác', 'a' * 100]
+        strings2 = ['', 'samples', 'frankenstein', 'áóc', 'ab' * 70]
+        matrix = self.lev.get_raw_score_matrix(strings1, strings2)
+        self.assertEqual(matrix.shape, (6, 5))
+        for i, s1 in enumerate(strings1):
+            for j, s2 in enumerate(strings2):
+                self.assertEqual(matrix[i, j], self.lev.get_raw_score(s1, s2))
+        matrix = self.lev.get_sim_score_matrix(strings1, strings2, n_jobs=2)
+        for i, s1 in enumerate(strings1):
+            for j, s2 in enumerate(strings2):
+                self.assertEqual(matrix[i, j], self.lev.get_sim_score(s1, s2))
+        self.assertEqual(self.lev.get_raw_score_matrix([], ['a']).shape, (0, 1))
+
+    @raises(TypeError)
+    def test_invalid_input_raw_score_matrix(self):
+        self.lev.get_raw_score_matrix(['a', 12.90], ['a'])
+
     def test_valid_input_raw_score(self):
         # http://oldfashionedsoftware.com/tag/levenshtein-distance/
         self.assertEqual(self.lev.get_raw_score('a', ''), 1)
@@ -596,6 +814,37 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertEqual(self.lev.get_raw_score('distance', 'difference'), 5)
         self.assertEqual(self.lev.get_raw_score('java was neat', 'scala is great'), 7)
 
+    def test_valid_input_raw_score_max_distance(self):
+        self.assertEqual(self.lev.get_raw_score('levenshtein', 'frankenstein', max_distance=6), 6)
+        self.assertEqual(self.lev.get_raw_score('levenshtein', 'frankenstein', max_distance=10), 6)
+        self.assertEqual(self.lev.get_raw_score('levenshtein', 'frankenstein', max_distance=5), 6)
+        self.assertEqual(self.lev.get_raw_score('levenshtein', 'frankenstein', max_distance=2), 3)
+        self.assertEqual(self.lev.get_raw_score('example', 'samples', max_distance=0), 1)
+        self.assertEqual(self.lev.get_raw_score('abc', 'abc', max_distance=0), 0)
+        self.assertEqual(self.lev.get_raw_score('', 'abc', max_distance=3), 3)
+        self.assertEqual(self.lev.get_raw_score('', 'abc', max_distance=1), 2)
+        self.assertEqual(self.lev.get_raw_score('a', 'abcdefgh', max_distance=2), 3)
+        self.assertEqual(self.lev.get_raw_score('xabxcdxxefxgx', '1ab2cd34ef5g6', max_distance=6), 6)
+        self.assertEqual(self.lev.get_raw_score('a' * 100, 'a' * 50 + 'b' + 'a' * 49, max_distance=1), 1)
+        self.assertEqual(self.lev.get_raw_score('ác', 'áóc', max_distance=1), 1)
+
+    def test_valid_input_sim_score_min_sim(self):
+        self.assertEqual(self.lev.get_sim_score('levenshtein', 'frankenstein', min_sim=0.5), 0.5)
+        self.assertEqual(self.lev.get_sim_score('levenshtein', 'frankenstein', min_sim=0.6), 0.0)
+        self.assertEqual(self.lev.get_sim_score('java was neat', 'scala is great', min_sim=0.5),
+                         1.0 - (7.0/14.0))
+        self.assertEqual(self.lev.get_sim_score('example', 'samples', min_sim=0.0), 1.0 - (3.0/7.0))
+        self.assertEqual(self.lev.get_sim_score('', '', min_sim=1.0), 1.0)
+        self.assertEqual(self.lev.get_sim_score('abc', 'abc', min_sim=1.0), 1.0)
+
+    @raises(ValueError)
+    def test_invalid_max_distance_raw_score(self):
+        self.lev.get_raw_score('a', 'b', max_distance=-1)
+
+    @raises(ValueError)
+    def test_invalid_min_sim_sim_score(self):
+        self.lev.get_sim_score('a', 'b', min_sim=1.5)
+
     def test_valid_input_sim_score(self):
         self.assertEqual(self.lev.get_sim_score('a', ''), 1.0 - (1.0/1.0))
         self.assertEqual(self.lev.get_sim_score('', 'a'), 1.0 - (1.0/1.0))
@@ -628,6 +877,19 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertEqual(self.lev.get_raw_score('ác', 'áóc'), 1)
         self.assertEqual(self.lev.get_raw_score(u'ác', u'áóc'), 1)
         self.assertEqual(self.lev.get_raw_score(b'\xc3\xa1c', b'\xc3\xa1\xc3\xb3c'), 1)
+        # code points that share their low byte must not be treated as equal
+        self.assertEqual(self.lev.get_raw_score('a\u0100', 'a\u0200'), 1)
+        self.assertEqual(self.lev.get_raw_score('\U0001F600ab', '\U0001F601ab'), 1)
+
+    def test_valid_input_long_strings_raw_score(self):
+        # strings longer than one 64-bit word use the blocked kernel
+        self.assertEqual(self.lev.get_raw_score('a' * 64, 'a' * 63 + 'b'), 1)
+        self.assertEqual(self.lev.get_raw_score('a' * 65, 'a' * 64), 1)
+        self.assertEqual(self.lev.get_raw_score('a' * 100, 'b' * 100), 100)
+        self.assertEqual(self.lev.get_raw_score('ab' * 100, 'ba' * 100), 2)
+        self.assertEqual(self.lev.get_raw_score('x' + 'abc' * 50, 'abc' * 50 + 'y'), 2)
+        self.assertEqual(self.lev.get_raw_score('abcdefg' * 20,
+                                                'xabxcdxxefxgx' * 20), 120)
 
     def test_valid_input_non_ascii_sim_score(self):
         self.assertEqual(self.lev.get_sim_score('ác', 'áóc'), 1.0 - (1.0/3.0))
@@ -689,6 +951,39 @@ class HammingDistanceTestCases(unittest.TestCase):
     def setUp(self):
         self.hd = HammingDistance()
 
+    def test_valid_input_raw_scores(self):
+        strings1 = ['-789', 'karolin', 'KARI', '', 'ác']
+        strings2 = ['john', 'kathrin', 'kari', '', 'óc']
+        self.assertEqual(list(self.hd.get_raw_scores(strings1, strings2)), [4, 3, 4, 0, 1])
+        self.assertEqual(list(self.hd.get_sim_scores(strings1, strings2)),
+                         [self.hd.get_sim_score(s1, s2) for s1, s2 in zip(strings1, strings2)])
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_string_len_raw_scores(self):
+        self.hd.get_raw_scores(['ali', 'abc'], ['alex', 'abd'])
+
+    @raises(TypeError)
+    def test_invalid_input_non_string_raw_scores(self):
+        self.hd.get_raw_scores(['ali', 12.90], ['alex', 'abd'])
+
+    def test_valid_input_packed_codes(self):
+        self.assertEqual(self.hd.get_raw_score(np.uint64(0b1011), np.uint64(0b0110)), 3)
+        self.assertEqual(self.hd.get_raw_score(np.uint64(0), np.uint64(2 ** 64 - 1)), 64)
+        self.assertEqual(self.hd.get_raw_score(np.uint64(5), np.uint64(5)), 0)
+        self.assertEqual(self.hd.get_raw_score(np.uint64(2 ** 63), np.uint64(2 ** 63 - 1)), 64)
+        self.assertEqual(self.hd.get_sim_score(np.uint64(0b1011), np.uint64(0b0110)), 1 - 3 / 64.0)
+
+    def test_valid_input_packed_codes_raw_scores(self):
+        codes1 = np.array([0b1011, 0, 5, 2 ** 63], dtype=np.uint64)
+        codes2 = np.array([0b0110, 2 ** 64 - 1, 5, 1], dtype=np.uint64)
+        self.assertEqual(self.hd.get_raw_scores(codes1, codes2).tolist(), [3, 64, 0, 2])
+        self.assertEqual(self.hd.get_sim_scores(codes1, codes2).tolist(),
+                         [self.hd.get_sim_score(c1, c2) for c1, c2 in zip(codes1, codes2)])
+
+    @raises(ValueError)
+    def test_invalid_input_unequal_len_packed_codes_raw_scores(self):
+        self.hd.get_raw_scores(np.zeros(2, dtype=np.uint64), np.zeros(3, dtype=np.uint64))
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.hd.get_raw_score('-789', 'john'), 4)
         self.assertEqual(self.hd.get_raw_score('a', '*'), 1)
@@ -948,6 +1243,70 @@ class SmithWatermanTestCases(unittest.TestCase):
         self.sw.get_raw_score(12, 12)
 
 
+class SubstitutionMatrixTestCases(unittest.TestCase):
+    def setUp(self):
+        self.constants = SubstitutionMatrix(match=2, mismatch=-1)
+        self.classes = SubstitutionMatrix(scores=[[1, 0.5], [0.5, 1]], classes=['aeiou', 'bcdfg'])
+        self.dense = SubstitutionMatrix(match=3, mismatch=-2,
+                                        scores=[[float(i * 10 + j) for j in range(10)] for i in range(10)])
+
+    def test_call(self):
+        self.assertEqual(self.constants('a', 'a'), 2.0)
+        self.assertEqual(self.constants('a', 'b'), -1.0)
+        self.assertEqual(self.classes('a', 'e'), 1.0)
+        self.assertEqual(self.classes('a', 'b'), 0.5)
+        self.assertEqual(self.classes('z', 'z'), 1.0)
+        self.assertEqual(self.classes('a', 'z'), 0.0)
+        self.assertEqual(self.dense(chr(3), chr(7)), 37.0)
+        self.assertEqual(self.dense(chr(3), 'a'), -2.0)
+        self.assertEqual(self.dense(u'\U0001F600', u'\U0001F600'), 3.0)
+
+    def test_same_scores_as_python_sim_func(self):
+        pairs = [('dva', 'deeva'), ('GCATGCUA', 'GATTACA'), ('', 'abc'),
+                 (u'b\U0001F600ad', u'ba\U0001F600d'), ('aeiou' * 20, 'bcdfg' * 15)]
+        for sim_func in [self.constants, self.classes, self.dense]:
+            python_sim_func = lambda s1, s2, sim_func=sim_func: sim_func(s1, s2)
+            for measure in [Affine(sim_func=sim_func), NeedlemanWunsch(sim_func=sim_func),
+                            SmithWaterman(sim_func=sim_func)]:
+                measure_py = measure.__class__(sim_func=python_sim_func)
+                for s1, s2 in pairs:
+                    self.assertAlmostEqual(measure.get_raw_score(s1, s2),
+                                           measure_py.get_raw_score(s1, s2))
+
+    def test_valid_input_measures(self):
+        self.assertEqual(NeedlemanWunsch(gap_cost=0.5, sim_func=SubstitutionMatrix(1, -1)).get_raw_score(
+            'GCATGCUA', 'GATTACA'), 2.5)
+        self.assertEqual(SmithWaterman(1, sim_func=SubstitutionMatrix(2, -1)).get_raw_score('dva', 'deeve'), 2.0)
+        self.assertAlmostEqual(Affine(gap_continuation=0.2, sim_func=SubstitutionMatrix()).get_raw_score(
+            'AAAGAATTCA', 'AAATCA'), 4.4)
+
+    def test_pickle(self):
+        for sim_func in [self.constants, self.classes, self.dense]:
+            copy = pickle.loads(pickle.dumps(sim_func))
+            self.assertEqual(copy('a', 'e'), sim_func('a', 'e'))
+            self.assertEqual(copy(chr(1), chr(2)), sim_func(chr(1), chr(2)))
+
+    @raises(ValueError)
+    def test_invalid_classes_without_scores(self):
+        SubstitutionMatrix(classes=['ab'])
+
+    @raises(ValueError)
+    def test_invalid_non_square_scores(self):
+        SubstitutionMatrix(scores=[[1, 0]])
+
+    @raises(ValueError)
+    def test_invalid_number_of_classes(self):
+        SubstitutionMatrix(scores=[[1]], classes=['a', 'b'])
+
+    @raises(ValueError)
+    def test_invalid_overlapping_classes(self):
+        SubstitutionMatrix(scores=[[1, 0], [0, 1]], classes=['ab', 'bc'])
+
+    @raises(TypeError)
+    def test_invalid_class_type(self):
+        SubstitutionMatrix(scores=[[1]], classes=[1])
+
+
 class SoundexTestCases(unittest.TestCase):
     def setUp(self):
         self.sdx = Soundex()
@@ -972,6 +1331,37 @@ class SoundexTestCases(unittest.TestCase):
         self.assertEqual(self.sdx.get_sim_score('Jawornicki', 'Yavornitzky'), 0)
         self.assertEqual(self.sdx.get_sim_score('Robert', 'Robert'), 1)
 
+    def test_encode(self):
+        self.assertEqual(self.sdx.encode('Robert'), self.sdx.encode('rupert'))
+        self.assertEqual(self.sdx.encode('a,,,li'), self.sdx.encode('Ali'))
+        self.assertNotEqual(self.sdx.encode('Gough'), self.sdx.encode('goff'))
+        # codes of different lengths do not collide
+        self.assertNotEqual(self.sdx.encode('A'), self.sdx.encode('A0'))
+        self.assertNotEqual(self.sdx.encode('AB'), self.sdx.encode('ABB'))
+
+    def test_encode_many(self):
+        strings = ['Robert', 'Rupert', 'Sue', 'S', 'Gough', 'goff', 'Jawornicki', 'Yavornitzky', 'ali', 'a,,,li']
+        codes = self.sdx.encode_many(strings)
+        self.assertEqual(codes.dtype, np.int32)
+        self.assertEqual(list(codes), [self.sdx.encode(s) for s in strings])
+        for i in range(len(strings)):
+            for j in range(len(strings)):
+                self.assertEqual(int(codes[i] == codes[j]),
+                                 self.sdx.get_raw_score(strings[i], strings[j]))
+        self.assertEqual(len(self.sdx.encode_many([])), 0)
+
+    @raises(TypeError)
+    def test_invalid_input_none_encode(self):
+        self.sdx.encode(None)
+
+    @raises(ValueError)
+    def test_invalid_input_no_alnum_encode(self):
+        self.sdx.encode(',, ')
+
+    @raises(TypeError)
+    def test_invalid_input_encode_many(self):
+        self.sdx.encode_many(['Robert', 1])
+
     @raises(TypeError)
     def test_invalid_input1_raw_score(self):
         self.sdx.get_raw_score('a', None)
@@ -1028,6 +1418,32 @@ class OverlapCoefficientTestCases(unittest.TestCase):
     def setUp(self):
         self.oc = OverlapCoefficient()
 
+    def test_token_ids(self):
+        vocabulary = Vocabulary()
+        for set1, set2 in [(['data', 'science'], ['data']),
+                           (['data', 'management'], ['data', 'data', 'science']),
+                           ([], []), ([], ['data']), (['data', 'data'], ['data']),
+                           (['a', 'b', 'c'], [str(i) for i in range(100)] + ['c'])]:
+            ids1, ids2 = vocabulary.encode(set1), vocabulary.encode(set2)
+            self.assertEqual(self.oc.get_raw_score(ids1, ids2), self.oc.get_raw_score(set1, set2))
+            self.assertEqual(self.oc.get_sim_score(ids1, ids2), self.oc.get_sim_score(set1, set2))
+
+    @raises(TypeError)
+    def test_invalid_token_ids(self):
+        self.oc.get_raw_score(np.array([1, 2], dtype=np.int64), np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted_token_ids(self):
+        self.oc.get_raw_score(np.array([3, 1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated_token_ids(self):
+        self.oc.get_raw_score(np.array([1, 1, 2], dtype=np.int32), np.array([1, 2], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_token_ids_and_list(self):
+        self.oc.get_raw_score(np.array([1, 2], dtype=np.int32), [1])
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.oc.get_raw_score([], []), 1.0)
         self.assertEqual(self.oc.get_raw_score(['data', 'science'], ['data']),
@@ -1105,6 +1521,32 @@ class DiceTestCases(unittest.TestCase):
     def setUp(self):
         self.dice = Dice()
 
+    def test_token_ids(self):
+        vocabulary = Vocabulary()
+        for set1, set2 in [(['data', 'science'], ['data']),
+                           (['data', 'management'], ['data', 'data', 'science']),
+                           ([], []), ([], ['data']), (['data', 'data'], ['data']),
+                           (['a', 'b', 'c'], [str(i) for i in range(100)] + ['c'])]:
+            ids1, ids2 = vocabulary.encode(set1), vocabulary.encode(set2)
+            self.assertEqual(self.dice.get_raw_score(ids1, ids2), self.dice.get_raw_score(set1, set2))
+            self.assertEqual(self.dice.get_sim_score(ids1, ids2), self.dice.get_sim_score(set1, set2))
+
+    @raises(TypeError)
+    def test_invalid_token_ids(self):
+        self.dice.get_raw_score(np.array([1, 2], dtype=np.int64), np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted_token_ids(self):
+        self.dice.get_raw_score(np.array([3, 1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated_token_ids(self):
+        self.dice.get_raw_score(np.array([1, 1, 2], dtype=np.int32), np.array([1, 2], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_token_ids_and_list(self):
+        self.dice.get_raw_score(np.array([1, 2], dtype=np.int32), [1])
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.dice.get_raw_score(['data', 'science'], ['data']),
                          2 * 1.0 / 3.0)
@@ -1198,6 +1640,32 @@ class JaccardTestCases(unittest.TestCase):
     def setUp(self):
         self.jac = Jaccard()
 
+    def test_token_ids(self):
+        vocabulary = Vocabulary()
+        for set1, set2 in [(['data', 'science'], ['data']),
+                           (['data', 'management'], ['data', 'data', 'science']),
+                           ([], []), ([], ['data']), (['data', 'data'], ['data']),
+                           (['a', 'b', 'c'], [str(i) for i in range(100)] + ['c'])]:
+            ids1, ids2 = vocabulary.encode(set1), vocabulary.encode(set2)
+            self.assertEqual(self.jac.get_raw_score(ids1, ids2), self.jac.get_raw_score(set1, set2))
+            self.assertEqual(self.jac.get_sim_score(ids1, ids2), self.jac.get_sim_score(set1, set2))
+
+    @raises(TypeError)
+    def test_invalid_token_ids(self):
+        self.jac.get_raw_score(np.array([1, 2], dtype=np.int64), np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted_token_ids(self):
+        self.jac.get_raw_score(np.array([3, 1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated_token_ids(self):
+        self.jac.get_raw_score(np.array([1, 1, 2], dtype=np.int32), np.array([1, 2], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_token_ids_and_list(self):
+        self.jac.get_raw_score(np.array([1, 2], dtype=np.int32), [1])
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.jac.get_raw_score(['data', 'science'], ['data']),
                          1.0 / 2.0)
@@ -1296,6 +1764,16 @@ class GeneralizedJaccardTestCases(unittest.TestCase):
         self.gen_jac_invalid = GeneralizedJaccard(sim_func=NeedlemanWunsch().get_raw_score,
                                                   threshold=0.8)
 
+
+    def test_valid_input_sim_func_with_score_cutoff(self):
+        jaro = Jaro()
+        gen_jac_without_cutoff = GeneralizedJaccard(sim_func=lambda s1, s2: jaro.get_raw_score(s1, s2),
+                                                    threshold=0.8)
+        set1 = ['Niall', 'Neal', 'Nigel', 'Comput.']
+        set2 = ['Neil', 'Niel', 'Computer', 'Nigella']
+        self.assertEqual(GeneralizedJaccard(threshold=0.8).get_raw_score(set1, set2),
+                         gen_jac_without_cutoff.get_raw_score(set1, set2))
+
     def test_get_sim_func(self):
         self.assertEqual(self.gen_jac_with_jw_08.get_sim_func(), self.jw_fn)
 
@@ -1475,6 +1953,32 @@ class CosineTestCases(unittest.TestCase):
     def setUp(self):
         self.cos = Cosine()
 
+    def test_token_ids(self):
+        vocabulary = Vocabulary()
+        for set1, set2 in [(['data', 'science'], ['data']),
+                           (['data', 'management'], ['data', 'data', 'science']),
+                           ([], []), ([], ['data']), (['data', 'data'], ['data']),
+                           (['a', 'b', 'c'], [str(i) for i in range(100)] + ['c'])]:
+            ids1, ids2 = vocabulary.encode(set1), vocabulary.encode(set2)
+            self.assertEqual(self.cos.get_raw_score(ids1, ids2), self.cos.get_raw_score(set1, set2))
+            self.assertEqual(self.cos.get_sim_score(ids1, ids2), self.cos.get_sim_score(set1, set2))
+
+    @raises(TypeError)
+    def test_invalid_token_ids(self):
+        self.cos.get_raw_score(np.array([1, 2], dtype=np.int64), np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted_token_ids(self):
+        self.cos.get_raw_score(np.array([3, 1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated_token_ids(self):
+        self.cos.get_raw_score(np.array([1, 1, 2], dtype=np.int32), np.array([1, 2], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_token_ids_and_list(self):
+        self.cos.get_raw_score(np.array([1, 2], dtype=np.int32), [1])
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.cos.get_raw_score(['data', 'science'], ['data']), 1.0 / (math.sqrt(2) * math.sqrt(1)))
         self.assertEqual(self.cos.get_raw_score(['data', 'science'], ['science', 'good']),
@@ -1574,6 +2078,136 @@ class TfidfTestCases(unittest.TestCase):
     def test_get_dampen(self):
         self.assertEqual(self.tfidf_with_params1.get_dampen(), True)
 
+    def test_get_weights(self):
+        self.assertEqual(self.tfidf_with_params1.get_weights(['a', 'c', 'c', 'd']),
+                         {'a': math.log(4.0 / 3) * math.log(2), 'c': math.log(4.0) * math.log(3)})
+        self.assertEqual(TfIdf(self.corpus, False).get_weights(['b', 'b']), {'b': 4.0})
+        self.assertEqual(self.tfidf_with_params1.get_weights([]), {})
+
+    @raises(ValueError)
+    def test_get_weights_no_corpus(self):
+        self.tfidf.get_weights(['a'])
+
+    @raises(TypeError)
+    def test_invalid_input_get_weights(self):
+        self.tfidf_with_params1.get_weights('a')
+
+    def test_vectorize(self):
+        ids, weights = self.tfidf_with_params1.vectorize(['c', 'a', 'c', 'd'])
+        self.assertEqual(ids.dtype, np.int32)
+        self.assertEqual(weights.dtype, np.float32)
+        self.assertEqual(ids.tolist(), [0, 2])
+        norm = math.sqrt((math.log(4.0 / 3) * math.log(2)) ** 2 + (math.log(4.0) * math.log(3)) ** 2)
+        self.assertAlmostEqual(weights[0], math.log(4.0 / 3) * math.log(2) / norm, places=6)
+        self.assertAlmostEqual(weights[1], math.log(4.0) * math.log(3) / norm, places=6)
+        ids, weights = self.tfidf_with_params1.vectorize(['d'])
+        self.assertEqual((len(ids), len(weights)), (0, 0))
+
+    def test_vectorize_get_raw_score(self):
+        bags = [['a', 'b', 'a'], ['a'], ['a', 'c'], ['b', 'c', 'c'], ['b', 'd'], ['d'], []]
+        for tfidf in [self.tfidf_with_params1, TfIdf(self.corpus, False)]:
+            vectors = tfidf.vectorize_many(bags)
+            for bag1, vector1 in zip(bags, vectors):
+                for bag2, vector2 in zip(bags, vectors):
+                    expected = tfidf.get_raw_score(bag1, bag2) if bag1 != bag2 or vector1[0].size > 0 else 0.0
+                    self.assertAlmostEqual(tfidf.get_raw_score(vector1, vector2), expected, places=6)
+                    self.assertAlmostEqual(tfidf.get_sim_score(vector1, vector2), expected, places=6)
+
+    def test_vectorize_after_set_dampen(self):
+        tfidf = TfIdf(self.corpus, True)
+        self.assertEqual(tfidf.vectorize(['a']), tfidf.vectorize(['a']))
+        tfidf.set_dampen(False)
+        self.assertAlmostEqual(tfidf.get_raw_score(tfidf.vectorize(['a', 'b']), tfidf.vectorize(['b'])),
+                               tfidf.get_raw_score(['a', 'b'], ['b']), places=6)
+
+    @raises(ValueError)
+    def test_vectorize_no_corpus(self):
+        self.tfidf.vectorize(['a'])
+
+    @raises(TypeError)
+    def test_invalid_input_vectorize(self):
+        self.tfidf_with_params1.vectorize('a')
+
+    @raises(TypeError)
+    def test_invalid_input_vectorize_none(self):
+        self.tfidf_with_params1.vectorize(None)
+
+    @raises(ValueError)
+    def test_invalid_vector_get_raw_score(self):
+        ids, weights = self.tfidf_with_params1.vectorize(['a', 'b'])
+        self.tfidf_with_params1.get_raw_score((ids, weights), (ids, weights[:1]))
+
+    def test_add_documents(self):
+        corpus1 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']]
+        corpus2 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b'], ['c', 'a', 'b']]
+        tfidf = TfIdf(corpus_list=corpus1)
+        self.assertEqual(tfidf.add_documents([['c', 'a', 'b']]), True)
+        self.assertEqual(tfidf.get_corpus_list(), None)
+        self.assertEqual(corpus1, [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']])
+        self.assertAlmostEqual(tfidf.get_raw_score(['a', 'b', 'a'], ['a']), 0.5692378887901467)
+        expected = TfIdf(corpus2)
+        self.assertEqual(tfidf.get_weights(['a', 'b', 'c', 'd']), expected.get_weights(['a', 'b', 'c', 'd']))
+
+    def test_has_corpus(self):
+        tfidf = TfIdf()
+        self.assertEqual(tfidf.has_corpus(), False)
+        tfidf.add_documents([['a', 'b'], ['c']])
+        self.assertEqual(tfidf.has_corpus(), True)
+        self.assertEqual(TfIdf([['a']]).has_corpus(), True)
+
+    def test_add_documents_no_corpus(self):
+        tfidf = TfIdf()
+        tfidf.add_documents(self.corpus)
+        self.assertEqual(tfidf.get_raw_score(['a', 'b', 'a'], ['a']),
+                         self.tfidf_with_params1.get_raw_score(['a', 'b', 'a'], ['a']))
+        self.assertAlmostEqual(tfidf.get_raw_score(tfidf.vectorize(['a', 'b', 'a']), tfidf.vectorize(['a', 'c'])),
+                               self.tfidf_with_params1.get_raw_score(['a', 'b', 'a'], ['a', 'c']), places=6)
+
+    def test_remove_documents(self):
+        tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a'], ['b'], ['c', 'a', 'b']])
+        self.assertEqual(tfidf.remove_documents([['b', 'a', 'c', 'c']]), True)
+        self.assertEqual(tfidf.get_raw_score(['a', 'b', 'a'], ['a', 'c']),
+                         self.tfidf_with_params1.get_raw_score(['a', 'b', 'a'], ['a', 'c']))
+        self.assertEqual(tfidf.get_weights(['a', 'b', 'c']), self.tfidf_with_params1.get_weights(['a', 'b', 'c']))
+        tfidf.remove_documents(self.corpus)
+        self.assertEqual(tfidf.get_weights(['a', 'b', 'c']), {})
+
+    def test_update_document(self):
+        tfidf = TfIdf([['a', 'b', 'a'], ['a', 'c'], ['a'], ['d']])
+        self.assertEqual(tfidf.update_document(['d'], ['b']), True)
+        self.assertEqual(tfidf.get_weights(['a', 'b', 'c', 'd']),
+                         self.tfidf_with_params1.get_weights(['a', 'b', 'c', 'd']))
+
+    @raises(ValueError)
+    def test_remove_documents_not_in_corpus(self):
+        self.tfidf_with_params1.remove_documents([['c'], ['c', 'a']])
+
+    def test_remove_documents_not_in_corpus_unchanged(self):
+        weights = self.tfidf_with_params1.get_weights(['a', 'b', 'c'])
+        self.assertRaises(ValueError, self.tfidf_with_params1.remove_documents, [['a'], ['d']])
+        self.assertRaises(ValueError, self.tfidf_with_params1.update_document, ['d'], ['a'])
+        self.assertEqual(self.tfidf_with_params1.get_weights(['a', 'b', 'c']), weights)
+
+    @raises(ValueError)
+    def test_remove_documents_too_many(self):
+        TfIdf([['a']]).remove_documents([['a'], ['a']])
+
+    @raises(ValueError)
+    def test_remove_documents_no_corpus(self):
+        self.tfidf.remove_documents([['a']])
+
+    @raises(ValueError)
+    def test_update_document_no_corpus(self):
+        self.tfidf.update_document(['a'], ['b'])
+
+    @raises(TypeError)
+    def test_invalid_input_add_documents(self):
+        self.tfidf_with_params1.add_documents([['a'], 'b'])
+
+    @raises(TypeError)
+    def test_invalid_input_update_document(self):
+        self.tfidf_with_params1.update_document(['a'], None)
+
     def test_set_corpus_list(self):
         corpus1 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']]
         corpus2 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b'], ['c', 'a', 'b']]
@@ -1592,6 +2226,16 @@ class TfidfTestCases(unittest.TestCase):
         self.assertEqual(tfidf.get_dampen(), True)
         self.assertAlmostEqual(tfidf.get_raw_score(['a', 'b', 'a'], ['a']), 0.5495722661728765)
 
+    def test_dampen_attribute_changed_after_scoring(self):
+        corpus = [['a', 'b', 'a'], ['a', 'c'], ['a']]
+        tfidf = TfIdf(corpus)
+        tfidf.get_raw_score(['a', 'b', 'a'], ['a'])
+        tfidf.dampen = False
+        self.assertEqual(tfidf.get_raw_score(['a', 'b', 'b'], ['b', 'c']),
+                         TfIdf(corpus, False).get_raw_score(['a', 'b', 'b'], ['b', 'c']))
+        self.assertAlmostEqual(tfidf.get_raw_score(['a', 'b', 'b'], ['b', 'c']), 0.6975, places=4)
+        self.assertEqual(tfidf.get_weights(['b', 'c']), TfIdf(corpus, False).get_weights(['b', 'c']))
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.tfidf_with_params1.get_raw_score(['a', 'b', 'a'], ['a', 'c']),
                          0.11166746710505392)
@@ -1711,6 +2355,32 @@ class TverskyIndexTestCases(unittest.TestCase):
         self.assertAlmostEqual(tvi.get_raw_score(['data', 'science'], ['science', 'good']),
                                0.45454545454545453)
 
+    def test_token_ids(self):
+        vocabulary = Vocabulary()
+        for set1, set2 in [(['data', 'science'], ['data']),
+                           (['data', 'management'], ['data', 'data', 'science']),
+                           ([], []), ([], ['data']), (['data', 'data'], ['data']),
+                           (['a', 'b', 'c'], [str(i) for i in range(100)] + ['c'])]:
+            ids1, ids2 = vocabulary.encode(set1), vocabulary.encode(set2)
+            self.assertEqual(self.tvi_with_params2.get_raw_score(ids1, ids2), self.tvi_with_params2.get_raw_score(set1, set2))
+            self.assertEqual(self.tvi_with_params2.get_sim_score(ids1, ids2), self.tvi_with_params2.get_sim_score(set1, set2))
+
+    @raises(TypeError)
+    def test_invalid_token_ids(self):
+        self.tvi_with_params2.get_raw_score(np.array([1, 2], dtype=np.int64), np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted_token_ids(self):
+        self.tvi_with_params2.get_raw_score(np.array([3, 1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated_token_ids(self):
+        self.tvi_with_params2.get_raw_score(np.array([1, 1, 2], dtype=np.int32), np.array([1, 2], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_token_ids_and_list(self):
+        self.tvi_with_params2.get_raw_score(np.array([1, 2], dtype=np.int32), [1])
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.tvi_with_params1.get_raw_score(['data', 'science'], ['data']),
                          1.0 / (1.0 + 0.5*1 + 0.5*0))
@@ -1867,6 +2537,15 @@ class Soft_TfidfTestCases(unittest.TestCase):
                                               sim_func=Jaro().get_raw_score,
                                               threshold=0.8)
 
+
+    def test_valid_input_sim_func_with_score_cutoff(self):
+        jaro = Jaro()
+        soft_tfidf_without_cutoff = SoftTfIdf(self.corpus, sim_func=lambda s1, s2: jaro.get_raw_score(s1, s2),
+                                              threshold=0.8)
+        for bag1, bag2 in [(['a', 'b', 'a'], ['a', 'c']), (['Niall', 'Nigel'], ['Neil', 'Niel', 'Nigella'])]:
+            self.assertEqual(self.soft_tfidf_with_params1.get_raw_score(bag1, bag2),
+                             soft_tfidf_without_cutoff.get_raw_score(bag1, bag2))
+
     def test_get_corpus_list(self):
         self.assertEqual(self.soft_tfidf_with_params1.get_corpus_list(), self.corpus)
 
@@ -1876,6 +2555,49 @@ class Soft_TfidfTestCases(unittest.TestCase):
     def test_get_threshold(self):
         self.assertEqual(self.soft_tfidf_with_params4.get_threshold(), 0.6)
 
+    def test_add_documents(self):
+        corpus1 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']]
+        soft_tfidf = SoftTfIdf(corpus_list=corpus1)
+        self.assertEqual(soft_tfidf.add_documents([['c', 'a', 'b']]), True)
+        self.assertEqual(soft_tfidf.get_corpus_list(), None)
+        self.assertAlmostEqual(soft_tfidf.get_raw_score(['a', 'b', 'a'], ['a']), 0.8320502943378437)
+
+    def test_has_corpus(self):
+        soft_tfidf = SoftTfIdf()
+        self.assertEqual(soft_tfidf.has_corpus(), False)
+        soft_tfidf.add_documents([['a', 'b'], ['c']])
+        self.assertEqual(soft_tfidf.has_corpus(), True)
+
+    def test_add_documents_no_corpus(self):
+        soft_tfidf = SoftTfIdf(threshold=0.8)
+        soft_tfidf.add_documents(self.corpus)
+        self.assertEqual(soft_tfidf.get_raw_score(['a', 'b', 'a'], ['a', 'c']),
+                         self.soft_tfidf_with_params1.get_raw_score(['a', 'b', 'a'], ['a', 'c']))
+
+    def test_remove_documents(self):
+        soft_tfidf = SoftTfIdf([['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']])
+        self.assertEqual(soft_tfidf.remove_documents([['b']]), True)
+        self.assertAlmostEqual(soft_tfidf.get_raw_score(['a', 'b', 'a'], ['a']),
+                               SoftTfIdf(self.corpus).get_raw_score(['a', 'b', 'a'], ['a']))
+
+    def test_update_document(self):
+        soft_tfidf = SoftTfIdf([['a', 'b', 'a'], ['a', 'c'], ['b']])
+        self.assertEqual(soft_tfidf.update_document(['b'], ['a']), True)
+        self.assertAlmostEqual(soft_tfidf.get_raw_score(['a', 'b', 'a'], ['a']),
+                               SoftTfIdf(self.corpus).get_raw_score(['a', 'b', 'a'], ['a']))
+
+    @raises(ValueError)
+    def test_remove_documents_not_in_corpus(self):
+        self.soft_tfidf_with_params1.remove_documents([['d']])
+
+    @raises(ValueError)
+    def test_remove_documents_no_corpus(self):
+        self.soft_tfidf.remove_documents([['a']])
+
+    @raises(TypeError)
+    def test_invalid_input_add_documents(self):
+        self.soft_tfidf.add_documents([None])
+
     def test_set_corpus_list(self):
         corpus1 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b']]
         corpus2 = [['a', 'b', 'a'], ['a', 'c'], ['a'], ['b'], ['c', 'a', 'b']]
@@ -1963,6 +2685,15 @@ class MongeElkanTestCases(unittest.TestCase):
         self.affine_fn = Affine().get_raw_score
         self.me_with_affine = MongeElkan(self.affine_fn)
 
+
+    def test_valid_input_sim_func_with_score_cutoff(self):
+        # Jaro-Winkler takes a score_cutoff, which must not change the result
+        jw = JaroWinkler()
+        me_without_cutoff = MongeElkan(sim_func=lambda s1, s2: jw.get_raw_score(s1, s2))
+        bag1 = ['Comput.', 'Sci.', 'and', 'Eng.', 'Dept.,', 'University', 'of', 'California,', 'San', 'Diego']
+        bag2 = ['Department', 'of', 'Computer', 'Science,', 'Univ.', 'Calif.,', 'San', 'Diego']
+        self.assertEqual(self.me.get_raw_score(bag1, bag2), me_without_cutoff.get_raw_score(bag1, bag2))
+
     def test_get_sim_func(self):
         self.assertEqual(self.me_with_affine.get_sim_func(), self.affine_fn)
 
@@ -2051,6 +2782,59 @@ class PartialRatioTestCases(unittest.TestCase):
     def setUp(self):
         self.ratio = PartialRatio()
 
+    def test_indel_engine(self):
+        ratio = PartialRatio(engine='indel')
+        self.assertEqual(PartialRatio().get_raw_score('bbcb xyz', 'xyz bcabacb'), 38)
+        self.assertEqual(ratio.get_raw_score('bbcb xyz', 'xyz bcabacb'), 50)
+        self.assertEqual(ratio.get_raw_score('Robert Rupert', 'Rupert'), 100)
+        self.assertEqual(ratio.get_raw_score('', 'abc'), 0)
+
+    def test_get_set_engine(self):
+        self.assertEqual(self.ratio.get_engine(), 'difflib')
+        self.assertEqual(self.ratio.set_engine('indel'), True)
+        self.assertEqual(self.ratio.get_engine(), 'indel')
+
+    @raises(ValueError)
+    def test_invalid_engine(self):
+        self.ratio.set_engine('fast')
+
+    def test_sliding_engine(self):
+        ratio = PartialRatio(engine='sliding')
+        indel = Ratio(engine='indel')
+        pairs = [('Robert Rupert', 'Rupert'), ('bag_distance', 'frankenstein'), ('distance', 'difference'),
+                 ('java was neat', 'scala is great'), ('samsng galaxi', 'apple iphone case samsung galaxy s9'),
+                 ('ab' * 40, 'ba' * 70 + 'xy'), ('a', 'b'), ('abc', 'abc'), ('abc', 'xxab'), ('abc', 'bcxx'),
+                 ('x' + 'a' * 70, 'a' * 69 + 'y' * 5)]
+        for string1, string2 in pairs:
+            shorter, longer = sorted([string1, string2], key=len)
+            # the best ratio of a substring of the longer string of the shorter string's length, or of a
+            # shorter prefix or suffix of it
+            expected = max(indel.get_raw_score(shorter, longer[max(i, 0):i + len(shorter)])
+                           for i in range(1 - len(shorter), len(longer)))
+            self.assertEqual(ratio.get_raw_score(string1, string2), expected)
+        self.assertEqual(ratio.get_raw_score('abc', 'xxab'), 80)
+        self.assertEqual(ratio.get_raw_score('abc', 'xxab', score_cutoff=81), 0)
+        self.assertEqual(ratio.get_raw_score('', 'abc'), 0)
+        self.assertEqual(ratio.get_sim_score('Robert Rupert', 'Rupert'), 1.0)
+
+    def test_score_cutoff(self):
+        for engine in ['difflib', 'indel', 'sliding']:
+            ratio = PartialRatio(engine=engine)
+            score = ratio.get_raw_score('distance', 'difference')
+            self.assertEqual(ratio.get_raw_score('distance', 'difference', score_cutoff=score), score)
+            self.assertEqual(ratio.get_raw_score('distance', 'difference', score_cutoff=score + 1), 0)
+            self.assertEqual(ratio.get_sim_score('distance', 'difference', score_cutoff=score / 100), score / 100)
+            self.assertEqual(ratio.get_sim_score('distance', 'difference', score_cutoff=(score + 1) / 100), 0)
+            self.assertEqual(ratio.get_raw_score('Robert Rupert', 'Rupert', score_cutoff=100), 100)
+
+    @raises(ValueError)
+    def test_invalid_score_cutoff_raw_score(self):
+        self.ratio.get_raw_score('a', 'b', score_cutoff=101)
+
+    @raises(ValueError)
+    def test_invalid_score_cutoff_sim_score(self):
+        self.ratio.get_sim_score('a', 'b', score_cutoff=1.5)
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.ratio.get_raw_score('a', ''), 0)
         self.assertEqual(self.ratio.get_raw_score('', 'a'), 0)
@@ -2173,6 +2957,28 @@ class RatioTestCases(unittest.TestCase):
     def setUp(self):
         self.ratio = Ratio()
 
+    def test_indel_engine(self):
+        ratio = Ratio(engine='indel')
+        # difflib's matching blocks miss part of the longest common subsequence
+        self.assertEqual(Ratio().get_raw_score('bbcb', 'bcabacb'), 55)
+        self.assertEqual(ratio.get_raw_score('bbcb', 'bcabacb'), 73)
+        self.assertEqual(ratio.get_raw_score('abcd bbcb', 'bcabacb'), 62)
+        self.assertEqual(ratio.get_raw_score('ab' * 50, 'ba' * 50), 99)
+        self.assertEqual(ratio.get_raw_score('', 'abc'), 0)
+        self.assertEqual(ratio.get_raw_score('abc', 'abc'), 100)
+        self.assertEqual(ratio.get_sim_score('example', 'samples'), 0.71)
+
+    def test_get_set_engine(self):
+        self.assertEqual(self.ratio.get_engine(), 'difflib')
+        ratio = Ratio(engine='indel')
+        self.assertEqual(ratio.get_engine(), 'indel')
+        self.assertEqual(ratio.set_engine('difflib'), True)
+        self.assertEqual(ratio.get_raw_score('bbcb', 'bcabacb'), 55)
+
+    @raises(ValueError)
+    def test_invalid_engine(self):
+        Ratio(engine='levenshtein')
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.ratio.get_raw_score('a', ''), 0)
         self.assertEqual(self.ratio.get_raw_score('', 'a'), 0)
@@ -2294,6 +3100,43 @@ class PartialTokenSortTestCases(unittest.TestCase):
     def setUp(self):
         self.partialTokenSort = PartialTokenSort()
 
+    def test_indel_engine(self):
+        partial_token_sort = PartialTokenSort(engine='indel')
+        self.assertEqual(partial_token_sort.get_raw_score('great is scala', 'java is great'), 77)
+        self.assertEqual(partial_token_sort.get_raw_score('bbcb', 'bcabacb'), 75)
+        self.assertEqual(partial_token_sort.get_engine(), 'indel')
+
+    @raises(ValueError)
+    def test_invalid_engine(self):
+        PartialTokenSort(engine='Indel')
+
+    def test_prepare(self):
+        partial_token_sort = PartialTokenSort()
+        query = partial_token_sort.prepare('Great is Scala!')
+        self.assertEqual(query, 'great is scala')
+        for string in ['java is great', 'C++ and Java', 'scala']:
+            self.assertEqual(partial_token_sort.get_raw_score(query, string),
+                             partial_token_sort.get_raw_score('Great is Scala!', string))
+
+    def test_normalizer(self):
+        partial_token_sort = PartialTokenSort(normalizer=Normalizer(fold_accents=True))
+        self.assertEqual(partial_token_sort.get_raw_score('Brûlée', 'creme brulee'), 100)
+        self.assertEqual(partial_token_sort.prepare('Crème Brûlée'), 'brulee creme')
+        self.assertEqual(partial_token_sort.set_normalizer(None), True)
+        self.assertIsNone(partial_token_sort.get_normalizer())
+        self.assertLess(partial_token_sort.get_raw_score('Brûlée', 'creme brulee'), 100)
+
+    @raises(TypeError)
+    def test_invalid_input_prepare(self):
+        PartialTokenSort().prepare(12)
+
+    def test_sliding_engine(self):
+        partial_token_sort = PartialTokenSort(engine='sliding')
+        self.assertEqual(partial_token_sort.get_raw_score('great is scala', 'java is great'), 82)
+        self.assertEqual(partial_token_sort.get_raw_score('great is scala', 'java is great', score_cutoff=85), 0)
+        self.assertEqual(partial_token_sort.get_sim_score('great is scala', 'java is great', score_cutoff=0.82),
+                         0.82)
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.partialTokenSort.get_raw_score('a', ''), 0)
         self.assertEqual(self.partialTokenSort.get_raw_score('', 'a'), 0)
@@ -2440,6 +3283,53 @@ class TokenSortTestCases(unittest.TestCase):
     def setUp(self):
         self.tokenSort = TokenSort()
 
+    def test_indel_engine(self):
+        token_sort = TokenSort(engine='indel')
+        self.assertEqual(TokenSort().get_raw_score('abcd bbcb', 'bcabacb'), 50)
+        self.assertEqual(token_sort.get_raw_score('abcd bbcb', 'bcabacb'), 62)
+        self.assertEqual(token_sort.get_raw_score('great is scala', 'java is great'), 81)
+        self.assertEqual(token_sort.get_engine(), 'indel')
+
+    @raises(ValueError)
+    def test_invalid_engine(self):
+        TokenSort(engine=None)
+
+    def test_prepare(self):
+        query = self.tokenSort.prepare('Great is Scala!')
+        self.assertEqual(query, 'great is scala')
+        for string in ['java is great', 'C++ and Java', 'scala', 'great is scala']:
+            self.assertEqual(self.tokenSort.get_raw_score(query, string),
+                             self.tokenSort.get_raw_score('Great is Scala!', string))
+        self.assertEqual(self.tokenSort.prepare('b a', full_process=False), 'a b')
+        self.assertEqual(self.tokenSort.prepare('Sue', force_ascii=False), 'sue')
+
+    def test_sorted_tokens_cache(self):
+        from py_stringmatching.similarity_measure.token_sort import _sorted_tokens
+        self.tokenSort.get_raw_score('gamma beta alpha', 'alpha beta')
+        hits = _sorted_tokens.cache_info().hits
+        self.tokenSort.get_raw_score('gamma beta alpha', 'beta alpha')
+        self.assertEqual(_sorted_tokens.cache_info().hits, hits + 1)
+        self.assertLessEqual(_sorted_tokens.cache_info().currsize, _sorted_tokens.cache_info().maxsize)
+
+    def test_normalizer(self):
+        token_sort = TokenSort(normalizer=Normalizer(fold_accents=True))
+        self.assertEqual(token_sort.get_raw_score('Crème Brûlée', 'brulee creme'), 100)
+        self.assertEqual(token_sort.prepare('Crème Brûlée'), 'brulee creme')
+        self.assertEqual(token_sort.get_raw_score('Crème', 'creme', full_process=False), 60)
+        self.assertLess(self.tokenSort.get_raw_score('Crème Brûlée', 'brulee creme'), 100)
+        self.assertIsNone(self.tokenSort.get_normalizer())
+        self.assertEqual(self.tokenSort.set_normalizer(Normalizer(lowercase=False)), True)
+        self.assertEqual(self.tokenSort.get_raw_score('Sue', 'sue'), 67)
+
+    def test_normalizers_with_other_options(self):
+        self.assertEqual(TokenSort(normalizer=Normalizer()).prepare('World, Héllo'), 'héllo world')
+        token_sort = TokenSort(normalizer=Normalizer(remove_punctuation=False, lowercase=False))
+        self.assertEqual(token_sort.prepare('World, Héllo'), 'Héllo World,')
+
+    @raises(TypeError)
+    def test_invalid_input_prepare(self):
+        self.tokenSort.prepare(None)
+
     def test_valid_input_raw_score(self):
         self.assertEqual(self.tokenSort.get_raw_score('a', ''), 0)
         self.assertEqual(self.tokenSort.get_raw_score('', 'a'), 0)
@@ -0,0 +1,81 @@
+from __future__ import unicode_literals
+
+import unittest
+from nose.tools import *
+
+import numpy as np
+
+from py_stringmatching.simhash import SimHash
+from py_stringmatching.similarity_measure.hamming_distance import HammingDistance
+from py_stringmatching.similarity_measure.tfidf import TfIdf
+
+
+class SimHashTestCases(unittest.TestCase):
+    def setUp(self):
+        self.simhash = SimHash()
+        self.corpus = [['stainless', 'steel', 'kettle'], ['glass', 'kettle'], ['steel', 'pan', 'kettle'], ['kettle']]
+        self.hd = HammingDistance()
+
+    def test_fingerprint(self):
+        fingerprint = self.simhash.fingerprint(['steel', 'kettle'])
+        self.assertTrue(isinstance(fingerprint, np.uint64))
+        self.assertEqual(fingerprint, SimHash().fingerprint(['kettle', 'steel']))
+        self.assertEqual(self.simhash.fingerprint([]), 0)
+        # a single token gives its hash
+        self.assertEqual(self.simhash.fingerprint(['steel', 'steel']), self.simhash.fingerprint(['steel']))
+
+    def test_fingerprints(self):
+        bags = [['steel', 'kettle'], [], {'glass'}, ['steel', 'kettle', 'kettle']]
+        fingerprints = self.simhash.fingerprints(bags)
+        self.assertEqual(fingerprints.dtype, np.uint64)
+        self.assertEqual(fingerprints.tolist(), [self.simhash.fingerprint(bag) for bag in bags])
+        self.assertEqual(len(self.simhash.fingerprints([])), 0)
+
+    def test_near_duplicates(self):
+        words = ['w%d' % i for i in range(200)]
+        fingerprint = self.simhash.fingerprint(words)
+        near = self.hd.get_raw_score(fingerprint, self.simhash.fingerprint(words[:-2] + ['x', 'y']))
+        far = self.hd.get_raw_score(fingerprint, self.simhash.fingerprint(words[:100] + ['x%d' % i for i in range(100)]))
+        self.assertLess(near, far)
+        self.assertLessEqual(near, 6)
+
+    def test_tfidf_weights(self):
+        simhash = SimHash(TfIdf(self.corpus))
+        # tokens that are not in the corpus, or that are in every document, weigh nothing
+        self.assertEqual(simhash.fingerprint(['steel', 'unknown', 'kettle']), self.simhash.fingerprint(['steel']))
+        self.assertEqual(simhash.fingerprint(['kettle']), 0)
+        self.assertEqual(simhash.fingerprints([['glass', 'pan'], ['unknown']]).tolist(),
+                         [simhash.fingerprint(['glass', 'pan']), 0])
+
+    def test_get_set_tfidf(self):
+        tfidf = TfIdf(self.corpus)
+        self.assertEqual(self.simhash.get_tfidf(), None)
+        self.assertEqual(self.simhash.set_tfidf(tfidf), True)
+        self.assertEqual(self.simhash.get_tfidf(), tfidf)
+
+    def test_tfidf_with_added_documents(self):
+        tfidf = TfIdf()
+        tfidf.add_documents(self.corpus)
+        simhash = SimHash(tfidf)
+        self.assertEqual(simhash.fingerprint(['steel', 'unknown', 'kettle']),
+                         SimHash(TfIdf(self.corpus)).fingerprint(['steel', 'unknown', 'kettle']))
+
+    @raises(ValueError)
+    def test_tfidf_without_corpus(self):
+        SimHash(TfIdf())
+
+    @raises(TypeError)
+    def test_invalid_tfidf(self):
+        SimHash('tfidf')
+
+    @raises(TypeError)
+    def test_invalid_input_none(self):
+        self.simhash.fingerprint(None)
+
+    @raises(TypeError)
+    def test_invalid_input_string(self):
+        self.simhash.fingerprint('steel kettle')
+
+    @raises(TypeError)
+    def test_invalid_token(self):
+        self.simhash.fingerprint(['steel', 1])
@@ -0,0 +1,64 @@
+from __future__ import unicode_literals
+
+import unittest
+from nose.tools import *
+
+import numpy as np
+
+from py_stringmatching.similarity_measure.cython.cython_token_sets import token_ids_overlap
+from py_stringmatching.vocabulary import Vocabulary
+
+
+class VocabularyTestCases(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = Vocabulary()
+
+    def test_encode(self):
+        ids = self.vocabulary.encode(['b', 'a', 'b', 'c'])
+        self.assertEqual(ids.dtype, np.int32)
+        self.assertEqual(ids.tolist(), [0, 1, 2])
+        self.assertEqual(self.vocabulary.encode({'c', 'd'}).tolist(), [2, 3])
+        self.assertEqual(self.vocabulary.encode([]).tolist(), [])
+        self.assertEqual(len(self.vocabulary), 4)
+
+    def test_encode_many(self):
+        encoded = self.vocabulary.encode_many([['x', 'y'], ['y'], []])
+        self.assertEqual([ids.tolist() for ids in encoded], [[0, 1], [1], []])
+
+    def test_add_and_lookup(self):
+        self.assertEqual(self.vocabulary.add('a'), 0)
+        self.assertEqual(self.vocabulary.add('b'), 1)
+        self.assertEqual(self.vocabulary.add('a'), 0)
+        self.assertEqual(self.vocabulary.get_id('b'), 1)
+        self.assertIn('a', self.vocabulary)
+        self.assertNotIn('c', self.vocabulary)
+        self.assertEqual(self.vocabulary.decode(self.vocabulary.encode(['b', 'a'])), ['a', 'b'])
+
+    @raises(KeyError)
+    def test_unknown_token(self):
+        self.vocabulary.get_id('a')
+
+
+class TokenIdsOverlapTestCases(unittest.TestCase):
+    def test_overlap(self):
+        rng = np.random.RandomState(0)
+        for len1, len2 in [(0, 0), (0, 5), (5, 5), (3, 200), (200, 3), (50, 80)]:
+            ids1 = np.unique(rng.randint(0, 300, len1)).astype(np.int32)
+            ids2 = np.unique(rng.randint(0, 300, len2)).astype(np.int32)
+            self.assertEqual(token_ids_overlap(ids1, ids2), len(set(ids1.tolist()) & set(ids2.tolist())))
+
+    @raises(TypeError)
+    def test_invalid_dtype(self):
+        token_ids_overlap(np.array([1, 2]).astype(np.int64), np.array([1], dtype=np.int32))
+
+    @raises(TypeError)
+    def test_not_contiguous(self):
+        token_ids_overlap(np.arange(10, dtype=np.int32)[::2], np.array([1], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_unsorted(self):
+        token_ids_overlap(np.array([1], dtype=np.int32), np.array([3, 1, 2], dtype=np.int32))
+
+    @raises(ValueError)
+    def test_repeated(self):
+        token_ids_overlap(np.array([1, 1, 2], dtype=np.int32), np.array([1], dtype=np.int32))
@@ -1,8 +1,12 @@
 import functools
+import inspect
+import os
 import re
 import six
 import sys
 
+import numpy as np
+
 """
 This module defines a list of utility and validation functions.
 """
@@ -41,11 +45,63 @@ def sim_check_for_list_or_set_inputs(*args):
             raise TypeError('Second argument is expected to be a python list or set')
 
 
+def sim_check_for_token_ids(*args):
+    # token sets encoded as arrays of token ids by a Vocabulary
+    return isinstance(args[0], np.ndarray) and isinstance(args[1], np.ndarray)
+
+
 def sim_check_tversky_parameters(alpha, beta):
         if alpha < 0 or beta < 0:
             raise ValueError('Tversky parameters should be greater than or equal to zero')
 
 
+def sim_check_score_cutoff(score_cutoff, max_score=1):
+    if score_cutoff is not None and (score_cutoff < 0 or score_cutoff > max_score):
+        raise ValueError('score_cutoff should be in the range [0, %s]' % max_score)
+
+
+def sim_check_threshold(threshold):
+    if threshold < 0 or threshold > 1:
+        raise ValueError('threshold should be in the range [0, 1]')
+
+
+RATIO_ENGINES = ('difflib', 'indel')
+PARTIAL_RATIO_ENGINES = RATIO_ENGINES + ('sliding',)
+
+
+def sim_check_ratio_engine(engine, engines=RATIO_ENGINES):
+    if engine not in engines:
+        raise ValueError('engine should be one of ' + ', '.join(repr(e) for e in engines))
+
+
+SET_MEASURES = ('jaccard', 'cosine', 'dice', 'overlap_coefficient', 'tversky_index')
+
+
+def sim_check_set_measure(measure, measures=SET_MEASURES):
+    if measure not in measures:
+        raise ValueError('measure should be one of ' + ', '.join(repr(m) for m in measures))
+
+
+def _accepts_score_cutoff(sim_func):
+    try:
+        return 'score_cutoff' in inspect.signature(sim_func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+_accepts_score_cutoff_cached = functools.lru_cache(maxsize=128)(_accepts_score_cutoff)
+
+
+def sim_func_accepts_score_cutoff(sim_func):
+    """Checks whether a secondary similarity function takes a score_cutoff
+    keyword argument, like Jaro and JaroWinkler do."""
+    try:
+        return _accepts_score_cutoff_cached(sim_func)
+    except TypeError:
+        # unhashable callable
+        return _accepts_score_cutoff(sim_func)
+
+
 def sim_check_for_exact_match(*args):
     if args[0] == args[1]:
         return True
@@ -67,6 +123,48 @@ def tok_check_for_none(*args):
         raise TypeError("First argument cannot be None")
 
 
+def count_document_frequency(documents):
+    """Number of documents that contain each token, with the tokens in the
+    order they first appear."""
+    document_frequency = {}
+    for document in documents:
+        tok_check_for_none(document)
+        if not isinstance(document, (list, set)):
+            raise TypeError('Documents are expected to be python lists or sets')
+        for element in dict.fromkeys(document):
+            document_frequency[element] = document_frequency.get(element, 0) + 1
+    return document_frequency
+
+
+def update_document_frequency(document_frequency, corpus_size, added, removed):
+    """Removes the documents of the document frequency table removed and then
+    adds those of added, in place, and returns the new corpus size. Nothing
+    is changed if a removed document cannot be in the corpus."""
+    removed_df = count_document_frequency(removed)
+    added_df = count_document_frequency(added)
+    if len(removed) > corpus_size or any(
+            document_frequency.get(element, 0) < count for element, count in removed_df.items()):
+        raise ValueError('Removed documents are expected to be in the corpus')
+    for element, count in removed_df.items():
+        if document_frequency[element] == count:
+            del document_frequency[element]
+        else:
+            document_frequency[element] -= count
+    for element, count in added_df.items():
+        document_frequency[element] = document_frequency.get(element, 0) + count
+    return corpus_size - len(removed) + len(added)
+
+
+def get_num_threads(n_jobs):
+    """Translate n_jobs into a number of threads. -1 means all CPUs,
+    -2 all CPUs but one, and so on."""
+    if n_jobs == 0:
+        raise ValueError('n_jobs should be a non-zero integer')
+    if n_jobs < 0:
+        n_jobs = (os.cpu_count() or 1) + 1 + n_jobs
+    return max(n_jobs, 1)
+
+
 def convert_bag_to_set(input_list):
     seen_tokens = {}
     output_set =[]
@@ -84,10 +182,17 @@ def convert_to_unicode(input_string):
     return input_string 
 
 
+# Characters removed by remove_non_ascii_chars, and the non-word characters
+# replaced by process_string. Both are built once, at import. Like the
+# asciionly function of fuzzywuzzy, remove_non_ascii_chars only removes code
+# points 128 to 255, and the default processing of the fuzzy measures keeps
+# doing so; Normalizer(force_ascii=True) removes every non-ASCII character.
+_NON_ASCII_TABLE = dict((i, None) for i in range(128, 256))
+_NON_WORD = re.compile(r"(?ui)\W")
+
+
 def remove_non_ascii_chars(input_string):
-    remove_chars = str("").join([chr(i) for i in range(128, 256)])
-    translation_table = dict((ord(c), None) for c in remove_chars)
-    return input_string.translate(translation_table)
+    return input_string.translate(_NON_ASCII_TABLE)
 
 
 def process_string(input_string, force_ascii=False):
@@ -100,10 +205,8 @@ def process_string(input_string, force_ascii=False):
     if force_ascii:
         input_string = remove_non_ascii_chars(input_string)
 
-    regex = re.compile(r"(?ui)\W")
-
     # Keep only Letters and Numbers.
-    out_string = regex.sub(" ", input_string)
+    out_string = _NON_WORD.sub(" ", input_string)
 
     # Convert String to lowercase.
     out_string = out_string.lower()
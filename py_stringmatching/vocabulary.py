@@ -0,0 +1,126 @@
+"""Integer encoding of tokens for the token based similarity measures"""
+
+import numpy as np
+
+
+class Vocabulary(object):
+    """Maps tokens to dense integer ids.
+
+    Every distinct token gets the next free id (0, 1, 2, ...) the first time it is seen. Vocabulary.encode turns
+    the output of a tokenizer into a sorted NumPy array of unique int32 ids, which Jaccard, Cosine, Dice,
+    OverlapCoefficient and TverskyIndex accept in place of a set or list of tokens. The intersection of two such
+    arrays is computed by merging them in Cython, so a record that is encoded once can be scored against many
+    others without hashing its tokens again.
+
+    Token id arrays are only comparable if they were encoded by the same vocabulary.
+
+    Examples:
+        >>> from py_stringmatching import Jaccard, WhitespaceTokenizer
+        >>> vocabulary = Vocabulary()
+        >>> ws = WhitespaceTokenizer()
+        >>> ids1 = vocabulary.encode(ws.tokenize('data science'))
+        >>> ids2 = vocabulary.encode(ws.tokenize('data data management'))
+        >>> ids2
+        array([0, 2], dtype=int32)
+        >>> Jaccard().get_raw_score(ids1, ids2)
+        0.3333333333333333
+    """
+    def __init__(self):
+        # token -> id
+        self._ids = {}
+        # id -> token
+        self._tokens = []
+
+    def add(self, token):
+        """
+        Adds a token to the vocabulary, if it is not already in it.
+
+        Args:
+            token (hashable): Token
+
+        Returns:
+            Id of the token (int)
+        """
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = len(self._tokens)
+            self._ids[token] = token_id
+            self._tokens.append(token)
+        return token_id
+
+    def encode(self, tokens):
+        """
+        Encodes a set or list of tokens, adding the new tokens to the vocabulary.
+
+        Args:
+            tokens (set or list): Input tokens, repeated tokens are counted once
+
+        Returns:
+            Sorted array of the unique ids of the tokens (numpy int32 array)
+
+        Examples:
+            >>> vocabulary = Vocabulary()
+            >>> vocabulary.encode(['b', 'a', 'b'])
+            array([0, 1], dtype=int32)
+            >>> vocabulary.encode(['a', 'c'])
+            array([1, 2], dtype=int32)
+        """
+        ids = self._ids
+        token_list = self._tokens
+        token_ids = set()
+        for token in tokens:
+            token_id = ids.get(token)
+            if token_id is None:
+                token_id = len(token_list)
+                ids[token] = token_id
+                token_list.append(token)
+            token_ids.add(token_id)
+        return np.array(sorted(token_ids), dtype=np.int32)
+
+    def encode_many(self, token_lists):
+        """
+        Encodes many sets or lists of tokens.
+
+        Args:
+            token_lists (list of set or list): Input token sets
+
+        Returns:
+            List of sorted arrays of unique token ids (numpy int32 arrays)
+        """
+        return [self.encode(tokens) for tokens in token_lists]
+
+    def get_id(self, token):
+        """
+        Get the id of a token
+
+        Args:
+            token (hashable): Token
+
+        Returns:
+            Id of the token (int)
+
+        Raises:
+            KeyError : If the token is not in the vocabulary
+        """
+        return self._ids[token]
+
+    def decode(self, token_ids):
+        """
+        Get the tokens of an array of token ids
+
+        Args:
+            token_ids (array or list of int): Token ids
+
+        Returns:
+            List of tokens
+
+        Raises:
+            IndexError : If one of the ids is not in the vocabulary
+        """
+        return [self._tokens[token_id] for token_id in token_ids]
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, token):
+        return token in self._ids
@@ -28,15 +28,28 @@ install_and_import('setuptools')
 
 from setuptools.command.build_ext import build_ext as _build_ext
 
+# The batch scoring kernels use OpenMP when the package is built with
+# PY_STRINGMATCHING_USE_OPENMP=1. Without it they run on a single thread.
+USE_OPENMP = os.environ.get('PY_STRINGMATCHING_USE_OPENMP', '0') == '1'
+
+
 class build_ext(_build_ext):
     def build_extensions(self):
         import pkg_resources                                                            
         numpy_incl = pkg_resources.resource_filename('numpy', 'core/include')
 
+        if self.compiler.compiler_type == 'msvc':
+            openmp_compile_args, openmp_link_args = ['/openmp'], []
+        else:
+            openmp_compile_args, openmp_link_args = ['-fopenmp'], ['-fopenmp']
+
         for ext in self.extensions:
             if (hasattr(ext, 'include_dirs') and
                     not numpy_incl in ext.include_dirs):
                 ext.include_dirs.append(numpy_incl)
+            if USE_OPENMP:
+                ext.extra_compile_args.extend(openmp_compile_args)
+                ext.extra_link_args.extend(openmp_link_args)
         _build_ext.build_extensions(self)
 
 def generate_cython():
@@ -87,6 +100,39 @@ if __name__ == "__main__":
                                        include_dirs=[]),
                   setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_affine",
                                        ["py_stringmatching/similarity_measure/cython/cython_affine.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_hamming_distance",
+                                       ["py_stringmatching/similarity_measure/cython/cython_hamming_distance.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_substitution_matrix",
+                                       ["py_stringmatching/similarity_measure/cython/cython_substitution_matrix.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_editex",
+                                       ["py_stringmatching/similarity_measure/cython/cython_editex.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_indel",
+                                       ["py_stringmatching/similarity_measure/cython/cython_indel.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_token_sets",
+                                       ["py_stringmatching/similarity_measure/cython/cython_token_sets.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_all_pairs",
+                                       ["py_stringmatching/similarity_measure/cython/cython_all_pairs.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_set_join",
+                                       ["py_stringmatching/similarity_measure/cython/cython_set_join.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_topk",
+                                       ["py_stringmatching/similarity_measure/cython/cython_topk.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_minhash",
+                                       ["py_stringmatching/similarity_measure/cython/cython_minhash.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_simhash",
+                                       ["py_stringmatching/similarity_measure/cython/cython_simhash.c"],
+                                       include_dirs=[]),
+                  setuptools.Extension("py_stringmatching.similarity_measure.cython.cython_tfidf",
+                                       ["py_stringmatching/similarity_measure/cython/cython_tfidf.c"],
                                        include_dirs=[])
 
                   ]